@@ -0,0 +1,274 @@
+"""
+Many projects at once through the FastAPI app.
+
+Serves the app with uvicorn on a local port, in a thread of its own, and
+runs `--projects` clients against it concurrently the way the frontend
+does: `POST /chat` and read the SSE stream, `POST /task/{id}/start` and
+`GET /task/{id}/sub-tasks` once the plan arrives, `DELETE /chat/{id}`
+after the result summary. Every model is a `ScriptedModel` and every tool
+a stub answering "Done.", so the work is the backend's own: task locks,
+the per-request environment, workforce construction and orchestration.
+
+    python -m app.bench.load [--projects 8] [--json] [--baseline PATH] [--update-baseline]
+
+One project is run first to warm imports and caches. The report gives time
+to first event, SSE events/s over all streams, control endpoint latency,
+max RSS and traced heap growth per project and event loop lag in the
+server thread. It is compared with the stored baseline for the same number
+of projects, and the command exits with status 1 when a metric got worse
+by more than `--tolerance`, or when a project failed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import httpx
+import uvicorn
+from fastapi import FastAPI
+
+from app.bench.replay import FINAL_STEPS, Cassette, ScriptedModel, chat_options, harness
+from app.router import register_routers
+from app.service.loop_monitor import LoopMonitor, percentile
+
+default_baseline = os.path.join(os.path.dirname(__file__), "data", "load_baseline.json")
+
+QUESTION = "Write a haiku about autumn to a file"
+
+# Metric -> whether larger is better, and the absolute change below which it is noise
+METRICS: Dict[str, Tuple[bool, float]] = {
+    "ttfe_ms_p50": (False, 50.0),
+    "ttfe_ms_p99": (False, 100.0),
+    "events_per_sec": (True, 0.0),
+    "control_ms_p50": (False, 5.0),
+    "control_ms_p99": (False, 20.0),
+    "rss_kb_per_project": (False, 2048.0),
+    "traced_kb_per_project": (False, 1024.0),
+    "loop_lag_ms_p99": (False, 50.0),
+}
+
+
+class Server:
+    """The app served by uvicorn from a thread with its own event loop."""
+
+    def __init__(self, app: FastAPI) -> None:
+        self.socket = socket.socket()
+        self.socket.bind(("127.0.0.1", 0))
+        self.url = "http://127.0.0.1:%d" % self.socket.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(app, log_level="warning", lifespan="off"))
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.thread = threading.Thread(target=asyncio.run, args=(self._serve(),), name="bench-server", daemon=True)
+
+    async def _serve(self) -> None:
+        self.loop = asyncio.get_running_loop()
+        await self.server.serve(sockets=[self.socket])
+
+    def __enter__(self) -> "Server":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+    def call(self, coro) -> Any:
+        """Run `coro` on the server loop."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+
+async def start_monitor() -> LoopMonitor:
+    monitor = LoopMonitor(interval=0.01, stall_threshold=0.05)
+    monitor.start()
+    return monitor
+
+
+async def stop_monitor(monitor: LoopMonitor) -> None:
+    await monitor.stop()
+
+
+async def project(client: httpx.AsyncClient, timeout: float) -> Dict[str, Any]:
+    """One frontend session, timed."""
+    options = chat_options(QUESTION, "openai", "gpt-4o", "scripted")
+    result: Dict[str, Any] = {"ttfe_ms": None, "frames": 0, "control_ms": defaultdict(list), "error": None}
+
+    async def control(name: str, method: str, url: str) -> None:
+        sent = time.perf_counter()
+        response = await client.request(method, url)
+        result["control_ms"][name].append((time.perf_counter() - sent) * 1000)
+        if response.status_code >= 400:
+            result["error"] = f"{name}: HTTP {response.status_code}"
+
+    async def session() -> None:
+        started = ended = False
+        sent = time.perf_counter()
+        async with client.stream("POST", "/chat", content=options.model_dump_json(), headers={"Content-Type": "application/json"}) as response:
+            if response.status_code != 200:
+                result["error"] = f"chat: HTTP {response.status_code}"
+                return
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                if result["ttfe_ms"] is None:
+                    result["ttfe_ms"] = (time.perf_counter() - sent) * 1000
+                result["frames"] += 1
+                frame = json.loads(line[len("data: "):])
+                step = frame.get("step")
+                if step == "to_sub_tasks" and frame["data"].get("is_final") and not started:
+                    started = True
+                    await control("start", "POST", f"/task/{options.project_id}/start")
+                    await control("sub_tasks", "GET", f"/task/{options.project_id}/sub-tasks")
+                elif step == "end":
+                    ended = True
+                elif step in FINAL_STEPS:
+                    result["error"] = f"{step}: {str(frame.get('data'))[:200]}"
+                    await control("stop", "DELETE", f"/chat/{options.project_id}")
+                elif step == "summary" and ended:
+                    await control("stop", "DELETE", f"/chat/{options.project_id}")
+        if not ended and result["error"] is None:
+            result["error"] = "stream closed before end"
+
+    try:
+        await asyncio.wait_for(session(), timeout)
+    except asyncio.TimeoutError:
+        result["error"] = f"no end within {timeout:.0f}s"
+    return result
+
+
+async def drive(url: str, projects: int, timeout: float) -> Tuple[List[Dict[str, Any]], float]:
+    limits = httpx.Limits(max_connections=projects * 2 + 4)
+    async with httpx.AsyncClient(base_url=url, timeout=None, limits=limits) as client:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(project(client, timeout) for _ in range(projects)))
+        return results, time.perf_counter() - start
+
+
+def summarize(results: List[Dict[str, Any]], elapsed: float, projects: int) -> Dict[str, Any]:
+    ttfe = sorted(r["ttfe_ms"] for r in results if r["ttfe_ms"] is not None)
+    control: Dict[str, List[float]] = defaultdict(list)
+    for result in results:
+        for name, values in result["control_ms"].items():
+            control[name].extend(values)
+    every = sorted(value for values in control.values() for value in values)
+    frames = sum(r["frames"] for r in results)
+    return {
+        "projects": projects,
+        "seconds": elapsed,
+        "failed": [r["error"] for r in results if r["error"]],
+        "frames": frames,
+        "ttfe_ms_p50": percentile(ttfe, 0.5),
+        "ttfe_ms_p99": percentile(ttfe, 0.99),
+        "events_per_sec": frames / elapsed if elapsed else 0.0,
+        "control_ms_p50": percentile(every, 0.5),
+        "control_ms_p99": percentile(every, 0.99),
+        "control_ms": {name: {"p50": percentile(sorted(v), 0.5), "p99": percentile(sorted(v), 0.99)} for name, v in control.items()},
+    }
+
+
+def run(projects: int, timeout: float = 900.0, memory: bool = True, warmup: bool = True) -> Dict[str, Any]:
+    app = FastAPI(title="bench")
+    register_routers(app)
+    with harness(Cassette(), "replay", create=ScriptedModel), Server(app) as server:
+        if warmup:
+            asyncio.run(drive(server.url, 1, timeout))
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if memory:
+            tracemalloc.start()
+        monitor = server.call(start_monitor())
+        try:
+            results, elapsed = asyncio.run(drive(server.url, projects, timeout))
+        finally:
+            server.call(stop_monitor(monitor))
+            peak = tracemalloc.get_traced_memory()[1] if memory else None
+            if memory:
+                tracemalloc.stop()
+    loop = monitor.stats()
+    return {
+        **summarize(results, elapsed, projects),
+        "rss_kb_per_project": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / projects,
+        "traced_kb_per_project": peak / 1024 / projects if peak is not None else None,
+        "loop_lag_ms_p50": loop.lag_ms_p50,
+        "loop_lag_ms_p99": loop.lag_ms_p99,
+        "loop_stalls": loop.stalls_total,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics worse than the baseline by more than `tolerance`, relative, and the noise floor."""
+    regressions = []
+    for name, (larger_is_better, noise) in METRICS.items():
+        value, base = report.get(name), baseline.get(name)
+        if value is None or base is None:
+            continue
+        worse = base - value if larger_is_better else value - base
+        if worse > noise and worse > abs(base) * tolerance:
+            regressions.append(f"{name}: {value:.1f} against {base:.1f}")
+    return regressions
+
+
+def load_baseline(path: str, projects: int) -> Dict[str, Any] | None:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get(str(projects))
+
+
+def save_baseline(path: str, report: Dict[str, Any]) -> None:
+    stored = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            stored = json.load(f)
+    stored[str(report["projects"])] = {name: report[name] for name in METRICS if report.get(name) is not None}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stored, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=8, help="concurrent projects")
+    parser.add_argument("--timeout", type=float, default=900.0, help="seconds a project may take")
+    parser.add_argument("--baseline", default=default_baseline, help="stored results, keyed by the number of projects")
+    parser.add_argument("--update-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative regression")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="skip heap tracking, which slows the run")
+    parser.add_argument("--no-warmup", action="store_true", help="measure the first project too")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.projects, args.timeout, not args.no_tracemalloc, not args.no_warmup)
+    baseline = load_baseline(args.baseline, args.projects)
+    report["regressions"] = compare(report, baseline, args.tolerance) if baseline else []
+    report["baseline"] = args.baseline if baseline else None
+    if args.update_baseline and not report["failed"]:
+        save_baseline(args.baseline, report)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(
+            f"{args.projects} projects in {report['seconds']:.2f}s: first event p50 {report['ttfe_ms_p50']:.0f} ms "
+            f"/ p99 {report['ttfe_ms_p99']:.0f} ms, {report['events_per_sec']:,.0f} events/s, "
+            f"control p50 {report['control_ms_p50']:.1f} ms / p99 {report['control_ms_p99']:.1f} ms, "
+            f"{report['rss_kb_per_project'] / 1024:.1f} MB RSS per project, loop lag p99 {report['loop_lag_ms_p99']:.1f} ms"
+        )
+        for line in report["failed"] + report["regressions"]:
+            print(f"  {line}")
+    if report["failed"] or report["regressions"]:
+        parser.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
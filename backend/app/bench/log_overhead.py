@@ -0,0 +1,95 @@
+"""
+Per-event cost of the logging calls on hot paths.
+
+Each case times one log call the way the code used to make it, on the
+underlying logger with an eager f-string or `extra` dict, against the same
+call through the `traceroot_wrapper` facade, with fields, %-args and
+callables that are only evaluated once the record is going to be written.
+
+    python -m app.bench.log_overhead [--calls 200000] [--json]
+
+Records go to a `NullHandler` at INFO, so a disabled DEBUG call measures the
+level check and an enabled INFO call measures building and handling the record.
+"""
+
+import argparse
+import json
+import logging
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from utils.traceroot_wrapper import LogFacade
+
+CONTENT = "Build a landing page for the product launch. " * 40
+ARGS = {"command": "ls -la /tmp/bench", "timeout": 30, "env": {"PATH": "/usr/bin"}}
+
+
+def make_loggers() -> Tuple[logging.Logger, LogFacade, LogFacade]:
+    std = logging.getLogger("bench.log_overhead")
+    std.handlers[:] = [logging.NullHandler()]
+    std.propagate = False
+    std.setLevel(logging.INFO)
+    limited = logging.getLogger("bench.log_overhead.limited")
+    limited.handlers[:] = [logging.NullHandler()]
+    limited.propagate = False
+    limited.setLevel(logging.DEBUG)
+    facade = LogFacade(std)
+    # As with the default `LOG_LEVEL`
+    facade.min_level = logging.INFO
+    return std, facade, LogFacade(limited, per_second=100)
+
+
+def cases(std: logging.Logger, facade: LogFacade, limited: LogFacade) -> Dict[str, Tuple[Callable, Callable]]:
+    task_id, action = "bench_task", "activate_toolkit"
+    return {
+        "debug off, fields": (
+            lambda: std.debug("Adding item to task queue", extra={"task_id": task_id, "action": action}),
+            lambda: facade.debug("Adding item to task queue", task_id=task_id, action=action),
+        ),
+        "debug off, tool args": (
+            lambda: std.debug(f"Agent developer executing tool: shell_exec with args: {json.dumps(ARGS)}"),
+            lambda: facade.debug(lambda: f"Agent developer executing tool: shell_exec with args: {json.dumps(ARGS)}"),
+        ),
+        "info on, content preview": (
+            lambda: std.info(f"[DECOMPOSE] Task content preview: '{CONTENT[:200]}...'"),
+            lambda: facade.info("[DECOMPOSE] Task content preview: '%.200s...'", CONTENT),
+        ),
+        "debug on, 100/s limit": (
+            lambda: limited._std.debug(f"Terminal output: {CONTENT[:80]}"),
+            lambda: limited.debug("Terminal output: %.80s", CONTENT),
+        ),
+    }
+
+
+def run(calls: int) -> Dict[str, Any]:
+    std, facade, limited = make_loggers()
+    report: Dict[str, Any] = {"calls": calls, "cases": {}}
+    for name, (before, after) in cases(std, facade, limited).items():
+        before_ns = min(timeit.repeat(before, number=calls, repeat=3)) / calls * 1e9
+        after_ns = min(timeit.repeat(after, number=calls, repeat=3)) / calls * 1e9
+        report["cases"][name] = {
+            "before_ns": round(before_ns, 1),
+            "after_ns": round(after_ns, 1),
+            "speedup": round(before_ns / after_ns, 2) if after_ns else None,
+        }
+    return report
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200000, help="calls per case and repeat")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.calls)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+    for name, result in report["cases"].items():
+        print(f"{name:26} {result['before_ns']:9.1f} ns -> {result['after_ns']:9.1f} ns  ({result['speedup']}x)")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,591 @@
+"""
+Record a workforce run against a live model, then replay it offline.
+
+Recording drives `step_solve` the way the frontend does (ask, start the
+plan once it is decomposed, stop after the result) with the configured
+model, and writes every model response and tool result to a cassette, one
+JSON object per line. Replaying runs the same orchestration,
+`construct_workforce` included, with models built by a stub `ModelFactory`
+that answers from the cassette and tools that return the recorded results,
+so orchestration changes can be measured without an LLM or side effects.
+
+    python -m app.bench.replay record --question "..." --model-platform openai \\
+        --model-type gpt-4o --api-key $KEY --out run.jsonl
+    python -m app.bench.replay replay [run.jsonl] [--latency 0] [--json]
+
+The cassette shipped in `app/bench/data` is the default for `replay` and
+comes from `record --scripted --question "Write a haiku about autumn to a
+file"`. `record` always needs `--out`, so it never overwrites that file by
+accident; pass the shipped path to regenerate it.
+
+Responses are served per agent name in recorded order. Workers of the same
+kind running in parallel may take them in another order than when recorded,
+which keeps the work done the same. An agent asking for more responses than
+were recorded gets a plain "Done." and is counted in `misses`. Replayed
+tools skip the toolkit itself, so its side effects and the frames it sends
+about them (`write_file`, `terminal`, ...) are not part of a replay.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+from unittest.mock import patch
+
+from camel.models import BaseModelBackend, ModelFactory
+from camel.models.stub_model import StubTokenCounter
+from camel.toolkits import FunctionTool
+from camel.types import ChatCompletion, ChatCompletionChunk
+from openai import AsyncStream, Stream
+
+from app.bench.step_solve import FakeRequest
+from app.model.chat import Chat
+from app.service import chat_service
+from app.service.loop_monitor import LoopMonitor
+from app.service.task import ActionImproveData, ActionStartData, ActionStopData, get_or_create_task_lock
+from app.utils.agent import ListenChatAgent, ToolDispatch
+
+default_cassette = os.path.join(os.path.dirname(__file__), "data", "replay_cassette.jsonl")
+
+# Frames after which the run is over and the frontend would stop asking
+FINAL_STEPS = {"wait_confirm", "error", "context_too_long", "budget_not_enough"}
+
+
+class Cassette:
+    """Model responses and tool results of one run, queued per agent."""
+
+    def __init__(self, meta: Dict[str, Any] | None = None) -> None:
+        self.meta: Dict[str, Any] = meta or {}
+        self.models: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.tools: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = defaultdict(deque)
+        self.workers: Dict[str, str] = {}
+        """Worker node description -> node id when recorded"""
+        self.rewrites: Dict[str, str] = {}
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        cassette = cls()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    cassette.add(json.loads(line))
+        return cassette
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        if entry["type"] == "meta":
+            self.meta = entry
+        elif entry["type"] == "model":
+            self.models[entry["agent"]].append(entry)
+        elif entry["type"] == "tool":
+            self.tools[(entry["agent"], entry["name"])].append(entry)
+        elif entry["type"] == "workers":
+            self.workers.update(entry["ids"])
+
+    def map_workers(self, ids: Dict[str, str]) -> None:
+        """Answer with the node ids of this run where recorded answers name workers."""
+        self.rewrites = {old: ids[description] for description, old in self.workers.items() if ids.get(description, old) != old}
+
+    def rewrite(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.rewrites:
+            return entry
+        text = json.dumps(entry)
+        for old, new in self.rewrites.items():
+            text = text.replace(old, new)
+        return json.loads(text)
+
+    def open(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self.write({"type": "meta", **self.meta})
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        # Agents may step in worker threads
+        with self._lock:
+            self.add(entry)
+            if self._file is not None:
+                self._file.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+                self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def next_model(self, agent: str) -> Dict[str, Any] | None:
+        with self._lock:
+            queue = self.models.get(agent)
+            if queue:
+                return self.rewrite(queue.popleft())
+            self.misses += 1
+            return None
+
+    def next_tool(self, agent: str, name: str) -> Dict[str, Any] | None:
+        with self._lock:
+            queue = self.tools.get((agent, name))
+            if queue:
+                return queue.popleft()
+            self.misses += 1
+            return None
+
+
+def cassette_agent(backend: BaseModelBackend) -> str:
+    return getattr(backend, "_cassette_agent", "unknown")
+
+
+def worker_ids(workforce: Any) -> Dict[str, str]:
+    return {child.description: child.node_id for child in workforce._children}
+
+
+def done_completion() -> ChatCompletion:
+    return ChatCompletion.model_validate({
+        "id": "replay",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "replay",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Done."}}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    })
+
+
+class ReplayModel(BaseModelBackend):
+    """A model backend answering from a cassette, `latency` times as slow as recorded."""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0, model_type: Any = "gpt-4o", model_config_dict=None, **kwargs) -> None:
+        super().__init__(model_type, model_config_dict)
+        self.cassette = cassette
+        self.latency = latency
+
+    @property
+    def token_counter(self):
+        if not self._token_counter:
+            self._token_counter = StubTokenCounter()
+        return self._token_counter
+
+    def _next(self) -> Tuple[Dict[str, Any] | None, float]:
+        entry = self.cassette.next_model(cassette_agent(self))
+        return entry, (entry or {}).get("seconds", 0.0) * self.latency
+
+    def _run(self, messages, response_format=None, tools=None):
+        entry, delay = self._next()
+        if delay:
+            time.sleep(delay)
+        if entry is None:
+            return done_completion()
+        if "chunks" in entry:
+            return (ChatCompletionChunk.model_validate(chunk) for chunk in entry["chunks"])
+        return ChatCompletion.model_validate(entry["completion"])
+
+    async def _arun(self, messages, response_format=None, tools=None):
+        entry, delay = self._next()
+        if delay:
+            await asyncio.sleep(delay)
+        if entry is None:
+            return done_completion()
+        if "chunks" in entry:
+            async def chunks():
+                for chunk in entry["chunks"]:
+                    yield ChatCompletionChunk.model_validate(chunk)
+
+            return chunks()
+        return ChatCompletion.model_validate(entry["completion"])
+
+
+class ReplayModelFactory:
+    """Stands in for `ModelFactory`, for our agents and those toolkits build themselves."""
+
+    def __init__(self, cassette: Cassette, latency: float = 0.0) -> None:
+        self.cassette = cassette
+        self.latency = latency
+
+    def create(self, model_platform=None, model_type="gpt-4o", model_config_dict=None, **kwargs) -> ReplayModel:
+        return ReplayModel(self.cassette, self.latency, model_type, model_config_dict)
+
+
+SCRIPTED_TASKS = [
+    "Write a three-line haiku about autumn leaves and save it as haiku.md in the working directory.",
+    "Check that haiku.md in the working directory exists and has exactly three lines.",
+]
+
+SCRIPTED_TOOLS = {
+    "document_agent": ("write_to_file", {
+        "title": "Autumn",
+        "content": "Red leaves drift and fall\nwind hums through the empty boughs\nthe year exhales slow\n",
+        "filename": "haiku.md",
+    }),
+    "developer_agent": ("shell_exec", {"id": "check", "command": "wc -l {working_directory}/haiku.md"}),
+}
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+class ScriptedModel(BaseModelBackend):
+    """
+    A rule-based stand-in for an LLM, enough for one small plan: it takes any
+    question as a task, splits it into writing a haiku and checking the file,
+    assigns those to the document and developer agents, which call one tool
+    each, and writes the summaries. `record --scripted` records it, which
+    makes a cassette without a model.
+    """
+
+    def __init__(self, model_type: Any = "gpt-4o", model_config_dict=None, **kwargs) -> None:
+        super().__init__(model_type, model_config_dict)
+
+    @property
+    def token_counter(self):
+        if not self._token_counter:
+            self._token_counter = StubTokenCounter()
+        return self._token_counter
+
+    def reply(self, messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+        agent = cassette_agent(self)
+        prompt = message_text(messages[-1])
+        if agent == "question_confirm_agent":
+            return {"content": "yes"}
+        if "<tasks>" in prompt:
+            return {"content": "<tasks>\n" + "".join(f"<task>{task}</task>\n" for task in SCRIPTED_TASKS) + "</tasks>"}
+        if "Task Name|" in prompt:
+            return {"content": "Autumn Haiku|Write an autumn haiku to haiku.md and check the file."}
+        if '"assignments"' in prompt:
+            task_ids = list(dict.fromkeys(re.findall(r"Task ID: (\S+)", prompt)))
+            workers = dict((name, node_id) for node_id, name in re.findall(r"<([^<>]+)>:<(\w+) Agent:", prompt))
+            assignments = [
+                {"task_id": task_id, "assignee_id": workers.get("Document" if i == 0 else "Developer"), "dependencies": task_ids[:1] if i else []}
+                for i, task_id in enumerate(task_ids)
+            ]
+            return {"content": json.dumps({"assignments": assignments})}
+        if '"quality_score"' in prompt:
+            return {"content": json.dumps({"reasoning": "The result meets the task.", "quality_score": 90, "issues": []})}
+        if agent in SCRIPTED_TOOLS:
+            called = any(m.get("role") == "tool" for m in messages[-3:])
+            if not called:
+                name, args = SCRIPTED_TOOLS[agent]
+                # Where the system prompt says files go
+                found = re.search(r"\*\*Working Directory\*\*: `([^`]+)`", message_text(messages[0]))
+                arguments = json.dumps(args).replace("{working_directory}", found.group(1) if found else ".")
+                return {"tool_calls": [{"id": f"call_{agent}", "type": "function", "function": {"name": name, "arguments": arguments}}]}
+            return {"content": json.dumps({"content": f"{prompt[:200]}", "failed": False})}
+        if agent == "task_summary_agent":
+            return {"content": "The autumn haiku was written to haiku.md and the file was checked: it has three lines."}
+        return {"content": "Done."}
+
+    def completion(self, reply: Dict[str, Any]) -> ChatCompletion:
+        return ChatCompletion.model_validate({
+            "id": "scripted",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "scripted",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "tool_calls" if reply.get("tool_calls") else "stop",
+                "message": {"role": "assistant", "content": reply.get("content"), "tool_calls": reply.get("tool_calls")},
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        })
+
+    def chunks(self, reply: Dict[str, Any]) -> List[ChatCompletionChunk]:
+        content = reply.get("content") or ""
+        pieces = [content[i:i + 40] for i in range(0, len(content), 40)] or [""]
+        chunk = {"id": "scripted", "object": "chat.completion.chunk", "created": int(time.time()), "model": "scripted"}
+        deltas = [
+            {**chunk, "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None if i < len(pieces) - 1 else "stop"}]}
+            for i, piece in enumerate(pieces)
+        ]
+        # As with `stream_options={"include_usage": True}`, which is where the agent finishes the message
+        usage = {**chunk, "choices": [], "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}}
+        return [ChatCompletionChunk.model_validate(data) for data in deltas + [usage]]
+
+    def _run(self, messages, response_format=None, tools=None):
+        reply = self.reply(messages)
+        if self.model_config_dict.get("stream"):
+            return iter(self.chunks(reply))
+        return self.completion(reply)
+
+    async def _arun(self, messages, response_format=None, tools=None):
+        reply = self.reply(messages)
+        if self.model_config_dict.get("stream"):
+            async def chunks():
+                for chunk in self.chunks(reply):
+                    yield chunk
+
+            return chunks()
+        return self.completion(reply)
+
+
+def replay_tool(cassette: Cassette, agent_name: str, tool: FunctionTool) -> FunctionTool:
+    name = tool.get_function_name()
+
+    def replayed(**kwargs: Any) -> Any:
+        entry = cassette.next_tool(agent_name, name)
+        return "Done." if entry is None else entry["result"]
+
+    replacement = FunctionTool(replayed, openai_tool_schema=tool.get_openai_tool_schema())
+    replacement._toolkit_name = ToolDispatch.resolve(tool).toolkit_name
+    return replacement
+
+
+def record_backend(backend: BaseModelBackend, cassette: Cassette) -> BaseModelBackend:
+    """Wrap `backend` so every response it returns is written to `cassette`."""
+    run, arun = backend._run, backend._arun
+
+    def entry(started: float, **fields: Any) -> Dict[str, Any]:
+        return {"type": "model", "agent": cassette_agent(backend), "seconds": round(time.perf_counter() - started, 4), **fields}
+
+    # The agent finishes the message at the usage chunk and may not read on
+    def chunks_of(result, started: float) -> Iterator:
+        chunks = []
+        for chunk in result:
+            chunks.append(chunk.model_dump(mode="json"))
+            if chunk.usage:
+                cassette.write(entry(started, chunks=chunks))
+            yield chunk
+        if not chunks or not chunks[-1].get("usage"):
+            cassette.write(entry(started, chunks=chunks))
+
+    async def achunks_of(result, started: float):
+        chunks = []
+        async for chunk in result:
+            chunks.append(chunk.model_dump(mode="json"))
+            if chunk.usage:
+                cassette.write(entry(started, chunks=chunks))
+            yield chunk
+        if not chunks or not chunks[-1].get("usage"):
+            cassette.write(entry(started, chunks=chunks))
+
+    def recorded(result, started: float):
+        if isinstance(result, ChatCompletion):
+            cassette.write(entry(started, completion=result.model_dump(mode="json")))
+            return result
+        if isinstance(result, Stream) or hasattr(result, "__next__"):
+            return chunks_of(result, started)
+        if isinstance(result, AsyncStream) or hasattr(result, "__anext__"):
+            return achunks_of(result, started)
+        # Structured stream managers are passed through unrecorded
+        cassette.write(entry(started, unsupported=type(result).__name__))
+        return result
+
+    def _run(messages, response_format=None, tools=None):
+        started = time.perf_counter()
+        return recorded(run(messages, response_format, tools), started)
+
+    async def _arun(messages, response_format=None, tools=None):
+        started = time.perf_counter()
+        return recorded(await arun(messages, response_format, tools), started)
+
+    backend._run, backend._arun = _run, _arun
+    return backend
+
+
+def harness(cassette: Cassette, mode: str, latency: float = 0.0, create: Callable | None = None) -> ExitStack:
+    """
+    Patches that bind models to agent names and record or replay them.
+    Models come from `create` when given. Otherwise recordings use the real
+    `ModelFactory` and replays answer from the cassette.
+    """
+    offline = mode == "replay" or create is not None
+    if create is None:
+        create = ReplayModelFactory(cassette, latency).create if mode == "replay" else ModelFactory.create
+    init = ListenChatAgent.__init__
+    record_tool_calling = ListenChatAgent._record_tool_calling
+    construct_workforce = chat_service.construct_workforce
+
+    def __init__(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        for model in self.model_backend.models:
+            if not hasattr(model, "_cassette_agent"):
+                model._cassette_agent = getattr(self.agent_name, "value", self.agent_name)
+        if mode == "replay":
+            for name, tool in list(self._internal_tools.items()):
+                self._internal_tools[name] = replay_tool(cassette, self.agent_name, tool)
+
+    def _record_tool_calling(self, func_name, args, result, *rest, **kwargs):
+        cassette.write({"type": "tool", "agent": self.agent_name, "name": func_name, "result": result})
+        return record_tool_calling(self, func_name, args, result, *rest, **kwargs)
+
+    def record_create(*args, **kwargs):
+        return record_backend(create(*args, **kwargs), cassette)
+
+    async def _construct_workforce(options):
+        workforce, mcp = await construct_workforce(options)
+        if mode == "replay":
+            cassette.map_workers(worker_ids(workforce))
+        else:
+            cassette.write({"type": "workers", "ids": worker_ids(workforce)})
+        return workforce, mcp
+
+    stack = ExitStack()
+    stack.enter_context(patch.object(ListenChatAgent, "__init__", __init__))
+    stack.enter_context(patch.object(chat_service, "construct_workforce", _construct_workforce))
+    if offline:
+        # Toolkits that build their own clients check for a key up front
+        stack.enter_context(patch.dict(os.environ, {"OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "replay"}))
+    if mode == "replay":
+        stack.enter_context(patch.object(ModelFactory, "create", create))
+    else:
+        stack.enter_context(patch.object(ModelFactory, "create", record_create))
+        stack.enter_context(patch.object(ListenChatAgent, "_record_tool_calling", _record_tool_calling))
+    # Runs are not synced to the server
+    stack.enter_context(patch("app.utils.server.sync_step.env", lambda key, default=None: None))
+    return stack
+
+
+async def drive(options: Chat, memory: bool = True) -> Dict[str, Any]:
+    """Run one question through `step_solve` as the frontend would, measuring it."""
+    task_lock = get_or_create_task_lock(options.project_id)
+    await task_lock.put_queue(ActionImproveData(data=options.question))
+
+    async def stop_after_summary() -> None:
+        # step_solve schedules the result summary once it resumes after `end`
+        await asyncio.sleep(0)
+        if task_lock.pending_summary is not None:
+            await asyncio.wait([task_lock.pending_summary])
+        await task_lock.put_queue(ActionStopData())
+
+    monitor = LoopMonitor(interval=0.01, stall_threshold=0.05)
+    monitor.start()
+    if memory:
+        tracemalloc.start()
+    frames = frame_bytes = 0
+    steps: Dict[str, int] = defaultdict(int)
+    started = False
+    stopping = None
+    start = time.perf_counter()
+    try:
+        async for frame in chat_service.step_solve(options, FakeRequest(), task_lock):
+            frames += 1
+            frame_bytes += len(getattr(frame, "encoded", frame))
+            step = getattr(frame, "step", "")
+            steps[step] += 1
+            if step == "to_sub_tasks" and frame.data.get("is_final") and not started:
+                started = True
+                await task_lock.put_queue(ActionStartData())
+            elif (step == "end" or step in FINAL_STEPS) and stopping is None:
+                stopping = asyncio.create_task(stop_after_summary())
+        elapsed = time.perf_counter() - start
+    finally:
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if memory:
+            tracemalloc.stop()
+        await monitor.stop()
+    loop = monitor.stats()
+    return {
+        "seconds": elapsed,
+        "frames": frames,
+        "frame_bytes": frame_bytes,
+        "events_per_sec": frames / elapsed if elapsed else 0.0,
+        "steps": dict(steps),
+        "peak_traced_bytes": peak,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "loop_lag_ms_p50": loop.lag_ms_p50,
+        "loop_lag_ms_p99": loop.lag_ms_p99,
+        "loop_lag_ms_max": loop.lag_ms_max,
+        "loop_stalls": loop.stalls_total,
+    }
+
+
+def chat_options(
+    question: str, model_platform: str, model_type: str, api_key: str, api_url: str | None = None, task_id: str | None = None
+) -> Chat:
+    return Chat(
+        task_id=task_id or f"bench_{uuid.uuid4().hex[:8]}",
+        project_id=f"bench_{uuid.uuid4().hex[:8]}",
+        question=question,
+        email="bench@example.com",
+        model_platform=model_platform,
+        model_type=model_type,
+        api_key=api_key,
+        api_url=api_url,
+    )
+
+
+def record(options: Chat, path: str, scripted: bool = False) -> Dict[str, Any]:
+    cassette = Cassette({
+        "question": options.question,
+        "model_platform": options.model_platform,
+        "model_type": options.model_type,
+        # Subtask ids derive from it, and recorded answers refer to them
+        "task_id": options.task_id,
+        "scripted": scripted,
+    })
+    cassette.open(path)
+    try:
+        with harness(cassette, "record", create=ScriptedModel if scripted else None):
+            report = asyncio.run(drive(options))
+    finally:
+        cassette.close()
+    return {**report, "cassette": path, "models": sum(len(q) for q in cassette.models.values()), "tools": sum(len(q) for q in cassette.tools.values())}
+
+
+def replay(path: str = default_cassette, latency: float = 0.0, memory: bool = True) -> Dict[str, Any]:
+    cassette = Cassette.load(path)
+    meta = cassette.meta
+    options = chat_options(
+        meta["question"], meta.get("model_platform", "openai"), meta.get("model_type", "gpt-4o"), "replay", task_id=meta.get("task_id")
+    )
+    with harness(cassette, "replay", latency):
+        report = asyncio.run(drive(options, memory))
+    return {
+        **report,
+        "cassette": path,
+        "misses": cassette.misses,
+        "unused": sum(len(q) for q in cassette.models.values()) + sum(len(q) for q in cassette.tools.values()),
+    }
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    rec = commands.add_parser("record", help="run against the configured model and write a cassette")
+    rec.add_argument("--question", required=True)
+    rec.add_argument("--model-platform", default="openai")
+    rec.add_argument("--model-type", default="gpt-4o")
+    rec.add_argument("--scripted", action="store_true", help="use the rule-based ScriptedModel instead of a live model")
+    rec.add_argument("--api-key", default=os.getenv("OPENAI_API_KEY", ""))
+    rec.add_argument("--api-url", default=None)
+    rec.add_argument("--out", required=True, help="cassette to write")
+    rep = commands.add_parser("replay", help="run from a cassette with no model")
+    rep.add_argument("cassette", nargs="?", default=default_cassette)
+    rep.add_argument("--latency", type=float, default=0.0, help="fraction of the recorded model latency to wait")
+    rep.add_argument("--no-tracemalloc", action="store_true", help="skip peak heap tracking, which slows the run")
+    for command in (rec, rep):
+        command.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        options = chat_options(args.question, args.model_platform, args.model_type, args.api_key or "scripted", args.api_url)
+        report = record(options, args.out, args.scripted)
+    else:
+        report = replay(args.cassette, args.latency, not args.no_tracemalloc)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+    peak = report["peak_traced_bytes"]
+    print(
+        f"{report['frames']} frames in {report['seconds']:.3f}s: {report['events_per_sec']:,.0f} events/s, "
+        + (f"peak {peak / 1e6:.1f} MB traced, " if peak is not None else "")
+        + f"max RSS {report['max_rss_kb'] / 1024:.0f} MB, "
+        f"loop lag p99 {report['loop_lag_ms_p99']:.1f} ms / max {report['loop_lag_ms_max']:.1f} ms"
+        + (f", {report['misses']} misses" if "misses" in report else "")
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
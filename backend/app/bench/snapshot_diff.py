@@ -0,0 +1,74 @@
+"""
+Byte and token savings of the "diff" browser snapshot mode.
+
+Replays a recorded sequence of browser actions and page snapshots through
+`SnapshotDiffer` and compares what the agent would receive with the full
+snapshots it gets in "full" mode.
+
+    python -m app.bench.snapshot_diff [--sequence path/to/sequence.json] [--json]
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List
+
+from app.utils.toolkit.hybrid_browser_toolkit import FULL_SNAPSHOT_COMMANDS
+from app.utils.toolkit.snapshot_diff import SnapshotDiffer
+
+default_sequence = os.path.join(os.path.dirname(__file__), "data", "snapshot_sequence.json")
+
+
+def run(steps: List[Dict[str, Any]]) -> Dict[str, Any]:
+    differ = SnapshotDiffer()
+    rows = []
+    for step in steps:
+        snapshot = step["snapshot"]
+        sent = differ.render("tab", snapshot, full=step["command"] in FULL_SNAPSHOT_COMMANDS)
+        rows.append(
+            {
+                "command": step["command"],
+                "full_bytes": len(snapshot.encode("utf-8")),
+                "diff_bytes": len(sent.encode("utf-8")),
+                "diff": sent is not snapshot,
+            }
+        )
+    full_bytes = sum(row["full_bytes"] for row in rows)
+    diff_bytes = sum(row["diff_bytes"] for row in rows)
+    return {
+        "steps": rows,
+        "full_bytes": full_bytes,
+        "diff_bytes": diff_bytes,
+        # Same rough estimate as ConversationHistory.approx_tokens
+        "full_tokens": full_bytes // 4,
+        "diff_tokens": diff_bytes // 4,
+        "saved_ratio": 1 - diff_bytes / full_bytes if full_bytes else 0.0,
+    }
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sequence", default=default_sequence, help="recorded snapshot sequence (JSON)")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.sequence, "r", encoding="utf-8") as f:
+        report = run(json.load(f)["steps"])
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+    print(f"{'step':>4}  {'command':<12} {'full B':>8} {'sent B':>8}  mode")
+    for i, row in enumerate(report["steps"], 1):
+        mode = "diff" if row["diff"] else "full"
+        print(f"{i:>4}  {row['command']:<12} {row['full_bytes']:>8} {row['diff_bytes']:>8}  {mode}")
+    print(
+        f"total: {report['full_bytes']} B (~{report['full_tokens']} tokens) in full mode, "
+        f"{report['diff_bytes']} B (~{report['diff_tokens']} tokens) in diff mode, "
+        f"{report['saved_ratio']:.0%} saved"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Events per second through `step_solve`.
+
+Drives `step_solve` with a fake workforce: the question is confirmed as a
+complex task, decomposition returns at once, and then a burst of queued
+pass-through events (agent and toolkit activity, terminal output, notices,
+file writes) is drained as fast as the generator yields them.
+
+    python -m app.bench.step_solve [--events 20000] [--sync] [--json]
+
+With `--sync` every event is also prepared for the server sync, with the
+HTTP call itself replaced by a counter.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Dict, List
+from unittest.mock import patch
+
+from app.model.chat import Chat
+from app.service import chat_service
+from app.service.task import (
+    ActionActivateAgentData,
+    ActionActivateToolkitData,
+    ActionDeactivateAgentData,
+    ActionDeactivateToolkitData,
+    ActionImproveData,
+    ActionNoticeData,
+    ActionStopData,
+    ActionTerminalData,
+    ActionWriteFileData,
+    get_or_create_task_lock,
+)
+
+
+class FakeWorkforce:
+    """Just enough of `Workforce` for step_solve to decompose and stop."""
+
+    _running = False
+    _state = SimpleNamespace(name="IDLE")
+
+    async def node_make_sub_tasks(self, task, context, on_stream_batch=None, on_stream_text=None):
+        return []
+
+    def pause(self) -> None:
+        pass
+
+    def resume(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def stop_gracefully(self) -> None:
+        pass
+
+
+class FakeRequest:
+    async def is_disconnected(self) -> bool:
+        return False
+
+
+def make_events(count: int) -> List[Any]:
+    agent = {"agent_name": "developer_agent", "process_task_id": "1.1", "agent_id": "a1"}
+    toolkit = {"agent_name": "developer_agent", "toolkit_name": "Terminal Toolkit", "process_task_id": "1.1"}
+    templates = [
+        lambda i: ActionActivateAgentData(data={**agent, "message": f"step {i}"}),
+        lambda i: ActionActivateToolkitData(data={**toolkit, "method_name": "shell exec", "message": f"ls -la {i}"}),
+        lambda i: ActionTerminalData(process_task_id="1.1", data=f"line {i}: " + "x" * 60, offset=i * 70),
+        lambda i: ActionDeactivateToolkitData(data={**toolkit, "method_name": "shell exec", "message": "done"}),
+        lambda i: ActionNoticeData(process_task_id="1.1", data=f"notice {i}"),
+        lambda i: ActionWriteFileData(process_task_id="1.1", data=f"/tmp/bench/file_{i}.md"),
+        lambda i: ActionDeactivateAgentData(data={**agent, "message": f"result {i}", "tokens": 42}),
+    ]
+    return [templates[i % len(templates)](i) for i in range(count)]
+
+
+async def drive(count: int, sync: bool) -> Dict[str, Any]:
+    project_id = f"bench_{uuid.uuid4().hex[:8]}"
+    options = Chat(
+        task_id="bench_task",
+        project_id=project_id,
+        question="benchmark",
+        email="bench@example.com",
+        model_platform="openai",
+        model_type="gpt-4",
+        api_key="bench",
+    )
+    task_lock = get_or_create_task_lock(project_id)
+    await task_lock.put_queue(ActionImproveData(data=options.question))
+    for event in make_events(count):
+        await task_lock.put_queue(event)
+    await task_lock.put_queue(ActionStopData())
+
+    synced = {"events": 0, "bytes": 0}
+
+    async def fake_send(url, data):
+        synced["events"] += 1
+        synced["bytes"] += len(data) if isinstance(data, bytes) else len(json.dumps(data))
+
+    async def summary(agent, task):
+        return "Bench|benchmark"
+
+    async def confirm(agent, prompt, task_lock=None):
+        return True
+
+    async def workforce(options):
+        return FakeWorkforce(), None
+
+    with (
+        patch.object(chat_service, "question_confirm_agent", lambda options: None),
+        patch.object(chat_service, "question_confirm", confirm),
+        patch.object(chat_service, "construct_workforce", workforce),
+        patch.object(chat_service, "task_summary_agent", lambda options: None),
+        patch.object(chat_service, "summary_task", summary),
+        patch("app.utils.server.sync_step.env", lambda key, default=None: "http://sync.invalid" if sync else None),
+        patch("app.utils.server.sync_step.send_to_api", fake_send),
+    ):
+        frames = 0
+        frame_bytes = 0
+        start = time.perf_counter()
+        async for frame in chat_service.step_solve(options, FakeRequest(), task_lock):
+            frames += 1
+            frame_bytes += len(getattr(frame, "encoded", frame))
+        elapsed = time.perf_counter() - start
+        # Let the sync tasks created for the last frames run
+        await asyncio.sleep(0)
+
+    return {
+        "events": count,
+        "frames": frames,
+        "frame_bytes": frame_bytes,
+        "seconds": elapsed,
+        "events_per_sec": frames / elapsed if elapsed else 0.0,
+        "synced_events": synced["events"],
+        "synced_bytes": synced["bytes"],
+    }
+
+
+def run(count: int, sync: bool = False) -> Dict[str, Any]:
+    return asyncio.run(drive(count, sync))
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000, help="pass-through events to queue")
+    parser.add_argument("--sync", action="store_true", help="also prepare every event for the server sync")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args.events, args.sync)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report
+    print(
+        f"{report['frames']} frames ({report['frame_bytes']} B) in {report['seconds']:.3f}s: "
+        f"{report['events_per_sec']:,.0f} events/s"
+        + (f", {report['synced_events']} synced ({report['synced_bytes']} B)" if args.sync else "")
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
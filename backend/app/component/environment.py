@@ -1,4 +1,5 @@
 from utils import traceroot_wrapper as traceroot
+import asyncio
 import importlib.util
 import os
 from pathlib import Path
@@ -47,6 +48,29 @@ def get_current_env_path() -> str:
     return getattr(_thread_local, 'env_path', default_env_path)
 
 
+async def to_thread_with_env(func, /, *args, **kwargs):
+    """
+    Run a blocking callable in a worker thread with the caller's
+    user-specific environment path bound, so `env()` resolves the same
+    values there. Unlike `set_user_env_path`, this does not reload dotenv.
+    """
+    env_path = getattr(_thread_local, 'env_path', None)
+
+    def run():
+        previous = getattr(_thread_local, 'env_path', None)
+        if env_path is not None:
+            _thread_local.env_path = env_path
+        try:
+            return func(*args, **kwargs)
+        finally:
+            if previous is not None:
+                _thread_local.env_path = previous
+            elif hasattr(_thread_local, 'env_path'):
+                delattr(_thread_local, 'env_path')
+
+    return await asyncio.to_thread(run)
+
+
 @overload
 def env(key: str) -> str | None: ...
 
@@ -72,12 +96,12 @@ def env(key: str, default=None):
         user_env_values = dotenv_values(_thread_local.env_path)
         if key in user_env_values:
             value = user_env_values[key] or default
-            traceroot_logger.debug("Environment variable retrieved from user-specific config", extra={"key": key, "env_path": _thread_local.env_path, "has_value": value is not None})
+            traceroot_logger.debug("Environment variable retrieved from user-specific config", key=key, env_path=_thread_local.env_path, has_value=value is not None)
             return value
 
     # Fall back to global environment
     value = os.getenv(key, default)
-    traceroot_logger.debug("Environment variable retrieved from global config", extra={"key": key, "has_value": value is not None, "using_default": value == default})
+    traceroot_logger.debug("Environment variable retrieved from global config", key=key, has_value=value is not None, using_default=value == default)
     return value
 
 
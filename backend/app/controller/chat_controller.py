@@ -9,7 +9,7 @@ from fastapi.responses import StreamingResponse
 from utils import traceroot_wrapper as traceroot
 from app.component import code
 from app.exception.exception import UserException
-from app.model.chat import Chat, HumanReply, McpServers, Status, SupplementChat, AddTaskRequest, sse_json
+from app.model.chat import Chat, HumanReply, McpServers, Status, SupplementChat, AddTaskRequest, SseEvent, sse_json
 from app.service.chat_service import step_solve
 from app.service.task import (
     Action,
@@ -55,7 +55,8 @@ async def timeout_stream_wrapper(stream_generator, timeout_seconds: int = SSE_TI
             try:
                 data = await asyncio.wait_for(generator.__anext__(), timeout=remaining_timeout)
                 last_data_time = time.time()
-                yield data
+                # Events from sse_json carry their encoded frame; reuse it
+                yield data.encoded if isinstance(data, SseEvent) else data
             except asyncio.TimeoutError:
                 chat_logger.warning(f"SSE timeout: No data received for {timeout_seconds} seconds, closing connection")
                 # yield sse_json("error", {"message": "Connection timeout: No data received for 10 minutes"})
@@ -244,7 +245,7 @@ def install_mcp(id: str, data: McpServers):
 @traceroot.trace()
 def add_task(id: str, data: AddTaskRequest):
     """Add a new task to the workforce"""
-    chat_logger.info(f"Adding task to workforce for task_id: {id}, content: {data.content[:100]}...")
+    chat_logger.info("Adding task to workforce for task_id: %s, content: %.100s...", id, data.content)
     task_lock = get_task_lock(id)
 
     try:
@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from app.service.loop_monitor import LoopStats, loop_monitor
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("debug_controller")
+
+router = APIRouter(tags=["Debug"])
+
+
+@router.get("/debug/loop", name="event loop lag", response_model=LoopStats)
+async def loop_stats():
+    """Event loop lag percentiles and the most recent stalls with their stack samples."""
+    return loop_monitor.stats()
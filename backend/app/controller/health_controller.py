@@ -1,5 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
+from app.service.task_lifecycle import TaskLockStats, task_lock_lifecycle
+from app.utils.toolkit.hybrid_browser_toolkit import ConnectionPoolStats, websocket_connection_pool
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("health_controller")
@@ -20,3 +22,14 @@ async def health_check():
     logger.debug("Health check completed", extra={"status": response.status, "service": response.service})
     return response
 
+
+@router.get("/health/tasks", name="task lock stats", response_model=TaskLockStats)
+async def task_lock_stats():
+    """Live task lock count and approximate memory they hold."""
+    return task_lock_lifecycle.stats()
+
+
+@router.get("/health/browser", name="browser connection pool stats", response_model=ConnectionPoolStats)
+async def browser_pool_stats():
+    """Browser WebSocket connection pool usage."""
+    return websocket_connection_pool.stats()
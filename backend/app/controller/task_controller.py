@@ -1,7 +1,10 @@
 from typing import Literal
 from dotenv import load_dotenv
 from fastapi import APIRouter, Response
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
+from app.component import code
+from app.exception.exception import UserException
 from app.model.chat import NewAgent, UpdateData
 from app.service.task import (
     Action,
@@ -11,10 +14,13 @@ from app.service.task import (
     ActionStartData,
     ActionUpdateTaskData,
     get_task_lock,
+    get_task_lock_if_exists,
     task_locks,
 )
 import asyncio
 from app.component.environment import set_user_env_path
+from app.utils.listen.preview import payload_store
+from app.utils.toolkit.terminal_stream import TerminalReadResult, terminal_streams
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("task_controller")
@@ -79,3 +85,54 @@ def stop_all():
         asyncio.run(task_lock.put_queue(ActionStopData()))
     logger.info("All tasks stopped", extra={"task_count": len(task_locks)})
     return Response(status_code=204)
+
+
+@router.get("/task/{id}/sub-tasks", name="get subtask tree")
+@traceroot.trace()
+def get_sub_tasks(id: str):
+    """Current subtask tree and its sequence number, for clients that missed a delta."""
+    task_lock = get_task_lock_if_exists(id)
+    if task_lock is None:
+        raise UserException(code.not_found, "Task not found")
+    return jsonable_encoder(task_lock.task_tree.current())
+
+
+@router.get("/task/{id}/timeline", name="export task timeline")
+@traceroot.trace()
+def get_timeline(id: str, task_id: str | None = None):
+    """
+    Spans of workforce phases, agent steps, tool calls and queued events as
+    Chrome trace JSON, for chrome://tracing or ui.perfetto.dev. Limited to
+    one task of the project when `task_id` is given.
+    """
+    task_lock = get_task_lock_if_exists(id)
+    if task_lock is None:
+        raise UserException(code.not_found, "Task not found")
+    return task_lock.timeline.chrome_trace(task_id, name=id)
+
+
+@router.get("/task/{id}/payload/{payload_id}", name="get full tool result")
+@traceroot.trace()
+def get_payload(id: str, payload_id: str):
+    """Full result of a tool call whose toolkit event only carried a preview."""
+    try:
+        payload = payload_store.get(id, payload_id)
+    except KeyError:
+        raise UserException(code.not_found, "Payload not found or expired")
+    try:
+        data = jsonable_encoder(payload)
+    except (TypeError, ValueError):
+        data = str(payload)
+    return {"payload_id": payload_id, "data": data}
+
+
+
+@router.get("/task/{id}/terminal", name="read terminal output", response_model=TerminalReadResult)
+@traceroot.trace()
+def get_terminal(id: str, process_task_id: str = "", offset: int = 0):
+    """Terminal output from `offset` on, for clients catching up on missed events."""
+    try:
+        stream = terminal_streams.get(id, process_task_id)
+    except KeyError:
+        raise UserException(code.not_found, "Terminal output not found")
+    return stream.read(offset)
@@ -1,8 +1,9 @@
 from enum import Enum
+from functools import cached_property
 import json
 from pathlib import Path
 import re
-from typing import Literal
+from typing import Any, Literal
 from pydantic import BaseModel, Field, field_validator
 from camel.types import ModelType, RoleType
 from utils import traceroot_wrapper as traceroot
@@ -134,6 +135,39 @@ class AddTaskRequest(BaseModel):
 class RemoveTaskRequest(BaseModel):
     task_id: str
 
-def sse_json(step: str, data):
-    res_format = {"step": step, "data": data}
-    return f"data: {json.dumps(res_format, ensure_ascii=False)}\n\n"
+class SseEvent(str):
+    """
+    An SSE frame that keeps the step, payload and JSON it was built from.
+
+    It is still the `data: ...` string the stream expects, but consumers
+    that need the event again (the server sync, the bytes written to the
+    response) reuse what was serialized here instead of parsing or dumping
+    it a second time.
+    """
+
+    step: str
+    data: Any
+    payload: str
+
+    def __new__(cls, step: str, data: Any) -> "SseEvent":
+        payload = json.dumps({"step": step, "data": data}, ensure_ascii=False)
+        event = super().__new__(cls, f"data: {payload}\n\n")
+        event.step = step
+        event.data = data
+        event.payload = payload
+        return event
+
+    @cached_property
+    def encoded(self) -> bytes:
+        return self.encode("utf-8")
+
+    def sync_body(self, **fields: Any) -> bytes:
+        """The JSON object `{**fields, "step": ..., "data": ...}`, spliced into the cached payload."""
+        if not fields:
+            return self.payload.encode("utf-8")
+        head = json.dumps(fields, ensure_ascii=False)
+        return f"{head[:-1]}, {self.payload[1:]}".encode("utf-8")
+
+
+def sse_json(step: str, data) -> SseEvent:
+    return SseEvent(step, data)
@@ -3,7 +3,7 @@ Centralized router registration for the Node API.
 All routers are explicitly registered here for better visibility and maintainability.
 """
 from fastapi import FastAPI
-from app.controller import chat_controller, model_controller, task_controller, tool_controller, health_controller
+from app.controller import chat_controller, model_controller, task_controller, tool_controller, health_controller, debug_controller
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("router")
@@ -48,6 +48,11 @@ def register_routers(app: FastAPI, prefix: str = "") -> None:
             "tags": ["tool"], 
             "description": "Tool installation and management"
         },
+        {
+            "router": debug_controller.router,
+            "tags": ["Debug"],
+            "description": "Runtime diagnostics such as event loop lag"
+        },
     ]
     
     for config in routers_config:
@@ -1,21 +1,27 @@
 import asyncio
+from contextlib import contextmanager
 import datetime
 import json
 from pathlib import Path
 import platform
-from typing import Any, Literal
+import time
+from typing import Any, Callable, Literal
 from fastapi import Request
 from inflection import titleize
-from pydash import chain
 from app.component.debug import dump_class
-from app.component.environment import env
+from app.component.environment import env, to_thread_with_env
 from app.utils.file_utils import get_working_directory
+from app.service.conversation_history import ConversationHistory, content_length
+from app.service.task_tree import tree_sub_tasks
 from app.service.task import (
     ActionImproveData,
     ActionInstallMcpData,
     ActionNewAgent,
+    ActionNoticeData,
+    ActionTaskSummaryData,
     TaskLock,
     delete_task_lock,
+    get_task_lock_if_exists,
     set_current_task_id,
     ActionDecomposeProgressData,
     ActionDecomposeTextData,
@@ -49,6 +55,28 @@ import os
 
 logger = traceroot.get_logger("chat_service")
 
+# Events forwarded to the frontend as they are: action -> (SSE step, payload).
+# Everything else is a control action handled by step_solve itself.
+PASS_THROUGH_EVENTS: dict[Action, tuple[str, Callable[[Any], Any]]] = {
+    Action.create_agent: ("create_agent", lambda item: item.data),
+    Action.activate_agent: ("activate_agent", lambda item: item.data),
+    Action.deactivate_agent: ("deactivate_agent", lambda item: dict(item.data)),
+    Action.assign_task: ("assign_task", lambda item: item.data),
+    Action.activate_toolkit: ("activate_toolkit", lambda item: item.data),
+    Action.deactivate_toolkit: ("deactivate_toolkit", lambda item: item.data),
+    Action.write_file: ("write_file", lambda item: {"file_path": item.data, "process_task_id": item.process_task_id}),
+    Action.ask: ("ask", lambda item: item.data),
+    Action.notice: ("notice", lambda item: {"notice": item.data, "process_task_id": item.process_task_id}),
+    Action.search_mcp: ("search_mcp", lambda item: item.data),
+    Action.terminal: (
+        "terminal",
+        lambda item: {"output": item.data, "process_task_id": item.process_task_id, "offset": item.offset},
+    ),
+    Action.decompose_text: ("decompose_text", lambda item: item.data),
+    Action.decompose_progress: ("to_sub_tasks", lambda item: item.data),
+    Action.task_summary: ("summary", lambda item: {"task_id": item.task_id, "summary": item.data}),
+}
+
 
 def format_task_context(task_data: dict, seen_files: set | None = None, skip_files: bool = False) -> str:
     """Format structured task data into a readable context string.
@@ -159,12 +187,15 @@ def check_conversation_history_length(task_lock: TaskLock, max_length: int = 100
     Returns:
         tuple: (is_exceeded, total_length)
     """
-    if not hasattr(task_lock, 'conversation_history') or not task_lock.conversation_history:
+    history = getattr(task_lock, 'conversation_history', None)
+    if not history:
         return False, 0
 
-    total_length = 0
-    for entry in task_lock.conversation_history:
-        total_length += len(entry.get('content', ''))
+    if isinstance(history, ConversationHistory):
+        # Running total, kept under its own budget by rolling summarisation
+        total_length = history.total_chars
+    else:
+        total_length = sum(content_length(entry.get('content', '')) for entry in history)
 
     is_exceeded = total_length > max_length
 
@@ -184,23 +215,27 @@ def build_conversation_context(task_lock: TaskLock, header: str = "=== CONVERSAT
     Returns:
         Formatted context string with task history and files listed once at the end
     """
-    context = ""
+    parts = []
     working_directories = set()  # Collect all unique working directories
 
     if task_lock.conversation_history:
-        context = f"{header}\n"
+        parts.append(f"{header}\n")
+
+        summary = getattr(task_lock.conversation_history, 'summary', "")
+        if summary:
+            parts.append(f"Summary of earlier conversation:\n{summary}\n\n")
 
         for entry in task_lock.conversation_history:
             if entry['role'] == 'task_result':
                 if isinstance(entry['content'], dict):
                     formatted_context = format_task_context(entry['content'], skip_files=True)
-                    context += formatted_context + "\n\n"
+                    parts.append(formatted_context + "\n\n")
                     if entry['content'].get('working_directory'):
                         working_directories.add(entry['content']['working_directory'])
                 else:
-                    context += entry['content'] + "\n"
+                    parts.append(entry['content'] + "\n")
             elif entry['role'] == 'assistant':
-                context += f"Assistant: {entry['content']}\n\n"
+                parts.append(f"Assistant: {entry['content']}\n\n")
 
         if working_directories:
             all_generated_files = set()  # Use set to avoid duplicates
@@ -218,14 +253,13 @@ def build_conversation_context(task_lock: TaskLock, header: str = "=== CONVERSAT
                     logger.warning(f"Failed to collect generated files from {working_directory}: {e}")
 
             if all_generated_files:
-                context += "Generated Files from Previous Tasks:\n"
-                for file_path in sorted(all_generated_files):
-                    context += f"  - {file_path}\n"
-                context += "\n"
+                parts.append("Generated Files from Previous Tasks:\n")
+                parts.extend(f"  - {file_path}\n" for file_path in sorted(all_generated_files))
+                parts.append("\n")
 
-        context += "\n"
+        parts.append("\n")
 
-    return context
+    return "".join(parts)
 
 
 def build_context_for_workforce(task_lock: TaskLock, options: Chat) -> str:
@@ -269,7 +303,6 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
     last_completed_task_result = ""  # Track the last completed task result
     summary_task_content = ""  # Track task summary
     loop_iteration = 0
-    event_loop = asyncio.get_running_loop()
     sub_tasks: list[Task] = []
 
     logger.info("=" * 80)
@@ -309,7 +342,11 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
             continue
 
         try:
-            if item.action == Action.improve or start_event_loop:
+            pass_through = None if start_event_loop else PASS_THROUGH_EVENTS.get(item.action)
+            if pass_through is not None:
+                step, payload = pass_through
+                yield sse_json(step, payload(item))
+            elif item.action == Action.improve or start_event_loop:
                 logger.info("=" * 80)
                 logger.info(f"💬 [NEW-QUESTION] Action.improve received or start_event_loop", extra={"project_id": options.project_id, "start_event_loop": start_event_loop})
                 logger.info(f"[NEW-QUESTION] Current workforce state: workforce={'None' if workforce is None else f'exists(id={id(workforce)})'}")
@@ -321,12 +358,12 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                 # tracer.start()
                 if start_event_loop is True:
                     question = options.question
-                    logger.info(f"[NEW-QUESTION] Initial question from options.question: '{question[:100]}...'")
+                    logger.info("[NEW-QUESTION] Initial question from options.question: '%.100s...'", question)
                     start_event_loop = False
                 else:
                     assert isinstance(item, ActionImproveData)
                     question = item.data
-                    logger.info(f"[NEW-QUESTION] Follow-up question from ActionImproveData: '{question[:100]}...'")
+                    logger.info("[NEW-QUESTION] Follow-up question from ActionImproveData: '%.100s...'", question)
 
                 is_exceeded, total_length = check_conversation_history_length(task_lock)
                 if is_exceeded:
@@ -444,7 +481,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                             stream_state["seen_ids"].add(t.id)
                         stream_state["subtasks"].extend(fresh_tasks)
 
-                    def on_stream_text(chunk):
+                    async def on_stream_text(chunk):
                         try:
                             # With task_agent using stream_accumulate=True, chunk.msg.content is accumulated content
                             # We need to calculate the delta to send only new content to frontend
@@ -460,17 +497,14 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                             stream_state["last_content"] = accumulated_content
 
                             if delta_content:
-                                asyncio.run_coroutine_threadsafe(
-                                    task_lock.put_queue(
-                                        ActionDecomposeTextData(
-                                            data={
-                                                "project_id": options.project_id,
-                                                "task_id": options.task_id,
-                                                "content": delta_content,
-                                            }
-                                        )
-                                    ),
-                                    event_loop,
+                                await task_lock.put_queue(
+                                    ActionDecomposeTextData(
+                                        data={
+                                            "project_id": options.project_id,
+                                            "task_id": options.task_id,
+                                            "content": delta_content,
+                                        }
+                                    )
                                 )
                         except Exception as e:
                             logger.warning(f"Failed to stream decomposition text: {e}")
@@ -478,8 +512,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     async def run_decomposition():
                         nonlocal camel_task, summary_task_content
                         try:
-                            sub_tasks = await asyncio.to_thread(
-                                workforce.node_make_sub_tasks,
+                            sub_tasks = await workforce.node_make_sub_tasks(
                                 camel_task,
                                 context_for_coordinator,
                                 on_stream_batch,
@@ -495,10 +528,9 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                                 pass
 
                             logger.info(f"[NEW-QUESTION] Generating task summary")
-                            summary_task_agent = task_summary_agent(options)
                             try:
                                 summary_task_content = await asyncio.wait_for(
-                                    summary_task(summary_task_agent, camel_task), timeout=10
+                                    pooled_summary_task(options, task_lock, camel_task), timeout=10
                                 )
                                 task_lock.summary_generated = True
                                 logger.info("[NEW-QUESTION] ✅ Summary generated successfully", extra={"project_id": options.project_id})
@@ -530,11 +562,11 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                             except Exception:
                                 pass
                             logger.info(f"[NEW-QUESTION] 📤 Sending to_sub_tasks SSE to frontend (task card)")
-                            logger.info(f"[NEW-QUESTION] to_sub_tasks data: task_id={camel_task.id}, summary={summary_task_content[:50]}..., subtasks_count={len(camel_task.subtasks)}")
+                            logger.info("[NEW-QUESTION] to_sub_tasks data: task_id=%s, summary=%.50s..., subtasks_count=%d", camel_task.id, summary_task_content, len(camel_task.subtasks))
                             payload = {
                                 "project_id": options.project_id,
                                 "task_id": options.task_id,
-                                "sub_tasks": tree_sub_tasks(camel_task.subtasks),
+                                **task_lock.task_tree.snapshot(camel_task.subtasks),
                                 "delta_sub_tasks": tree_sub_tasks(sub_tasks),
                                 "is_final": True,
                                 "summary_task": summary_task_content,
@@ -555,8 +587,10 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     sub_tasks = getattr(task_lock, "decompose_sub_tasks", [])
                 sub_tasks = update_sub_tasks(sub_tasks, update_tasks)
                 add_sub_tasks(camel_task, item.data.task)
-                summary_task_content_local = getattr(task_lock, "summary_task_content", summary_task_content)
-                yield to_sub_tasks(camel_task, summary_task_content_local)
+                # Only the edits go out; the frontend already has the rest of the tree
+                delta = task_lock.task_tree.delta(camel_task.subtasks)
+                if delta is not None:
+                    yield sse_json("sub_tasks_delta", delta)
             elif item.action == Action.add_task:
 
                 # Check if this might be a misrouted second question
@@ -627,6 +661,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     logger.warning(f"[LIFECYCLE] Cannot skip: workforce is None or project_id mismatch")
 
                 # Mark task as done and preserve context (like Action.end does)
+                cancel_result_summary(task_lock)
                 task_lock.status = Status.done
                 end_message = "<summary>Task stopped</summary>Task stopped by user"
                 task_lock.last_task_result = end_message
@@ -706,18 +741,20 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     yield sse_json("error", {"message": "Cannot process new task state: current task not initialized."})
                     continue
 
+                cancel_result_summary(task_lock)
                 old_task_content: str = camel_task.content
-                old_task_result: str = await get_task_result_with_optional_summary(camel_task, options)
+                old_task_result: str = task_result_text(camel_task)
 
                 old_task_content_clean: str = old_task_content
                 if "=== CURRENT TASK ===" in old_task_content_clean:
                     old_task_content_clean = old_task_content_clean.split("=== CURRENT TASK ===")[-1].strip()
 
-                task_lock.add_conversation('task_result', {
+                old_task_entry = task_lock.add_conversation('task_result', {
                     'task_content': old_task_content_clean,
                     'task_result': old_task_result,
                     'working_directory': get_working_directory(options, task_lock)
                 })
+                old_camel_task = camel_task
 
                 new_task_content = item.data.get('content', '')
 
@@ -731,6 +768,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
 
                 # Now trigger end of previous task using stored result
                 yield sse_json("end", old_task_result)
+                schedule_result_summary(old_camel_task, options, task_lock, old_task_entry)
                 
                 # Always yield new_task_state first - this is not optional
                 yield sse_json("new_task_state", item.data)
@@ -789,7 +827,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                                 stream_state["seen_ids"].add(t.id)
                             stream_state["subtasks"].extend(fresh_tasks)
 
-                        def on_stream_text(chunk):
+                        async def on_stream_text(chunk):
                             try:
                                 # With task_agent using stream_accumulate=True, chunk.msg.content is accumulated content
                                 # We need to calculate the delta to send only new content to frontend
@@ -804,17 +842,14 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                                 stream_state["last_content"] = accumulated_content
 
                                 if delta_content:
-                                    asyncio.run_coroutine_threadsafe(
-                                        task_lock.put_queue(
-                                            ActionDecomposeTextData(
-                                                data={
-                                                    "project_id": options.project_id,
-                                                    "task_id": options.task_id,
-                                                    "content": delta_content,
-                                                }
-                                            )
-                                        ),
-                                        event_loop,
+                                    await task_lock.put_queue(
+                                        ActionDecomposeTextData(
+                                            data={
+                                                "project_id": options.project_id,
+                                                "task_id": options.task_id,
+                                                "content": delta_content,
+                                            }
+                                        )
                                     )
                             except Exception as e:
                                 logger.warning(f"Failed to stream decomposition text: {e}")
@@ -831,9 +866,8 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
 
                         # Generate proper LLM summary for multi-turn tasks instead of hardcoded fallback
                         try:
-                            multi_turn_summary_agent = task_summary_agent(options)
                             new_summary_content = await asyncio.wait_for(
-                                summary_task(multi_turn_summary_agent, camel_task), timeout=10
+                                pooled_summary_task(options, task_lock, camel_task), timeout=10
                             )
                             logger.info("Generated LLM summary for multi-turn task", extra={"project_id": options.project_id})
                         except asyncio.TimeoutError:
@@ -857,7 +891,7 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                         final_payload = {
                             "project_id": options.project_id,
                             "task_id": options.task_id,
-                            "sub_tasks": tree_sub_tasks(camel_task.subtasks),
+                            **task_lock.task_tree.snapshot(camel_task.subtasks),
                             "delta_sub_tasks": tree_sub_tasks(new_sub_tasks),
                             "is_final": True,
                             "summary_task": new_summary_content,
@@ -879,40 +913,9 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                         logger.warning(f"[TRACE] Workforce is None - this might be the issue")
                     if not new_task_content:
                         logger.warning(f"[TRACE] No new task content provided")
-            elif item.action == Action.create_agent:
-                yield sse_json("create_agent", item.data)
-            elif item.action == Action.activate_agent:
-                yield sse_json("activate_agent", item.data)
-            elif item.action == Action.deactivate_agent:
-                yield sse_json("deactivate_agent", dict(item.data))
-            elif item.action == Action.assign_task:
-                yield sse_json("assign_task", item.data)
-            elif item.action == Action.activate_toolkit:
-                yield sse_json("activate_toolkit", item.data)
-            elif item.action == Action.deactivate_toolkit:
-                yield sse_json("deactivate_toolkit", item.data)
-            elif item.action == Action.write_file:
-                yield sse_json(
-                    "write_file",
-                    {"file_path": item.data, "process_task_id": item.process_task_id},
-                )
-            elif item.action == Action.ask:
-                yield sse_json("ask", item.data)
-            elif item.action == Action.notice:
-                yield sse_json(
-                    "notice",
-                    {"notice": item.data, "process_task_id": item.process_task_id},
-                )
-            elif item.action == Action.search_mcp:
-                yield sse_json("search_mcp", item.data)
             elif item.action == Action.install_mcp:
                 task = asyncio.create_task(install_mcp(mcp, item))
                 task_lock.add_background_task(task)
-            elif item.action == Action.terminal:
-                yield sse_json(
-                    "terminal",
-                    {"output": item.data, "process_task_id": item.process_task_id},
-                )
             elif item.action == Action.pause:
                 if workforce is not None:
                     workforce.pause()
@@ -925,10 +928,6 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     logger.info(f"Workforce resumed for project {options.project_id}")
                 else:
                     logger.warning(f"Cannot resume: workforce is None for project {options.project_id}")
-            elif item.action == Action.decompose_text:
-                yield sse_json("decompose_text", item.data)
-            elif item.action == Action.decompose_progress:
-                yield sse_json("to_sub_tasks", item.data)
             elif item.action == Action.new_agent:
                 if workforce is not None:
                     workforce.pause()
@@ -954,8 +953,10 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                     # Use the item data as the final result if camel_task is None
                     final_result: str = str(item.data) if item.data else "Task completed"
                 else:
-                    final_result: str = await get_task_result_with_optional_summary(camel_task, options)
+                    # Sent as it stands; the LLM summary follows as a `summary` event
+                    final_result: str = task_result_text(camel_task)
                 
+                cancel_result_summary(task_lock)
                 task_lock.status = Status.done
 
                 task_lock.last_task_result = final_result
@@ -968,14 +969,15 @@ async def step_solve(options: Chat, request: Request, task_lock: TaskLock):
                 else:
                     task_content: str = f"Task {options.task_id}"
                 
-                task_lock.add_conversation('task_result', {
+                task_entry = task_lock.add_conversation('task_result', {
                     'task_content': task_content,
                     'task_result': final_result,
                     'working_directory': get_working_directory(options, task_lock)
                 })
 
-
                 yield sse_json("end", final_result)
+                if camel_task is not None:
+                    schedule_result_summary(camel_task, options, task_lock, task_entry)
 
                 if workforce is not None:
                     logger.info(f"[LIFECYCLE] 🛑 Calling workforce.stop_gracefully() for project {options.project_id}, workforce id={id(workforce)}")
@@ -1067,38 +1069,6 @@ async def install_mcp(
         raise
 
 
-def to_sub_tasks(task: Task, summary_task_content: str):
-    logger.info(f"[TO-SUB-TASKS] 📋 Creating to_sub_tasks SSE event")
-    logger.info(f"[TO-SUB-TASKS] task.id={task.id}, summary={summary_task_content[:50]}..., subtasks_count={len(task.subtasks)}")
-    result = sse_json(
-        "to_sub_tasks",
-        {
-            "summary_task": summary_task_content,
-            "sub_tasks": tree_sub_tasks(task.subtasks),
-        },
-    )
-    logger.info(f"[TO-SUB-TASKS] ✅ to_sub_tasks SSE event created")
-    return result
-
-
-def tree_sub_tasks(sub_tasks: list[Task], depth: int = 0):
-    if depth > 5:
-        return []
-    return (
-        chain(sub_tasks)
-        .filter(lambda x: x.content != "")
-        .map(
-            lambda x: {
-                "id": x.id,
-                "content": x.content,
-                "state": x.state,
-                "subtasks": tree_sub_tasks(x.subtasks, depth + 1),
-            }
-        )
-        .value()
-    )
-
-
 def update_sub_tasks(sub_tasks: list[Task], update_tasks: dict[str, TaskContent], depth: int = 0):
     if depth > 5:  # limit the depth of the recursion
         return []
@@ -1188,7 +1158,7 @@ Do not include any other text or formatting.
 """
     logger.debug("Generating task summary", extra={"task_id": task.id})
     try:
-        res = agent.step(prompt)
+        res = await agent.astep(prompt)
         summary = res.msgs[0].content
         logger.info("Task summary generated", extra={"summary": summary})
         return summary
@@ -1235,7 +1205,7 @@ Instructions:
 Summary:
 """
 
-    res = agent.step(prompt)
+    res = await agent.astep(prompt)
     summary = res.msgs[0].content
 
     logger.info(f"Generated subtasks summary for task {task.id} with {len(task.subtasks)} subtasks")
@@ -1243,43 +1213,103 @@ Summary:
     return summary
 
 
-async def get_task_result_with_optional_summary(task: Task, options: Chat) -> str:
+@contextmanager
+def pooled_summary_agent(options: Chat, task_lock: TaskLock):
     """
-    Get the task result, with LLM summary if there are multiple subtasks.
+    Borrow an idle summary agent of the project, building one only when all
+    are in use. The agent is reset first, so summaries never see each other.
+    """
+    agent = task_lock.summary_agents.pop() if task_lock.summary_agents else task_summary_agent(options)
+    agent.reset()
+    try:
+        yield agent
+    finally:
+        task_lock.summary_agents.append(agent)
 
-    Args:
-        task: The task to get result from
-        options: Chat options for creating summary agent
 
-    Returns:
-        The task result (summarized if multiple subtasks, raw otherwise)
-    """
-    result = str(task.result or "")
+async def pooled_summary_task(options: Chat, task_lock: TaskLock, task: Task) -> str:
+    with pooled_summary_agent(options, task_lock) as agent:
+        return await summary_task(agent, task)
 
-    if task.subtasks and len(task.subtasks) > 1:
-        logger.info(f"Task {task.id} has {len(task.subtasks)} subtasks, generating summary")
-        try:
-            summary_agent = task_summary_agent(options)
-            summarized_result = await summary_subtasks_result(summary_agent, task)
-            result = summarized_result
-            logger.info(f"Successfully generated summary for task {task.id}")
-        except Exception as e:
-            logger.error(f"Failed to generate summary for task {task.id}: {e}")
-    elif task.subtasks and len(task.subtasks) == 1:
-        logger.info(f"Task {task.id} has only 1 subtask, skipping LLM summary")
+
+def needs_result_summary(task: Task) -> bool:
+    """Only results aggregated from several subtasks are worth an LLM summary."""
+    return bool(task.subtasks) and len(task.subtasks) > 1
+
+
+def task_result_text(task: Task) -> str:
+    """The task result as aggregated by the workforce, without an LLM summary."""
+    result = str(task.result or "")
+    if task.subtasks and len(task.subtasks) == 1:
         if result and "--- Subtask" in result and "Result ---" in result:
             parts = result.split("Result ---", 1)
             if len(parts) > 1:
                 result = parts[1].strip()
-
     return result
 
 
-@traceroot.trace()
-async def construct_workforce(options: Chat) -> tuple[Workforce, ListenChatAgent]:
-    logger.info("Constructing workforce", extra={"project_id": options.project_id, "task_id": options.task_id})
+def cancel_result_summary(task_lock: TaskLock) -> None:
+    """Drop a summary still being written; every `end` path calls this before it records its result."""
+    if task_lock.pending_summary is not None and not task_lock.pending_summary.done():
+        task_lock.pending_summary.cancel()
+    task_lock.pending_summary = None
+
+
+def schedule_result_summary(task: Task, options: Chat, task_lock: TaskLock, entry: dict) -> None:
+    """
+    Second phase of completing a task: `end` has already been sent with the
+    raw result, and the LLM summary is written in the background. When it
+    is ready it replaces the result in the conversation history and goes to
+    the frontend as a `summary` event.
+
+    Only the last finished task is summarized; a summary still running when
+    another task ends is cancelled and that task keeps its raw result.
+    """
+    cancel_result_summary(task_lock)
+    if not needs_result_summary(task):
+        return
+
+    async def summarize() -> None:
+        try:
+            with pooled_summary_agent(options, task_lock) as agent:
+                summary = await summary_subtasks_result(agent, task)
+        except Exception as e:
+            logger.error(f"Failed to generate summary for task {task.id}: {e}")
+            return
+        task_lock.last_task_result = summary
+        task_lock.conversation_history.update(entry, {**entry["content"], "task_result": summary})
+        await task_lock.put_queue(ActionTaskSummaryData(task_id=task.id, data=summary))
+
+    task_lock.pending_summary = asyncio.create_task(summarize())
+    task_lock.add_background_task(task_lock.pending_summary)
+
+
+async def _build_agent_timed(name: str, factory, options: Chat, timings: dict[str, float]):
+    start = time.perf_counter()
+    # Async factories only await their MCP connects here and build toolkits in a thread
+    if asyncio.iscoroutinefunction(factory):
+        agent = await factory(options)
+    else:
+        agent = await to_thread_with_env(factory, options)
+    timings[name] = time.perf_counter() - start
+    return agent
+
+
+async def report_agent_build_timings(project_id: str, timings: dict[str, float], total: float):
+    r"""Log per-agent construction times and surface them to the client as a notice."""
+    summary = ", ".join(f"{name}={seconds:.2f}s" for name, seconds in sorted(timings.items(), key=lambda x: -x[1]))
+    logger.info(
+        f"Workforce agents built in {total:.2f}s ({summary})",
+        extra={"project_id": project_id, "total_seconds": round(total, 3), "timings": {k: round(v, 3) for k, v in timings.items()}},
+    )
+    task_lock = get_task_lock_if_exists(project_id)
+    if task_lock is not None:
+        await task_lock.put_queue(ActionNoticeData(process_task_id="", data=f"Agents ready in {total:.2f}s ({summary})"))
+
+
+def _build_planner_agents(options: Chat) -> tuple[ListenChatAgent, ListenChatAgent, ListenChatAgent]:
+    r"""The coordinator, task and new worker agents of a workforce."""
     working_directory = get_working_directory(options)
-    logger.debug("Working directory set", extra={"working_directory": working_directory})
     [coordinator_agent, task_agent] = [
         agent_model(
             key,
@@ -1289,7 +1319,7 @@ async def construct_workforce(options: Chat) -> tuple[Workforce, ListenChatAgent
                 *(
                     ToolkitMessageIntegration(
                         message_handler=HumanToolkit(options.project_id, key).send_message_to_user
-                    ).register_toolkits(NoteTakingToolkit(options.project_id, working_directory=working_directory))
+                    ).register_toolkits(NoteTakingToolkit(options.project_id, key, working_directory=working_directory))
                 ).get_tools()
             ],
         )
@@ -1326,16 +1356,34 @@ The current date is {datetime.date.today()}. For any date-related tasks, you MUS
             *(
                 ToolkitMessageIntegration(
                     message_handler=HumanToolkit(options.project_id, Agents.new_worker_agent).send_message_to_user
-                ).register_toolkits(NoteTakingToolkit(options.project_id, working_directory=working_directory))
+                ).register_toolkits(
+                    NoteTakingToolkit(options.project_id, Agents.new_worker_agent, working_directory=working_directory)
+                )
             ).get_tools(),
         ],
     )
+    return coordinator_agent, task_agent, new_worker_agent
+
+
+@traceroot.trace()
+async def construct_workforce(options: Chat) -> tuple[Workforce, ListenChatAgent]:
+    logger.info("Constructing workforce", extra={"project_id": options.project_id, "task_id": options.task_id})
+    logger.debug("Working directory set", extra={"working_directory": get_working_directory(options)})
     # msg_toolkit = AgentCommunicationToolkit(max_message_history=100)
 
-    searcher = search_agent(options)
-    developer = await developer_agent(options)
-    documenter = await document_agent(options)
-    multi_modaler = multi_modal_agent(options)
+    # The agents don't depend on each other, so build them concurrently:
+    # async factories share the event loop, sync ones run in worker threads.
+    timings: dict[str, float] = {}
+    started = time.perf_counter()
+    planners, searcher, developer, documenter, multi_modaler, mcp = await asyncio.gather(
+        _build_agent_timed("planner_agents", _build_planner_agents, options, timings),
+        _build_agent_timed(Agents.search_agent.value, search_agent, options, timings),
+        _build_agent_timed(Agents.developer_agent.value, developer_agent, options, timings),
+        _build_agent_timed(Agents.document_agent.value, document_agent, options, timings),
+        _build_agent_timed(Agents.multi_modal_agent.value, multi_modal_agent, options, timings),
+        _build_agent_timed(Agents.mcp_agent.value, mcp_agent, options, timings),
+    )
+    await report_agent_build_timings(options.project_id, timings, time.perf_counter() - started)
 
     # msg_toolkit.register_agent("Worker", new_worker_agent)
     # msg_toolkit.register_agent("Search_Agent", searcher)
@@ -1343,6 +1391,23 @@ The current date is {datetime.date.today()}. For any date-related tasks, you MUS
     # msg_toolkit.register_agent("Document_Agent", documenter)
     # msg_toolkit.register_agent("Multi_Modal_Agent", multi_modaler)
 
+    # Worker pools clone their agent up front, which is blocking work too
+    workforce = await to_thread_with_env(
+        _assemble_workforce, options, planners, developer, searcher, documenter, multi_modaler
+    )
+    return workforce, mcp
+
+
+def _assemble_workforce(
+    options: Chat,
+    planners: tuple[ListenChatAgent, ListenChatAgent, ListenChatAgent],
+    developer: ListenChatAgent,
+    searcher: ListenChatAgent,
+    documenter: ListenChatAgent,
+    multi_modaler: ListenChatAgent,
+) -> Workforce:
+    r"""The workforce of the built agents, with a worker pool per specialist."""
+    coordinator_agent, task_agent, new_worker_agent = planners
     # Convert string model_platform to enum for comparison
     try:
         model_platform_enum = ModelPlatformType(options.model_platform.lower())
@@ -1393,13 +1458,12 @@ The current date is {datetime.date.today()}. For any date-related tasks, you MUS
     #     "Notion, Slack, and other social platforms.",
     #     await social_medium_agent(options),
     # )
-    mcp = await mcp_agent(options)
     # workforce.add_single_agent_worker(
     #     "MCP Agent: A Model Context Protocol agent that provides access "
     #     "to external tools and services through MCP integrations.",
     #     mcp,
     # )
-    return workforce, mcp
+    return workforce
 
 
 def format_agent_description(agent_data: NewAgent | ActionNewAgent) -> str:
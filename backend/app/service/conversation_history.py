@@ -0,0 +1,210 @@
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("conversation_history")
+
+# Default location for entries that have been compacted out of memory
+default_spill_dir = os.path.join(os.path.expanduser("~"), ".node", "conversation_history")
+
+Summarizer = Callable[[str, List[Dict[str, Any]]], str]
+
+
+def content_length(content: Any) -> int:
+    """Character length of an entry's content, as counted against the budget."""
+    return len(content) if isinstance(content, str) else len(str(content))
+
+
+def condense_entries(previous_summary: str, entries: List[Dict[str, Any]], max_chars: int = 4000) -> str:
+    """
+    Default rolling summarizer: keep a short excerpt of every compacted entry
+    and drop the oldest excerpts once the summary exceeds `max_chars`.
+    """
+    lines = [previous_summary] if previous_summary else []
+    for entry in entries:
+        content = entry.get("content", "")
+        if isinstance(content, dict):
+            content = content.get("summary_task") or content.get("task_content") or str(content)
+        excerpt = " ".join(str(content).split())
+        if len(excerpt) > 200:
+            excerpt = excerpt[:200] + "..."
+        lines.append(f"- {entry.get('role', 'unknown')}: {excerpt}")
+    summary = "\n".join(lines)
+    if len(summary) > max_chars:
+        summary = summary[-max_chars:]
+        summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+    return summary
+
+
+class ConversationHistory:
+    """
+    Bounded conversation history for a project.
+
+    Keeps a running character total so length checks are O(1), serves the most
+    recent entries in O(window), and once the in-memory total exceeds
+    `max_chars` compacts the oldest entries: they are appended to a JSONL spill
+    file and folded into a rolling summary, so memory stays roughly constant
+    for long-lived projects.
+
+    Behaves like the list of `{'role', 'content', 'timestamp'}` dicts it
+    replaces (iteration, `len`, indexing, `append`); the rolling summary is
+    exposed separately through `summary`.
+    """
+
+    def __init__(
+        self,
+        project_id: str,
+        max_chars: int = 100000,
+        compact_to: float = 0.5,
+        spill_dir: str | None = default_spill_dir,
+        summarizer: Summarizer | None = None,
+    ) -> None:
+        self.project_id = project_id
+        self.max_chars = max_chars
+        self.compact_to = compact_to
+        self.spill_dir = spill_dir
+        self.summarizer = summarizer or condense_entries
+        self.summary = ""
+        self.total_chars = 0
+        self.compacted_count = 0
+        self._entries: deque[Dict[str, Any]] = deque()
+
+    @classmethod
+    def from_entries(cls, project_id: str, entries: Iterable[Dict[str, Any]], **kwargs) -> "ConversationHistory":
+        history = cls(project_id, **kwargs)
+        for entry in entries:
+            history.append(entry)
+        return history
+
+    @property
+    def approx_tokens(self) -> int:
+        """Rough token count of the in-memory history (about 4 chars per token)."""
+        return (self.total_chars + len(self.summary)) // 4
+
+    @property
+    def spill_path(self) -> str | None:
+        if not self.spill_dir:
+            return None
+        # Hash the id so a project id can never name a path outside spill_dir
+        digest = hashlib.sha256(str(self.project_id).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.jsonl")
+
+    def add(self, role: str, content: str | dict) -> Dict[str, Any]:
+        entry = {"role": role, "content": content, "timestamp": time.time()}
+        self.append(entry)
+        return entry
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self._entries.append(entry)
+        self.total_chars += content_length(entry.get("content", ""))
+        if self.total_chars > self.max_chars:
+            self.compact()
+
+    def update(self, entry: Dict[str, Any], content: str | dict) -> bool:
+        """
+        Replace the content of an entry still held in memory, keeping the
+        running total right. Returns False if it was already compacted.
+        """
+        if not any(held is entry for held in reversed(self._entries)):
+            return False
+        self.total_chars += content_length(content) - content_length(entry.get("content", ""))
+        entry["content"] = content
+        return True
+
+    def recent(self, max_entries: int | None = None) -> List[Dict[str, Any]]:
+        """Return the last `max_entries` entries, oldest first, in O(window)."""
+        if max_entries is None:
+            return list(self._entries)
+        if max_entries <= 0:
+            return []
+        window = list(islice(reversed(self._entries), max_entries))
+        window.reverse()
+        return window
+
+    def compact(self, target_chars: int | None = None) -> int:
+        """
+        Move the oldest entries out of memory until the total is at most
+        `target_chars`, spilling them to disk and folding them into the
+        rolling summary. The newest entry is always kept.
+
+        Returns:
+            int: number of entries compacted
+        """
+        if target_chars is None:
+            target_chars = int(self.max_chars * self.compact_to)
+        evicted: List[Dict[str, Any]] = []
+        while len(self._entries) > 1 and self.total_chars > target_chars:
+            entry = self._entries.popleft()
+            self.total_chars -= content_length(entry.get("content", ""))
+            evicted.append(entry)
+        if not evicted:
+            return 0
+
+        self._spill(evicted)
+        try:
+            self.summary = self.summarizer(self.summary, evicted)
+        except Exception as e:
+            logger.warning(f"Conversation summarizer failed, falling back to excerpts: {e}")
+            self.summary = condense_entries(self.summary, evicted)
+        self.compacted_count += len(evicted)
+        logger.info(
+            "Compacted conversation history",
+            extra={"project_id": self.project_id, "compacted": len(evicted), "remaining_chars": self.total_chars},
+        )
+        return len(evicted)
+
+    def iter_spilled(self) -> Iterator[Dict[str, Any]]:
+        """Lazily read back entries that were compacted to disk, oldest first."""
+        path = self.spill_path
+        if not path or not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_chars = 0
+        self.summary = ""
+        self.compacted_count = 0
+        self.remove_spill()
+
+    def remove_spill(self) -> None:
+        path = self.spill_path
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Failed to remove conversation spill file {path}: {e}")
+
+    def _spill(self, entries: List[Dict[str, Any]]) -> None:
+        path = self.spill_path
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+        except OSError as e:
+            logger.warning(f"Failed to spill conversation history to {path}: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._entries)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self._entries)[index]
+        return self._entries[index]
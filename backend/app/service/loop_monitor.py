@@ -0,0 +1,259 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import List, Literal
+from pydantic import BaseModel
+from app.component.environment import env
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("loop_monitor")
+
+default_log_path = os.path.join(os.path.expanduser("~"), ".node", "logs", "loop_monitor.jsonl")
+
+# Innermost frames kept from each stack sample
+STACK_DEPTH = 25
+
+
+class LoopStall(BaseModel):
+    started_at: float
+    """Wall-clock time the loop stopped responding"""
+    duration_ms: float
+    source: Literal["watchdog", "asyncio"]
+    """`watchdog`: measured by the lag probe; `asyncio`: a slow callback reported in debug mode"""
+    description: str = ""
+    stacks: List[List[str]] = []
+    """Stack samples of the loop thread taken while it was blocked, innermost frame last"""
+
+
+class LoopStats(BaseModel):
+    running: bool
+    debug: bool
+    interval_ms: float
+    stall_threshold_ms: float
+    samples: int
+    lag_ms_last: float
+    lag_ms_p50: float
+    lag_ms_p95: float
+    lag_ms_p99: float
+    lag_ms_max: float
+    stalls_total: int
+    stalls: List[LoopStall]
+    """Most recent first"""
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def format_stack(frame) -> List[str]:
+    return [
+        f"{entry.filename}:{entry.lineno} in {entry.name}" + (f": {entry.line}" if entry.line else "")
+        for entry in traceback.extract_stack(frame)[-STACK_DEPTH:]
+    ]
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Turns asyncio's debug-mode "Executing <handle> took N seconds" warnings into stalls."""
+
+    def __init__(self, monitor: "LoopMonitor") -> None:
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if not record.msg.startswith("Executing ") or len(record.args or ()) != 2:
+            return
+        handle, seconds = record.args
+        self.monitor.record(
+            LoopStall(
+                started_at=record.created - seconds,
+                duration_ms=seconds * 1000,
+                source="asyncio",
+                description=str(handle),
+            )
+        )
+
+
+class LoopMonitor:
+    """
+    Measures how late the event loop runs and records what blocked it.
+
+    A probe coroutine sleeps for `interval` and takes any extra time it was
+    woken up with as lag. A watchdog thread checks the probe's heartbeat and,
+    while the loop is overdue by `stall_threshold`, samples the loop thread's
+    stack, so a stall comes with the code that caused it. With `debug` the
+    loop also runs in asyncio debug mode and every callback slower than the
+    threshold is recorded as reported by asyncio.
+
+    Stalls are kept in memory (`stats`) and appended as JSON lines to a
+    rotating log at `log_path`.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.1,
+        stall_threshold: float = 0.1,
+        window: int = 600,
+        max_stalls: int = 50,
+        max_stack_samples: int = 5,
+        debug: bool = False,
+        log_path: str | None = None,
+    ) -> None:
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self.max_stack_samples = max_stack_samples
+        self.debug = debug
+        self.log_path = log_path
+        self.lags: deque[float] = deque(maxlen=window)
+        self.stalls: deque[LoopStall] = deque(maxlen=max_stalls)
+        self.stalls_total = 0
+        self._lock = threading.Lock()
+        self._stacks: List[List[str]] = []
+        self._heartbeat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._probe_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._slow_callback_handler: _SlowCallbackHandler | None = None
+        self._stall_log: logging.Logger | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._probe_task is not None and not self._probe_task.done()
+
+    def start(self) -> bool:
+        """Start monitoring the running loop; must be called from the loop thread."""
+        if self.running:
+            return True
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            logger.debug("No running event loop, loop monitor not started")
+            return False
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+
+        if self.debug:
+            self._loop.set_debug(True)
+            self._loop.slow_callback_duration = self.stall_threshold
+            self._slow_callback_handler = _SlowCallbackHandler(self)
+            logging.getLogger("asyncio").addHandler(self._slow_callback_handler)
+        if self.log_path:
+            self._stall_log = self._open_stall_log(self.log_path)
+
+        self._probe_task = self._loop.create_task(self._probe())
+        self._watchdog = threading.Thread(target=self._watch, name="loop_monitor_watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(
+            "Event loop monitor started",
+            extra={"interval_ms": self.interval * 1000, "stall_threshold_ms": self.stall_threshold * 1000, "debug": self.debug},
+        )
+        return True
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+        if self._slow_callback_handler is not None:
+            logging.getLogger("asyncio").removeHandler(self._slow_callback_handler)
+            self._slow_callback_handler = None
+        if self._stall_log is not None:
+            for handler in list(self._stall_log.handlers):
+                handler.close()
+                self._stall_log.removeHandler(handler)
+            self._stall_log = None
+
+    def stats(self) -> LoopStats:
+        lags = sorted(self.lags)
+        return LoopStats(
+            running=self.running,
+            debug=self.debug,
+            interval_ms=self.interval * 1000,
+            stall_threshold_ms=self.stall_threshold * 1000,
+            samples=len(lags),
+            lag_ms_last=(self.lags[-1] if self.lags else 0.0) * 1000,
+            lag_ms_p50=percentile(lags, 0.5) * 1000,
+            lag_ms_p95=percentile(lags, 0.95) * 1000,
+            lag_ms_p99=percentile(lags, 0.99) * 1000,
+            lag_ms_max=(lags[-1] if lags else 0.0) * 1000,
+            stalls_total=self.stalls_total,
+            stalls=list(reversed(self.stalls)),
+        )
+
+    def record(self, stall: LoopStall) -> None:
+        self.stalls.append(stall)
+        self.stalls_total += 1
+        logger.warning(
+            "Event loop stalled",
+            extra={"duration_ms": round(stall.duration_ms, 1), "source": stall.source, "description": stall.description},
+        )
+        if self._stall_log is not None:
+            self._stall_log.info(stall.model_dump_json())
+
+    async def _probe(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - started - self.interval)
+            self.lags.append(lag)
+            with self._lock:
+                self._heartbeat = now
+                stacks, self._stacks = self._stacks, []
+            if lag >= self.stall_threshold:
+                self.record(LoopStall(started_at=time.time() - lag, duration_ms=lag * 1000, source="watchdog", stacks=stacks))
+
+    def _watch(self) -> None:
+        # Sample a few times per threshold so short stalls still get a stack
+        while not self._stopped.wait(self.stall_threshold / 2):
+            with self._lock:
+                overdue = time.monotonic() - self._heartbeat - self.interval
+                if overdue < self.stall_threshold or len(self._stacks) >= self.max_stack_samples:
+                    continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = format_stack(frame)
+            del frame
+            with self._lock:
+                if not self._stacks or self._stacks[-1] != stack:
+                    self._stacks.append(stack)
+
+    @staticmethod
+    def _open_stall_log(path: str) -> logging.Logger | None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=1024 * 1024, backupCount=3, encoding="utf-8")
+        except OSError as e:
+            logger.warning(f"Failed to open loop monitor log {path}: {e}")
+            return None
+        stall_log = logging.getLogger(f"loop_monitor.stalls.{path}")
+        stall_log.propagate = False
+        stall_log.setLevel(logging.INFO)
+        stall_log.addHandler(handler)
+        return stall_log
+
+
+loop_monitor = LoopMonitor(
+    interval=float(env("LOOP_MONITOR_INTERVAL_MS", "100")) / 1000,
+    stall_threshold=float(env("LOOP_MONITOR_STALL_MS", "100")) / 1000,
+    debug=env("LOOP_MONITOR_DEBUG", "false").lower() == "true",
+    log_path=env("LOOP_MONITOR_LOG", default_log_path),
+)
@@ -3,12 +3,15 @@ from typing import List, Dict, Optional
 from pydantic import BaseModel
 from app.exception.exception import ProgramException
 from app.model.chat import McpServers, Status, SupplementChat, Chat, UpdateData
+from app.service.conversation_history import ConversationHistory
+from app.service.task_timeline import TaskTimeline
+from app.service.task_tree import TaskTreeStream
 import asyncio
 from enum import Enum
 from camel.tasks import Task
 from contextlib import contextmanager
 from contextvars import ContextVar
-from datetime import datetime, timedelta
+from datetime import datetime
 import weakref
 from utils import traceroot_wrapper as traceroot
 
@@ -36,6 +39,7 @@ class Action(str, Enum):
     install_mcp = "install_mcp"  # backend -> user
     terminal = "terminal"  # backend -> user
     end = "end"  # backend -> user
+    task_summary = "task_summary"  # backend -> user (summary that follows `end`)
     stop = "stop"  # user -> backend
     supplement = "supplement"  # user -> backend
     pause = "pause"  # user -> backend  user take control
@@ -132,7 +136,7 @@ class ActionActivateToolkitData(BaseModel):
 class ActionDeactivateToolkitData(BaseModel):
     action: Literal[Action.deactivate_toolkit] = Action.deactivate_toolkit
     data: dict[
-        Literal["agent_name", "toolkit_name", "process_task_id", "method_name", "message"],
+        Literal["agent_name", "toolkit_name", "process_task_id", "method_name", "message", "payload_id"],
         str,
     ]
 
@@ -163,6 +167,7 @@ class ActionTerminalData(BaseModel):
     action: Literal[Action.terminal] = Action.terminal
     process_task_id: str
     data: str
+    offset: int | None = None
 
 
 class ActionStopData(BaseModel):
@@ -173,6 +178,12 @@ class ActionEndData(BaseModel):
     action: Literal[Action.end] = Action.end
 
 
+class ActionTaskSummaryData(BaseModel):
+    action: Literal[Action.task_summary] = Action.task_summary
+    task_id: str
+    data: str
+
+
 class ActionSupplementData(BaseModel):
     action: Literal[Action.supplement] = Action.supplement
     data: SupplementChat
@@ -233,6 +244,7 @@ ActionData = (
     | ActionTerminalData
     | ActionStopData
     | ActionEndData
+    | ActionTaskSummaryData
     | ActionSupplementData
     | ActionTakeControl
     | ActionNewAgent
@@ -272,8 +284,6 @@ class TaskLock:
     """Track all background tasks for cleanup"""
 
     # Context management fields
-    conversation_history: List[Dict[str, Any]]
-    """Store conversation history for context"""
     last_task_result: str
     """Store the last task execution result"""
     question_agent: Optional[Any]
@@ -282,6 +292,18 @@ class TaskLock:
     """Track if summary has been generated for this project"""
     current_task_id: Optional[str]
     """Current task ID to be used in SSE responses"""
+    consumers: int
+    """Number of SSE streams currently waiting on the queue"""
+    loop: Optional[asyncio.AbstractEventLoop]
+    """Event loop that consumes the queue, used to emit events from worker threads"""
+    task_tree: TaskTreeStream
+    """Versioned subtask tree last sent to the frontend"""
+    summary_agents: list[Any]
+    """Idle summary agents, borrowed instead of building one per summary"""
+    pending_summary: Optional[asyncio.Task]
+    """Summary still being written for the last finished task"""
+    timeline: TaskTimeline
+    """Timed spans of agent steps, tool calls, workforce phases and queued events"""
 
     def __init__(self, id: str, queue: asyncio.Queue, human_input: dict) -> None:
         self.id = id
@@ -292,23 +314,69 @@ class TaskLock:
         self.background_tasks = set()
 
         # Initialize context management fields
-        self.conversation_history = []
+        self.conversation_history = ConversationHistory(id)
         self.last_task_result = ""
         self.last_task_summary = ""
         self.question_agent = None
         self.current_task_id = None
+        self.consumers = 0
+        self.task_tree = TaskTreeStream()
+        self.summary_agents = []
+        self.pending_summary = None
+        self.timeline = TaskTimeline(lambda: self.current_task_id)
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.loop = None
 
         logger.info("Task lock initialized", extra={"task_id": id, "created_at": self.created_at.isoformat()})
 
     async def put_queue(self, data: ActionData):
         self.last_accessed = datetime.now()
-        logger.debug("Adding item to task queue", extra={"task_id": self.id, "action": data.action})
+        logger.debug("Adding item to task queue", task_id=self.id, action=data.action)
+        self.timeline.enqueued(data)
         await self.queue.put(data)
 
+    @property
+    def conversation_history(self) -> ConversationHistory:
+        """Store conversation history for context"""
+        return self._conversation_history
+
+    @conversation_history.setter
+    def conversation_history(self, entries: ConversationHistory | List[Dict[str, Any]]) -> None:
+        if not isinstance(entries, ConversationHistory):
+            entries = ConversationHistory.from_entries(self.id, entries)
+        self._conversation_history = entries
+
+    def put_queue_threadsafe(self, data: ActionData) -> None:
+        r"""Schedule `put_queue` without awaiting it.
+
+        Safe to call from the event loop thread as well as from worker threads
+        (e.g. agents built via `asyncio.to_thread`) and threads running a loop
+        of their own: the queue is only ever touched from `self.loop`.
+        """
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is not None and (running_loop is self.loop or self.loop is None):
+            self.add_background_task(running_loop.create_task(self.put_queue(data)))
+        elif self.loop is not None and not self.loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self.put_queue(data), self.loop)
+        else:
+            logger.warning("No event loop available, dropping queue item", extra={"task_id": self.id, "action": data.action})
+
     async def get_queue(self):
         self.last_accessed = datetime.now()
-        logger.debug("Getting item from task queue", extra={"task_id": self.id})
-        return await self.queue.get()
+        self.loop = asyncio.get_running_loop()
+        logger.debug("Getting item from task queue", task_id=self.id)
+        self.consumers += 1
+        try:
+            item = await self.queue.get()
+        finally:
+            self.consumers -= 1
+        self.timeline.dequeued(item)
+        return item
 
     async def put_human_input(self, agent: str, data: Any = None):
         logger.debug("Adding human input", extra={"task_id": self.id, "agent": agent, "has_data": data is not None})
@@ -339,27 +407,33 @@ class TaskLock:
                 except asyncio.CancelledError:
                     pass
         self.background_tasks.clear()
+        self.conversation_history.remove_spill()
+        from app.utils.listen.preview import payload_store
+
+        payload_store.drop_task(self.id)
+        from app.utils.toolkit.terminal_stream import terminal_streams
+
+        terminal_streams.drop_task(self.id)
+        from app.utils.toolkit.file_write_toolkit import staged_parts
+
+        staged_parts.drop_task(self.id)
         logger.info("Task lock cleanup completed", extra={"task_id": self.id})
 
-    def add_conversation(self, role: str, content: str | dict):
+    def add_conversation(self, role: str, content: str | dict) -> Dict[str, Any]:
         """Add a conversation entry to history"""
-        logger.debug("Adding conversation entry", extra={"task_id": self.id, "role": role, "content_length": len(str(content))})
-        self.conversation_history.append({
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        })
+        logger.debug("Adding conversation entry", extra=lambda: {"task_id": self.id, "role": role, "content_length": len(str(content))})
+        return self.conversation_history.add(role, content)
 
     def get_recent_context(self, max_entries: int = None) -> str:
         """Get recent conversation context as a formatted string"""
         if not self.conversation_history:
             return ""
 
-        context = "=== Recent Conversation ===\n"
-        history_to_use = self.conversation_history if max_entries is None else self.conversation_history[-max_entries:]
-        for entry in history_to_use:
-            context += f"{entry['role']}: {entry['content']}\n"
-        return context
+        lines = ["=== Recent Conversation ==="]
+        if self.conversation_history.summary:
+            lines.append(f"summary: {self.conversation_history.summary}")
+        lines.extend(f"{entry['role']}: {entry['content']}" for entry in self.conversation_history.recent(max_entries))
+        return "\n".join(lines) + "\n"
 
 
 task_locks = dict[str, TaskLock]()
@@ -396,10 +470,17 @@ def create_task_lock(id: str) -> TaskLock:
     logger.info("Creating new task lock", extra={"task_id": id})
     task_locks[id] = TaskLock(id=id, queue=asyncio.Queue(), human_input={})
 
+    from app.service.task_lifecycle import task_lock_lifecycle
+
+    task_lock_lifecycle.restore(task_locks[id])
+
     # Start cleanup task if not running
-    # global _cleanup_task
-    # if _cleanup_task is None or _cleanup_task.done():
-    #     _cleanup_task = asyncio.create_task(_periodic_cleanup())
+    global _cleanup_task
+    if _cleanup_task is None or _cleanup_task.done():
+        try:
+            _cleanup_task = asyncio.get_running_loop().create_task(_periodic_cleanup())
+        except RuntimeError:
+            logger.debug("No running event loop, idle task lock eviction not started")
 
     logger.info("Task lock created successfully", extra={"task_id": id, "total_task_locks": len(task_locks)})
     return task_locks[id]
@@ -453,27 +534,10 @@ def get_camel_task(id: str, tasks: list[Task]) -> None | Task:
 
 
 async def _periodic_cleanup():
-    r"""Periodically clean up stale task locks"""
-    while True:
-        try:
-            await asyncio.sleep(300)  # Run every 5 minutes
-
-            current_time = datetime.now()
-            stale_timeout = timedelta(hours=2)  # Consider tasks stale after 2 hours
-
-            stale_ids = []
-            for task_id, task_lock in task_locks.items():
-                if current_time - task_lock.last_accessed > stale_timeout:
-                    stale_ids.append(task_id)
-
-            for task_id in stale_ids:
-                logger.warning(f"Cleaning up stale task lock: {task_id}")
-                await delete_task_lock(task_id)
+    r"""Periodically evict idle task locks, see `TaskLockLifecycle`"""
+    from app.service.task_lifecycle import task_lock_lifecycle
 
-        except asyncio.CancelledError:
-            break
-        except Exception as e:
-            logger.error(f"Error in periodic cleanup: {e}")
+    await task_lock_lifecycle.run()
 
 
 process_task = ContextVar[str]("id")
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import os
+from datetime import datetime, timedelta
+from pydantic import BaseModel
+from app.component.environment import env
+from app.model.chat import Status
+from app.service.task import ActionStopData, TaskLock, delete_task_lock, task_locks
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("task_lifecycle")
+
+# Rough per-component costs used by `estimate_task_lock_bytes`
+TASK_LOCK_BASE_BYTES = 4 * 1024
+QUEUE_ITEM_BYTES = 1024
+BACKGROUND_TASK_BYTES = 4 * 1024
+HUMAN_INPUT_QUEUE_BYTES = 512
+HISTORY_ENTRY_OVERHEAD_BYTES = 256
+
+
+class TaskLockStats(BaseModel):
+    live_locks: int
+    approx_bytes: int
+    evicted_total: int
+    busy_locks: int
+
+
+def estimate_task_lock_bytes(task_lock: TaskLock) -> int:
+    """
+    Approximate memory held by a task lock.
+
+    The question agent keeps its own copy of the conversation in memory, so
+    history text is counted twice.
+    """
+    size = TASK_LOCK_BASE_BYTES
+    history = task_lock.conversation_history
+    size += 2 * (history.total_chars + len(history.summary)) + HISTORY_ENTRY_OVERHEAD_BYTES * len(history)
+    size += len(task_lock.last_task_result or "") + len(getattr(task_lock, "last_task_summary", "") or "")
+    size += QUEUE_ITEM_BYTES * task_lock.queue.qsize()
+    size += BACKGROUND_TASK_BYTES * len(task_lock.background_tasks)
+    size += HUMAN_INPUT_QUEUE_BYTES * len(task_lock.human_input)
+    return size
+
+
+def is_task_lock_busy(task_lock: TaskLock) -> bool:
+    """A lock that is executing a task or still has work in flight is never evicted."""
+    return task_lock.status == Status.processing or any(not t.done() for t in task_lock.background_tasks)
+
+
+class TaskLockLifecycle:
+    """
+    Evicts idle task locks and keeps resource accounting for the live ones.
+
+    A lock is evicted once it has not been accessed for `idle_timeout`, or
+    least-recently-accessed first while the total estimate is above
+    `max_bytes`. Busy locks are skipped. Locks with an attached SSE stream are
+    asked to stop so the stream cleans up after itself; others are deleted
+    directly. When `persist_dir` is set, a lock's history is written there on
+    eviction and restored when the project comes back.
+    """
+
+    def __init__(
+        self,
+        idle_timeout: timedelta = timedelta(hours=2),
+        sweep_interval: float = 300,
+        max_bytes: int | None = None,
+        persist_dir: str | None = None,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.max_bytes = max_bytes
+        self.persist_dir = persist_dir
+        self.evicted_total = 0
+
+    def stats(self) -> TaskLockStats:
+        locks = list(task_locks.values())
+        return TaskLockStats(
+            live_locks=len(locks),
+            approx_bytes=sum(estimate_task_lock_bytes(lock) for lock in locks),
+            evicted_total=self.evicted_total,
+            busy_locks=sum(1 for lock in locks if is_task_lock_busy(lock)),
+        )
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.sweep_interval)
+                await self.sweep()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in task lock sweep: {e}", exc_info=True)
+
+    async def sweep(self, now: datetime | None = None) -> list[str]:
+        """Evict idle locks, then the least recently used ones while over `max_bytes`."""
+        now = now or datetime.now()
+        candidates = sorted(
+            (lock for lock in task_locks.values() if not is_task_lock_busy(lock)),
+            key=lambda lock: lock.last_accessed,
+        )
+        evict = [lock for lock in candidates if now - lock.last_accessed > self.idle_timeout]
+
+        if self.max_bytes is not None:
+            total = sum(estimate_task_lock_bytes(lock) for lock in task_locks.values())
+            total -= sum(estimate_task_lock_bytes(lock) for lock in evict)
+            for lock in candidates:
+                if total <= self.max_bytes:
+                    break
+                if lock not in evict:
+                    evict.append(lock)
+                    total -= estimate_task_lock_bytes(lock)
+
+        evicted = []
+        for lock in evict:
+            try:
+                await self.evict(lock)
+                evicted.append(lock.id)
+            except Exception as e:
+                logger.warning(f"Failed to evict task lock {lock.id}: {e}")
+        if evicted:
+            logger.info("Evicted idle task locks", extra={"evicted": len(evicted), "live_locks": len(task_locks)})
+        return evicted
+
+    async def evict(self, task_lock: TaskLock) -> None:
+        if self.persist_dir:
+            self.persist(task_lock)
+        if task_lock.consumers > 0:
+            # step_solve deletes its own lock when it handles the stop action
+            await task_lock.put_queue(ActionStopData())
+        else:
+            await delete_task_lock(task_lock.id)
+        self.evicted_total += 1
+
+    def _history_path(self, task_id: str) -> str:
+        return os.path.join(self.persist_dir, f"{task_id}.json")
+
+    def persist(self, task_lock: TaskLock) -> None:
+        history = task_lock.conversation_history
+        data = {
+            "entries": list(history),
+            "summary": history.summary,
+            "last_task_result": task_lock.last_task_result,
+            "last_task_summary": getattr(task_lock, "last_task_summary", ""),
+        }
+        try:
+            os.makedirs(self.persist_dir, exist_ok=True)
+            with open(self._history_path(task_lock.id), "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, default=str)
+        except OSError as e:
+            logger.warning(f"Failed to persist history for task lock {task_lock.id}: {e}")
+
+    def restore(self, task_lock: TaskLock) -> bool:
+        """Load a previously persisted history into a freshly created lock."""
+        if not self.persist_dir:
+            return False
+        path = self._history_path(task_lock.id)
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to restore history for task lock {task_lock.id}: {e}")
+            return False
+        task_lock.conversation_history = data.get("entries", [])
+        task_lock.conversation_history.summary = data.get("summary", "")
+        task_lock.last_task_result = data.get("last_task_result", "")
+        task_lock.last_task_summary = data.get("last_task_summary", "")
+        logger.info("Restored persisted task lock history", extra={"task_id": task_lock.id, "entries": len(task_lock.conversation_history)})
+        return True
+
+
+task_lock_lifecycle = TaskLockLifecycle(persist_dir=env("TASK_LOCK_HISTORY_DIR"))
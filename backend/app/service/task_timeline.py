@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+
+def now_ns() -> int:
+    return time.perf_counter_ns()
+
+
+class Span(NamedTuple):
+    name: str
+    cat: str
+    lane: str
+    start_ns: int
+    end_ns: int
+    task_id: Optional[str]
+    args: Optional[Dict[str, Any]]
+
+
+class TaskTimeline:
+    """
+    Timed spans of one project's work, exported as Chrome trace JSON.
+
+    Spans are grouped by category (`workforce`, `agent`, `tool`, `queue`) and
+    drawn on lanes, one per workforce, agent instance or the SSE queue, so a
+    trace loaded into Perfetto or chrome://tracing shows where the wall-clock
+    time of a task went. Each span is tagged with the task that was current
+    when it ended. Only the newest `max_spans` spans are kept.
+
+    Recording is thread-safe: agents may step in worker threads.
+    """
+
+    def __init__(self, current_task: Callable[[], Optional[str]] = lambda: None, max_spans: int = 50000) -> None:
+        self.current_task = current_task
+        self.spans: deque[Span] = deque(maxlen=max_spans)
+        self.origin_ns = now_ns()
+        self.origin_wall = time.time()
+        self._lock = threading.Lock()
+        self._enqueued: Dict[int, int] = {}
+        self._handling: Optional[tuple[str, int, int]] = None
+
+    def add(self, name: str, cat: str, lane: str, start_ns: int, end_ns: int | None = None, **args: Any) -> None:
+        self.spans.append(
+            Span(name, cat, lane, start_ns, now_ns() if end_ns is None else end_ns, self.current_task(), args or None)
+        )
+
+    @contextmanager
+    def span(self, name: str, cat: str, lane: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """Time the block; the yielded dict is recorded as the span's args."""
+        start = now_ns()
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = type(e).__name__
+            raise
+        finally:
+            self.add(name, cat, lane, start, **args)
+
+    def enqueued(self, item: Any) -> None:
+        with self._lock:
+            self._enqueued[id(item)] = now_ns()
+
+    def dequeued(self, item: Any) -> None:
+        """
+        Close the span of the previously dequeued event and open one for `item`.
+
+        The consumer comes back for the next event only after the frame for
+        the previous one has been written, so an event's span runs from
+        `put_queue` to its SSE write, and `wait_ms` is the part spent queued.
+        """
+        now = now_ns()
+        with self._lock:
+            previous, self._handling = self._handling, None
+            enqueued = self._enqueued.pop(id(item), None)
+            if enqueued is not None:
+                action = getattr(item, "action", type(item).__name__)
+                self._handling = (getattr(action, "value", action), enqueued, now)
+        if previous is not None:
+            action, start, taken = previous
+            self.add(action, "queue", "sse queue", start, now, wait_ms=round((taken - start) / 1e6, 3))
+
+    def chrome_trace(self, task_id: Optional[str] = None, name: str = "") -> Dict[str, Any]:
+        """The spans (of one task, if given) in the Chrome trace event format."""
+        lanes: Dict[str, int] = {}
+        events: List[Dict[str, Any]] = []
+        for span in list(self.spans):
+            if task_id is not None and span.task_id != task_id:
+                continue
+            tid = lanes.setdefault(span.lane, len(lanes) + 1)
+            events.append({
+                "name": span.name,
+                "cat": span.cat,
+                "ph": "X",
+                "ts": (span.start_ns - self.origin_ns) / 1000,
+                "dur": max(0, span.end_ns - span.start_ns) / 1000,
+                "pid": 1,
+                "tid": tid,
+                "args": {"task_id": span.task_id, **(span.args or {})},
+            })
+        metadata = [{"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": name or "node"}}]
+        metadata += [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": lane}} for lane, tid in lanes.items()
+        ]
+        return {
+            "traceEvents": metadata + events,
+            "displayTimeUnit": "ms",
+            "otherData": {"started_at": self.origin_wall, "task_id": task_id},
+        }
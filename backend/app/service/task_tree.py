@@ -0,0 +1,113 @@
+from typing import Any, Dict, List, Optional, Tuple
+from camel.tasks import Task
+
+# Subtasks deeper than this are not sent to the frontend
+MAX_TREE_DEPTH = 5
+
+TaskNode = Dict[str, Any]
+
+
+def tree_sub_tasks(sub_tasks: List[Task], depth: int = 0) -> List[TaskNode]:
+    """The `{id, content, state, subtasks}` tree the frontend renders, without empty tasks."""
+    if depth > MAX_TREE_DEPTH:
+        return []
+    return [
+        {
+            "id": task.id,
+            "content": task.content,
+            "state": task.state,
+            "subtasks": tree_sub_tasks(task.subtasks, depth + 1),
+        }
+        for task in sub_tasks
+        if task.content != ""
+    ]
+
+
+def _parents(nodes: List[TaskNode], parent: Optional[str] = None, out=None) -> Dict[str, Tuple[Optional[str], TaskNode]]:
+    if out is None:
+        out = {}
+    for node in nodes:
+        out[node["id"]] = (parent, node)
+        _parents(node["subtasks"], node["id"], out)
+    return out
+
+
+def diff_task_trees(old: List[TaskNode], new: List[TaskNode]) -> List[Dict[str, Any]]:
+    """
+    Operations that turn the `old` tree into the `new` one, applied in order:
+
+    - `{"op": "remove", "id"}` drops a node and its subtree;
+    - `{"op": "add", "parent", "index", "node"}` inserts a whole subtree
+      under `parent` (None for the top level) at `index`;
+    - `{"op": "update", "id", "fields"}` changes a node's content or state.
+
+    Moved and reordered nodes are removed and added again.
+    """
+    old_parents = _parents(old)
+    new_parents = _parents(new)
+    ops: List[Dict[str, Any]] = []
+
+    def kept(node_id: str, parent: Optional[str]) -> bool:
+        entry = new_parents.get(node_id)
+        return entry is not None and entry[0] == parent
+
+    def remove(nodes: List[TaskNode], parent: Optional[str]) -> None:
+        for node in nodes:
+            if kept(node["id"], parent):
+                remove(node["subtasks"], node["id"])
+            else:
+                ops.append({"op": "remove", "id": node["id"]})
+
+    def merge(old_children: List[TaskNode], new_children: List[TaskNode], parent: Optional[str]) -> None:
+        old_order = [node["id"] for node in old_children if kept(node["id"], parent)]
+        retained = set(old_order)
+        if [node["id"] for node in new_children if node["id"] in retained] != old_order:
+            # Reordered siblings: rebuild this level rather than describe the moves
+            ops.extend({"op": "remove", "id": node_id} for node_id in old_order)
+            retained = set()
+        for index, node in enumerate(new_children):
+            if node["id"] not in retained:
+                ops.append({"op": "add", "parent": parent, "index": index, "node": node})
+                continue
+            before = old_parents[node["id"]][1]
+            fields = {key: node[key] for key in ("content", "state") if node[key] != before[key]}
+            if fields:
+                ops.append({"op": "update", "id": node["id"], "fields": fields})
+            merge(before["subtasks"], node["subtasks"], node["id"])
+
+    remove(old, None)
+    merge(old, new, None)
+    return ops
+
+
+class TaskTreeStream:
+    """
+    The subtask tree as last sent to the frontend, with a sequence number.
+
+    A full tree goes out as a `to_sub_tasks` snapshot; later changes go out
+    as `sub_tasks_delta` events that name the `base_seq` they apply to, so a
+    client that missed one can ask for the current snapshot instead.
+    """
+
+    def __init__(self) -> None:
+        self.seq = 0
+        self.tree: List[TaskNode] = []
+
+    def snapshot(self, sub_tasks: List[Task]) -> Dict[str, Any]:
+        self.tree = tree_sub_tasks(sub_tasks)
+        self.seq += 1
+        return {"seq": self.seq, "sub_tasks": self.tree}
+
+    def delta(self, sub_tasks: List[Task]) -> Optional[Dict[str, Any]]:
+        """The changes since the last event, or None if the tree is unchanged."""
+        tree = tree_sub_tasks(sub_tasks)
+        ops = diff_task_trees(self.tree, tree)
+        if not ops:
+            return None
+        base_seq = self.seq
+        self.tree = tree
+        self.seq += 1
+        return {"seq": self.seq, "base_seq": base_seq, "ops": ops}
+
+    def current(self) -> Dict[str, Any]:
+        return {"seq": self.seq, "sub_tasks": self.tree}
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import json
 import os
 import platform
@@ -17,8 +18,9 @@ from camel.responses import ChatAgentResponse
 from camel.terminators import ResponseTerminator
 from camel.toolkits import FunctionTool, RegisteredAgentToolkit
 from camel.types.agents import ToolCallingRecord
-from app.component.environment import env
+from app.component.environment import env, to_thread_with_env
 from app.utils.file_utils import get_working_directory
+from app.utils.listen.preview import preview_tool_result
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
 from app.utils.toolkit.hybrid_browser_toolkit import HybridBrowserToolkit
 from app.utils.toolkit.excel_toolkit import ExcelToolkit
@@ -71,6 +73,87 @@ from app.service.task import set_process_task
 
 NOW_STR = datetime.datetime.now().strftime("%Y-%m-%d %H:00:00")
 
+_validate_openai_tool_schema = FunctionTool.validate_openai_tool_schema
+
+
+@functools.lru_cache(maxsize=1024)
+def _validate_tool_schema_json(schema_json: str) -> None:
+    _validate_openai_tool_schema(json.loads(schema_json))
+
+
+def validate_tool_schema_once(openai_tool_schema: Dict[str, Any]) -> None:
+    """
+    camel checks a tool's schema against the JSON Schema meta-schema each
+    time it is read, on every clone and step for every tool. The check takes
+    milliseconds per tool and runs on the event loop, so a schema that passed
+    once is not checked again.
+    """
+    _validate_tool_schema_json(json.dumps(openai_tool_schema, sort_keys=True))
+
+
+FunctionTool.validate_openai_tool_schema = staticmethod(validate_tool_schema_once)
+
+
+class ToolDispatch:
+    r"""How to invoke a `FunctionTool`, resolved once per tool instead of on
+    every call.
+
+    Invoke strategies:
+        - ``sync``: call the tool directly in the current context, awaiting the
+          result if it turns out to be a coroutine.
+        - ``thread``: call a sync tool of a toolkit with ``run_tools_in_thread``
+          (tools that block, e.g. on subprocesses) in a worker thread.
+        - ``func_async_call``: await ``tool.func.async_call`` (MCP tools).
+        - ``async_call``: await ``tool.async_call``.
+        - ``await_func``: await ``tool.func`` (plain async functions).
+        - ``await_tool``: await the tool itself.
+    """
+
+    __slots__ = ("tool", "toolkit_name", "invoke", "has_listen_decorator")
+
+    def __init__(self, tool: FunctionTool, toolkit_name: str, invoke: str, has_listen_decorator: bool) -> None:
+        self.tool = tool
+        self.toolkit_name = toolkit_name
+        self.invoke = invoke
+        self.has_listen_decorator = has_listen_decorator
+
+    @classmethod
+    def resolve(cls, tool: FunctionTool) -> "ToolDispatch":
+        has_listen_decorator = hasattr(getattr(tool, "func", None), "__wrapped__")
+        return cls(tool, cls._resolve_toolkit_name(tool), cls._resolve_invoke(tool), has_listen_decorator)
+
+    @staticmethod
+    def _resolve_toolkit_name(tool: FunctionTool) -> str:
+        # Toolkits tag their tools explicitly (see get_can_use_tools)
+        toolkit_name = getattr(tool, "_toolkit_name", None)
+        if toolkit_name:
+            return toolkit_name
+        # Bound method of a toolkit, possibly wrapped once more (MCP tools)
+        func = getattr(tool, "func", None)
+        for owner in (getattr(func, "__self__", None), getattr(getattr(func, "func", None), "__self__", None)):
+            if owner is not None and callable(getattr(owner, "toolkit_name", None)):
+                return owner.toolkit_name()
+        return "mcp_toolkit"
+
+    @staticmethod
+    def _resolve_invoke(tool: FunctionTool) -> str:
+        # Sync tools are always called directly: run_in_executor would lose the
+        # process_task ContextVar
+        is_sync = hasattr(tool, "is_async") and not tool.is_async
+        func = getattr(tool, "func", None)
+        if is_sync and getattr(getattr(func, "__self__", None), "run_tools_in_thread", False):
+            # asyncio.to_thread copies the context, so process_task survives
+            return "thread"
+        if func is not None and hasattr(func, "async_call"):
+            return "sync" if is_sync else "func_async_call"
+        if callable(getattr(tool, "async_call", None)):
+            return "sync" if is_sync else "async_call"
+        if func is not None and asyncio.iscoroutinefunction(func):
+            return "await_func"
+        if asyncio.iscoroutinefunction(tool):
+            return "await_tool"
+        return "sync"
+
 
 class ListenChatAgent(ChatAgent):
     @traceroot.trace()
@@ -136,9 +219,27 @@ class ListenChatAgent(ChatAgent):
         )
         self.api_task_id = api_task_id
         self.agent_name = agent_name
+        self._tool_dispatch: dict[str, ToolDispatch] = {
+            name: ToolDispatch.resolve(tool) for name, tool in self._internal_tools.items()
+        }
 
     process_task_id: str = ""
 
+    @property
+    def timeline_lane(self) -> str:
+        """Timeline lane of this agent instance; clones of one agent step in parallel."""
+        return f"{self.agent_name} {self.agent_id[:8]}"
+
+    def _get_tool_dispatch(self, func_name: str) -> ToolDispatch:
+        r"""Return the cached dispatch record for a tool, resolving it again if
+        the tool was added or replaced after construction."""
+        tool = self._internal_tools[func_name]
+        dispatch = self._tool_dispatch.get(func_name)
+        if dispatch is None or dispatch.tool is not tool:
+            dispatch = ToolDispatch.resolve(tool)
+            self._tool_dispatch[func_name] = dispatch
+        return dispatch
+
     @traceroot.trace()
     def step(
         self,
@@ -162,10 +263,13 @@ class ListenChatAgent(ChatAgent):
         message = None
         res = None
         traceroot_logger.info(
-            f"Agent {self.agent_name} starting step with message: {input_message.content if isinstance(input_message, BaseMessage) else input_message}"
+            "Agent %s starting step with message: %s",
+            self.agent_name,
+            input_message.content if isinstance(input_message, BaseMessage) else input_message,
         )
         try:
-            res = super().step(input_message, response_format)
+            with task_lock.timeline.span("step", "agent", self.timeline_lane, process_task_id=self.process_task_id):
+                res = super().step(input_message, response_format)
         except ModelProcessingError as e:
             res = None
             error_info = e
@@ -274,13 +378,14 @@ class ListenChatAgent(ChatAgent):
         message = None
         res = None
         traceroot_logger.debug(
-            f"Agent {self.agent_name} starting async step with message: {input_message.content if isinstance(input_message, BaseMessage) else input_message}"
+            "Agent %s starting async step with message: %s",
+            self.agent_name,
+            input_message.content if isinstance(input_message, BaseMessage) else input_message,
         )
 
         try:
-            res = await super().astep(input_message, response_format)
-            if isinstance(res, AsyncStreamingChatAgentResponse):
-                res = await res._get_final_response()
+            with task_lock.timeline.span("astep", "agent", self.timeline_lane, process_task_id=self.process_task_id):
+                res = await super().astep(input_message, response_format)
         except ModelProcessingError as e:
             res = None
             error_info = e
@@ -300,6 +405,45 @@ class ListenChatAgent(ChatAgent):
             total_tokens = 0
 
         if res is not None:
+            if isinstance(res, AsyncStreamingChatAgentResponse):
+                # Hand the stream back so callers (e.g. task decomposition) can
+                # consume chunks on the loop; deactivate once it is drained.
+                async def _astream_with_deactivate():
+                    last_response: ChatAgentResponse | None = None
+                    accumulated_content = ""
+                    try:
+                        async for chunk in res:
+                            last_response = chunk
+                            if chunk.msg and chunk.msg.content:
+                                if self.stream_accumulate:
+                                    accumulated_content = chunk.msg.content
+                                else:
+                                    accumulated_content += chunk.msg.content
+                            yield chunk
+                    finally:
+                        total_tokens = 0
+                        if last_response:
+                            usage_info = (
+                                last_response.info.get("usage")
+                                or last_response.info.get("token_usage")
+                                or {}
+                            )
+                            if usage_info:
+                                total_tokens = usage_info.get("total_tokens", 0)
+                        await task_lock.put_queue(
+                            ActionDeactivateAgentData(
+                                data={
+                                    "agent_name": self.agent_name,
+                                    "process_task_id": self.process_task_id,
+                                    "agent_id": self.agent_id,
+                                    "message": accumulated_content,
+                                    "tokens": total_tokens,
+                                },
+                            )
+                        )
+
+                return AsyncStreamingChatAgentResponse(_astream_with_deactivate())
+
             message = res.msg.content if res.msg else ""
             total_tokens = res.info["usage"]["total_tokens"]
             traceroot_logger.info(f"Agent {self.agent_name} completed step, tokens used: {total_tokens}")
@@ -337,17 +481,19 @@ class ListenChatAgent(ChatAgent):
         # Handle all sync tools ourselves to maintain ContextVar context
         args = tool_call_request.args
         tool_call_id = tool_call_request.tool_call_id
+        dispatch = self._get_tool_dispatch(func_name)
 
         # Check if tool is wrapped by @listen_toolkit decorator
         # If so, the decorator will handle activate/deactivate events
-        has_listen_decorator = hasattr(tool.func, "__wrapped__")
+        has_listen_decorator = dispatch.has_listen_decorator
 
         try:
             task_lock = get_task_lock(self.api_task_id)
 
-            toolkit_name = getattr(tool, "_toolkit_name") if hasattr(tool, "_toolkit_name") else "mcp_toolkit"
+            toolkit_name = dispatch.toolkit_name
+            args_json = json.dumps(args, ensure_ascii=False)
             traceroot_logger.debug(
-                f"Agent {self.agent_name} executing tool: {func_name} from toolkit: {toolkit_name} with args: {json.dumps(args, ensure_ascii=False)}"
+                "Agent %s executing tool: %s from toolkit: %s with args: %s", self.agent_name, func_name, toolkit_name, args_json
             )
 
             # Only send activate event if tool is NOT wrapped by @listen_toolkit
@@ -360,15 +506,18 @@ class ListenChatAgent(ChatAgent):
                                 "process_task_id": self.process_task_id,
                                 "toolkit_name": toolkit_name,
                                 "method_name": func_name,
-                                "message": json.dumps(args, ensure_ascii=False),
+                                "message": args_json,
                             },
                         )
                     )
                 )
             # Set process_task context for all tool executions
-            with set_process_task(self.process_task_id):
+            with (
+                set_process_task(self.process_task_id),
+                task_lock.timeline.span(func_name, "tool", self.timeline_lane, toolkit=toolkit_name),
+            ):
                 raw_result = tool(**args)
-            traceroot_logger.debug(f"Tool {func_name} executed successfully")
+            traceroot_logger.debug("Tool %s executed successfully", func_name)
             if self.mask_tool_output:
                 self._secure_result_store[tool_call_id] = raw_result
                 result = (
@@ -379,16 +528,8 @@ class ListenChatAgent(ChatAgent):
             else:
                 result = raw_result
                 mask_flag = False
-            # Prepare result message with truncation
-            if isinstance(result, str):
-                result_msg = result
-            else:
-                result_str = repr(result)
-                MAX_RESULT_LENGTH = 500
-                if len(result_str) > MAX_RESULT_LENGTH:
-                    result_msg = result_str[:MAX_RESULT_LENGTH] + f"... (truncated, total length: {len(result_str)} chars)"
-                else:
-                    result_msg = result_str
+            # Bounded preview; the full result is kept out-of-band when cut
+            result_fields = preview_tool_result(self.api_task_id, func_name, result)
 
             # Only send deactivate event if tool is NOT wrapped by @listen_toolkit
             if not has_listen_decorator:
@@ -400,7 +541,7 @@ class ListenChatAgent(ChatAgent):
                                 "process_task_id": self.process_task_id,
                                 "toolkit_name": toolkit_name,
                                 "method_name": func_name,
-                                "message": result_msg,
+                                **result_fields,
                             },
                         )
                     )
@@ -428,32 +569,12 @@ class ListenChatAgent(ChatAgent):
         tool_call_id = tool_call_request.tool_call_id
         task_lock = get_task_lock(self.api_task_id)
 
-        # Try to get the real toolkit name
-        toolkit_name = None
-
-        # Method 1: Check _toolkit_name attribute
-        if hasattr(tool, "_toolkit_name"):
-            toolkit_name = tool._toolkit_name
-
-        # Method 2: For MCP tools, check if func has __self__ (the toolkit instance)
-        if not toolkit_name and hasattr(tool, "func") and hasattr(tool.func, "__self__"):
-            toolkit_instance = tool.func.__self__
-            if hasattr(toolkit_instance, "toolkit_name") and callable(toolkit_instance.toolkit_name):
-                toolkit_name = toolkit_instance.toolkit_name()
-
-        # Method 3: Check if tool.func is a bound method with toolkit
-        if not toolkit_name and hasattr(tool, "func"):
-            if hasattr(tool.func, "func") and hasattr(tool.func.func, "__self__"):
-                toolkit_instance = tool.func.func.__self__
-                if hasattr(toolkit_instance, "toolkit_name") and callable(toolkit_instance.toolkit_name):
-                    toolkit_name = toolkit_instance.toolkit_name()
+        dispatch = self._get_tool_dispatch(func_name)
+        toolkit_name = dispatch.toolkit_name
+        args_json = json.dumps(args, ensure_ascii=False)
 
-        # Default fallback
-        if not toolkit_name:
-            toolkit_name = "mcp_toolkit"
-
-        traceroot_logger.info(
-            f"Agent {self.agent_name} executing async tool: {func_name} from toolkit: {toolkit_name} with args: {json.dumps(args, ensure_ascii=False)}"
+        traceroot_logger.debug(
+            "Agent %s executing async tool: %s from toolkit: %s with args: %s", self.agent_name, func_name, toolkit_name, args_json
         )
 
         # Always send activate event from agent to ensure consistent logging
@@ -465,49 +586,29 @@ class ListenChatAgent(ChatAgent):
                     "process_task_id": self.process_task_id,
                     "toolkit_name": toolkit_name,
                     "method_name": func_name,
-                    "message": json.dumps(args, ensure_ascii=False),
+                    "message": args_json,
                 },
             )
         )
         try:
             # Set process_task context for all tool executions
-            with set_process_task(self.process_task_id):
-                # Try different invocation paths in order of preference
-                if hasattr(tool, "func") and hasattr(tool.func, "async_call"):
-                    # Case: FunctionTool wrapping an MCP tool
-                    # Check if the wrapped tool is sync to avoid run_in_executor
-                    if hasattr(tool, 'is_async') and not tool.is_async:
-                        # Sync tool: call directly to preserve ContextVar
-                        result = tool(**args)
-                        if asyncio.iscoroutine(result):
-                            result = await result
-                    else:
-                        # Async tool: use async_call
-                        result = await tool.func.async_call(**args)
-
-                elif hasattr(tool, "async_call") and callable(tool.async_call):
-                    # Case: tool itself has async_call
-                    # Check if this is a sync tool to avoid run_in_executor (which breaks ContextVar)
-                    if hasattr(tool, 'is_async') and not tool.is_async:
-                        # Sync tool: call directly to preserve ContextVar in same thread
-                        result = tool(**args)
-                        # Handle case where synchronous call returns a coroutine
-                        if asyncio.iscoroutine(result):
-                            result = await result
-                    else:
-                        # Async tool: use async_call
-                        result = await tool.async_call(**args)
-
-                elif hasattr(tool, "func") and asyncio.iscoroutinefunction(tool.func):
-                    # Case: tool wraps a direct async function
+            with (
+                set_process_task(self.process_task_id),
+                task_lock.timeline.span(func_name, "tool", self.timeline_lane, toolkit=toolkit_name),
+            ):
+                invoke = dispatch.invoke
+                if invoke == "func_async_call":
+                    result = await tool.func.async_call(**args)
+                elif invoke == "async_call":
+                    result = await tool.async_call(**args)
+                elif invoke == "await_func":
                     result = await tool.func(**args)
-
-                elif asyncio.iscoroutinefunction(tool):
-                    # Case: tool is itself a coroutine function
+                elif invoke == "await_tool":
                     result = await tool(**args)
-
+                elif invoke == "thread":
+                    result = await to_thread_with_env(tool, **args)
                 else:
-                    # Fallback: synchronous call - call directly in current context
+                    # Synchronous call directly in the current context
                     # DO NOT use run_in_executor to preserve ContextVar
                     result = tool(**args)
                     # Handle case where synchronous call returns a coroutine
@@ -520,16 +621,8 @@ class ListenChatAgent(ChatAgent):
             result = {"error": error_msg}
             traceroot_logger.error(f"Async tool execution failed for {func_name}: {e}", exc_info=True)
 
-        # Prepare result message with truncation
-        if isinstance(result, str):
-            result_msg = result
-        else:
-            result_str = repr(result)
-            MAX_RESULT_LENGTH = 500
-            if len(result_str) > MAX_RESULT_LENGTH:
-                result_msg = result_str[:MAX_RESULT_LENGTH] + f"... (truncated, total length: {len(result_str)} chars)"
-            else:
-                result_msg = result_str
+        # Bounded preview; the full result is kept out-of-band when cut
+        result_fields = preview_tool_result(self.api_task_id, func_name, result)
 
         # Always send deactivate event from agent to ensure consistent logging
         await task_lock.put_queue(
@@ -539,7 +632,7 @@ class ListenChatAgent(ChatAgent):
                     "process_task_id": self.process_task_id,
                     "toolkit_name": toolkit_name,
                     "method_name": func_name,
-                    "message": result_msg,
+                    **result_fields,
                 },
             )
         )
@@ -606,10 +699,9 @@ def agent_model(
     task_lock = get_task_lock(options.project_id)
     agent_id = str(uuid.uuid4())
     traceroot_logger.info(f"Creating agent: {agent_name} with id: {agent_id} for project: {options.project_id}")
-    asyncio.create_task(
-        task_lock.put_queue(
-            ActionCreateAgentData(data={"agent_name": agent_name, "agent_id": agent_id, "tools": tool_names or []})
-        )
+    # May run in a worker thread when agents are built concurrently
+    task_lock.put_queue_threadsafe(
+        ActionCreateAgentData(data={"agent_name": agent_name, "agent_id": agent_id, "tools": tool_names or []})
     )
 
     # Build model config, defaulting to streaming for planner
@@ -668,6 +760,11 @@ def task_summary_agent(options: Chat):
 
 @traceroot.trace()
 async def developer_agent(options: Chat):
+    # Toolkit setup (terminal env, tool schemas) blocks, so keep it off the loop
+    return await to_thread_with_env(_build_developer_agent, options)
+
+
+def _build_developer_agent(options: Chat):
     working_directory = get_working_directory(options)
     traceroot_logger.info(f"Creating developer agent for project: {options.project_id} in directory: {working_directory}")
     message_integration = ToolkitMessageIntegration(
@@ -682,7 +779,9 @@ async def developer_agent(options: Chat):
     screenshot_toolkit = ScreenshotToolkit(options.project_id, working_directory=working_directory)
     screenshot_toolkit = message_integration.register_toolkits(screenshot_toolkit)
 
-    terminal_toolkit = TerminalToolkit(options.project_id, Agents.document_agent, safe_mode=True, clone_current_env=False)
+    terminal_toolkit = TerminalToolkit(
+        options.project_id, Agents.document_agent, safe_mode=True, clone_current_env=False
+    )
     terminal_toolkit = message_integration.register_toolkits(terminal_toolkit)
 
     tools = [
@@ -719,7 +818,10 @@ The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks,
 </operating_environment>
 
 <mandatory_instructions>
-- You MUST use the `read_note` tool to read the ALL notes from other agents.
+- You MUST use the `read_note` tool to read the notes from other agents.
+    A plain `read_note()` returns what is new since your last read; use
+    its `note_name`, `agent`, `since` or `query` arguments to look further
+    back.
 
 You SHOULD keep the user informed by providing message_title and message_description
     parameters when calling tools. These optional parameters are available on all tools
@@ -859,6 +961,7 @@ def search_agent(options: Chat):
         session_id=str(uuid.uuid4())[:8],
         default_start_url="about:blank",
         cdp_url=f"http://localhost:{env('browser_port', '9222')}",
+        snapshot_mode=env("browser_snapshot_mode", "full"),
         enabled_tools=[
             "browser_click",
             "browser_type",
@@ -868,6 +971,7 @@ def search_agent(options: Chat):
             "browser_enter",
             "browser_visit_page",
             "browser_scroll",
+            "browser_get_page_snapshot",
             # "browser_get_som_screenshot",
         ],
     )
@@ -1030,6 +1134,12 @@ Your approach depends on available search tools:
 
 @traceroot.trace()
 async def document_agent(options: Chat):
+    # Only the MCP connect is awaited here; the blocking toolkit setup runs in a thread
+    google_drive_tools = await GoogleDriveMCPToolkit.get_can_use_tools(options.project_id, options.get_bun_env())
+    return await to_thread_with_env(_build_document_agent, options, google_drive_tools)
+
+
+def _build_document_agent(options: Chat, google_drive_tools: list[FunctionTool]):
     working_directory = get_working_directory(options)
     traceroot_logger.info(f"Creating document agent for project: {options.project_id} in directory: {working_directory}")
     message_integration = ToolkitMessageIntegration(
@@ -1044,7 +1154,9 @@ async def document_agent(options: Chat):
     excel_toolkit = message_integration.register_toolkits(excel_toolkit)
     note_toolkit = NoteTakingToolkit(options.project_id, Agents.document_agent, working_directory=working_directory)
     note_toolkit = message_integration.register_toolkits(note_toolkit)
-    terminal_toolkit = TerminalToolkit(options.project_id, Agents.document_agent, safe_mode=True, clone_current_env=False)
+    terminal_toolkit = TerminalToolkit(
+        options.project_id, Agents.document_agent, safe_mode=True, clone_current_env=False
+    )
     terminal_toolkit = message_integration.register_toolkits(terminal_toolkit)
     tools = [
         *file_write_toolkit.get_tools(),
@@ -1054,7 +1166,7 @@ async def document_agent(options: Chat):
         *excel_toolkit.get_tools(),
         *note_toolkit.get_tools(),
         *terminal_toolkit.get_tools(),
-        *await GoogleDriveMCPToolkit.get_can_use_tools(options.project_id, options.get_bun_env()),
+        *google_drive_tools,
     ]
     # if env("EXA_API_KEY") or options.is_cloud():
     #     search_toolkit = SearchToolkit(options.project_id, Agents.document_agent).search_exa
@@ -1088,7 +1200,9 @@ The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks,
 
 <mandatory_instructions>
 - Before creating any document, you MUST use the `read_note` tool to gather
-    all information collected by other team members by reading ALL notes.
+    the information collected by other team members. A plain `read_note()`
+    returns what is new since your last read; use its `note_name`, `agent`,
+    `since` or `query` arguments to look further back.
 
 - You MUST use the available tools to create or modify documents (e.g.,
     `write_to_file`, `create_presentation`). Your primary output should be
@@ -1097,6 +1211,10 @@ The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks,
 - If there's no specified format for the document/report/paper, you should use 
     the `write_to_file` tool to create a HTML file.
 
+- For long text documents or large CSV tables, write the content in parts
+    with `append_to_file` and then call `finalize_file` once, instead of
+    sending everything in a single `write_to_file` call.
+
 - If the document has many data, you MUST use the terminal tool to
     generate charts and graphs and add them to the document.
 
@@ -1324,9 +1442,10 @@ The current date is {NOW_STR}(Accurate to the hour). For any date-related tasks,
 </operating_environment>
 
 <mandatory_instructions>
-- You MUST use the `read_note` tool to to gather all information collected
-    by other team members by reading ALL notes and write down your findings in 
-    the notes.
+- You MUST use the `read_note` tool to gather the information collected
+    by other team members and write down your findings in the notes. A plain
+    `read_note()` returns what is new since your last read; use its
+    `note_name`, `agent`, `since` or `query` arguments to look further back.
 
 - When you complete your task, your final response must be a comprehensive
     summary of your analysis or the generated media, presented in a clear,
@@ -1412,6 +1531,14 @@ async def social_medium_agent(options: Chat):
     Agent to handling tasks related to social media:
     include toolkits: WhatsApp, Twitter, LinkedIn, Reddit, Notion, Slack, Discord and Google Suite.
     """
+    notion_tools = await NotionMCPToolkit.get_can_use_tools(options.project_id)
+    gmail_tools = await GoogleGmailMCPToolkit.get_can_use_tools(options.project_id, options.get_bun_env())
+    return await to_thread_with_env(_build_social_medium_agent, options, notion_tools, gmail_tools)
+
+
+def _build_social_medium_agent(
+    options: Chat, notion_tools: list[FunctionTool], gmail_tools: list[FunctionTool]
+):
     working_directory = get_working_directory(options)
     traceroot_logger.info(f"Creating social medium agent for project: {options.project_id} in directory: {working_directory}")
     tools = [
@@ -1419,9 +1546,9 @@ async def social_medium_agent(options: Chat):
         *TwitterToolkit.get_can_use_tools(options.project_id),
         *LinkedInToolkit.get_can_use_tools(options.project_id),
         *RedditToolkit.get_can_use_tools(options.project_id),
-        *await NotionMCPToolkit.get_can_use_tools(options.project_id),
+        *notion_tools,
         # *SlackToolkit.get_can_use_tools(options.project_id),
-        *await GoogleGmailMCPToolkit.get_can_use_tools(options.project_id, options.get_bun_env()),
+        *gmail_tools,
         *GoogleCalendarToolkit.get_can_use_tools(options.project_id),
         *HumanToolkit.get_can_use_tools(options.project_id, Agents.social_medium_agent),
         *TerminalToolkit(options.project_id, agent_name=Agents.social_medium_agent, clone_current_env=False).get_tools(),
@@ -1530,10 +1657,7 @@ async def mcp_agent(options: Chat):
     traceroot_logger.info(
         f"Creating MCP agent for project: {options.project_id} with {len(options.installed_mcp['mcpServers'])} MCP servers"
     )
-    tools = [
-        # *HumanToolkit.get_can_use_tools(options.project_id, Agents.mcp_agent),
-        *McpSearchToolkit(options.project_id).get_tools(),
-    ]
+    mcp_tools = []
     if len(options.installed_mcp["mcpServers"]) > 0:
         try:
             mcp_tools = await get_mcp_tools(options.installed_mcp)
@@ -1541,22 +1665,27 @@ async def mcp_agent(options: Chat):
             if mcp_tools:
                 tool_names = [tool.get_function_name() if hasattr(tool, 'get_function_name') else str(tool) for tool in mcp_tools]
                 traceroot_logger.debug(f"MCP tools: {tool_names}")
-            tools = [*tools, *mcp_tools]
         except Exception as e:
             traceroot_logger.debug(repr(e))
+    return await to_thread_with_env(_build_mcp_agent, options, mcp_tools)
+
 
+def _build_mcp_agent(options: Chat, mcp_tools: list[FunctionTool]):
+    tools = [
+        # *HumanToolkit.get_can_use_tools(options.project_id, Agents.mcp_agent),
+        *McpSearchToolkit(options.project_id).get_tools(),
+        *mcp_tools,
+    ]
     task_lock = get_task_lock(options.project_id)
     agent_id = str(uuid.uuid4())
     traceroot_logger.info(f"Creating MCP agent: {Agents.mcp_agent} with id: {agent_id} for task: {options.project_id}")
-    asyncio.create_task(
-        task_lock.put_queue(
-            ActionCreateAgentData(
-                data={
-                    "agent_name": Agents.mcp_agent,
-                    "agent_id": agent_id,
-                    "tools": [key for key in options.installed_mcp["mcpServers"].keys()],
-                }
-            )
+    task_lock.put_queue_threadsafe(
+        ActionCreateAgentData(
+            data={
+                "agent_name": Agents.mcp_agent,
+                "agent_id": agent_id,
+                "tools": [key for key in options.installed_mcp["mcpServers"].keys()],
+            }
         )
     )
     return ListenChatAgent(
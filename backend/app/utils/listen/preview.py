@@ -0,0 +1,287 @@
+import json
+import sys
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Tuple
+from pydantic import BaseModel
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("toolkit_preview")
+
+# Budgets (UTF-8 bytes) for the messages sent with activate/deactivate toolkit events
+ARGS_PREVIEW_BYTES = 500
+RESULT_PREVIEW_BYTES = 4 * 1024
+# Containers nested deeper than this are rendered as "..."
+MAX_PREVIEW_DEPTH = 6
+# Total size the payload store may hold before evicting
+PAYLOAD_STORE_BYTES = 64 * 1024 * 1024
+
+ArgsRenderer = Callable[[Tuple[Any, ...], Dict[str, Any], int], str]
+ResultRenderer = Callable[[Any, int], "str | Preview"]
+
+
+class Preview(NamedTuple):
+    text: str
+    truncated: bool
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class _PreviewWriter:
+    """Accumulates text until the byte budget is spent, then stops the walk."""
+
+    def __init__(self, budget: int) -> None:
+        self.parts: list[str] = []
+        self.remaining = budget
+        self.truncated = False
+
+    def write(self, text: str) -> None:
+        # Slicing first keeps the encode bounded by the remaining budget
+        piece = text[: self.remaining]
+        encoded = piece.encode("utf-8")
+        if len(encoded) > self.remaining or len(piece) < len(text):
+            self.parts.append(encoded[: self.remaining].decode("utf-8", "ignore"))
+            self.remaining = 0
+            self.truncated = True
+            raise _BudgetExhausted()
+        self.parts.append(piece)
+        self.remaining -= len(encoded)
+
+
+def _write_str(writer: _PreviewWriter, value: str, style: str) -> None:
+    # Only the part that can still fit is quoted/escaped
+    head = value[: writer.remaining + 1]
+    if style == "json":
+        text = json.dumps(head, ensure_ascii=False)
+    else:
+        text = repr(head)
+    if len(head) < len(value):
+        text = text[:-1]
+    writer.write(text)
+
+
+def _write_value(writer: _PreviewWriter, value: Any, style: str, depth: int) -> None:
+    if isinstance(value, str):
+        _write_str(writer, value, style)
+    elif value is None or isinstance(value, (bool, int, float)):
+        writer.write(json.dumps(value) if style == "json" else repr(value))
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        writer.write(f"<{len(value)} bytes>")
+    elif depth >= MAX_PREVIEW_DEPTH:
+        writer.write("...")
+    elif isinstance(value, BaseModel):
+        writer.write(f"{value.__class__.__name__}(")
+        for i, (key, item) in enumerate(value):
+            writer.write(f"{', ' if i else ''}{key}=")
+            _write_value(writer, item, style, depth + 1)
+        writer.write(")")
+    elif isinstance(value, dict):
+        writer.write("{")
+        for i, (key, item) in enumerate(value.items()):
+            if i:
+                writer.write(", ")
+            _write_value(writer, key if style != "json" or isinstance(key, str) else str(key), style, depth + 1)
+            writer.write(": ")
+            _write_value(writer, item, style, depth + 1)
+        writer.write("}")
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        if style == "json" or isinstance(value, list):
+            opening, closing = "[", "]"
+        elif isinstance(value, tuple):
+            opening, closing = "(", ")"
+        else:
+            opening, closing = "{", "}"
+        writer.write(opening)
+        for i, item in enumerate(value):
+            if i:
+                writer.write(", ")
+            _write_value(writer, item, style, depth + 1)
+        writer.write(closing)
+    else:
+        # Arbitrary objects have no incremental form; only their head is kept
+        writer.write(str(value) if style == "json" else repr(value))
+
+
+def render_preview(value: Any, budget: int = RESULT_PREVIEW_BYTES, style: str = "json") -> Preview:
+    """
+    Render a bounded preview of `value`.
+
+    Containers are walked incrementally and the walk stops as soon as
+    `budget` bytes have been produced, so large payloads are never fully
+    serialized. `style="json"` renders like `json.dumps` (strings at the top
+    level are passed through unquoted), `style="repr"` renders like `repr`.
+    """
+    writer = _PreviewWriter(budget)
+    try:
+        if isinstance(value, str) and style == "json":
+            writer.write(value)
+        else:
+            _write_value(writer, value, style, 0)
+    except _BudgetExhausted:
+        pass
+    text = "".join(writer.parts)
+    if writer.truncated:
+        if isinstance(value, str):
+            text += f"... (truncated, total length: {len(value)} chars)"
+        else:
+            text += "... (truncated)"
+    return Preview(text, writer.truncated)
+
+
+def render_args_preview(args: Tuple[Any, ...], kwargs: Dict[str, Any], budget: int = ARGS_PREVIEW_BYTES) -> Preview:
+    """Bounded equivalent of `", ".join(repr(arg) ...)` over positional and keyword arguments."""
+    writer = _PreviewWriter(budget)
+    try:
+        first = True
+        for arg in args:
+            if not first:
+                writer.write(", ")
+            _write_value(writer, arg, "repr", 0)
+            first = False
+        for key, arg in kwargs.items():
+            if not first:
+                writer.write(", ")
+            writer.write(f"{key}=")
+            _write_value(writer, arg, "repr", 0)
+            first = False
+    except _BudgetExhausted:
+        pass
+    text = "".join(writer.parts)
+    if writer.truncated:
+        text += "... (truncated)"
+    return Preview(text, writer.truncated)
+
+
+def truncate_preview(text: str, budget: int) -> str:
+    """Cap an already rendered message (e.g. from a custom renderer) at `budget` bytes."""
+    preview = render_preview(text, budget)
+    return preview.text
+
+
+# Per-tool preview hooks, keyed by method name
+args_renderers: Dict[str, ArgsRenderer] = {}
+result_renderers: Dict[str, ResultRenderer] = {}
+
+
+def register_preview_renderer(
+    method_name: str,
+    args: ArgsRenderer | None = None,
+    result: ResultRenderer | None = None,
+) -> None:
+    """
+    Register custom preview renderers for a toolkit method.
+
+    `args` receives `(args, kwargs, budget)` without `self`; `result` receives
+    `(result, budget)` and may return a `Preview` with `truncated=True` when
+    it left parts of the result out, so the full result is still stored.
+    Their output is capped at the budget either way.
+    """
+    if args is not None:
+        args_renderers[method_name] = args
+    if result is not None:
+        result_renderers[method_name] = result
+
+
+def payload_size(value: Any, depth: int = 0) -> int:
+    """Approximate in-memory size of a tool result, in bytes, as counted by `PayloadStore`."""
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if depth >= MAX_PREVIEW_DEPTH:
+        return sys.getsizeof(value)
+    if isinstance(value, BaseModel):
+        return sum(payload_size(item, depth + 1) for _, item in value)
+    if isinstance(value, dict):
+        return sum(payload_size(key, depth + 1) + payload_size(item, depth + 1) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(payload_size(item, depth + 1) for item in value)
+    return sys.getsizeof(value)
+
+
+class PayloadStore:
+    """
+    Keeps full tool results whose preview was truncated, so clients can fetch
+    them on demand by id instead of receiving them over SSE.
+
+    Values are held as-is (not serialized) and evicted least recently used
+    first once they total more than `max_bytes` (see `payload_size`) or more
+    than `max_items` are stored. A value larger than `max_bytes` on its own
+    is not stored at all.
+    """
+
+    def __init__(self, max_bytes: int = PAYLOAD_STORE_BYTES, max_items: int = 256) -> None:
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.total_bytes = 0
+        self._payloads: OrderedDict[str, Tuple[str, Any, int]] = OrderedDict()
+
+    def put(self, task_id: str, value: Any) -> str | None:
+        size = payload_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Tool result of {size} bytes exceeds the payload store, not keeping it")
+            return None
+        payload_id = uuid.uuid4().hex
+        self._payloads[payload_id] = (task_id, value, size)
+        self.total_bytes += size
+        while len(self._payloads) > self.max_items or self.total_bytes > self.max_bytes:
+            _, (_, _, evicted) = self._payloads.popitem(last=False)
+            self.total_bytes -= evicted
+        return payload_id
+
+    def get(self, task_id: str, payload_id: str) -> Any:
+        entry = self._payloads.get(payload_id)
+        if entry is None or entry[0] != task_id:
+            raise KeyError(payload_id)
+        self._payloads.move_to_end(payload_id)
+        return entry[1]
+
+    def drop_task(self, task_id: str) -> None:
+        for payload_id in [k for k, (owner, _, _) in self._payloads.items() if owner == task_id]:
+            self.total_bytes -= self._payloads.pop(payload_id)[2]
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+
+payload_store = PayloadStore()
+
+
+def preview_tool_args(method_name: str, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> str:
+    """Activate-event message for a tool call (`args` excludes `self`)."""
+    renderer = args_renderers.get(method_name)
+    if renderer is not None:
+        try:
+            return truncate_preview(renderer(args, kwargs, ARGS_PREVIEW_BYTES), ARGS_PREVIEW_BYTES)
+        except Exception as e:
+            logger.warning(f"Preview renderer for {method_name} args failed: {e}")
+    return render_args_preview(args, kwargs).text
+
+
+def preview_tool_result(task_id: str, method_name: str, res: Any) -> Dict[str, str]:
+    """
+    Deactivate-event fields for a tool result: `message` is the bounded
+    preview, and `payload_id` references the full result when it was cut.
+    """
+    renderer = result_renderers.get(method_name)
+    preview = None
+    if renderer is not None:
+        try:
+            rendered = renderer(res, RESULT_PREVIEW_BYTES)
+            if isinstance(rendered, Preview):
+                capped = render_preview(rendered.text)
+                preview = Preview(capped.text, rendered.truncated or capped.truncated)
+            else:
+                preview = render_preview(rendered)
+        except Exception as e:
+            logger.warning(f"Preview renderer for {method_name} result failed: {e}")
+    if preview is None:
+        preview = render_preview(res)
+    if not preview.truncated:
+        return {"message": preview.text}
+    payload_id = payload_store.put(task_id, res)
+    if payload_id is None:
+        return {"message": preview.text}
+    return {"message": preview.text, "payload_id": payload_id}
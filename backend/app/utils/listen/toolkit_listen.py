@@ -1,7 +1,6 @@
 import asyncio
 from functools import wraps
 from inspect import iscoroutinefunction, getmembers, ismethod, signature
-import json
 from typing import Any, Callable, Type, TypeVar
 import threading
 from concurrent.futures import ThreadPoolExecutor
@@ -12,6 +11,13 @@ from app.service.task import (
     ActionDeactivateToolkitData,
     get_task_lock,
 )
+from app.utils.listen.preview import (
+    ARGS_PREVIEW_BYTES,
+    RESULT_PREVIEW_BYTES,
+    preview_tool_args,
+    preview_tool_result,
+    truncate_preview,
+)
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
 from app.service.task import process_task
 from utils import traceroot_wrapper as traceroot
@@ -40,6 +46,10 @@ def _safe_put_queue(task_lock, data):
         task.add_done_callback(handle_task_result)
 
     except RuntimeError:
+        # Worker thread (e.g. a tool run off the loop): hand the item to the queue's own loop
+        if isinstance(getattr(task_lock, "loop", None), asyncio.AbstractEventLoop):
+            task_lock.put_queue_threadsafe(data)
+            return
         # No running event loop, run in a separate thread
         try:
             import queue
@@ -97,20 +107,10 @@ def listen_toolkit(
                 task_lock = get_task_lock(toolkit.api_task_id)
 
                 if inputs is not None:
-                    args_str = inputs(*args, **kwargs)
+                    args_str = truncate_preview(inputs(*args, **kwargs), ARGS_PREVIEW_BYTES)
                 else:
-                    # remove first param self
-                    filtered_args = args[1:] if len(args) > 0 else []
-
-                    args_str = ", ".join(repr(arg) for arg in filtered_args)
-                    if kwargs:
-                        kwargs_str = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
-                        args_str = f"{args_str}, {kwargs_str}" if args_str else kwargs_str
-
-                # Truncate args_str if too long
-                MAX_ARGS_LENGTH = 500
-                if len(args_str) > MAX_ARGS_LENGTH:
-                    args_str = args_str[:MAX_ARGS_LENGTH] + f"... (truncated, total length: {len(args_str)} chars)"
+                    # remove first param self; rendering stops at the preview budget
+                    args_str = preview_tool_args(func.__name__, args[1:], kwargs)
 
                 toolkit_name = toolkit.toolkit_name()
                 method_name = func.__name__.replace("_", " ")
@@ -144,31 +144,22 @@ def listen_toolkit(
                 except Exception as e:
                     error = e
 
-                if return_msg and error is None:
-                    res_msg = return_msg(res)
-                elif isinstance(res, str):
-                    res_msg = res
+                if error is not None:
+                    res_fields = {"message": truncate_preview(str(error), RESULT_PREVIEW_BYTES)}
+                elif return_msg:
+                    res_fields = {"message": truncate_preview(return_msg(res), RESULT_PREVIEW_BYTES)}
                 else:
-                    if error is None:
-                        try:
-                            res_msg = json.dumps(res, ensure_ascii=False)
-                        except TypeError:
-                            # Handle cases where res contains non-serializable objects (like coroutines)
-                            res_str = str(res)
-                            # Truncate very long outputs to avoid flooding logs
-                            MAX_LENGTH = 500
-                            if len(res_str) > MAX_LENGTH:
-                                res_msg = res_str[:MAX_LENGTH] + f"... (truncated, total length: {len(res_str)} chars)"
-                            else:
-                                res_msg = res_str
-                    else:
-                        res_msg = str(error)
+                    # Bounded preview; the full result is kept out-of-band when cut
+                    res_fields = preview_tool_result(toolkit.api_task_id, func.__name__, res)
 
                 deactivate_timestamp = datetime.now().isoformat()
                 status = "ERROR" if error is not None else "SUCCESS"
 
                 # Log toolkit deactivation (only send to WorkFlow if not skipped)
-                logger.info(f"[TOOLKIT DEACTIVATE] Toolkit: {toolkit_name} | Method: {method_name} | Task ID: {process_task_id} | Agent: {toolkit.agent_name} | Status: {status} | Timestamp: {deactivate_timestamp}")
+                logger.info(
+                    "[TOOLKIT DEACTIVATE] Toolkit: %s | Method: %s | Task ID: %s | Agent: %s | Status: %s | Timestamp: %s",
+                    toolkit_name, method_name, process_task_id, toolkit.agent_name, status, deactivate_timestamp,
+                )
 
                 if not skip_workflow_display:
                     deactivate_data = ActionDeactivateToolkitData(
@@ -177,7 +168,7 @@ def listen_toolkit(
                             "process_task_id": process_task_id,
                             "toolkit_name": toolkit_name,
                             "method_name": method_name,
-                            "message": res_msg,
+                            **res_fields,
                         },
                     )
                     await task_lock.put_queue(deactivate_data)
@@ -201,20 +192,10 @@ def listen_toolkit(
                 task_lock = get_task_lock(toolkit.api_task_id)
 
                 if inputs is not None:
-                    args_str = inputs(*args, **kwargs)
+                    args_str = truncate_preview(inputs(*args, **kwargs), ARGS_PREVIEW_BYTES)
                 else:
-                    # remove first param self
-                    filtered_args = args[1:] if len(args) > 0 else []
-
-                    args_str = ", ".join(repr(arg) for arg in filtered_args)
-                    if kwargs:
-                        kwargs_str = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
-                        args_str = f"{args_str}, {kwargs_str}" if args_str else kwargs_str
-
-                # Truncate args_str if too long
-                MAX_ARGS_LENGTH = 500
-                if len(args_str) > MAX_ARGS_LENGTH:
-                    args_str = args_str[:MAX_ARGS_LENGTH] + f"... (truncated, total length: {len(args_str)} chars)"
+                    # remove first param self; rendering stops at the preview budget
+                    args_str = preview_tool_args(func.__name__, args[1:], kwargs)
 
                 toolkit_name = toolkit.toolkit_name()
                 method_name = func.__name__.replace("_", " ")
@@ -255,25 +236,13 @@ def listen_toolkit(
                 except Exception as e:
                     error = e
 
-                if return_msg and error is None:
-                    res_msg = return_msg(res)
-                elif isinstance(res, str):
-                    res_msg = res
+                if error is not None:
+                    res_fields = {"message": truncate_preview(str(error), RESULT_PREVIEW_BYTES)}
+                elif return_msg:
+                    res_fields = {"message": truncate_preview(return_msg(res), RESULT_PREVIEW_BYTES)}
                 else:
-                    if error is None:
-                        try:
-                            res_msg = json.dumps(res, ensure_ascii=False)
-                        except TypeError:
-                            # Handle cases where res contains non-serializable objects (like coroutines)
-                            res_str = str(res)
-                            # Truncate very long outputs to avoid flooding logs
-                            MAX_LENGTH = 500
-                            if len(res_str) > MAX_LENGTH:
-                                res_msg = res_str[:MAX_LENGTH] + f"... (truncated, total length: {len(res_str)} chars)"
-                            else:
-                                res_msg = res_str
-                    else:
-                        res_msg = str(error)
+                    # Bounded preview; the full result is kept out-of-band when cut
+                    res_fields = preview_tool_result(toolkit.api_task_id, func.__name__, res)
 
                 if not skip_workflow_display:
                     deactivate_data = ActionDeactivateToolkitData(
@@ -282,7 +251,7 @@ def listen_toolkit(
                             "process_task_id": process_task_id,
                             "toolkit_name": toolkit_name,
                             "method_name": method_name,
-                            "message": res_msg,
+                            **res_fields,
                         },
                     )
                     _safe_put_queue(task_lock, deactivate_data)
@@ -4,6 +4,7 @@ import asyncio
 import os
 import json
 from app.service.chat_service import Chat
+from app.model.chat import SseEvent
 from app.component.environment import env
 from app.service.task import get_task_lock_if_exists
 from utils import traceroot_wrapper as traceroot
@@ -20,22 +21,26 @@ def sync_step(func):
                 yield value
                 continue
 
-            if isinstance(value, str) and value.startswith("data: "):
-                value_json_str = value[len("data: ") :].strip()
+            if isinstance(value, SseEvent):
+                # Built by sse_json: step and data are known, no need to parse the frame
+                json_data = None
             else:
-                value_json_str = value
+                if isinstance(value, str) and value.startswith("data: "):
+                    value_json_str = value[len("data: ") :].strip()
+                else:
+                    value_json_str = value
 
-            try:
-                json_data = json.loads(value_json_str)
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON in sync_step: {e}. Value: {value_json_str}")
-                yield value
-                continue
+                try:
+                    json_data = json.loads(value_json_str)
+                except json.JSONDecodeError as e:
+                    logger.error(f"Failed to parse JSON in sync_step: {e}. Value: {value_json_str}")
+                    yield value
+                    continue
 
-            if "step" not in json_data or "data" not in json_data:
-                logger.error(f"Missing 'step' or 'data' key in sync_step JSON. Keys: {list(json_data.keys())}")
-                yield value
-                continue
+                if "step" not in json_data or "data" not in json_data:
+                    logger.error(f"Missing 'step' or 'data' key in sync_step JSON. Keys: {list(json_data.keys())}")
+                    yield value
+                    continue
 
             # Dynamic task_id extraction - prioritize runtime data over static args
             chat: Chat = args[0] if args and hasattr(args[0], 'task_id') else None
@@ -51,26 +56,29 @@ def sync_step(func):
                     task_id = chat.task_id
 
             if task_id:
-                asyncio.create_task(
-                    send_to_api(
-                        sync_url,
-                        {
-                            "task_id": task_id,
-                            "step": json_data["step"],
-                            "data": json_data["data"],
-                            "timestamp": time.time_ns() / 1_000_000_000,
-                        },
-                    )
-                )
+                timestamp = time.time_ns() / 1_000_000_000
+                if json_data is None:
+                    body = value.sync_body(task_id=task_id, timestamp=timestamp)
+                else:
+                    body = {
+                        "task_id": task_id,
+                        "step": json_data["step"],
+                        "data": json_data["data"],
+                        "timestamp": timestamp,
+                    }
+                asyncio.create_task(send_to_api(sync_url, body))
             yield value
 
     return wrapper
 
 
-async def send_to_api(url, data):
+async def send_to_api(url, data: dict | bytes):
     async with httpx.AsyncClient() as client:
         try:
-            res = await client.post(url, json=data)
+            if isinstance(data, bytes):
+                res = await client.post(url, content=data, headers={"Content-Type": "application/json"})
+            else:
+                res = await client.post(url, json=data)
             # logger.info(res)
         except Exception as e:
             logger.error(f"Failed to sync step to {url}: {type(e).__name__}: {e}")
@@ -1,12 +1,102 @@
-import asyncio
+import csv
 import os
-from typing import List
+import shutil
+import sys
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
 from camel.toolkits import FileToolkit as BaseFileToolkit
+from camel.toolkits import FunctionTool
 from app.component.environment import env
 from app.service.task import process_task
 from app.service.task import ActionWriteFileData, Agents, get_task_lock
 from app.utils.listen.toolkit_listen import auto_listen_toolkit, listen_toolkit, _safe_put_queue
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("file_write_toolkit")
+
+# Formats that are rendered from the whole document and cannot be appended to
+WHOLE_DOCUMENT_EXTENSIONS = {".pdf", ".doc", ".docx"}
+# linux/fs.h FICLONE: share the source extents with the destination (btrfs, xfs)
+_FICLONE = 0x40049409
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        shutil.copystat(src, dst)
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+def clone_file(src: Path, dst: Path, allow_link: bool = False) -> str:
+    """
+    Copy `src` to `dst` as cheaply as the filesystem allows.
+
+    A hard link is only safe when `src` will be replaced by a rename rather
+    than modified in place, so it must be asked for with `allow_link`.
+    Returns how the copy was made: "link", "reflink" or "copy".
+    """
+    dst.unlink(missing_ok=True)
+    if allow_link:
+        try:
+            os.link(src, dst)
+            return "link"
+        except OSError:
+            pass
+    if _reflink(src, dst):
+        return "reflink"
+    shutil.copy2(src, dst)
+    return "copy"
+
+
+class StagedParts:
+    """
+    Staging files of `append_to_file` that were not finalized yet, by task.
+
+    When a task ends (see `TaskLock.cleanup`) its unfinished parts are
+    deleted, so abandoned documents do not pile up as hidden `.part` files.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._parts: Dict[str, Set[Path]] = {}
+
+    def add(self, task_id: str, path: Path) -> None:
+        with self._lock:
+            self._parts.setdefault(task_id, set()).add(path)
+
+    def discard(self, task_id: str, path: Path) -> None:
+        with self._lock:
+            parts = self._parts.get(task_id)
+            if parts is not None:
+                parts.discard(path)
+
+    def drop_task(self, task_id: str) -> None:
+        with self._lock:
+            parts = self._parts.pop(task_id, set())
+        for path in parts:
+            try:
+                path.unlink(missing_ok=True)
+                logger.info(f"Removed unfinished staged file: {path}")
+            except OSError as e:
+                logger.warning(f"Failed to remove staged file {path}: {e}")
+
+    def __len__(self) -> int:
+        return sum(len(parts) for parts in self._parts.values())
+
+
+staged_parts = StagedParts()
 
 
 @auto_listen_toolkit(BaseFileToolkit)
@@ -26,6 +116,51 @@ class FileToolkit(BaseFileToolkit, AbstractToolkit):
         super().__init__(working_directory, timeout, default_encoding, backup_enabled)
         self.api_task_id = api_task_id
 
+    def _backup_path(self, file_path: Path) -> Path:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return file_path.parent / f"{file_path.name}.{timestamp}.bak"
+
+    def _create_backup(self, file_path: Path, for_replace: bool = False) -> Optional[Path]:
+        r"""Back up an existing file before it is changed.
+
+        Files about to be replaced by a rename are backed up with a hard
+        link, since the old inode is left untouched; files edited in place get
+        a reflink or a real copy.
+        """
+        if not self.backup_enabled or not file_path.exists():
+            return None
+        backup_path = self._backup_path(file_path)
+        try:
+            method = clone_file(file_path, backup_path, allow_link=for_replace)
+            logger.info(f"Created backup: {backup_path} ({method})")
+            return backup_path
+        except Exception as e:
+            logger.warning(f"Failed to create backup: {e}")
+            return None
+
+    def _replace(self, staging: Path, file_path: Path) -> None:
+        self._create_backup(file_path, for_replace=True)
+        os.replace(staging, file_path)
+
+    def _notify_written(self, file_path: Path) -> None:
+        # Capture ContextVar value before creating async task
+        current_process_task_id = process_task.get("")
+        # Use _safe_put_queue to handle both sync and async contexts
+        _safe_put_queue(
+            get_task_lock(self.api_task_id),
+            ActionWriteFileData(process_task_id=current_process_task_id, data=str(file_path)),
+        )
+
+    def _final_path(self, filename: str) -> Path:
+        file_path = self._resolve_filepath(filename)
+        # Markdown is the default, as in the base toolkit
+        if file_path.suffix == "":
+            file_path = file_path.with_suffix(".md")
+        return file_path
+
+    def _staging_path(self, file_path: Path) -> Path:
+        return file_path.with_name(f".{file_path.name}.part")
+
     @listen_toolkit(
         BaseFileToolkit.write_to_file,
         lambda _,
@@ -43,18 +178,107 @@ class FileToolkit(BaseFileToolkit, AbstractToolkit):
         encoding: str | None = None,
         use_latex: bool = False,
     ) -> str:
-        res = super().write_to_file(title, content, filename, encoding, use_latex)
-        if "Content successfully written to file: " in res:
-            task_lock = get_task_lock(self.api_task_id)
-            # Capture ContextVar value before creating async task
-            current_process_task_id = process_task.get("")
-
-            # Use _safe_put_queue to handle both sync and async contexts
-            _safe_put_queue(
-                task_lock,
-                ActionWriteFileData(
-                    process_task_id=current_process_task_id,
-                    data=res.replace("Content successfully written to file: ", ""),
-                )
-            )
-        return res
+        file_path = self._final_path(filename)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Render into a new file next to the target and rename it into place,
+        # so readers never see a partial file and the backup can be a link
+        staging = file_path.with_name(f".{file_path.stem}.{uuid.uuid4().hex[:8]}.tmp{file_path.suffix}")
+        res = super().write_to_file(title, content, str(staging), encoding, use_latex)
+        if "Content successfully written to file: " not in res:
+            staging.unlink(missing_ok=True)
+            return res.replace(str(staging), str(file_path))
+        try:
+            self._replace(staging, file_path)
+        except OSError as e:
+            staging.unlink(missing_ok=True)
+            return f"Error occurred while writing to file {file_path}: {e}"
+        self._notify_written(file_path)
+        return f"Content successfully written to file: {file_path}"
+
+    @listen_toolkit(
+        inputs=lambda _, filename, content, encoding=None: f"append content to file: {filename}",
+    )
+    def append_to_file(
+        self,
+        filename: str,
+        content: str | List[List[str]],
+        encoding: str | None = None,
+    ) -> str:
+        r"""Append a chunk of content to a file that is being written in parts.
+
+        Use this instead of `write_to_file` for long documents and large
+        tables: send the content in several calls, then call
+        `finalize_file` once to publish the file. Chunks are written to a
+        hidden staging file, so the target only appears, complete, on
+        finalization. Supports text formats (Markdown, plaintext, HTML,
+        YAML, JSON) and CSV; PDF and Word documents must be written with
+        `write_to_file`.
+
+        Args:
+            filename (str): The name or path of the file. If a relative path
+                is supplied, it is resolved to self.working_directory.
+            content (Union[str, List[List[str]]]): The chunk to append. For
+                CSV this may be a list of rows.
+            encoding (Optional[str]): The character encoding to use.
+                (default: :obj: `None`)
+
+        Returns:
+            str: A message with the size of the staged content so far.
+        """
+        file_path = self._final_path(filename)
+        if file_path.suffix.lower() in WHOLE_DOCUMENT_EXTENSIONS:
+            return f"Error: {file_path.suffix} files cannot be written in parts, use write_to_file instead."
+        staging = self._staging_path(file_path)
+        staging.parent.mkdir(parents=True, exist_ok=True)
+        file_encoding = encoding or self.default_encoding
+        try:
+            if file_path.suffix.lower() == ".csv":
+                with staging.open("a", encoding=file_encoding, newline="") as f:
+                    if isinstance(content, str):
+                        f.write(content)
+                    else:
+                        csv.writer(f).writerows(content)
+            else:
+                with staging.open("a", encoding=file_encoding) as f:
+                    f.write(str(content))
+        except Exception as e:
+            return f"Error occurred while appending to file {file_path}: {e}"
+        staged_parts.add(self.api_task_id, staging)
+        return (
+            f"Appended to {file_path} ({staging.stat().st_size} bytes staged). "
+            f"Call finalize_file when the content is complete."
+        )
+
+    @listen_toolkit(
+        inputs=lambda _, filename: f"finalize file: {filename}",
+    )
+    def finalize_file(self, filename: str) -> str:
+        r"""Publish a file written with `append_to_file`.
+
+        The staged content atomically replaces the target file; an existing
+        file is backed up first if backups are enabled.
+
+        Args:
+            filename (str): The same file name passed to `append_to_file`.
+
+        Returns:
+            str: A message indicating success or error details.
+        """
+        file_path = self._final_path(filename)
+        staging = self._staging_path(file_path)
+        if not staging.exists():
+            return f"Error: nothing was appended to {file_path}, use append_to_file first."
+        try:
+            self._replace(staging, file_path)
+        except OSError as e:
+            return f"Error occurred while finalizing file {file_path}: {e}"
+        staged_parts.discard(self.api_task_id, staging)
+        self._notify_written(file_path)
+        return f"Content successfully written to file: {file_path}"
+
+    def get_tools(self) -> List[FunctionTool]:
+        return [
+            *super().get_tools(),
+            FunctionTool(self.append_to_file),
+            FunctionTool(self.finalize_file),
+        ]
@@ -2,12 +2,14 @@ import asyncio
 import datetime
 import json
 import os
+import signal
 from typing import Any, Dict, List
 import uuid
 from camel.models import BaseModelBackend
 from camel.toolkits.hybrid_browser_toolkit_py import HybridBrowserToolkit as BaseHybridBrowserToolkit
 from camel.toolkits.hybrid_browser_toolkit_py.config_loader import ConfigLoader
 from camel.toolkits.hybrid_browser_toolkit_py.browser_session import HybridBrowserSession as BaseHybridBrowserSession
+from camel.toolkits.hybrid_browser_toolkit_py.browser_session import TabIdGenerator
 from camel.toolkits.hybrid_browser_toolkit_py.actions import ActionExecutor
 from camel.toolkits.hybrid_browser_toolkit_py.snapshot import PageSnapshot
 from camel.toolkits.hybrid_browser_toolkit_py.agent import PlaywrightLLMAgent
@@ -22,80 +24,209 @@ from utils import traceroot_wrapper as traceroot
 logger = traceroot.get_logger("hybrid_browser_python_toolkit")
 
 
-class BrowserSession(BaseHybridBrowserSession):
-    async def _ensure_browser_inner(self) -> None:
+class BrowserTabPool:
+    """
+    Shares one Playwright driver and CDP connection per process between all
+    browser sessions, and leases the app's pre-opened tabs to them.
+
+    The desktop app pre-opens tabs whose URL is an `about:blank` variant
+    (e.g. `about:blank#tab-1`) to mark them as free. Leasing a tab navigates
+    it to plain `about:blank`, which resets it and marks it as taken;
+    releasing navigates it back to its marker URL. Parallel worker clones
+    therefore only claim a tab instead of starting a driver and connecting
+    over CDP each time.
+
+    With `spare_tabs` set, the pool also keeps that many free tabs of its own
+    ready (at most `max_tabs` in total), opening them in the background after
+    each lease, so a clone rarely waits for a tab.
+    """
+
+    def __init__(self, lease_retry_delay: float = 3.0, spare_tabs: int = 0, max_tabs: int = 8) -> None:
+        self.lease_retry_delay = lease_retry_delay
+        self.spare_tabs = spare_tabs
+        self.max_tabs = max_tabs
+        self.driver_starts = 0
+        self._playwright = None
+        self._browser = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock: asyncio.Lock | None = None
+        self._tabs_lock: asyncio.Lock | None = None
+        self._warm_task: asyncio.Task | None = None
+        # Tabs the pool opened itself as spares
+        self._opened: set = set()
+        # page -> marker URL it had before it was leased
+        self._leased: Dict[Any, str] = {}
+        # page -> init scripts already added, so recycled tabs don't stack them
+        self._init_scripts: Dict[Any, set] = {}
+
+    async def _start_driver(self):
         from playwright.async_api import async_playwright
 
-        if self._page is not None:
+        return await async_playwright().start()
+
+    async def browser(self):
+        """Return the shared `(playwright, browser)`, starting or reconnecting them if needed."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Playwright objects are bound to the loop that started them
+            self._stop_stale_driver()
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._tabs_lock = asyncio.Lock()
+            self._warm_task = None
+            self._playwright = None
+            self._browser = None
+            self._leased.clear()
+            self._init_scripts.clear()
+            self._opened.clear()
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._playwright, self._browser
+            if self._playwright is None:
+                self._playwright = await self._start_driver()
+                self.driver_starts += 1
+            port = env("browser_port", 9222)
+            self._browser = await self._playwright.chromium.connect_over_cdp(f"http://localhost:{port}")
+            self._leased.clear()
+            self._init_scripts.clear()
+            self._opened.clear()
+            logger.info(f"Connected shared Playwright driver to browser on port {port}")
+            return self._playwright, self._browser
+
+    def _stop_stale_driver(self) -> None:
+        """Stop the driver started on a previous loop, which this loop cannot use."""
+        playwright, loop = self._playwright, self._loop
+        if playwright is None:
+            return
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(playwright.stop(), loop)
+            return
+        # Its loop is gone, so the driver can no longer be stopped politely
+        connection = getattr(getattr(playwright, "_impl_obj", None), "_connection", None)
+        process = getattr(getattr(connection, "_transport", None), "_proc", None)
+        pid = getattr(process, "pid", None)
+        if pid is None:
+            logger.warning("Could not stop Playwright driver from a previous event loop")
             return
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError as e:
+            logger.debug(f"Playwright driver {pid} already exited: {e}")
+
+    def warm_soon(self) -> None:
+        """Start the shared driver and open spare tabs in the background when called on a running loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if self._warm_task is None or self._warm_task.done():
+            self._warm_task = loop.create_task(self._warm())
+
+    async def _warm(self) -> None:
+        try:
+            _, browser = await self.browser()
+            await self._top_up(browser.contexts[0])
+        except Exception as e:
+            logger.debug(f"Could not pre-warm shared browser driver: {e}")
 
-        self._playwright = await async_playwright().start()
+    async def _top_up(self, context) -> None:
+        """Open marker tabs until `spare_tabs` are free or the pool has opened `max_tabs`."""
+        if not self.spare_tabs:
+            return
+        async with self._tabs_lock:
+            self._opened = {page for page in self._opened if not page.is_closed()}
+            free = sum(1 for page in context.pages if self._is_free(page))
+            while free < self.spare_tabs and len(self._opened) < self.max_tabs:
+                page = await context.new_page()
+                self._opened.add(page)
+                await page.goto(f"about:blank#pool-{uuid.uuid4().hex[:8]}")
+                free += 1
+
+    def _is_free(self, page) -> bool:
+        return (
+            page.url.startswith("about:blank")
+            and page.url != "about:blank"
+            and page not in self._leased
+            and not page.is_closed()
+        )
 
-        # Prepare stealth options
-        launch_options: Dict[str, Any] = {"headless": self._headless}
-        context_options: Dict[str, Any] = {}
-        if self._stealth and self._stealth_config:
-            # Use preloaded stealth configuration
-            launch_options["args"] = self._stealth_config["launch_args"]
-            context_options.update(self._stealth_config["context_options"])
+    async def lease(self, init_script: str | None = None):
+        """Claim a free tab, reset to `about:blank`, with `init_script` applied once per tab."""
+        _, browser = await self.browser()
+        context = browser.contexts[0]
+        for attempt in range(2):
+            for page in context.pages:
+                if self._is_free(page):
+                    # Claim before awaiting so concurrent leases never share a tab
+                    self._leased[page] = page.url
+                    await page.goto("about:blank")
+                    if init_script:
+                        await self._add_init_script(page, init_script)
+                    if self.spare_tabs:
+                        self.warm_soon()
+                    return page
+            if attempt == 0:
+                logger.debug(json.dumps([item.url for item in context.pages]))
+                if self.spare_tabs:
+                    await self._top_up(context)
+                else:
+                    await asyncio.sleep(self.lease_retry_delay)  # wait, retry get new page
+        raise ProgramException("Maximum Window Limit Reached.")
+
+    async def _add_init_script(self, page, script: str) -> None:
+        applied = self._init_scripts.setdefault(page, set())
+        if script in applied:
+            return
+        try:
+            await page.add_init_script(script)
+            applied.add(script)
+        except Exception as e:
+            logger.warning(f"Failed to apply init script to tab: {e}")
+
+    async def release(self, page) -> None:
+        """Reset a leased tab and make it available to other sessions again."""
+        marker = self._leased.pop(page, None)
+        if marker is None:
+            return
+        if page.is_closed():
+            self._init_scripts.pop(page, None)
+            return
+        try:
+            await page.goto(marker)
+        except Exception as e:
+            logger.warning(f"Failed to reset browser tab to {marker}: {e}")
+
+    def owns(self, page) -> bool:
+        return page in self._leased
+
+    @property
+    def leased_count(self) -> int:
+        return len(self._leased)
+
+
+browser_tab_pool = BrowserTabPool(
+    spare_tabs=int(env("browser_spare_tabs", "1")),
+    max_tabs=int(env("browser_max_tabs", "8")),
+)
+
+
+class BrowserSession(BaseHybridBrowserSession):
+    async def _ensure_browser_inner(self) -> None:
+        if self._page is not None:
+            return
 
         if self._user_data_dir:
             raise ProgramException("connect over cdp does not support set user_data_dir")
-            # Path(self._user_data_dir).mkdir(parents=True, exist_ok=True)
-            # pl = self._playwright
-            # assert pl is not None
-            # self._context = await pl.chromium.launch_persistent_context(
-            #     user_data_dir=self._user_data_dir,
-            #     headless=self._headless,
-            # )
-            # self._browser = self._context.browser
-        else:
-            pl = self._playwright
-            assert pl is not None
-            # self._browser = await pl.chromium.launch(headless=self._headless)
-            port = env("browser_port", 9222)
-            self._browser = await pl.chromium.connect_over_cdp(f"http://localhost:{port}")
-            self._context = self._browser.contexts[0]
-
-        # Reuse an already open page (persistent context may restore last
-        # session)
-        # if self._context.pages:
-        #     self._page = self._context.pages[0]
-        # else:
-        #     self._page = await self._context.new_page()
 
-        # Debug information to help trace concurrency issues
+        # The driver and CDP connection are shared; only the tabs belong to this session
+        self._playwright, self._browser = await browser_tab_pool.browser()
+        self._context = self._browser.contexts[0]
 
         # Initialize _pages as empty list
         self._pages = {}
+        await self.get_new_tab()
 
-        for index, item in enumerate(self._context.pages):
-            if item.url.startswith("about:blank") and item.url != "about:blank":
-                tab_id = "tab-" + str(index)
-                self._page = item
-                self._pages[tab_id] = self._page
-                self._current_tab_id = tab_id
-                await item.goto("about:blank")
-                break
-
-        # If no suitable page found, create a new one
-        if not self._page:
-            logger.debug(json.dumps([item.url for item in self._context.pages]))
-            await asyncio.sleep(3)  # wait 3 sec, retry get new page
-            await self.get_new_tab()
-            logger.debug(json.dumps([item.url for item in self._context.pages]))
-            if not self._page:
-                raise ProgramException("Maximum Window Limit Reached.")
-
-        # Apply stealth modifications if enabled
-        if self._stealth and self._stealth_script:
-            try:
-                await self._page.add_init_script(self._stealth_script)
-                logger.debug("Applied stealth script to main page")
-            except Exception as e:
-                logger.warning(f"Failed to apply stealth script: {e}")
-
-                # Set up timeout for navigation
+        # Set up timeout for navigation
         self._page.set_default_navigation_timeout(self._navigation_timeout)
         self._page.set_default_timeout(self._navigation_timeout)
 
@@ -110,20 +241,49 @@ class BrowserSession(BaseHybridBrowserSession):
         logger.info("Browser session initialized successfully")
 
     async def get_new_tab(self):
-        assert self._context is not None
-
         # Initialize _pages if not already done
         if not hasattr(self, "_pages") or self._pages is None:
             self._pages = {}
 
-        for index, item in enumerate(self._context.pages):
-            if item.url.startswith("about:blank") and item.url != "about:blank":
-                tab_id = "tab-" + str(index)
-                self._pages[tab_id] = item
-                await item.goto("about:blank")
-                self._page = item
-                self._current_tab_id = tab_id
-                break
+        page = await browser_tab_pool.lease(self._stealth_script if self._stealth else None)
+        tab_id = await TabIdGenerator.generate_tab_id()
+        self._pages[tab_id] = page
+        self._page = page
+        self._current_tab_id = tab_id
+
+    async def _close_session(self) -> None:
+        """Return leased tabs to the pool and close the tabs and popups this
+        session opened; the shared driver and browser stay up."""
+        try:
+            pages = list(self._pages.values())
+            if self._context is not None:
+                # Popups are not registered as tabs; find them by their opener
+                for page in list(self._context.pages):
+                    if page not in pages and not browser_tab_pool.owns(page) and await self._opener(page) in pages:
+                        pages.append(page)
+            for page in pages:
+                if browser_tab_pool.owns(page):
+                    await browser_tab_pool.release(page)
+                elif not page.is_closed():
+                    try:
+                        await page.close()
+                    except Exception as e:
+                        logger.warning(f"Error closing browser tab: {e}")
+        finally:
+            self._page = None
+            self._pages = {}
+            self._current_tab_id = None
+            self._context = None
+            self._browser = None
+            self._playwright = None
+
+
+    @staticmethod
+    async def _opener(page):
+        try:
+            return await page.opener()
+        except Exception:
+            return None
 
 
 @auto_listen_toolkit(BaseHybridBrowserToolkit)
@@ -222,6 +382,7 @@ class HybridBrowserPythonToolkit(BaseHybridBrowserToolkit, AbstractToolkit):
         # Use the session directly - singleton logic is handled in
         # ensure_browser
         self._session = temp_session
+        browser_tab_pool.warm_soon()
         self._agent: PlaywrightLLMAgent | None = None
         self._unified_script = self._load_unified_analyzer()
 
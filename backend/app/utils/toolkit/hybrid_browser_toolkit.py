@@ -1,7 +1,11 @@
 import os
 import asyncio
 import json
-from typing import Any, Dict, List, Optional
+import time
+import uuid
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Literal, Optional
 import websockets
 import websockets.exceptions
 
@@ -9,20 +13,40 @@ from camel.toolkits.hybrid_browser_toolkit.hybrid_browser_toolkit_ts import (
     HybridBrowserToolkit as BaseHybridBrowserToolkit,
 )
 from camel.toolkits.hybrid_browser_toolkit.ws_wrapper import WebSocketBrowserWrapper as BaseWebSocketBrowserWrapper
+from pydantic import BaseModel
 from app.component.command import bun, uv
 from app.component.environment import env
 from app.service.task import Agents
+from app.utils.listen.preview import Preview, register_preview_renderer, render_preview
 from app.utils.listen.toolkit_listen import auto_listen_toolkit
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
+from app.utils.toolkit.snapshot_diff import SnapshotDiffer
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("hybrid_browser_toolkit")
 
+# Commands after which the agent always gets the full page snapshot
+FULL_SNAPSHOT_COMMANDS = {
+    "open_browser",
+    "visit_page",
+    "back",
+    "forward",
+    "switch_tab",
+    "close_tab",
+    "get_page_snapshot",
+    "get_snapshot_for_ai",
+}
+
 
 class WebSocketBrowserWrapper(BaseWebSocketBrowserWrapper):
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         """Initialize wrapper."""
         super().__init__(config)
+        # Monotonic time of the last command, used by the pool's idle reaper
+        self.last_used = time.monotonic()
+        # Set by toolkits in "diff" snapshot mode
+        self.snapshot_differ: SnapshotDiffer | None = None
+        self._snapshot_tab = "current"
         logger.info(f"WebSocketBrowserWrapper using ts_dir: {self.ts_dir}")
 
     async def _receive_loop(self):
@@ -101,11 +125,14 @@ class WebSocketBrowserWrapper(BaseWebSocketBrowserWrapper):
                     raise RuntimeError(f"WebSocket is in {self.websocket.state} state, not OPEN")
 
             logger.debug(f"Sending command '{command}' with params: {params}")
+            self.last_used = time.monotonic()
 
             # Call parent's _send_command
             result = await super()._send_command(command, params)
 
             logger.debug(f"Command '{command}' completed successfully")
+            if self.snapshot_differ is not None:
+                self._apply_snapshot_mode(command, params, result)
             return result
 
         except RuntimeError as e:
@@ -120,98 +147,376 @@ class WebSocketBrowserWrapper(BaseWebSocketBrowserWrapper):
             raise
 
 
+    def _apply_snapshot_mode(self, command: str, params: Dict[str, Any], result: Any):
+        """Replace action snapshots with diffs against the previous snapshot of the same tab."""
+        if command == "get_tab_info":
+            tabs = result if isinstance(result, list) else result.get("tabs", [])
+            current = next((tab.get("tab_id") for tab in tabs if tab.get("is_current")), None)
+            if current:
+                self._snapshot_tab = current
+            return
+        if command == "switch_tab" and params.get("tabId"):
+            self._snapshot_tab = params["tabId"]
+        full = command in FULL_SNAPSHOT_COMMANDS
+        if isinstance(result, dict) and result.get("newTabId"):
+            self._snapshot_tab = result["newTabId"]
+            full = True
+        if isinstance(result, str):
+            # get_page_snapshot returns the snapshot itself; it becomes the new baseline
+            if command == "get_page_snapshot":
+                self.snapshot_differ.render(self._snapshot_tab, result, full=True)
+        elif isinstance(result, dict) and result.get("snapshot"):
+            result["snapshot"] = self.snapshot_differ.render(self._snapshot_tab, result["snapshot"], full=full)
+
+
+class ConnectionPoolStats(BaseModel):
+    connections: int
+    starting: int
+    waiting: int
+    max_connections: int
+    created_total: int
+    reused_total: int
+    reaped_total: int
+    start_failures: int
+    avg_start_seconds: float
+    spares: int
+    warm_hits: int
+
+
+class _SessionEntry:
+    """Per-session lock plus the number of callers holding or waiting on it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
 # WebSocket connection pool
 class WebSocketConnectionPool:
-    """Manage WebSocket browser connections with session-based pooling."""
+    """
+    Manage WebSocket browser connections with session-based pooling.
+
+    Each session has its own lock, so starting a browser server for one
+    session never blocks lookups or starts for other sessions. At most
+    `max_connections` connections are open or starting at once; further
+    sessions queue for a slot in FIFO order, for at most `slot_timeout`
+    seconds, after which `get_connection` raises and the browser tool call
+    returns an error. Connections without traffic for `idle_timeout` seconds
+    are closed by a background reaper.
+
+    Starting a browser server takes seconds, so after each start the pool
+    pre-warms up to `warm_spares` connections with the same config in the
+    background. A new session (e.g. a worker clone) adopts a spare instead
+    of starting its own. Spares only take free slots and are the first to go
+    when a session needs one.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        max_connections: int = 16,
+        idle_timeout: float = 1800.0,
+        reap_interval: float = 60.0,
+        slot_timeout: float = 120.0,
+        warm_spares: int = 0,
+    ):
+        self.max_connections = max_connections
+        self.warm_spares = warm_spares
+        self.slot_timeout = slot_timeout
+        self.idle_timeout = idle_timeout
+        self.reap_interval = reap_interval
         self._connections: Dict[str, WebSocketBrowserWrapper] = {}
-        self._lock = asyncio.Lock()
+        self._sessions: Dict[str, _SessionEntry] = {}
+        self._slots_used = 0
+        self._slot_waiters: deque[asyncio.Future] = deque()
+        self._reaper: asyncio.Task | None = None
+        # Pre-started connections by config key, and the warm-ups in flight
+        self._spares: Dict[str, deque[WebSocketBrowserWrapper]] = {}
+        self._warming: Dict[str, set[asyncio.Task]] = {}
+        self.warm_hits = 0
+        self._starting = 0
+        self.created_total = 0
+        self.reused_total = 0
+        self.reaped_total = 0
+        self.start_failures = 0
+        self._start_seconds_total = 0.0
+
+    @asynccontextmanager
+    async def _session(self, session_id: str):
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            entry = self._sessions[session_id] = _SessionEntry()
+        entry.users += 1
+        try:
+            async with entry.lock:
+                yield
+        finally:
+            entry.users -= 1
+            if entry.users == 0:
+                del self._sessions[session_id]
+
+    @staticmethod
+    def _config_key(config: Dict[str, Any]) -> str:
+        return json.dumps({k: v for k, v in config.items() if k != "session_id"}, sort_keys=True, default=str)
+
+    def _spare_count(self) -> int:
+        return sum(len(spares) for spares in self._spares.values())
+
+    async def _drop_spare(self) -> bool:
+        """Stop one spare connection to free its slot."""
+        for key, spares in self._spares.items():
+            if spares:
+                wrapper = spares.popleft()
+                await self._stop_spare(wrapper)
+                return True
+        return False
+
+    async def _stop_spare(self, wrapper: WebSocketBrowserWrapper):
+        try:
+            await wrapper.stop()
+        except Exception as e:
+            logger.error(f"Error closing spare WebSocket connection: {e}")
+        finally:
+            self._release_slot()
+
+    def _warm_soon(self, config: Dict[str, Any]):
+        """Start spare connections for `config` in the background, using free slots only."""
+        key = self._config_key(config)
+        warming = self._warming.setdefault(key, set())
+        missing = self.warm_spares - len(self._spares.get(key, ())) - sum(1 for task in warming if not task.done())
+        loop = asyncio.get_running_loop()
+        while missing > 0 and self._slots_used < self.max_connections and not self._slot_waiters:
+            self._slots_used += 1
+            task = loop.create_task(self._warm(key, {**config, "session_id": f"spare-{uuid.uuid4().hex[:8]}"}))
+            warming.add(task)
+            task.add_done_callback(warming.discard)
+            missing -= 1
+
+    async def _warm(self, key: str, config: Dict[str, Any]):
+        wrapper = WebSocketBrowserWrapper(config)
+        try:
+            await wrapper.start()
+        except asyncio.CancelledError:
+            self._release_slot()
+            raise
+        except Exception as e:
+            logger.debug(f"Could not pre-warm browser connection: {e}")
+            self._release_slot()
+            return
+        self._spares.setdefault(key, deque()).append(wrapper)
+        self._ensure_reaper()
+
+    async def _take_spare(self, config: Dict[str, Any]) -> WebSocketBrowserWrapper | None:
+        """Adopt a healthy spare for `config`; its slot moves to the new session."""
+        spares = self._spares.get(self._config_key(config))
+        while spares:
+            wrapper = spares.popleft()
+            if await self._is_healthy("spare", wrapper):
+                return wrapper
+            await self._stop_spare(wrapper)
+        return None
+
+    async def _acquire_slot(self):
+        if self._slots_used >= self.max_connections:
+            await self.reap_idle()
+        if self._slots_used >= self.max_connections:
+            await self._drop_spare()
+        if self._slots_used < self.max_connections and not self._slot_waiters:
+            self._slots_used += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._slot_waiters.append(waiter)
+        logger.info(f"WebSocket pool full ({self.max_connections}), waiting for a slot; {len(self._slot_waiters)} queued")
+        try:
+            # The releasing caller hands its slot over, so _slots_used is unchanged
+            await asyncio.wait_for(waiter, self.slot_timeout)
+        except asyncio.TimeoutError:
+            if waiter in self._slot_waiters:
+                self._slot_waiters.remove(waiter)
+            raise RuntimeError(
+                f"No browser session available: all {self.max_connections} are in use, "
+                f"waited {self.slot_timeout:.0f}s"
+            ) from None
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            elif waiter in self._slot_waiters:
+                self._slot_waiters.remove(waiter)
+            raise
+
+    def _release_slot(self):
+        while self._slot_waiters:
+            waiter = self._slot_waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._slots_used -= 1
+
+    async def _is_healthy(self, session_id: str, wrapper: WebSocketBrowserWrapper) -> bool:
+        if not wrapper.websocket:
+            return False
+        try:
+            # Check WebSocket state based on available attributes
+            if hasattr(wrapper.websocket, "state"):
+                import websockets.protocol
+
+                if wrapper.websocket.state != websockets.protocol.State.OPEN:
+                    logger.debug(f"Session {session_id} WebSocket state: {wrapper.websocket.state}")
+                    return False
+                return True
+            if hasattr(wrapper.websocket, "open"):
+                return wrapper.websocket.open
+            # Try ping as last resort
+            await asyncio.wait_for(wrapper.websocket.ping(), timeout=1.0)
+            return True
+        except Exception as e:
+            logger.debug(f"Health check failed for session {session_id}: {e}")
+            return False
+
+    async def _remove_unlocked(self, session_id: str, wrapper: WebSocketBrowserWrapper):
+        """Stop a connection and free its slot; the caller holds the session lock."""
+        del self._connections[session_id]
+        try:
+            await wrapper.stop()
+        except Exception as e:
+            logger.error(f"Error closing WebSocket connection for session {session_id}: {e}")
+        finally:
+            self._release_slot()
 
     async def get_connection(self, session_id: str, config: Dict[str, Any]) -> WebSocketBrowserWrapper:
         """Get or create a connection for the given session ID."""
-        async with self._lock:
-            # Check if we have an existing connection for this session
-            if session_id in self._connections:
-                wrapper = self._connections[session_id]
-
-                # Comprehensive connection health check
-                is_healthy = False
-                if wrapper.websocket:
-                    try:
-                        # Check WebSocket state based on available attributes
-                        if hasattr(wrapper.websocket, "state"):
-                            import websockets.protocol
-
-                            is_healthy = wrapper.websocket.state == websockets.protocol.State.OPEN
-                            if not is_healthy:
-                                logger.debug(f"Session {session_id} WebSocket state: {wrapper.websocket.state}")
-                        elif hasattr(wrapper.websocket, "open"):
-                            is_healthy = wrapper.websocket.open
-                        else:
-                            # Try ping as last resort
-                            try:
-                                await asyncio.wait_for(wrapper.websocket.ping(), timeout=1.0)
-                                is_healthy = True
-                            except:
-                                is_healthy = False
-                    except Exception as e:
-                        logger.debug(f"Health check failed for session {session_id}: {e}")
-                        is_healthy = False
-
-                if is_healthy:
+        async with self._session(session_id):
+            wrapper = self._connections.get(session_id)
+            if wrapper is not None:
+                if await self._is_healthy(session_id, wrapper):
                     logger.debug(f"Reusing healthy WebSocket connection for session {session_id}")
+                    wrapper.last_used = time.monotonic()
+                    self.reused_total += 1
                     return wrapper
-                else:
-                    # Connection is unhealthy, clean it up
-                    logger.info(f"Removing unhealthy WebSocket connection for session {session_id}")
-                    try:
-                        await wrapper.stop()
-                    except Exception as e:
-                        logger.debug(f"Error stopping unhealthy wrapper: {e}")
-                    del self._connections[session_id]
-
-            # Create a new connection
+                # Connection is unhealthy, clean it up
+                logger.info(f"Removing unhealthy WebSocket connection for session {session_id}")
+                await self._remove_unlocked(session_id, wrapper)
+
+            wrapper = await self._take_spare(config)
+            if wrapper is not None:
+                wrapper.last_used = time.monotonic()
+                self.warm_hits += 1
+                self._connections[session_id] = wrapper
+                if self.warm_spares:
+                    self._warm_soon(config)
+                logger.info(f"Adopted pre-warmed WebSocket connection for session {session_id}")
+                return wrapper
+
+            await self._acquire_slot()
             logger.info(f"Creating new WebSocket connection for session {session_id}")
-            wrapper = WebSocketBrowserWrapper(config)
-            await wrapper.start()
+            self._starting += 1
+            started_at = time.monotonic()
+            try:
+                wrapper = WebSocketBrowserWrapper(config)
+                await wrapper.start()
+            except asyncio.CancelledError:
+                self._release_slot()
+                raise
+            except Exception:
+                self.start_failures += 1
+                self._release_slot()
+                raise
+            finally:
+                self._starting -= 1
+            elapsed = time.monotonic() - started_at
+            self._start_seconds_total += elapsed
+            self.created_total += 1
             self._connections[session_id] = wrapper
-            logger.info(f"Successfully created WebSocket connection for session {session_id}")
+            self._ensure_reaper()
+            if self.warm_spares:
+                self._warm_soon(config)
+            logger.info(f"Successfully created WebSocket connection for session {session_id} in {elapsed:.2f}s")
             return wrapper
 
     async def close_connection(self, session_id: str):
         """Close and remove a connection for the given session ID."""
-        async with self._lock:
-            if session_id in self._connections:
-                wrapper = self._connections[session_id]
-                try:
-                    await wrapper.stop()
-                except Exception as e:
-                    logger.error(f"Error closing WebSocket connection for session {session_id}: {e}")
-                del self._connections[session_id]
+        async with self._session(session_id):
+            wrapper = self._connections.get(session_id)
+            if wrapper is not None:
+                await self._remove_unlocked(session_id, wrapper)
                 logger.info(f"Closed WebSocket connection for session {session_id}")
 
-    async def _close_connection_unlocked(self, session_id: str):
-        """Close connection without acquiring lock (for internal use)."""
-        if session_id in self._connections:
-            wrapper = self._connections[session_id]
+    async def reap_idle(self) -> int:
+        """Close connections idle for longer than `idle_timeout` that nobody is using."""
+        now = time.monotonic()
+        reaped = 0
+        for session_id, wrapper in list(self._connections.items()):
+            if now - wrapper.last_used < self.idle_timeout or wrapper._pending_responses:
+                continue
+            if session_id in self._sessions:
+                # A caller is looking up or starting this session right now
+                continue
+            async with self._session(session_id):
+                if self._connections.get(session_id) is wrapper:
+                    await self._remove_unlocked(session_id, wrapper)
+                    reaped += 1
+        for spares in self._spares.values():
+            for wrapper in [w for w in spares if now - w.last_used >= self.idle_timeout]:
+                spares.remove(wrapper)
+                await self._stop_spare(wrapper)
+                reaped += 1
+        if reaped:
+            self.reaped_total += reaped
+            logger.info(f"Reaped {reaped} idle WebSocket connections", extra=self.stats().model_dump())
+        return reaped
+
+    def _ensure_reaper(self):
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_loop())
+
+    async def _reap_loop(self):
+        while self._connections or self._spare_count():
             try:
-                await wrapper.stop()
+                await asyncio.sleep(self.reap_interval)
+                await self.reap_idle()
+            except asyncio.CancelledError:
+                break
             except Exception as e:
-                logger.error(f"Error closing WebSocket connection for session {session_id}: {e}")
-            del self._connections[session_id]
-            logger.info(f"Closed WebSocket connection for session {session_id}")
+                logger.error(f"Error reaping idle WebSocket connections: {e}", exc_info=True)
+
+    def stats(self) -> ConnectionPoolStats:
+        return ConnectionPoolStats(
+            connections=len(self._connections),
+            starting=self._starting,
+            waiting=sum(1 for waiter in self._slot_waiters if not waiter.done()),
+            max_connections=self.max_connections,
+            created_total=self.created_total,
+            reused_total=self.reused_total,
+            reaped_total=self.reaped_total,
+            start_failures=self.start_failures,
+            avg_start_seconds=self._start_seconds_total / self.created_total if self.created_total else 0.0,
+            spares=self._spare_count(),
+            warm_hits=self.warm_hits,
+        )
 
     async def close_all(self):
         """Close all connections in the pool."""
-        async with self._lock:
-            for session_id in list(self._connections.keys()):
-                await self._close_connection_unlocked(session_id)
-            logger.info("Closed all WebSocket connections")
+        if self._reaper is not None and not self._reaper.done():
+            self._reaper.cancel()
+        for tasks in self._warming.values():
+            for task in list(tasks):
+                task.cancel()
+        await asyncio.gather(*(task for tasks in self._warming.values() for task in list(tasks)), return_exceptions=True)
+        while await self._drop_spare():
+            pass
+        for session_id in list(self._connections.keys()):
+            await self.close_connection(session_id)
+        logger.info("Closed all WebSocket connections")
 
 
 # Global connection pool instance
-websocket_connection_pool = WebSocketConnectionPool()
+websocket_connection_pool = WebSocketConnectionPool(
+    max_connections=int(env("browser_max_connections", "16")),
+    idle_timeout=float(env("browser_idle_timeout", "1800")),
+    slot_timeout=float(env("browser_slot_timeout", "120")),
+    warm_spares=int(env("browser_warm_spares", "1")),
+)
 
 @auto_listen_toolkit(BaseHybridBrowserToolkit)
 class HybridBrowserToolkit(BaseHybridBrowserToolkit, AbstractToolkit):
@@ -242,9 +547,12 @@ class HybridBrowserToolkit(BaseHybridBrowserToolkit, AbstractToolkit):
         cdp_url: str | None = "http://localhost:9222",
         cdp_keep_current_page: bool = False,
         full_visual_mode: bool = False,
+        snapshot_mode: Literal["full", "diff"] = "full",
     ) -> None:
         logger.info(f"[HybridBrowserToolkit] Initializing with api_task_id: {api_task_id}")
         self.api_task_id = api_task_id
+        # "diff": action results carry a diff against the tab's previous snapshot
+        self._snapshot_mode = snapshot_mode
         logger.debug(f"[HybridBrowserToolkit] api_task_id set to: {self.api_task_id}")
         
         # Set default user_data_dir if not provided
@@ -306,6 +614,9 @@ class HybridBrowserToolkit(BaseHybridBrowserToolkit, AbstractToolkit):
             await websocket_connection_pool.close_connection(session_id)
             self._ws_wrapper = await websocket_connection_pool.get_connection(session_id, self._ws_config)
 
+        if self._snapshot_mode == "diff" and self._ws_wrapper.snapshot_differ is None:
+            self._ws_wrapper.snapshot_differ = SnapshotDiffer()
+
     def clone_for_new_session(self, new_session_id: str | None = None) -> "HybridBrowserToolkit":
         import uuid
 
@@ -341,6 +652,7 @@ class HybridBrowserToolkit(BaseHybridBrowserToolkit, AbstractToolkit):
             cdp_url=f"http://localhost:{env('browser_port', '9222')}",
             cdp_keep_current_page=self.config_loader.get_browser_config().cdp_keep_current_page,
             full_visual_mode=self._full_visual_mode,
+            snapshot_mode=self._snapshot_mode,
         )
 
     @classmethod
@@ -366,3 +678,20 @@ class HybridBrowserToolkit(BaseHybridBrowserToolkit, AbstractToolkit):
         if hasattr(self, "_ws_wrapper") and self._ws_wrapper:
             session_id = self._ws_config.get("session_id", "default")
             logger.debug(f"HybridBrowserToolkit for session {session_id} is being garbage collected")
+
+
+def _browser_result_preview(res: Any, budget: int) -> str | Preview:
+    """Preview browser action results without the page snapshot; the full result is kept by payload id."""
+    if isinstance(res, dict) and res.get("snapshot"):
+        full = render_preview(res, budget)
+        if not full.truncated:
+            # Small snapshots fit the preview as they are, so nothing needs storing
+            return full.text
+        summary = {**res, "snapshot": f"<page snapshot, {len(res['snapshot'])} chars>"}
+        return Preview(render_preview(summary, budget).text, True)
+    return render_preview(res, budget).text
+
+
+for _method_name in dir(BaseHybridBrowserToolkit):
+    if _method_name.startswith("browser_") and _method_name != "browser_get_page_snapshot":
+        register_preview_renderer(_method_name, result=_browser_result_preview)
@@ -0,0 +1,297 @@
+import asyncio
+import json
+import os
+import re
+import time
+import weakref
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+import httpx
+from app.component.environment import env
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("mcp_catalogue")
+
+# Field weights for ranking: a match in the name counts more than one in the description
+FIELD_WEIGHTS = {"name": 3.0, "key": 3.0, "category": 2.0, "description": 1.0}
+PREFIX_FACTOR = 0.5
+SYNC_PAGE_SIZE = 100
+MAX_SYNC_PAGES = 50
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _fields(item: Dict[str, Any]) -> Dict[str, str]:
+    category = item.get("category") or {}
+    return {
+        "name": str(item.get("name") or ""),
+        "key": str(item.get("key") or ""),
+        "category": str(category.get("name") or "") if isinstance(category, dict) else str(category),
+        "description": str(item.get("description") or ""),
+    }
+
+
+def _item_ids(items: List[Dict[str, Any]]) -> List[str]:
+    """Stable ids for catalogue items, so an update can tell which ones changed."""
+    ids, seen = [], set()
+    for position, item in enumerate(items):
+        item_id = f"id:{item['id']}" if item.get("id") is not None else f"key:{item.get('key')}"
+        if item_id in seen or item_id == "key:None":
+            item_id = f"position:{position}"
+        seen.add(item_id)
+        ids.append(item_id)
+    return ids
+
+
+class McpIndex:
+    """
+    Inverted index over MCP server names, keys, categories and descriptions.
+
+    `update` re-indexes only the items that were added, changed or removed,
+    so syncing a catalogue where a few servers changed does not tokenize
+    every server again.
+    """
+
+    def __init__(self, items: List[Dict[str, Any]]) -> None:
+        self.items: List[Dict[str, Any]] = []
+        self._items_by_id: Dict[str, Dict[str, Any]] = {}
+        self._order: Dict[str, int] = {}
+        self._item_weights: Dict[str, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []
+        self.update(items)
+
+    @staticmethod
+    def _weights(item: Dict[str, Any]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, text in _fields(item).items():
+            for token in tokenize(text):
+                weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+        return weights
+
+    def _index(self, item_id: str, item: Dict[str, Any]) -> None:
+        weights = self._item_weights[item_id] = self._weights(item)
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._terms, token)
+            postings[item_id] = weight
+
+    def _unindex(self, item_id: str) -> None:
+        for token in self._item_weights.pop(item_id, {}):
+            postings = self._postings[token]
+            del postings[item_id]
+            if not postings:
+                del self._postings[token]
+                del self._terms[bisect_left(self._terms, token)]
+
+    def update(self, items: List[Dict[str, Any]]) -> int:
+        """Make the index match `items`; returns how many items were re-indexed or dropped."""
+        ids = _item_ids(items)
+        new = dict(zip(ids, items))
+        changed = 0
+        for item_id in [item_id for item_id in self._items_by_id if item_id not in new]:
+            self._unindex(item_id)
+            changed += 1
+        for item_id, item in new.items():
+            old = self._items_by_id.get(item_id)
+            if old == item:
+                continue
+            if old is not None:
+                self._unindex(item_id)
+            self._index(item_id, item)
+            changed += 1
+        self.items = list(items)
+        self._items_by_id = new
+        self._order = {item_id: position for position, item_id in enumerate(ids)}
+        return changed
+
+    def _prefixed(self, token: str) -> List[str]:
+        start = bisect_left(self._terms, token)
+        terms = []
+        for term in self._terms[start:]:
+            if not term.startswith(token):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, keyword: str) -> List[Dict[str, Any]]:
+        """Items matching `keyword`, best first; catalogue order breaks ties."""
+        tokens = tokenize(keyword)
+        if not tokens:
+            return list(self.items)
+        scores: Dict[str, float] = defaultdict(float)
+        for token in tokens:
+            best: Dict[str, float] = {}
+            for term in self._prefixed(token):
+                factor = 1.0 if term == token else PREFIX_FACTOR
+                for item_id, weight in self._postings[term].items():
+                    best[item_id] = max(best.get(item_id, 0.0), weight * factor)
+            for item_id, score in best.items():
+                scores[item_id] += score
+        # The marketplace matches the keyword as a substring of the key; keep those on top
+        needle = keyword.strip().lower()
+        for item_id, item in self._items_by_id.items():
+            if needle and needle in str(item.get("key") or "").lower():
+                scores[item_id] += FIELD_WEIGHTS["key"] * len(tokens)
+        ranked = sorted(scores, key=lambda item_id: (-scores[item_id], self._order[item_id]))
+        return [self._items_by_id[item_id] for item_id in ranked]
+
+
+class McpCatalogue:
+    """
+    Local copy of the MCP marketplace catalogue.
+
+    The catalogue is downloaded once, persisted to `cache_path` and searched
+    locally with `McpIndex`. It is revalidated at most every `ttl` seconds
+    with `If-None-Match` / `If-Modified-Since`, so an unchanged catalogue
+    costs a single 304 and a network failure falls back to the cached copy.
+    The marketplace has no delta endpoint, so a changed catalogue is
+    downloaded in full, but only the servers that changed are re-indexed.
+    All requests share one keep-alive client per event loop.
+    """
+
+    def __init__(self, cache_path: str, ttl: float = 600.0, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self.transport = transport
+        self.url: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.checked_at = 0.0
+        self.index: Optional[McpIndex] = None
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
+        self.fetches = 0
+        self.not_modified = 0
+
+    def client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=30.0, limits=httpx.Limits(max_keepalive_connections=4), transport=self.transport
+            )
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self) -> None:
+        for client in list(self._clients.values()):
+            await client.aclose()
+        self._clients.clear()
+
+    def _load(self, url: str) -> None:
+        self.url = url
+        self.etag = self.last_modified = None
+        self.index = None
+        self.checked_at = 0.0
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if cached.get("url") != url:
+            return
+        self.etag = cached.get("etag")
+        self.last_modified = cached.get("last_modified")
+        self.index = McpIndex(cached.get("items", []))
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "url": self.url,
+                    "etag": self.etag,
+                    "last_modified": self.last_modified,
+                    "synced_at": time.time(),
+                    "items": self.index.items if self.index else [],
+                },
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp, self.cache_path)
+
+    async def _fetch_page(self, url: str, page: int, headers: Dict[str, str]) -> httpx.Response:
+        self.fetches += 1
+        return await self.client().get(url, params={"keyword": "", "size": SYNC_PAGE_SIZE, "page": page}, headers=headers)
+
+    async def _download(self, url: str, first: httpx.Response) -> List[Dict[str, Any]]:
+        data = first.json()
+        items = list(data.get("items", []))
+        total = data.get("total")
+        page = data.get("page", 0)
+        for _ in range(MAX_SYNC_PAGES):
+            if len(data.get("items", [])) < SYNC_PAGE_SIZE or (total is not None and len(items) >= total):
+                break
+            # Follow the page number the server reports, whatever its first page is
+            response = await self._fetch_page(url, page + 1, {})
+            if response.status_code != 200:
+                raise Exception(f"MCP catalogue sync failed: {response.text}")
+            data = response.json()
+            items.extend(data.get("items", []))
+            page = data.get("page", page + 1)
+        return items
+
+    async def sync(self, url: str, force: bool = False) -> None:
+        """Bring the local catalogue up to date with `url` if it is due for a check."""
+        loop = asyncio.get_running_loop()
+        lock = self._locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            if self.url != url:
+                await asyncio.to_thread(self._load, url)
+            fresh = self.index is not None and time.monotonic() - self.checked_at < self.ttl
+            if fresh and not force:
+                return
+            headers = {}
+            if self.index is not None:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+            try:
+                response = await self._fetch_page(url, 0, headers)
+                if response.status_code == 304 and self.index is not None:
+                    self.not_modified += 1
+                    self.checked_at = time.monotonic()
+                    return
+                if response.status_code != 200:
+                    raise Exception(f"MCP catalogue sync failed: {response.text}")
+                items = await self._download(url, response)
+            except Exception as e:
+                if self.index is None:
+                    raise
+                logger.warning(f"MCP catalogue sync failed, using cached copy: {e}")
+                self.checked_at = time.monotonic()
+                return
+            self.etag = response.headers.get("etag")
+            self.last_modified = response.headers.get("last-modified")
+            if self.index is None:
+                self.index = McpIndex(items)
+                changed = len(items)
+            else:
+                changed = self.index.update(items)
+            self.checked_at = time.monotonic()
+            await asyncio.to_thread(self._save)
+            logger.info("MCP catalogue synced", extra={"url": url, "items": len(items), "changed": changed})
+
+    async def search(self, url: str, keyword: str, size: int = 15, page: int = 0) -> Dict[str, Any]:
+        await self.sync(url)
+        matches = self.index.search(keyword)
+        start = max(page, 0) * size
+        return {"items": matches[start : start + size], "total": len(matches), "page": page, "size": size}
+
+
+mcp_catalogue = McpCatalogue(
+    os.path.join(os.path.expanduser("~"), ".node", "cache", "mcp_catalogue.json"),
+    ttl=float(env("mcp_catalogue_ttl", "600")),
+)
@@ -1,10 +1,10 @@
 from typing import Any, List
 from camel.toolkits import BaseToolkit, FunctionTool
-import httpx
 from app.service.task import Action, ActionSearchMcpData, Agents, get_task_lock
 from app.component.environment import env_not_empty
 from app.utils.listen.toolkit_listen import listen_toolkit
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
+from app.utils.toolkit.mcp_catalogue import mcp_catalogue
 
 
 class McpSearchToolkit(BaseToolkit, AbstractToolkit):
@@ -17,8 +17,8 @@ class McpSearchToolkit(BaseToolkit, AbstractToolkit):
     @listen_toolkit(
         inputs=lambda _,
         keyword,
-        size,
-        page: f"keyword: {keyword}, size: {size}, page: {page}",
+        size=15,
+        page=0: f"keyword: {keyword}, size: {size}, page: {page}",
         return_msg=lambda res: f"Search {len(res)} results: ",
     )
     async def search_mcp_from_url(
@@ -29,6 +29,9 @@ class McpSearchToolkit(BaseToolkit, AbstractToolkit):
     ) -> dict[str, Any]:
         """Search mcp server for keyword.
 
+        Results come from a locally cached copy of the MCP catalogue,
+        ranked by matches in server names, descriptions and categories.
+
         Args:
             keyword (str): mcp server name keyword.
             size (int): count per page.
@@ -37,23 +40,12 @@ class McpSearchToolkit(BaseToolkit, AbstractToolkit):
         Returns:
             dict[str, Any]: _description_
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                env_not_empty("MCP_URL"),
-                params={
-                    "keyword": keyword,
-                    "size": size,
-                    "page": page,
-                },
-            )
-            if response.status_code != 200:
-                raise Exception(f"MCP server search failed: {response.text}")
-            data = response.json()
-            task_lock = get_task_lock(self.api_task_id)
-            await task_lock.put_queue(
-                ActionSearchMcpData(action=Action.search_mcp, data=data["items"])
-            )
-            return data
+        data = await mcp_catalogue.search(env_not_empty("MCP_URL"), keyword, size=size, page=page)
+        task_lock = get_task_lock(self.api_task_id)
+        await task_lock.put_queue(
+            ActionSearchMcpData(action=Action.search_mcp, data=data["items"])
+        )
+        return data
 
     def get_tools(self) -> List[FunctionTool]:
         return [FunctionTool(self.search_mcp_from_url)]
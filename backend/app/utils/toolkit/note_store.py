@@ -0,0 +1,215 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("note_store")
+
+DB_FILE = ".notes.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    note_name TEXT NOT NULL,
+    agent TEXT NOT NULL DEFAULT '',
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_by_name ON notes (note_name, id);
+CREATE INDEX IF NOT EXISTS notes_by_agent ON notes (agent, id);
+CREATE INDEX IF NOT EXISTS notes_by_time ON notes (created_at);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    content, note_name, content='notes', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS notes_ai AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, content, note_name) VALUES (new.id, new.content, new.note_name);
+END;
+CREATE TRIGGER IF NOT EXISTS notes_ad AFTER DELETE ON notes BEGIN
+    INSERT INTO notes_fts (notes_fts, rowid, content, note_name)
+    VALUES ('delete', old.id, old.content, old.note_name);
+END;
+"""
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class NoteEntry(BaseModel):
+    id: int
+    note_name: str
+    agent: str
+    content: str
+    created_at: float
+
+    def render(self) -> str:
+        written = datetime.fromtimestamp(self.created_at).isoformat(timespec="seconds")
+        author = f" by {self.agent}" if self.agent else ""
+        return f"=== {self.note_name}.md (#{self.id}{author}, {written}) ===\n{self.content}"
+
+
+class NoteSummary(BaseModel):
+    note_name: str
+    entries: int
+    chars: int
+    agents: List[str]
+    updated_at: float
+
+
+class NoteStore:
+    """
+    Notes of one project, stored as timestamped, per-agent entries in SQLite.
+
+    Every `append_note` is one row, so readers can ask for just the entries
+    written since their last read, by one agent or matching a query, instead
+    of the whole note. Full-text search uses FTS5 where the SQLite build has
+    it and falls back to LIKE otherwise.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                logger.info("SQLite has no FTS5, note queries fall back to LIKE")
+                self.fts = False
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A connection per call: agents write from different threads
+        conn = sqlite3.connect(self.db_path, timeout=10.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _run(self, sql: str, params=()) -> List[sqlite3.Row]:
+        conn = self._connect()
+        try:
+            with conn:
+                return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def add(self, note_name: str, content: str, agent: str = "", created_at: float | None = None) -> int:
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO notes (note_name, agent, content, created_at) VALUES (?, ?, ?, ?)",
+                    (note_name, agent or "", content, created_at or time.time()),
+                )
+                return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def seed(self, notes: List[Tuple[str, str, float]]) -> None:
+        """Import `(note_name, content, mtime)` notes, unless the store already has entries."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if conn.execute("SELECT 1 FROM notes LIMIT 1").fetchone():
+                    return
+                conn.executemany(
+                    "INSERT INTO notes (note_name, agent, content, created_at) VALUES (?, '', ?, ?)", notes
+                )
+        finally:
+            conn.close()
+        logger.info("Imported markdown notes", extra={"db_path": self.db_path, "notes": len(notes)})
+
+    def replace(self, note_name: str, content: str, agent: str = "") -> int:
+        # One transaction, so readers never see the note missing
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM notes WHERE note_name = ?", (note_name,))
+                cursor = conn.execute(
+                    "INSERT INTO notes (note_name, agent, content, created_at) VALUES (?, ?, ?, ?)",
+                    (note_name, agent or "", content, time.time()),
+                )
+                return cursor.lastrowid
+        finally:
+            conn.close()
+
+    def exists(self, note_name: str) -> bool:
+        return bool(self._run("SELECT 1 FROM notes WHERE note_name = ? LIMIT 1", (note_name,)))
+
+    def is_empty(self) -> bool:
+        return not self._run("SELECT 1 FROM notes LIMIT 1")
+
+    def read(
+        self,
+        note_name: Optional[str] = None,
+        after_id: int = 0,
+        since: float | None = None,
+        agent: Optional[str] = None,
+        query: Optional[str] = None,
+        limit: int | None = None,
+    ) -> List[NoteEntry]:
+        """Entries matching every given filter, oldest first; `limit` keeps the newest."""
+        where, params = ["notes.id > ?"], [after_id]
+        if note_name:
+            where.append("notes.note_name = ?")
+            params.append(note_name)
+        if since is not None:
+            where.append("notes.created_at >= ?")
+            params.append(since)
+        if agent:
+            where.append("notes.agent = ?")
+            params.append(agent)
+        words = _WORD_RE.findall(query or "")
+        if words and self.fts:
+            where.append("notes.id IN (SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?)")
+            params.append(" ".join(f'"{word}"*' for word in words))
+        else:
+            for word in words:
+                where.append("(notes.content LIKE ? OR notes.note_name LIKE ?)")
+                params.extend([f"%{word}%"] * 2)
+        sql = f"SELECT * FROM notes WHERE {' AND '.join(where)} ORDER BY notes.id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        rows = self._run(sql, params)
+        return [NoteEntry(**dict(row)) for row in reversed(rows)]
+
+    def summaries(self) -> List[NoteSummary]:
+        rows = self._run(
+            "SELECT note_name, COUNT(*) AS entries, SUM(LENGTH(content)) AS chars, "
+            "GROUP_CONCAT(DISTINCT agent) AS agents, MAX(created_at) AS updated_at, MIN(id) AS first_id "
+            "FROM notes GROUP BY note_name ORDER BY first_id"
+        )
+        return [
+            NoteSummary(
+                note_name=row["note_name"],
+                entries=row["entries"],
+                chars=row["chars"] or 0,
+                agents=[agent for agent in (row["agents"] or "").split(",") if agent],
+                updated_at=row["updated_at"],
+            )
+            for row in rows
+        ]
+
+
+_stores: dict[str, NoteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def note_store(directory: str) -> NoteStore:
+    """The shared store for the notes kept in `directory`."""
+    db_path = os.path.join(os.path.abspath(directory), DB_FILE)
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None or not os.path.exists(db_path):
+            store = _stores[db_path] = NoteStore(db_path)
+        return store
@@ -1,16 +1,29 @@
 import os
+from datetime import datetime
 from camel.toolkits import NoteTakingToolkit as BaseNoteTakingToolkit
 
 from typing import Optional
 
 from app.component.environment import env
 from app.service.task import Agents
-from app.utils.listen.toolkit_listen import auto_listen_toolkit
+from app.utils.listen.toolkit_listen import auto_listen_toolkit, listen_toolkit
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
+from app.utils.toolkit.note_store import NoteStore, note_store
+
+# Entries returned by one read_note call; older matches are summarised instead
+READ_LIMIT = 30
 
 
 @auto_listen_toolkit(BaseNoteTakingToolkit)
 class NoteTakingToolkit(BaseNoteTakingToolkit, AbstractToolkit):
+    r"""Notes shared by the agents of a project.
+
+    Notes are kept as timestamped, per-agent entries in a SQLite store in the
+    working directory, with the `.md` files mirrored for the user. A plain
+    `read_note()` returns only the entries added since this agent's previous
+    read, so repeated reads do not pull the whole history into the context.
+    """
+
     agent_name: str = Agents.document_agent
 
     def __init__(
@@ -26,3 +39,191 @@ class NoteTakingToolkit(BaseNoteTakingToolkit, AbstractToolkit):
         if working_directory is None:
             working_directory = env("file_save_path", os.path.expanduser("~/.node/notes")) + "/note.md"
         super().__init__(working_directory=working_directory, timeout=timeout)
+        self.store: NoteStore = note_store(str(self.working_directory))
+        # Highest entry id this agent has read with a plain read_note()
+        self._read_cursor = 0
+        self._import_markdown_notes()
+
+    def _author(self) -> str:
+        return getattr(self.agent_name, "value", self.agent_name) or ""
+
+    def clone_for_new_session(self, new_session_id: str | None = None) -> "NoteTakingToolkit":
+        # Worker clones share the store but each tracks what it has read
+        return NoteTakingToolkit(
+            self.api_task_id,
+            self.agent_name,
+            working_directory=str(self.working_directory),
+            timeout=self.timeout,
+        )
+
+    def _import_markdown_notes(self) -> None:
+        # Notes written before the store existed become one entry each
+        if not self.registry or not self.store.is_empty():
+            return
+        notes = []
+        for note_name in self.registry:
+            note_path = self.working_directory / f"{note_name}.md"
+            if note_path.exists():
+                notes.append((note_name, note_path.read_text(encoding="utf-8"), note_path.stat().st_mtime))
+        self.store.seed(notes)
+
+    def _mirror(self, note_name: str, content: str, mode: str) -> None:
+        note_path = self.working_directory / f"{note_name}.md"
+        with note_path.open(mode, encoding="utf-8") as f:
+            f.write(content)
+        self._register_note(note_name)
+
+    @listen_toolkit(
+        inputs=lambda _, note_name, content: f"append note: {note_name}",
+    )
+    def append_note(self, note_name: str, content: str) -> str:
+        r"""Appends content to a note.
+
+        If the note does not exist, it will be created with the given content.
+        Each call is stored as a separate entry with your agent name and a
+        timestamp, so other agents can read just what is new.
+
+        Args:
+            note_name (str): The name of the note (without the .md extension).
+            content (str): The content to append to the note.
+
+        Returns:
+            str: A message confirming that the content was appended or the note
+                 was created.
+        """
+        try:
+            created = not self.store.exists(note_name)
+            self.store.add(note_name, content, self._author())
+            self._mirror(note_name, content + "\n", "w" if created else "a")
+            if created:
+                return f"Note '{note_name}' created with content added."
+            return f"Content successfully appended to '{note_name}.md'."
+        except Exception as e:
+            return f"Error appending note: {e}"
+
+    @listen_toolkit(
+        inputs=lambda _, note_name, content, overwrite=False: f"create note: {note_name} overwrite: {overwrite}",
+    )
+    def create_note(self, note_name: str, content: str, overwrite: bool = False) -> str:
+        r"""Creates a new note with a unique name.
+
+        By default, you must provide a `note_name` that does not already exist.
+        If you want to add content to an existing note, use the `append_note`
+        function instead. If you want to overwrite an existing note, set
+        `overwrite=True`.
+
+        Args:
+            note_name (str): The name for your new note (without the .md
+                extension). This name must be unique unless overwrite is True.
+            content (str): The initial content to write in the note.
+            overwrite (bool): Whether to overwrite an existing note.
+                Defaults to False.
+
+        Returns:
+            str: A message confirming the creation of the note or an error if
+                the note already exists (when overwrite=False).
+        """
+        try:
+            existed_before = self.store.exists(note_name)
+            if existed_before and not overwrite:
+                return f"Error: Note '{note_name}.md' already exists."
+            self.store.replace(note_name, content, self._author())
+            self._mirror(note_name, content, "w")
+            if existed_before:
+                return f"Note '{note_name}.md' successfully overwritten."
+            return f"Note '{note_name}.md' successfully created."
+        except Exception as e:
+            return f"Error creating note: {e}"
+
+    @listen_toolkit(
+        inputs=lambda _: "list notes",
+    )
+    def list_note(self) -> str:
+        r"""Lists all the notes of the team.
+
+        Shows each note with its number of entries, size, the agents that
+        wrote to it and when it was last updated.
+
+        Returns:
+            str: A string containing a list of available notes, or a message
+                indicating that no notes have been created yet.
+        """
+        try:
+            summaries = self.store.summaries()
+            if not summaries:
+                return "No notes have been created yet."
+            lines = [
+                f"- {summary.note_name}.md ({summary.entries} entries, {summary.chars} chars"
+                f"{', by ' + ', '.join(summary.agents) if summary.agents else ''}, "
+                f"updated {datetime.fromtimestamp(summary.updated_at).isoformat(timespec='seconds')})"
+                for summary in summaries
+            ]
+            return "Available notes:\n" + "\n".join(lines)
+        except Exception as e:
+            return f"Error listing notes: {e}"
+
+    @listen_toolkit(
+        inputs=lambda _, note_name="all_notes", since=None, agent=None, query=None: (
+            f"read note: {note_name} since: {since} agent: {agent} query: {query}"
+        ),
+    )
+    def read_note(
+        self,
+        note_name: Optional[str] = "all_notes",
+        since: Optional[str] = None,
+        agent: Optional[str] = None,
+        query: Optional[str] = None,
+    ) -> str:
+        r"""Reads notes written by you and the other agents.
+
+        Called without arguments, it returns only the note entries added
+        since your previous `read_note()` call (all entries on the first
+        call). Use the arguments to look further back or narrow the result.
+
+        Args:
+            note_name (str, optional): Read only this note (without the .md
+                extension). Defaults to "all_notes".
+            since (str, optional): Only entries written at or after this ISO
+                8601 time (e.g. "2025-01-31T14:00:00"), or "all" for the
+                full history. Defaults to entries you have not read yet.
+            agent (str, optional): Only entries written by this agent, e.g.
+                "search_agent".
+            query (str, optional): Only entries containing these words.
+
+        Returns:
+            str: The matching note entries, oldest first, each with its note
+                name, author and time, or a message if there are none.
+        """
+        try:
+            if note_name == "all_notes":
+                note_name = None
+            if note_name and not self.store.exists(note_name):
+                return f"Error: Note '{note_name}' is not registered or was not created by this toolkit."
+            after_id = 0
+            since_ts = None
+            if since and since != "all":
+                try:
+                    since_ts = datetime.fromisoformat(since.replace("Z", "+00:00")).timestamp()
+                except ValueError:
+                    return f"Error: since must be an ISO 8601 time or 'all', got '{since}'."
+            unread = not (note_name or since or agent or query)
+            if unread:
+                after_id = self._read_cursor
+            entries = self.store.read(note_name, after_id, since_ts, agent, query, limit=READ_LIMIT + 1)
+            omitted = len(entries) > READ_LIMIT
+            entries = entries[-READ_LIMIT:]
+            if unread:
+                self._read_cursor = max([self._read_cursor, *(entry.id for entry in entries)])
+            if not entries:
+                if unread and after_id:
+                    return "No new notes since your last read. Use since='all' or query to search older notes."
+                return "No notes have been created yet." if self.store.is_empty() else "No matching notes."
+            header = []
+            if omitted:
+                header.append(
+                    f"[Showing the latest {READ_LIMIT} matching entries; older ones were omitted. "
+                    "Narrow the result with note_name, agent, since or query.]"
+                )
+            return "\n\n".join(header + [entry.render() for entry in entries])
+        except Exception as e:
+            return f"Error reading note: {e}"
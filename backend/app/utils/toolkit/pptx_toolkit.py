@@ -4,6 +4,7 @@ from camel.toolkits import PPTXToolkit as BasePPTXToolkit
 
 from app.component.environment import env
 from app.service.task import ActionWriteFileData, Agents, get_task_lock
+from app.utils.listen.preview import ARGS_PREVIEW_BYTES, render_preview
 from app.utils.listen.toolkit_listen import auto_listen_toolkit, listen_toolkit, _safe_put_queue
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
 from app.service.task import process_task
@@ -29,7 +30,7 @@ class PPTXToolkit(BasePPTXToolkit, AbstractToolkit):
         lambda _,
         content,
         filename,
-        template=None: f"create presentation with content: {content}, filename: {filename}, template: {template}",
+        template=None: f"create presentation with content: {render_preview(content, ARGS_PREVIEW_BYTES // 2).text}, filename: {filename}, template: {template}",
     )
     def create_presentation(self, content: str, filename: str, template: str | None = None) -> str:
         if not filename.lower().endswith(".pptx"):
@@ -0,0 +1,128 @@
+import re
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Tuple
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("snapshot_diff")
+
+_REF_RE = re.compile(r"\[ref=([^\]]+)\]")
+
+# Fall back to the full snapshot when the diff would not be meaningfully smaller
+MAX_DIFF_RATIO = 0.6
+
+
+class SnapshotNode(NamedTuple):
+    parent: str
+    text: str
+
+
+class SnapshotDiff(NamedTuple):
+    added: List[Tuple[str, SnapshotNode]]
+    removed: List[Tuple[str, SnapshotNode]]
+    changed: List[Tuple[str, SnapshotNode, SnapshotNode]]
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed)
+
+
+def parse_snapshot(snapshot: str) -> "OrderedDict[str, SnapshotNode]":
+    """
+    Index a YAML-like accessibility snapshot by node.
+
+    Nodes carrying a `[ref=...]` are keyed by their ref, so a node whose text
+    changes is reported as changed. Other lines (text, `/url:` and similar
+    children) are keyed by their nearest ancestor plus their text and only
+    ever show up as added or removed.
+    """
+    nodes: "OrderedDict[str, SnapshotNode]" = OrderedDict()
+    stack: List[Tuple[int, str]] = []
+    seen: Dict[str, int] = {}
+    for line in snapshot.splitlines():
+        text = line.strip()
+        if not text:
+            continue
+        indent = len(line) - len(line.lstrip())
+        while stack and stack[-1][0] >= indent:
+            stack.pop()
+        parent = stack[-1][1] if stack else ""
+        match = _REF_RE.search(text)
+        if match and match.group(1) not in nodes:
+            key = match.group(1)
+        else:
+            base = f"{parent}/{text}"
+            seen[base] = seen.get(base, 0) + 1
+            key = f"{base}#{seen[base]}"
+        nodes[key] = SnapshotNode(parent, text)
+        stack.append((indent, key))
+    return nodes
+
+
+def diff_snapshots(old: str, new: str) -> SnapshotDiff:
+    old_nodes = parse_snapshot(old)
+    new_nodes = parse_snapshot(new)
+    added = [(key, node) for key, node in new_nodes.items() if key not in old_nodes]
+    removed = [(key, node) for key, node in old_nodes.items() if key not in new_nodes]
+    changed = [
+        (key, old_nodes[key], node)
+        for key, node in new_nodes.items()
+        if key in old_nodes and old_nodes[key] != node
+    ]
+    return SnapshotDiff(added, removed, changed)
+
+
+def _parent_ref(parent: str) -> str:
+    # Non-ref keys look like "<parent>/<text>#n"; report the closest ref instead
+    return parent.split("/", 1)[0]
+
+
+def format_snapshot_diff(diff: SnapshotDiff) -> str:
+    if diff.empty:
+        return "- Page Snapshot (no changes since the previous snapshot of this tab)"
+    lines = [
+        f"- Page Snapshot (diff against the previous snapshot of this tab: "
+        f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed; "
+        f"call browser_get_page_snapshot for the full page)"
+    ]
+    for _, node in diff.added:
+        parent = _parent_ref(node.parent)
+        lines.append(f"+ {node.text}" + (f" (in {parent})" if parent else ""))
+    for _, node in diff.removed:
+        lines.append(f"- {node.text}")
+    for _, old, new in diff.changed:
+        if old.parent != new.parent:
+            lines.append(f"~ {new.text} (moved into {_parent_ref(new.parent) or 'root'})")
+        else:
+            lines.append(f"~ {new.text} (was: {old.text})")
+    return "\n".join(lines)
+
+
+class SnapshotDiffer:
+    """
+    Keeps the last full snapshot per tab and turns later snapshots into
+    structural diffs against it.
+
+    A full snapshot is returned for the first snapshot of a tab, when
+    `full=True` (navigation, tab switches, explicit snapshot requests), and
+    whenever the diff would not be much smaller than the page itself.
+    """
+
+    def __init__(self, max_tabs: int = 32) -> None:
+        self.max_tabs = max_tabs
+        self._last: "OrderedDict[str, str]" = OrderedDict()
+
+    def render(self, tab_id: str, snapshot: str, full: bool = False) -> str:
+        previous = self._last.pop(tab_id, None)
+        self._last[tab_id] = snapshot
+        while len(self._last) > self.max_tabs:
+            self._last.popitem(last=False)
+        if full or previous is None:
+            return snapshot
+        text = format_snapshot_diff(diff_snapshots(previous, snapshot))
+        if len(text) >= len(snapshot) * MAX_DIFF_RATIO:
+            return snapshot
+        logger.debug(f"Snapshot diff for tab {tab_id}: {len(text)} of {len(snapshot)} chars")
+        return text
+
+    def forget(self, tab_id: str) -> None:
+        self._last.pop(tab_id, None)
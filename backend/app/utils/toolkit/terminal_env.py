@@ -0,0 +1,227 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from app.component.command import uv
+from app.component.environment import env
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("terminal_env")
+
+# Bump to rebuild every shared environment after changing how they are built
+ENV_VERSION = 1
+PYTHON_VERSION = "3.10"
+DEFAULT_PACKAGES = ["pandas", "numpy", "matplotlib", "requests", "openpyxl"]
+# uv venvs come without pip, which agents expect inside terminal sessions
+ESSENTIAL_PACKAGES = ["pip", "setuptools", "wheel"]
+
+MARKER_FILE = ".eigent-env.json"
+# Puts the shared environment's packages on the path of a per-project overlay
+OVERLAY_PTH = "_eigent_shared_env.pth"
+BUILD_TIMEOUT = 600
+# A build lock older than this is assumed to belong to a crashed process
+STALE_LOCK_SECONDS = 2 * BUILD_TIMEOUT
+
+
+def env_key(packages: Iterable[str], python: str = PYTHON_VERSION) -> str:
+    spec = {"version": ENV_VERSION, "python": python, "packages": sorted(set(packages))}
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def python_in(env_path: str) -> str:
+    if os.name == "nt":
+        return os.path.join(env_path, "Scripts", "python.exe")
+    return os.path.join(env_path, "bin", "python")
+
+
+def installed_distributions(env_path: str) -> List[str]:
+    """Names of the distributions installed in a venv, e.g. `pandas-2.2.3.dist-info`."""
+    patterns = [
+        os.path.join(env_path, "lib", "python*", "site-packages", "*.dist-info"),
+        os.path.join(env_path, "Lib", "site-packages", "*.dist-info"),
+    ]
+    return sorted({os.path.basename(path) for pattern in patterns for path in glob.glob(pattern)})
+
+
+def site_packages_dirs(env_path: str) -> List[str]:
+    patterns = [
+        os.path.join(env_path, "lib", "python*", "site-packages"),
+        os.path.join(env_path, "Lib", "site-packages"),
+    ]
+    return sorted({path for pattern in patterns for path in glob.glob(pattern)})
+
+
+def distributions_hash(distributions: Iterable[str]) -> str:
+    return hashlib.sha256("\n".join(sorted(distributions)).encode()).hexdigest()
+
+
+def _run(cmd: List[str]) -> None:
+    subprocess.run(cmd, check=True, capture_output=True, text=True, timeout=BUILD_TIMEOUT)
+
+
+class SharedTerminalEnv:
+    """
+    Versioned Python environments shared by every terminal toolkit.
+
+    An environment is keyed by its Python version and package list and built
+    once per backend install under `root`, instead of creating a venv and
+    running `pip install` in the working directory of every project. After a
+    build the installed distributions are recorded in a marker file with
+    their hash; an environment is reused as long as the marker is intact and
+    every recorded distribution is still installed, so packages an agent adds
+    later do not invalidate it but a removed or replaced one does.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._ready: Dict[str, str] = {}
+        self.builds = 0
+
+    def verify(self, env_path: str) -> bool:
+        try:
+            with open(os.path.join(env_path, MARKER_FILE), encoding="utf-8") as f:
+                marker = json.load(f)
+        except (OSError, ValueError):
+            return False
+        recorded = marker.get("distributions", [])
+        if marker.get("hash") != distributions_hash(recorded):
+            return False
+        if not os.path.exists(python_in(env_path)):
+            return False
+        return set(recorded) <= set(installed_distributions(env_path))
+
+    def ensure(self, packages: Iterable[str] = DEFAULT_PACKAGES, python: str = PYTHON_VERSION) -> Optional[str]:
+        """
+        Path of a verified environment with `packages` installed, building it
+        if needed. Returns None if it cannot be built.
+        """
+        packages = sorted(set(packages))
+        key = env_key(packages, python)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            env_path = self._ready.get(key)
+            if env_path is not None and os.path.exists(python_in(env_path)):
+                return env_path
+            env_path = os.path.join(self.root, key)
+            try:
+                with self._build_lock(env_path):
+                    if not self.verify(env_path):
+                        self._build(env_path, packages, python)
+            except Exception as e:
+                logger.error(f"Failed to prepare shared terminal environment: {e}", exc_info=True)
+                return None
+            self._ready[key] = env_path
+            return env_path
+
+    def warm_soon(self, packages: Iterable[str] = DEFAULT_PACKAGES) -> None:
+        """Build or verify the environment in the background."""
+        threading.Thread(target=self.ensure, args=(list(packages),), name="terminal_env_warm", daemon=True).start()
+
+    def _build_lock(self, env_path: str) -> "_DirLock":
+        return _DirLock(env_path + ".lock")
+
+    def _build(self, env_path: str, packages: List[str], python: str) -> None:
+        logger.info("Building shared terminal environment", extra={"path": env_path, "packages": packages})
+        started = time.monotonic()
+        shutil.rmtree(env_path, ignore_errors=True)
+        uv_path = uv() if os.path.exists(uv()) else shutil.which("uv")
+        if uv_path:
+            _run([uv_path, "venv", "--python", python, env_path])
+            _run([uv_path, "pip", "install", "--python", python_in(env_path), *ESSENTIAL_PACKAGES, *packages])
+        else:
+            _run([sys.executable, "-m", "venv", env_path])
+            if packages:
+                _run([python_in(env_path), "-m", "pip", "install", *packages])
+        distributions = installed_distributions(env_path)
+        marker = {
+            "version": ENV_VERSION,
+            "python": python,
+            "packages": packages,
+            "distributions": distributions,
+            "hash": distributions_hash(distributions),
+            "created_at": time.time(),
+        }
+        # Written last, so an interrupted build is never mistaken for a valid one
+        with open(os.path.join(env_path, MARKER_FILE), "w", encoding="utf-8") as f:
+            json.dump(marker, f, indent=2)
+        self.builds += 1
+        logger.info(
+            "Shared terminal environment ready",
+            extra={"path": env_path, "seconds": round(time.monotonic() - started, 1)},
+        )
+
+
+def overlay_env(shared_path: str, env_path: str) -> Optional[str]:
+    """
+    A thin venv at `env_path` on top of the shared environment at
+    `shared_path`, whose packages it sees through a `.pth` file.
+
+    Packages an agent installs land in the overlay, so the shared environment
+    is never modified. An existing overlay is reused as long as it still
+    points at `shared_path`. Returns None if it cannot be created.
+    """
+    shared_sites = site_packages_dirs(shared_path)
+    try:
+        with _DirLock(env_path + ".lock"):
+            sites = site_packages_dirs(env_path)
+            pth = os.path.join(sites[0], OVERLAY_PTH) if sites else None
+            if pth and os.path.exists(python_in(env_path)) and os.path.exists(pth):
+                with open(pth, encoding="utf-8") as f:
+                    if f.read().splitlines() == shared_sites:
+                        return env_path
+            shutil.rmtree(env_path, ignore_errors=True)
+            # Only the interpreter links are created; pip comes from the shared env
+            _run([python_in(shared_path), "-m", "venv", "--without-pip", env_path])
+            sites = site_packages_dirs(env_path)
+            if not sites:
+                raise RuntimeError(f"No site-packages in {env_path}")
+            with open(os.path.join(sites[0], OVERLAY_PTH), "w", encoding="utf-8") as f:
+                f.write("".join(f"{site}\n" for site in shared_sites))
+    except Exception as e:
+        logger.error(f"Failed to create terminal environment overlay at {env_path}: {e}", exc_info=True)
+        return None
+    return env_path
+
+
+class _DirLock:
+    """Cross-process lock on a directory name; `mkdir` is atomic on every platform."""
+
+    def __init__(self, path: str, poll: float = 0.5) -> None:
+        self.path = path
+        self.poll = poll
+
+    def __enter__(self) -> "_DirLock":
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        deadline = time.monotonic() + BUILD_TIMEOUT
+        while True:
+            try:
+                os.mkdir(self.path)
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > STALE_LOCK_SECONDS:
+                        os.rmdir(self.path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {self.path}")
+                time.sleep(self.poll)
+
+    def __exit__(self, *exc) -> None:
+        try:
+            os.rmdir(self.path)
+        except OSError:
+            pass
+
+
+shared_terminal_env = SharedTerminalEnv(env("terminal_env_dir", os.path.expanduser("~/.node/terminal_env")))
@@ -0,0 +1,190 @@
+import asyncio
+import codecs
+import os
+import threading
+from asyncio.subprocess import PIPE, STDOUT
+from typing import Callable, Dict, List, Optional
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("terminal_process")
+
+READ_CHUNK = 4096
+STDIN_TIMEOUT = 5.0
+
+
+def shell_args(command: str) -> List[str]:
+    """Arguments running `command` through the platform shell, like `Popen(shell=True)`."""
+    if os.name == "nt":
+        return [os.environ.get("COMSPEC", "cmd.exe"), "/c", command]
+    return ["/bin/sh", "-c", command]
+
+
+class ProcessLoop:
+    """
+    A background event loop owning every non-blocking terminal process.
+
+    Output of all sessions is read by coroutines on this loop, so starting
+    another long-running command costs a task rather than a reader thread, and
+    commands from parallel subtasks do not wait on each other.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._loop.is_closed():
+                ready = threading.Event()
+
+                def run() -> None:
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
+                    self._loop = loop
+                    ready.set()
+                    loop.run_forever()
+
+                threading.Thread(target=run, name="terminal_process_loop", daemon=True).start()
+                ready.wait()
+            return self._loop
+
+    def run(self, coro, timeout: Optional[float] = None):
+        """Run `coro` on the loop and wait for its result from the calling thread.
+
+        Blocks the calling thread, so it must not be called from a thread
+        running an event loop (blocking tools are dispatched to a worker
+        thread, see `ToolDispatch`).
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+        coro.close()
+        raise RuntimeError("process_loop.run would block a running event loop; call it from a worker thread")
+
+    def call_soon(self, callback: Callable, *args) -> None:
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+process_loop = ProcessLoop()
+
+
+class _Stdin:
+    def __init__(self, handle: "AsyncProcess") -> None:
+        self._handle = handle
+
+    def write(self, text: str) -> None:
+        stream = self._handle.process.stdin
+        process_loop.call_soon(stream.write, text.encode("utf-8"))
+
+    def flush(self) -> None:
+        process_loop.run(self._handle.process.stdin.drain(), STDIN_TIMEOUT)
+
+    def close(self) -> None:
+        process_loop.call_soon(self._handle.process.stdin.close)
+
+
+class _Stdout:
+    def __init__(self, handle: "AsyncProcess") -> None:
+        self._handle = handle
+
+    def close(self) -> None:
+        reader = self._handle.reader
+        if reader is not None:
+            process_loop.call_soon(reader.cancel)
+
+
+class AsyncProcess:
+    """
+    `Popen`-like handle to a subprocess running on the process loop.
+
+    Camel's terminal session helpers (`shell_write_to_process`,
+    `shell_kill_process`, `cleanup`) only use `stdin`, `stdout.close`,
+    `poll`, `terminate` and `kill`, so sessions started here work with them
+    unchanged.
+    """
+
+    def __init__(self, process: asyncio.subprocess.Process) -> None:
+        self.process = process
+        self.pid = process.pid
+        self.reader: Optional[asyncio.Task] = None
+        self.stdin = _Stdin(self)
+        self.stdout = _Stdout(self)
+
+    def poll(self) -> Optional[int]:
+        return self.process.returncode
+
+    def _signal(self, name: str) -> None:
+        if self.process.returncode is None:
+            try:
+                getattr(self.process, name)()
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        process_loop.call_soon(self._signal, "terminate")
+
+    def kill(self) -> None:
+        process_loop.call_soon(self._signal, "kill")
+
+    def wait(self, timeout: Optional[float] = None) -> int:
+        return process_loop.run(self.process.wait(), timeout)
+
+
+async def _pump(
+    process: asyncio.subprocess.Process,
+    on_output: Callable[[str], None],
+    on_exit: Callable[[Optional[int]], None],
+) -> None:
+    # Output is forwarded once per read, so each chunk costs one log write
+    # however many lines it holds; a trailing partial line (a prompt, a
+    # progress bar) is forwarded as soon as it is read rather than held back
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    try:
+        while True:
+            data = await process.stdout.read(READ_CHUNK)
+            text = decoder.decode(data, final=not data)
+            if text:
+                on_output(text)
+            if not data:
+                break
+        await process.wait()
+    except asyncio.CancelledError:
+        pass
+    except Exception as e:
+        logger.error(f"Terminal process reader failed: {e}", exc_info=True)
+    finally:
+        on_exit(process.returncode)
+
+
+async def _start(
+    command: str,
+    cwd: str,
+    env: Dict[str, str],
+    on_output: Callable[[str], None],
+    on_exit: Callable[[Optional[int]], None],
+) -> AsyncProcess:
+    process = await asyncio.create_subprocess_exec(
+        *shell_args(command), stdin=PIPE, stdout=PIPE, stderr=STDOUT, cwd=cwd, env=env
+    )
+    handle = AsyncProcess(process)
+    handle.reader = asyncio.create_task(_pump(process, on_output, on_exit))
+    return handle
+
+
+def start_process(
+    command: str,
+    cwd: str,
+    env: Dict[str, str],
+    on_output: Callable[[str], None],
+    on_exit: Callable[[Optional[int]], None],
+) -> AsyncProcess:
+    """
+    Start `command` through the shell on the process loop.
+
+    `on_output` is called with each piece of combined stdout/stderr and
+    `on_exit` with the return code once the output is drained, both from the
+    process loop thread.
+    """
+    return process_loop.run(_start(command, cwd, env, on_output, on_exit))
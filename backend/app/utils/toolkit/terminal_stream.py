@@ -0,0 +1,207 @@
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, NamedTuple, Optional, Tuple
+from pydantic import BaseModel
+from utils import traceroot_wrapper as traceroot
+
+logger = traceroot.get_logger("terminal_stream")
+
+# Flush to the frontend at most every FLUSH_INTERVAL seconds, or as soon as
+# FLUSH_CHARS of output are pending
+FLUSH_INTERVAL = 0.1
+FLUSH_CHARS = 16 * 1024
+# Output kept per stream for clients catching up from an offset
+BUFFER_CHARS = 256 * 1024
+# An unterminated escape longer than this is not held back any further
+MAX_ESCAPE_CHARS = 256
+
+# A complete escape sequence: CSI, OSC/DCS style strings terminated by BEL or
+# ST, or a two character escape
+_ESCAPE_RE = re.compile(
+    r"\x1b(?:\[[0-?]*[ -/]*[@-~]|[\]PX^_][^\x07\x1b]*(?:\x07|\x1b\\)|[@-Z\\-_])"
+)
+# The start of a sequence that may be completed by the next chunk
+_PARTIAL_RE = re.compile(r"\x1b(?:\[[0-?]*[ -/]*|[\]PX^_][^\x07\x1b]*\x1b?)?\Z")
+
+
+class AnsiStripper:
+    """
+    Incremental ANSI escape remover.
+
+    Unlike stripping each chunk on its own, an escape sequence split across
+    two writes is held back until its end arrives instead of leaking into the
+    output as text.
+    """
+
+    def __init__(self) -> None:
+        self._tail = ""
+
+    def feed(self, text: str) -> str:
+        text = self._tail + text
+        self._tail = ""
+        partial = _PARTIAL_RE.search(text)
+        if partial and len(partial.group(0)) <= MAX_ESCAPE_CHARS:
+            self._tail = partial.group(0)
+            text = text[: partial.start()]
+        return _ESCAPE_RE.sub("", text).replace("\r\n", "\n")
+
+
+class TerminalChunk(NamedTuple):
+    offset: int
+    data: str
+
+
+class TerminalReadResult(BaseModel):
+    offset: int
+    next_offset: int
+    data: str
+    truncated: bool
+
+
+class TerminalStream:
+    """
+    Plain text output of one terminal, kept in a bounded ring buffer.
+
+    Writes are cheap: they are stripped of ANSI escapes and buffered. Pending
+    output is handed to `sink` as a single chunk at most every
+    `flush_interval` seconds or once `flush_chars` are pending, so a noisy
+    command produces a few events per second instead of one per line.
+    Offsets count characters of plain output since the stream started, so a
+    client can catch up from the last offset it saw with `read`.
+    """
+
+    def __init__(
+        self,
+        sink: Callable[[TerminalChunk], None],
+        flush_interval: float = FLUSH_INTERVAL,
+        flush_chars: int = FLUSH_CHARS,
+        buffer_chars: int = BUFFER_CHARS,
+    ) -> None:
+        self.sink = sink
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self.buffer_chars = buffer_chars
+        self._lock = threading.Lock()
+        self._stripper = AnsiStripper()
+        self._buffer: Deque[TerminalChunk] = deque()
+        self._buffered_chars = 0
+        self._end = 0
+        self._pending: list[str] = []
+        self._pending_chars = 0
+        self._pending_offset = 0
+        self._timer: Optional[threading.Timer] = None
+        self._last_flush = 0.0
+        self._closed = False
+        self.flushes = 0
+
+    @property
+    def offset(self) -> int:
+        return self._end
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            data = self._stripper.feed(text)
+            if not data:
+                return
+            if not self._pending:
+                self._pending_offset = self._end
+            self._pending.append(data)
+            self._pending_chars += len(data)
+            self._append(data)
+            if self._pending_chars < self.flush_chars:
+                delay = self._last_flush + self.flush_interval - time.monotonic()
+                if delay > 0:
+                    self._schedule(delay)
+                    return
+        self.flush()
+
+    def _append(self, data: str) -> None:
+        self._buffer.append(TerminalChunk(self._end, data))
+        self._end += len(data)
+        self._buffered_chars += len(data)
+        while self._buffered_chars - len(self._buffer[0].data) >= self.buffer_chars:
+            self._buffered_chars -= len(self._buffer.popleft().data)
+
+    def _schedule(self, delay: float) -> None:
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            chunk = TerminalChunk(self._pending_offset, "".join(self._pending))
+            self._pending.clear()
+            self._pending_chars = 0
+            self._last_flush = time.monotonic()
+            self.flushes += 1
+            # Call the sink under the lock so chunks reach it in offset order
+            try:
+                self.sink(chunk)
+            except Exception as e:
+                logger.error(f"Failed to flush terminal output: {e}", exc_info=True)
+
+    def read(self, offset: int = 0) -> TerminalReadResult:
+        """Output from `offset` on, or from the oldest buffered output if it was dropped."""
+        with self._lock:
+            start = self._buffer[0].offset if self._buffer else self._end
+            truncated = offset < start
+            offset = min(max(offset, start), self._end)
+            parts = [
+                chunk.data[max(offset - chunk.offset, 0) :]
+                for chunk in self._buffer
+                if chunk.offset + len(chunk.data) > offset
+            ]
+            return TerminalReadResult(
+                offset=offset, next_offset=self._end, data="".join(parts), truncated=truncated
+            )
+
+    def close(self) -> None:
+        """Flush what is pending and stop accepting output."""
+        self.flush()
+        with self._lock:
+            self._closed = True
+
+
+class TerminalStreams:
+    """Terminal streams by task and process task id."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._streams: Dict[Tuple[str, str], TerminalStream] = {}
+
+    def get_or_create(
+        self, task_id: str, process_task_id: str, sink: Callable[[TerminalChunk], None]
+    ) -> TerminalStream:
+        with self._lock:
+            stream = self._streams.get((task_id, process_task_id))
+            if stream is None:
+                stream = TerminalStream(sink)
+                self._streams[(task_id, process_task_id)] = stream
+            return stream
+
+    def get(self, task_id: str, process_task_id: str) -> TerminalStream:
+        with self._lock:
+            return self._streams[(task_id, process_task_id)]
+
+    def drop_task(self, task_id: str) -> None:
+        with self._lock:
+            keys = [key for key in self._streams if key[0] == task_id]
+            streams = [self._streams.pop(key) for key in keys]
+        for stream in streams:
+            stream.close()
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+
+terminal_streams = TerminalStreams()
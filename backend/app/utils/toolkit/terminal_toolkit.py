@@ -1,15 +1,14 @@
-import asyncio
-import logging
 import os
-import threading
-from concurrent.futures import ThreadPoolExecutor
-from typing import Optional
+import time
+from queue import Full, Queue
 from camel.toolkits.terminal_toolkit import TerminalToolkit as BaseTerminalToolkit
-from camel.toolkits.terminal_toolkit.terminal_toolkit import _to_plain
 from app.component.environment import env
 from app.service.task import Action, ActionTerminalData, Agents, get_task_lock
 from app.utils.listen.toolkit_listen import auto_listen_toolkit
 from app.utils.toolkit.abstract_toolkit import AbstractToolkit
+from app.utils.toolkit.terminal_env import DEFAULT_PACKAGES, overlay_env, python_in, shared_terminal_env
+from app.utils.toolkit.terminal_process import start_process
+from app.utils.toolkit.terminal_stream import TerminalChunk, TerminalStream, terminal_streams
 from app.service.task import process_task
 from utils import traceroot_wrapper as traceroot
 
@@ -19,8 +18,8 @@ logger = traceroot.get_logger("terminal_toolkit")
 @auto_listen_toolkit(BaseTerminalToolkit)
 class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
     agent_name: str = Agents.developer_agent
-    _thread_pool: Optional[ThreadPoolExecutor] = None
-    _thread_local = threading.local()
+    # Commands block until they finish or time out, so agents call these tools off the event loop
+    run_tools_in_thread = True
 
     def __init__(
         self,
@@ -49,13 +48,6 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
             "use_docker_backend": use_docker_backend
         })
 
-        if TerminalToolkit._thread_pool is None:
-            TerminalToolkit._thread_pool = ThreadPoolExecutor(
-                max_workers=1,
-                thread_name_prefix="terminal_toolkit"
-            )
-            logger.debug("Created terminal toolkit thread pool")
-
         super().__init__(
             timeout=timeout,
             working_directory=working_directory,
@@ -65,82 +57,76 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
             safe_mode=safe_mode,
             allowed_commands=allowed_commands,
             clone_current_env=clone_current_env,
-            install_dependencies=[
-                "pandas",
-                "numpy",
-                "matplotlib",
-                "requests",
-                "openpyxl",
-            ],
+            install_dependencies=DEFAULT_PACKAGES,
         )
 
+    def _setup_initial_environment(self):
+        r"""Use a thin overlay on the shared prebuilt environment instead of
+        creating a full one in the working directory, falling back to the base
+        setup if either cannot be built. The shared environment itself is
+        read-only; `pip install` in a session goes to the overlay."""
+        shared_path = shared_terminal_env.ensure(self.install_dependencies)
+        env_path = None
+        if shared_path is not None:
+            env_path = overlay_env(shared_path, os.path.join(self.working_dir, ".initial_env"))
+        if env_path is None:
+            super()._setup_initial_environment()
+            return
+        self.initial_env_path = env_path
+        self.python_executable = python_in(env_path)
+        self._uses_shared_env = True
+        logger.debug("Using shared terminal environment", extra={
+            "api_task_id": self.api_task_id,
+            "env_path": env_path,
+            "shared_env_path": shared_path,
+        })
+
+    def _install_dependencies(self):
+        r"""Dependencies are already part of the shared environment."""
+        if getattr(self, "_uses_shared_env", False):
+            return
+        super()._install_dependencies()
+
     def _write_to_log(self, log_file: str, content: str) -> None:
-        r"""Write content to log file with optional ANSI stripping.
+        r"""Write content to log file and the task's terminal stream.
+
+        The stream strips ANSI escapes incrementally and forwards output to
+        the frontend in rate-limited chunks rather than one event per write.
 
         Args:
             log_file (str): Path to the log file
             content (str): Content to write
         """
-        # Convert ANSI escape sequences to plain text
         super()._write_to_log(log_file, content)
         logger.debug("Terminal output logged", extra={
             "api_task_id": self.api_task_id,
             "log_file": log_file,
             "content_length": len(content)
         })
-        self._update_terminal_output(_to_plain(content))
+        self._terminal_stream(process_task.get("")).write(content)
+
+    def _terminal_stream(self, process_task_id: str) -> TerminalStream:
+        def send(chunk: TerminalChunk) -> None:
+            self._update_terminal_output(chunk.data, chunk.offset, process_task_id)
 
-    def _update_terminal_output(self, output: str):
+        return terminal_streams.get_or_create(self.api_task_id, process_task_id, send)
+
+    def _update_terminal_output(self, output: str, offset: int | None = None, process_task_id: str | None = None):
         task_lock = get_task_lock(self.api_task_id)
-        process_task_id = process_task.get("")
+        if process_task_id is None:
+            process_task_id = process_task.get("")
 
-        # Create the coroutine
-        coro = task_lock.put_queue(
+        # Called from the task's loop, stream flush timers and the process
+        # loop; the task lock hands the event to the loop its queue lives on
+        task_lock.put_queue_threadsafe(
             ActionTerminalData(
                 action=Action.terminal,
                 process_task_id=process_task_id,
                 data=output,
+                offset=offset,
             )
         )
 
-        # Try to get the current event loop, if none exists, create a new one in a thread
-        try:
-            loop = asyncio.get_running_loop()
-            # If we're in an async context, schedule the coroutine
-            task = loop.create_task(coro)
-            if hasattr(task_lock, "add_background_task"):
-                task_lock.add_background_task(task)
-        except RuntimeError:
-            self._thread_pool.submit(self._run_coro_in_thread, coro,task_lock)
-
-    @staticmethod
-    def _run_coro_in_thread(coro,task_lock):
-        """
-        Execute coro in the thread pool, with each thread bound to a long-term event loop
-        """
-        if not hasattr(TerminalToolkit._thread_local, "loop"):
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            TerminalToolkit._thread_local.loop = loop
-        else:
-            loop = TerminalToolkit._thread_local.loop
-
-        if loop.is_closed():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            TerminalToolkit._thread_local.loop = loop
-
-        try:
-            task = loop.create_task(coro)
-            if hasattr(task_lock, "add_background_task"):
-                task_lock.add_background_task(task)
-            loop.run_until_complete(task)
-        except Exception as e:
-            logging.error(
-                f"Failed to execute coroutine in thread pool: {str(e)}",
-                exc_info=True
-            )
-
     def shell_exec(
         self,
         command: str,
@@ -162,9 +148,11 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
         """
         # Auto-generate ID if not provided
         if id is None:
-            import time
             id = f"auto_{int(time.time() * 1000)}"
 
+        if not block and not self.use_docker_backend:
+            return self._shell_exec_async(id, command)
+
         result = super().shell_exec(id=id, command=command, block=block, timeout=timeout)
 
         # If the command executed successfully but returned empty output,
@@ -175,8 +163,94 @@ class TerminalToolkit(BaseTerminalToolkit, AbstractToolkit):
 
         return result
 
-    @classmethod
-    def shutdown(cls):
-        if cls._thread_pool:
-            cls._thread_pool.shutdown(wait=True)
-            cls._thread_pool = None
+    def _prepare_command(self, command: str) -> tuple[bool, str]:
+        r"""Sanitize a local command and activate the toolkit's virtual
+        environment, as the base `shell_exec` does."""
+        if self.safe_mode:
+            is_safe, message = self._sanitize_command(command)
+            if not is_safe:
+                return False, f"Error: {message}"
+            command = message
+        env_path = self._get_venv_path()
+        if env_path:
+            if self.os_type == "Windows":
+                command = f'call "{os.path.join(env_path, "Scripts", "activate.bat")}" && {command}'
+            else:
+                command = f'. "{os.path.join(env_path, "bin", "activate")}" && {command}'
+        return True, command
+
+    def _shell_exec_async(self, session_id: str, command: str) -> str:
+        r"""Start a local non-blocking session on the shared process loop.
+
+        Sessions have the same shape as the base toolkit's, so `shell_view`,
+        `shell_write_to_process` and `shell_kill_process` work unchanged, but
+        their output is read by a coroutine instead of a dedicated thread.
+        """
+        ok, command = self._prepare_command(command)
+        if not ok:
+            return command
+
+        log_file = os.path.join(self.log_dir, f"session_{session_id}.log")
+        with self._session_lock:
+            existing = self.shell_sessions.get(session_id)
+            if existing and existing.get("running", False):
+                return (
+                    f"Error: Session '{session_id}' already exists "
+                    f"and is running. Use a different ID or kill "
+                    f"the existing session first."
+                )
+            session = {
+                "id": session_id,
+                "process": None,
+                "output_stream": Queue(maxsize=10000),
+                "command_history": [command],
+                "running": True,
+                "log_file": log_file,
+                "backend": "local",
+            }
+            self.shell_sessions[session_id] = session
+
+        self._write_to_log(log_file, f"--- Starting non-blocking session at {time.ctime()} ---\n> {command}\n")
+
+        def on_output(text: str) -> None:
+            self._write_to_log(log_file, text)
+            try:
+                session["output_stream"].put_nowait(text)
+            except Full:
+                logger.warning(f"[SESSION {session_id}] Output queue full, dropping data (still logged to file)")
+                return
+            with self._output_condition:
+                self._output_condition.notify_all()
+
+        def on_exit(returncode: int | None) -> None:
+            with self._output_condition:
+                session["running"] = False
+                self._output_condition.notify_all()
+            logger.debug("Terminal session exited", extra={
+                "api_task_id": self.api_task_id,
+                "session_id": session_id,
+                "returncode": returncode,
+            })
+
+        env_vars = os.environ.copy()
+        env_vars["PYTHONUNBUFFERED"] = "1"
+        try:
+            process = start_process(command, self.working_dir, env_vars, on_output, on_exit)
+        except Exception as e:
+            with self._session_lock:
+                session["running"] = False
+            error_msg = f"Error starting non-blocking command: {e}"
+            self._write_to_log(log_file, f"--- Error ---\n{error_msg}\n")
+            return error_msg
+
+        with self._session_lock:
+            session["process"] = process
+
+        return (
+            f"Session '{session_id}' started.\n\n"
+            f"You could use:\n"
+            f"  - shell_view('{session_id}') - get output\n"
+            f"  - shell_write_to_process('{session_id}', '<input>')"
+            f" - send input\n"
+            f"  - shell_kill_process('{session_id}') - terminate"
+        )
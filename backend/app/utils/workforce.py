@@ -1,6 +1,9 @@
 import asyncio
-from typing import Generator, List
+import inspect
+from typing import AsyncGenerator, Generator, List
 from camel.agents import ChatAgent
+from camel.agents.chat_agent import AsyncStreamingChatAgentResponse
+from camel.messages import BaseMessage
 from camel.societies.workforce.workforce import (
     Workforce as BaseWorkforce,
     WorkforceState,
@@ -13,7 +16,7 @@ from camel.societies.workforce.utils import TaskAssignResult
 from camel.societies.workforce.workforce_metrics import WorkforceMetrics
 from camel.societies.workforce.events import WorkerCreatedEvent
 from camel.societies.workforce.prompts import TASK_DECOMPOSE_PROMPT
-from camel.tasks.task import Task, TaskState, validate_task_content
+from camel.tasks.task import Task, TaskState, parse_response, validate_task_content
 from app.component import code
 from app.exception.exception import UserException
 from app.utils.agent import ListenChatAgent
@@ -25,12 +28,19 @@ from app.service.task import (
     get_camel_task,
     get_task_lock,
 )
+from app.service.task_timeline import now_ns
 from app.utils.single_agent_worker import SingleAgentWorker
 from utils import traceroot_wrapper as traceroot
 
 logger = traceroot.get_logger("workforce")
 
 
+async def _maybe_await(result):
+    """Await the result of a streaming callback if it returned an awaitable."""
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
 
 class Workforce(BaseWorkforce):
     def __init__(
@@ -68,7 +78,7 @@ class Workforce(BaseWorkforce):
         self.task_agent._stream_accumulate_explicit = True
         logger.info(f"[WF-LIFECYCLE] ✅ Workforce.__init__ COMPLETED, id={id(self)}")
 
-    def node_make_sub_tasks(
+    async def node_make_sub_tasks(
         self,
         task: Task,
         coordinator_context: str = "",
@@ -77,6 +87,8 @@ class Workforce(BaseWorkforce):
     ):
         """
         Split process_task method to node_make_sub_tasks and node_start method.
+        Runs on the caller's event loop, so streaming callbacks may be coroutines
+        that write straight into the task queue.
 
         Args:
             task: The main task to decompose
@@ -91,7 +103,7 @@ class Workforce(BaseWorkforce):
             "workforce_id": id(self),
             "task_id": task.id
         })
-        logger.info(f"[DECOMPOSE] Task content preview: '{task.content[:200]}...'")
+        logger.info("[DECOMPOSE] Task content preview: '%.200s...'", task.content)
         logger.info(f"[DECOMPOSE] Has coordinator context: {bool(coordinator_context)}")
         logger.info(f"[DECOMPOSE] Current workforce state: {self._state.name}, _running: {self._running}")
         logger.info("=" * 80)
@@ -114,14 +126,12 @@ class Workforce(BaseWorkforce):
         logger.info(f"[DECOMPOSE] Workforce reset complete, state: {self._state.name}")
 
         logger.info(f"[DECOMPOSE] Calling handle_decompose_append_task")
-        subtasks = asyncio.run(
-            self.handle_decompose_append_task(
-                task, 
-                reset=False, 
-                coordinator_context=coordinator_context,
-                on_stream_batch=on_stream_batch, 
-                on_stream_text=on_stream_text
-            )
+        subtasks = await self.handle_decompose_append_task(
+            task,
+            reset=False,
+            coordinator_context=coordinator_context,
+            on_stream_batch=on_stream_batch,
+            on_stream_text=on_stream_text,
         )
         logger.info("=" * 80)
         logger.info(f"✅ [DECOMPOSE] Task decomposition COMPLETED", extra={
@@ -193,6 +203,65 @@ class Workforce(BaseWorkforce):
                 self._update_dependencies_for_decomposition(task, subtasks)
             return subtasks
 
+    async def _adecompose_task(self, task: Task, stream_callback=None) -> List[Task] | AsyncGenerator[List[Task], None]:
+        """Async counterpart of `_decompose_task`, streamed on the running loop.
+
+        Mirrors `Task.decompose`, but awaits `task_agent.astep` instead of
+        blocking on `step`, so no worker thread or nested event loop is needed.
+        """
+        decompose_prompt = str(
+            TASK_DECOMPOSE_PROMPT.format(
+                content=task.content,
+                child_nodes_info=self._get_child_nodes_info(),
+                additional_info=task.additional_info,
+            )
+        )
+        self.task_agent.reset()
+        msg = BaseMessage.make_user_message(role_name=self.task_agent.role_name, content=decompose_prompt)
+        response = await self.task_agent.astep(msg)
+
+        if not isinstance(response, AsyncStreamingChatAgentResponse):
+            subtasks = parse_response(response.msg.content, task.id)
+            for subtask in subtasks:
+                subtask.additional_info = task.additional_info
+                subtask.parent = task
+            task.subtasks = subtasks
+            if subtasks:
+                self._update_dependencies_for_decomposition(task, subtasks)
+            return subtasks
+
+        async def streaming_with_dependencies():
+            accumulated_content = ""
+            all_subtasks = []
+            async for chunk in response:
+                # task_agent streams with stream_accumulate=True
+                accumulated_content = chunk.msg.content if chunk.msg else accumulated_content
+                if stream_callback:
+                    try:
+                        await _maybe_await(stream_callback(chunk))
+                    except Exception as e:
+                        logger.warning(f"stream_callback failed during decomposition: {e}")
+                try:
+                    current_tasks = task._parse_partial_tasks(accumulated_content)
+                except Exception:
+                    continue
+                if len(current_tasks) > len(all_subtasks):
+                    new_tasks = current_tasks[len(all_subtasks):]
+                    for subtask in new_tasks:
+                        subtask.additional_info = task.additional_info
+                        subtask.parent = task
+                    all_subtasks.extend(new_tasks)
+                    self._update_dependencies_for_decomposition(task, all_subtasks)
+                    yield new_tasks
+
+            final_tasks = parse_response(accumulated_content, task.id)
+            for subtask in final_tasks:
+                subtask.additional_info = task.additional_info
+                subtask.parent = task
+            task.subtasks = final_tasks
+
+        return streaming_with_dependencies()
+
     async def handle_decompose_append_task(
         self,
         task: Task,
@@ -216,6 +285,7 @@ class Workforce(BaseWorkforce):
             List[Task]: The decomposed subtasks or the original task
         """
         logger.info(f"[DECOMPOSE] handle_decompose_append_task CALLED, task_id={task.id}, reset={reset}")
+        started = now_ns()
 
         if not validate_task_content(task.content, task.id):
             task.state = TaskState.FAILED
@@ -243,22 +313,22 @@ class Workforce(BaseWorkforce):
             task_with_context += original_content
             task.content = task_with_context
 
-            logger.info(f"[DECOMPOSE] Calling _decompose_task with context")
-            subtasks_result = self._decompose_task(task, stream_callback=on_stream_text)
+            logger.info(f"[DECOMPOSE] Calling _adecompose_task with context")
+            subtasks_result = await self._adecompose_task(task, stream_callback=on_stream_text)
 
             task.content = original_content
         else:
-            logger.info(f"[DECOMPOSE] Calling _decompose_task without context")
-            subtasks_result = self._decompose_task(task, stream_callback=on_stream_text)
+            logger.info(f"[DECOMPOSE] Calling _adecompose_task without context")
+            subtasks_result = await self._adecompose_task(task, stream_callback=on_stream_text)
 
-        logger.info(f"[DECOMPOSE] _decompose_task returned, processing results")
-        if isinstance(subtasks_result, Generator):
+        logger.info(f"[DECOMPOSE] _adecompose_task returned, processing results")
+        if isinstance(subtasks_result, AsyncGenerator):
             subtasks = []
-            for new_tasks in subtasks_result:
+            async for new_tasks in subtasks_result:
                 subtasks.extend(new_tasks)
                 if on_stream_batch:
                     try:
-                        on_stream_batch(new_tasks, False)
+                        await _maybe_await(on_stream_batch(new_tasks, False))
                     except Exception as e:
                         logger.warning(f"Streaming callback failed: {e}")
             logger.info(f"[DECOMPOSE] Collected {len(subtasks)} subtasks from generator")
@@ -287,10 +357,11 @@ class Workforce(BaseWorkforce):
 
         if on_stream_batch:
             try:
-                on_stream_batch(subtasks, True)
+                await _maybe_await(on_stream_batch(subtasks, True))
             except Exception as e:
                 logger.warning(f"Final streaming callback failed: {e}")
 
+        get_task_lock(self.api_task_id).timeline.add("decompose", "workforce", "workforce", started, subtasks=len(subtasks))
         return subtasks
 
     def _get_agent_id_from_node_id(self, node_id: str) -> str | None:
@@ -309,9 +380,11 @@ class Workforce(BaseWorkforce):
         # Task assignment phase: send "waiting for execution" notification
         # to the frontend, and send "start execution" notification when the
         # task actually begins execution
+        started = now_ns()
         assigned = await super()._find_assignee(tasks)
 
         task_lock = get_task_lock(self.api_task_id)
+        task_lock.timeline.add("find_assignee", "workforce", "workforce", started, tasks=len(tasks))
         for item in assigned.assignments:
             # DEBUG ▶ Task has been assigned to which worker and its dependencies
             logger.debug(f"[WF] ASSIGN {item.task_id} -> {item.assignee_id} deps={item.dependencies}")
@@ -398,7 +471,8 @@ class Workforce(BaseWorkforce):
                     )
                 )
         # Call the parent class method to continue the normal task publishing process
-        await super()._post_task(task, assignee_id)
+        with task_lock.timeline.span("post_task", "workforce", "workforce", task=task.id, assignee=assignee_id):
+            await super()._post_task(task, assignee_id)
 
     def add_single_agent_worker(
         self,
@@ -453,8 +527,8 @@ class Workforce(BaseWorkforce):
         is_main_task = self._task and task.id == self._task.id
         task_type = "MAIN TASK" if is_main_task else "SUB-TASK"
         logger.info(f"[TASK-RESULT] {task_type} COMPLETED: {task.id}")
-        logger.info(f"[TASK-RESULT] Content: {task.content[:200]}..." if len(task.content) > 200 else f"[TASK-RESULT] Content: {task.content}")
-        logger.info(f"[TASK-RESULT] Result: {task.result[:500]}..." if task.result and len(str(task.result)) > 500 else f"[TASK-RESULT] Result: {task.result}")
+        logger.info(lambda: f"[TASK-RESULT] Content: {task.content[:200]}..." if len(task.content) > 200 else f"[TASK-RESULT] Content: {task.content}")
+        logger.info(lambda: f"[TASK-RESULT] Result: {task.result[:500]}..." if task.result and len(str(task.result)) > 500 else f"[TASK-RESULT] Result: {task.result}")
 
         task_data = {
             "task_id": task.id,
@@ -38,6 +38,17 @@ app_logger.info(f"Loading routers with prefix: '{prefix}'")
 register_routers(api, prefix)
 app_logger.info("All routers loaded successfully")
 
+# Build or verify the shared terminal environment before the first task needs it
+from app.utils.toolkit.terminal_env import shared_terminal_env
+
+shared_terminal_env.warm_soon()
+
+# Measure event loop lag and record what blocks it, served at /debug/loop
+if env("LOOP_MONITOR", "true").lower() != "false":
+    from app.service.loop_monitor import loop_monitor
+
+    loop_monitor.start()
+
 # Check if debug mode is enabled via environment variable
 if os.environ.get('ENABLE_PYTHON_DEBUG') == 'true':
     try:
@@ -89,6 +100,10 @@ async def cleanup_resources():
         except asyncio.CancelledError:
             pass
 
+    from app.service.loop_monitor import loop_monitor
+
+    await loop_monitor.stop()
+
     # Cleanup all task locks
     for task_id in list(task_locks.keys()):
         try:
@@ -236,7 +236,7 @@ def mock_workforce():
     """Mock Workforce for testing."""
     workforce = MagicMock()
     workforce._running = False
-    workforce.node_make_sub_tasks = MagicMock(return_value=[])
+    workforce.node_make_sub_tasks = AsyncMock(return_value=[])
     workforce.node_start = AsyncMock()
     workforce.add_single_agent_worker = MagicMock()
     workforce.pause = MagicMock()
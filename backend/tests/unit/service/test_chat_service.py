@@ -1,13 +1,17 @@
+import asyncio
+import json
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 import os
 import tempfile
 from pathlib import Path
 
+from app.bench import step_solve as step_solve_bench
 from app.service.chat_service import (
+    PASS_THROUGH_EVENTS,
     step_solve,
     install_mcp,
-    to_sub_tasks,
     tree_sub_tasks,
     update_sub_tasks,
     add_sub_tasks,
@@ -17,10 +21,12 @@ from app.service.chat_service import (
     format_agent_description,
     new_agent_model,
     collect_previous_task_context,
-    build_context_for_workforce
+    build_context_for_workforce,
+    schedule_result_summary,
+    task_result_text,
 )
-from app.model.chat import Chat, NewAgent
-from app.service.task import Action, ActionImproveData, ActionEndData, ActionInstallMcpData, TaskLock
+from app.model.chat import Chat, NewAgent, sse_json
+from app.service.task import Action, ActionImproveData, ActionEndData, ActionInstallMcpData, ActionNoticeData, ActionSkipTaskData, ActionStopData, Agents, TaskLock, get_or_create_task_lock
 from camel.tasks import Task
 from camel.tasks.task import TaskState
 
@@ -475,22 +481,6 @@ class TestChatServiceUtilities:
         assert new_subtasks[0].id.startswith("main.")
         assert new_subtasks[1].id.startswith("main.")
 
-    def test_to_sub_tasks_creates_proper_response(self):
-        """Test to_sub_tasks creates properly formatted SSE response."""
-        task = Task(content="Main Task", id="main")
-        subtask = Task(content="Sub Task", id="sub")
-        subtask.state = TaskState.OPEN
-        task.add_subtask(subtask)
-        
-        summary_content = "Task Summary"
-        
-        result = to_sub_tasks(task, summary_content)
-        
-        # Should be a JSON string formatted for SSE
-        assert "to_sub_tasks" in result
-        assert "summary_task" in result
-        assert "sub_tasks" in result
-
     def test_format_agent_description_basic(self):
         """Test format_agent_description with basic agent data."""
         agent_data = NewAgent(
@@ -571,14 +561,15 @@ class TestChatServiceAgentOperations:
     @pytest.mark.asyncio
     async def test_summary_task(self, mock_camel_agent):
         """Test summary_task creates proper task summary."""
-        mock_camel_agent.step.return_value.msgs[0].content = "Web App Creation|Create a modern web application with user authentication and dashboard"
+        mock_camel_agent.astep.return_value.msgs = [MagicMock(content="Web App Creation|Create a modern web application with user authentication and dashboard")]
         
         task = Task(content="Create a web application with user authentication", id="web_app_task")
         
         result = await summary_task(mock_camel_agent, task)
         
         assert result == "Web App Creation|Create a modern web application with user authentication and dashboard"
-        mock_camel_agent.step.assert_called_once()
+        mock_camel_agent.astep.assert_awaited_once()
+        mock_camel_agent.step.assert_not_called()
 
     @pytest.mark.asyncio
     async def test_new_agent_model_creation(self, sample_chat_data):
@@ -629,6 +620,41 @@ class TestChatServiceAgentOperations:
             # Should add multiple agent workers
             assert mock_workforce.add_single_agent_worker.call_count >= 4
 
+    @pytest.mark.asyncio
+    async def test_construct_workforce_builds_agents_concurrently(self, sample_chat_data):
+        """Test construct_workforce runs sync factories and the workforce assembly off the loop and reports timings."""
+        options = Chat(**sample_chat_data)
+        task_lock = TaskLock(options.project_id, asyncio.Queue(), {})
+        loop_thread = threading.get_ident()
+        factory_threads = {}
+
+        def sync_factory(name):
+            def factory(*args, **kwargs):
+                factory_threads[name] = threading.get_ident()
+                return MagicMock(name=name)
+            return factory
+
+        with patch("app.service.chat_service.agent_model", side_effect=sync_factory("planner")), \
+             patch("app.service.chat_service.Workforce", side_effect=sync_factory("workforce")), \
+             patch("app.service.chat_service.search_agent", side_effect=sync_factory("search")), \
+             patch("app.service.chat_service.multi_modal_agent", side_effect=sync_factory("multi_modal")), \
+             patch("app.service.chat_service.developer_agent", new_callable=AsyncMock), \
+             patch("app.service.chat_service.document_agent", new_callable=AsyncMock), \
+             patch("app.service.chat_service.mcp_agent", new_callable=AsyncMock), \
+             patch("app.service.chat_service.get_task_lock_if_exists", return_value=task_lock), \
+             patch("app.utils.toolkit.human_toolkit.get_task_lock", return_value=task_lock):
+
+            workforce, _ = await construct_workforce(options)
+
+            assert set(factory_threads) == {"planner", "search", "multi_modal", "workforce"}
+            assert loop_thread not in factory_threads.values()
+            assert workforce.add_single_agent_worker.call_count == 4
+
+        notice = await asyncio.wait_for(task_lock.get_queue(), timeout=1)
+        assert isinstance(notice, ActionNoticeData)
+        assert notice.process_task_id == ""
+        assert Agents.search_agent.value in notice.data
+
     @pytest.mark.asyncio
     async def test_install_mcp_success(self, mock_camel_agent):
         """Test install_mcp successfully installs MCP tools."""
@@ -795,7 +821,7 @@ class TestChatServiceIntegration:
             
             mock_question_agent.return_value = MagicMock()
             mock_summary_agent.return_value = MagicMock()
-            mock_workforce.node_make_sub_tasks.return_value = []
+            mock_workforce.node_make_sub_tasks = AsyncMock(return_value=[])
             
             # Convert async generator to list
             responses = []
@@ -1072,7 +1098,7 @@ class TestChatServiceErrorCases:
     @pytest.mark.asyncio
     async def test_summary_task_agent_error(self, mock_camel_agent):
         """Test summary_task when agent raises error."""
-        mock_camel_agent.step.side_effect = Exception("Summary error")
+        mock_camel_agent.astep.side_effect = Exception("Summary error")
         
         task = Task(content="Test task", id="test")
         
@@ -1136,3 +1162,233 @@ class TestChatServiceErrorCases:
         
         # Should filter out empty content tasks
         assert len(result) <= 1
+
+
+@pytest.mark.unit
+class TestPassThroughEvents:
+    """Test cases for pass-through dispatch and serialize-once SSE events."""
+
+    def test_sse_event_is_serialized_once(self):
+        """Test an SSE event keeps the old frame format and reuses its JSON for sync."""
+        event = sse_json("notice", {"notice": "héllo", "process_task_id": "1"})
+
+        assert event == 'data: {"step": "notice", "data": {"notice": "héllo", "process_task_id": "1"}}\n\n'
+        assert event.encoded == event.encode("utf-8")
+        assert json.loads(event.sync_body(task_id="t1", timestamp=1.5)) == {
+            "task_id": "t1",
+            "timestamp": 1.5,
+            "step": "notice",
+            "data": {"notice": "héllo", "process_task_id": "1"},
+        }
+
+    def test_pass_through_table_covers_forwarded_actions(self):
+        """Test control actions stay out of the pass-through table."""
+        assert PASS_THROUGH_EVENTS[Action.decompose_progress][0] == "to_sub_tasks"
+        for action in (Action.improve, Action.end, Action.stop, Action.pause, Action.install_mcp, Action.new_agent):
+            assert action not in PASS_THROUGH_EVENTS
+
+    def test_step_solve_forwards_events_and_syncs_without_parsing(self):
+        """Test queued events come out in order and sync bodies are spliced, not re-parsed."""
+        sent = []
+
+        async def fake_send(url, data):
+            sent.append(data)
+
+        with patch("app.utils.server.sync_step.json.loads", side_effect=AssertionError("parsed")):
+            report = step_solve_bench.run(14, sync=True)
+
+        assert report["frames"] == 15  # "confirmed" and the queued events
+        assert report["synced_events"] == 15
+
+        frames = []
+
+        async def collect():
+            task_lock = get_or_create_task_lock("dispatch_order")
+            await task_lock.put_queue(ActionImproveData(data="q"))
+            for event in step_solve_bench.make_events(7):
+                await task_lock.put_queue(event)
+            await task_lock.put_queue(ActionStopData())
+            options = Chat(
+                task_id="t", project_id="dispatch_order", question="q", email="e@example.com",
+                model_platform="openai", model_type="gpt-4", api_key="k",
+            )
+            with (
+                patch("app.service.chat_service.question_confirm_agent") as question_agent,
+                patch("app.service.chat_service.question_confirm", AsyncMock(return_value=False)),
+                patch("app.utils.server.sync_step.env", return_value="http://sync.invalid"),
+                patch("app.utils.server.sync_step.send_to_api", fake_send),
+            ):
+                question_agent.return_value.step.return_value = MagicMock(msgs=[MagicMock(content="answer")])
+                async for frame in step_solve(options, step_solve_bench.FakeRequest(), task_lock):
+                    frames.append(frame)
+
+        asyncio.run(collect())
+
+        assert json.loads(frames[0][len("data: "):])["data"]["content"] == "answer"
+        steps = [json.loads(frame[len("data: "):])["step"] for frame in frames]
+        assert steps == [
+            "wait_confirm", "activate_agent", "activate_toolkit", "terminal", "deactivate_toolkit",
+            "notice", "write_file", "deactivate_agent",
+        ]
+        assert all(isinstance(body, bytes) for body in sent)
+        assert [json.loads(body)["step"] for body in sent] == steps
+
+
+@pytest.mark.unit
+class TestTwoPhaseCompletion:
+    """Test cases for sending `end` at once and the result summary afterwards."""
+
+    @staticmethod
+    def finished_task(subtask_count=2):
+        task = Task(content="Write a report", id="report")
+        for i in range(subtask_count):
+            subtask = Task(content=f"part {i}", id=f"report.{i}")
+            subtask.result = f"result {i}"
+            task.add_subtask(subtask)
+        task.result = "--- Subtask report.0 Result ---\nresult 0"
+        return task
+
+    @staticmethod
+    def summary_agent(text="All parts done", delay=0):
+        agent = MagicMock()
+
+        async def astep(prompt):
+            await asyncio.sleep(delay)
+            return MagicMock(msgs=[MagicMock(content=text)])
+
+        agent.astep = astep
+        return agent
+
+    def test_summary_follows_and_agents_are_pooled(self):
+        """Test the summary is queued, recorded in history and its agent reused."""
+        async def run():
+            task_lock = TaskLock("two_phase_pool", asyncio.Queue(), {})
+            options = MagicMock(project_id="two_phase_pool")
+            agent = self.summary_agent()
+            with patch("app.service.chat_service.task_summary_agent", return_value=agent) as factory:
+                for _ in range(2):
+                    entry = task_lock.add_conversation("task_result", {"task_content": "c", "task_result": "raw"})
+                    schedule_result_summary(self.finished_task(), options, task_lock, entry)
+                    await task_lock.pending_summary
+                    event = task_lock.queue.get_nowait()
+                    assert event.action == Action.task_summary and event.task_id == "report"
+                    assert event.data == "All parts done"
+                    assert entry["content"]["task_result"] == "All parts done"
+                    assert task_lock.last_task_result == "All parts done"
+            assert factory.call_count == 1
+            assert agent.reset.call_count == 2
+            assert task_lock.summary_agents == [agent]
+
+        asyncio.run(run())
+
+    def test_single_subtask_result_is_final(self):
+        """Test a one-subtask result is unwrapped and not summarized."""
+        task = self.finished_task(1)
+        task_lock = TaskLock("two_phase_single", asyncio.Queue(), {})
+
+        assert task_result_text(task) == "result 0"
+        schedule_result_summary(task, MagicMock(), task_lock, {})
+        assert task_lock.pending_summary is None
+
+    def test_newer_end_cancels_pending_summary(self):
+        """Test a summary still running when the next task ends is dropped."""
+        async def run():
+            task_lock = TaskLock("two_phase_cancel", asyncio.Queue(), {})
+            options = MagicMock(project_id="two_phase_cancel")
+            with patch("app.service.chat_service.task_summary_agent", return_value=self.summary_agent(delay=10)):
+                schedule_result_summary(self.finished_task(), options, task_lock, {"content": {}})
+                first = task_lock.pending_summary
+                await asyncio.sleep(0)
+                schedule_result_summary(self.finished_task(1), options, task_lock, {"content": {}})
+                with pytest.raises(asyncio.CancelledError):
+                    await first
+            assert task_lock.queue.empty()
+            assert len(task_lock.summary_agents) == 1
+
+        asyncio.run(run())
+
+    def test_step_solve_sends_end_before_summary(self):
+        """Test `end` carries the raw result and the summary frame comes after it."""
+        frames = []
+
+        class Workforce(step_solve_bench.FakeWorkforce):
+            async def node_make_sub_tasks(self, task, context, on_stream_batch=None, on_stream_text=None):
+                for subtask in TestTwoPhaseCompletion.finished_task().subtasks:
+                    task.add_subtask(subtask)
+                task.result = "raw aggregate"
+                return task.subtasks
+
+        async def collect():
+            task_lock = get_or_create_task_lock("two_phase_stream")
+            await task_lock.put_queue(ActionImproveData(data="q"))
+            options = Chat(
+                task_id="t", project_id="two_phase_stream", question="q", email="e@example.com",
+                model_platform="openai", model_type="gpt-4", api_key="k",
+            )
+            with (
+                patch("app.service.chat_service.question_confirm_agent"),
+                patch("app.service.chat_service.question_confirm", AsyncMock(return_value=True)),
+                patch("app.service.chat_service.construct_workforce", AsyncMock(return_value=(Workforce(), None))),
+                patch("app.service.chat_service.pooled_summary_task", AsyncMock(return_value="Report|r")),
+                patch("app.service.chat_service.task_summary_agent", return_value=self.summary_agent(delay=0.05)),
+            ):
+                async for frame in step_solve(options, step_solve_bench.FakeRequest(), task_lock):
+                    event = json.loads(frame[len("data: "):])
+                    frames.append(event)
+                    if event["step"] == "to_sub_tasks" and event["data"].get("summary_task"):
+                        await task_lock.put_queue(ActionEndData())
+                    elif event["step"] == "summary":
+                        await task_lock.put_queue(ActionStopData())
+
+        asyncio.run(asyncio.wait_for(collect(), timeout=10))
+
+        steps = [event["step"] for event in frames]
+        assert steps.index("end") < steps.index("summary")
+        assert frames[steps.index("end")]["data"] == "raw aggregate"
+        assert frames[steps.index("summary")]["data"] == {"task_id": "t", "summary": "All parts done"}
+
+    def test_skip_task_cancels_pending_summary(self):
+        """Test stopping a task drops a summary still running, so it cannot overwrite the stop result."""
+        frames = []
+        pending = []
+        cancelled_at_end = []
+
+        class Workforce(step_solve_bench.FakeWorkforce):
+            async def node_make_sub_tasks(self, task, context, on_stream_batch=None, on_stream_text=None):
+                for subtask in TestTwoPhaseCompletion.finished_task().subtasks:
+                    task.add_subtask(subtask)
+                return task.subtasks
+
+        async def collect():
+            task_lock = get_or_create_task_lock("two_phase_skip")
+            await task_lock.put_queue(ActionImproveData(data="q"))
+            options = Chat(
+                task_id="t", project_id="two_phase_skip", question="q", email="e@example.com",
+                model_platform="openai", model_type="gpt-4", api_key="k",
+            )
+            with (
+                patch("app.service.chat_service.question_confirm_agent"),
+                patch("app.service.chat_service.question_confirm", AsyncMock(return_value=True)),
+                patch("app.service.chat_service.construct_workforce", AsyncMock(return_value=(Workforce(), None))),
+                patch("app.service.chat_service.pooled_summary_task", AsyncMock(return_value="Report|r")),
+                patch("app.service.chat_service.task_summary_agent", return_value=self.summary_agent(delay=10)),
+            ):
+                async for frame in step_solve(options, step_solve_bench.FakeRequest(), task_lock):
+                    event = json.loads(frame[len("data: "):])
+                    frames.append(event)
+                    if event["step"] == "to_sub_tasks" and event["data"].get("summary_task"):
+                        # The previous task's summary is still being written
+                        schedule_result_summary(self.finished_task(), options, task_lock, {"content": {}})
+                        pending.append(task_lock.pending_summary)
+                        await task_lock.put_queue(ActionSkipTaskData(project_id="two_phase_skip"))
+                    elif event["step"] == "end":
+                        await asyncio.sleep(0.01)
+                        cancelled_at_end.append(pending[0].cancelled())
+                        await task_lock.put_queue(ActionStopData())
+            return task_lock
+
+        task_lock = asyncio.run(asyncio.wait_for(collect(), timeout=10))
+
+        assert "end" in [event["step"] for event in frames]
+        assert cancelled_at_end == [True]
+        assert task_lock.last_task_result == "<summary>Task stopped</summary>Task stopped by user"
@@ -0,0 +1,111 @@
+import os
+
+import pytest
+
+from app.service.conversation_history import ConversationHistory, condense_entries
+from app.service.task import TaskLock
+
+
+@pytest.mark.unit
+class TestConversationHistory:
+    """Test cases for ConversationHistory."""
+
+    def test_running_total_and_window(self, temp_dir):
+        """Test the char total is maintained incrementally and windows return the newest entries."""
+        history = ConversationHistory("project_1", spill_dir=str(temp_dir))
+        for i in range(10):
+            history.add("assistant", f"answer {i}")
+
+        assert len(history) == 10
+        assert history.total_chars == sum(len(f"answer {i}") for i in range(10))
+        assert [e["content"] for e in history.recent(3)] == ["answer 7", "answer 8", "answer 9"]
+        assert history.recent(0) == []
+        assert len(history.recent()) == 10
+
+    def test_compaction_spills_and_summarises(self, temp_dir):
+        """Test exceeding the budget moves the oldest entries to disk and into the summary."""
+        history = ConversationHistory("project_1", max_chars=100, spill_dir=str(temp_dir))
+        for i in range(6):
+            history.add("assistant", f"{i}" * 30)
+
+        assert history.total_chars <= 100
+        assert history.compacted_count > 0
+        assert len(history) + history.compacted_count == 6
+        assert history[-1]["content"] == "5" * 30
+        assert "assistant: 000" in history.summary
+
+        spilled = list(history.iter_spilled())
+        assert len(spilled) == history.compacted_count
+        assert spilled[0]["content"] == "0" * 30
+
+        history.clear()
+        assert list(history.iter_spilled()) == []
+        assert history.total_chars == 0
+
+    def test_spill_path_stays_in_spill_dir(self, temp_dir):
+        """Test a project id with path separators cannot escape the spill directory."""
+        history = ConversationHistory("../../escape", spill_dir=str(temp_dir))
+
+        assert os.path.dirname(history.spill_path) == str(temp_dir)
+        assert ".." not in os.path.basename(history.spill_path)
+
+    def test_task_result_dict_entries(self, temp_dir):
+        """Test dict contents count by their string form and summarise by their summary field."""
+        history = ConversationHistory("project_1", max_chars=50, spill_dir=str(temp_dir))
+        history.add("task_result", {"task_content": "Build a site", "summary_task": "Site|Build a site", "task_result": "x" * 80})
+        history.add("assistant", "done")
+
+        assert history.compacted_count == 1
+        assert "task_result: Site|Build a site" in history.summary
+
+    def test_update_keeps_running_total(self, temp_dir):
+        """Test replacing an entry's content adjusts the total, and compacted entries are left alone."""
+        history = ConversationHistory("project_1", max_chars=60, spill_dir=str(temp_dir))
+        first = history.add("task_result", "raw result")
+        history.add("assistant", "ok")
+
+        assert history.update(first, "summarized result")
+        assert history.total_chars == len("summarized result") + len("ok")
+
+        newest = history.add("assistant", "y" * 50)
+        assert not history.update(first, "late")
+        assert first["content"] == "summarized result"
+        assert history.update(newest, "short")
+        assert history.total_chars == len("short")
+
+    def test_condense_entries_is_bounded(self):
+        """Test the default summarizer keeps the summary under its character cap."""
+        summary = ""
+        for i in range(50):
+            summary = condense_entries(summary, [{"role": "assistant", "content": f"message {i} " * 40}], max_chars=1000)
+
+        assert len(summary) <= 1000
+        assert "message 49" in summary
+
+
+@pytest.mark.unit
+class TestTaskLockConversationHistory:
+    """Test cases for TaskLock integration with ConversationHistory."""
+
+    def test_assigning_list_wraps_history(self):
+        """Test assigning a plain list keeps the bounded store."""
+        task_lock = TaskLock("project_1", None, {})
+        task_lock.conversation_history = [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello"},
+        ]
+
+        assert isinstance(task_lock.conversation_history, ConversationHistory)
+        assert task_lock.conversation_history.total_chars == 7
+        assert task_lock.conversation_history[0]["role"] == "user"
+
+    def test_get_recent_context_includes_summary(self, temp_dir):
+        """Test get_recent_context prepends the rolling summary once entries are compacted."""
+        task_lock = TaskLock("project_1", None, {})
+        task_lock.conversation_history = ConversationHistory("project_1", max_chars=40, spill_dir=str(temp_dir))
+        task_lock.add_conversation("user", "a" * 30)
+        task_lock.add_conversation("assistant", "b" * 30)
+
+        context = task_lock.get_recent_context(max_entries=1)
+        assert context.startswith("=== Recent Conversation ===\nsummary: - user: aaa")
+        assert context.endswith(f"assistant: {'b' * 30}\n")
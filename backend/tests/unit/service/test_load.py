@@ -0,0 +1,60 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.bench.load import Server, compare, load_baseline, save_baseline, summarize
+
+
+def result(ttfe_ms, frames, control_ms=None, error=None):
+    return {"ttfe_ms": ttfe_ms, "frames": frames, "control_ms": control_ms or {}, "error": error}
+
+
+@pytest.mark.unit
+class TestLoadBench:
+    """Test cases for the concurrent projects load test."""
+
+    def test_summarize(self):
+        """Test per-project timings are merged into percentiles, throughput and failures."""
+        report = summarize(
+            [
+                result(100.0, 40, {"start": [5.0], "stop": [20.0]}),
+                result(300.0, 60, {"start": [7.0]}, error="stream closed before end"),
+            ],
+            elapsed=10.0,
+            projects=2,
+        )
+        assert report["frames"] == 100 and report["events_per_sec"] == 10.0
+        assert report["ttfe_ms_p50"] == 300.0 and report["ttfe_ms_p99"] == 300.0
+        assert report["control_ms"]["start"] == {"p50": 7.0, "p99": 7.0}
+        assert report["control_ms_p99"] == 20.0
+        assert report["failed"] == ["stream closed before end"]
+
+    def test_compare_against_baseline(self):
+        """Test a metric regresses only past both the relative tolerance and its noise floor, in its own direction."""
+        baseline = {"ttfe_ms_p99": 1000.0, "events_per_sec": 100.0, "control_ms_p50": 2.0}
+        assert compare({"ttfe_ms_p99": 1400.0, "events_per_sec": 120.0, "control_ms_p50": 6.0}, baseline, 0.5) == []
+
+        regressions = compare({"ttfe_ms_p99": 1600.0, "events_per_sec": 40.0, "control_ms_p50": 8.0}, baseline, 0.5)
+        assert [line.split(":")[0] for line in regressions] == ["ttfe_ms_p99", "events_per_sec", "control_ms_p50"]
+
+    def test_baseline_round_trip(self, temp_dir):
+        """Test baselines are stored per number of projects, keeping the others."""
+        path = str(temp_dir / "baseline.json")
+        assert load_baseline(path, 8) is None
+        save_baseline(path, {"projects": 8, "ttfe_ms_p50": 10.0, "traced_kb_per_project": None, "frames": 5})
+        save_baseline(path, {"projects": 2, "ttfe_ms_p50": 4.0})
+
+        assert load_baseline(path, 8) == {"ttfe_ms_p50": 10.0}
+        assert load_baseline(path, 2) == {"ttfe_ms_p50": 4.0}
+
+    def test_server_serves_from_its_thread(self):
+        """Test the app is served on a free local port and shut down on exit."""
+        app = FastAPI()
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        with Server(app) as server:
+            assert httpx.get(f"{server.url}/ping").json() == {"ok": True}
+        assert not server.thread.is_alive()
@@ -0,0 +1,66 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.controller.debug_controller import loop_stats
+from app.service.loop_monitor import LoopMonitor, percentile
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+@pytest.mark.unit
+class TestLoopMonitor:
+    """Test cases for the event loop lag monitor."""
+
+    def test_blocking_call_is_recorded_with_its_stack(self, temp_dir):
+        """Test a blocking call shows up as a stall whose stack names the blocking function."""
+        log_path = temp_dir / "loop.jsonl"
+
+        async def run():
+            monitor = LoopMonitor(interval=0.02, stall_threshold=0.05, log_path=str(log_path))
+            assert monitor.start()
+            await asyncio.sleep(0.1)
+            block_the_loop(0.3)
+            await asyncio.sleep(0.1)
+            await monitor.stop()
+            return monitor.stats()
+
+        stats = asyncio.run(run())
+
+        assert stats.samples > 3 and stats.lag_ms_max >= 200
+        stall = stats.stalls[0]
+        assert stall.source == "watchdog" and stall.duration_ms >= 200
+        assert any("block_the_loop" in frame for stack in stall.stacks for frame in stack)
+        logged = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert logged[-1]["duration_ms"] == stall.duration_ms
+
+    def test_debug_mode_records_slow_callbacks(self):
+        """Test asyncio debug mode reports of slow callbacks are kept as stalls."""
+        async def run():
+            monitor = LoopMonitor(interval=1, stall_threshold=0.05, debug=True)
+            monitor.start()
+            loop = asyncio.get_running_loop()
+            assert loop.get_debug() and loop.slow_callback_duration == 0.05
+            loop.call_soon(block_the_loop, 0.1)
+            await asyncio.sleep(0.2)
+            await monitor.stop()
+            return monitor.stats()
+
+        stats = asyncio.run(run())
+
+        slow = [stall for stall in stats.stalls if stall.source == "asyncio"]
+        assert slow and "block_the_loop" in slow[0].description
+
+    def test_stats_without_a_loop(self):
+        """Test the monitor reports empty stats until started, and the endpoint serves them."""
+        monitor = LoopMonitor()
+
+        assert not monitor.start()
+        stats = monitor.stats()
+        assert not stats.running and stats.samples == 0 and stats.lag_ms_p99 == 0
+        assert percentile([0.1, 0.2, 0.3, 0.4], 0.5) == 0.3
+        assert asyncio.run(loop_stats()).interval_ms > 0
@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import pytest
+
+from app.bench import replay as replay_bench
+from app.bench.replay import Cassette, ReplayModel, ScriptedModel, record_backend
+
+
+def model_entry(agent, content, chunks=False):
+    backend = ScriptedModel(model_config_dict={"stream": chunks})
+    reply = {"content": content}
+    if chunks:
+        return {"type": "model", "agent": agent, "seconds": 0.5, "chunks": [c.model_dump(mode="json") for c in backend.chunks(reply)]}
+    return {"type": "model", "agent": agent, "seconds": 0.5, "completion": backend.completion(reply).model_dump(mode="json")}
+
+
+def replay_model(cassette, agent, stream=False):
+    model = ReplayModel(cassette, model_config_dict={"stream": stream})
+    model._cassette_agent = agent
+    return model
+
+
+@pytest.mark.unit
+class TestReplay:
+    """Test cases for the record-and-replay harness."""
+
+    def test_cassette_round_trip(self, temp_dir):
+        """Test a written cassette loads back into per-agent queues, skipping the meta line."""
+        path = temp_dir / "run.jsonl"
+        cassette = Cassette({"question": "q", "task_id": "t1"})
+        cassette.open(str(path))
+        cassette.write(model_entry("task_agent", "plan"))
+        cassette.write({"type": "tool", "agent": "developer_agent", "name": "shell_exec", "result": "ok"})
+        cassette.write({"type": "workers", "ids": {"Developer Agent: codes": "old-id"}})
+        cassette.close()
+
+        loaded = Cassette.load(str(path))
+        assert loaded.meta["task_id"] == "t1"
+        assert len(loaded.models["task_agent"]) == 1
+        assert loaded.next_tool("developer_agent", "shell_exec")["result"] == "ok"
+        assert loaded.next_tool("developer_agent", "shell_exec") is None
+        assert loaded.misses == 1
+        assert loaded.workers == {"Developer Agent: codes": "old-id"}
+
+    def test_worker_ids_are_rewritten(self):
+        """Test recorded answers naming a worker get the node id of the replaying run."""
+        cassette = Cassette()
+        cassette.add({"type": "workers", "ids": {"Developer Agent: codes": "old-id", "Gone Agent": "gone-id"}})
+        cassette.add(model_entry("coordinator_agent", json.dumps({"assignments": [{"task_id": "t.1", "assignee_id": "old-id"}]})))
+        cassette.map_workers({"Developer Agent: codes": "new-id"})
+
+        entry = cassette.next_model("coordinator_agent")
+        assert "new-id" in entry["completion"]["choices"][0]["message"]["content"]
+        assert "old-id" not in json.dumps(entry)
+
+    def test_replay_model_serves_in_order(self):
+        """Test completions and streams are served per agent in order, and a miss answers "Done."."""
+        cassette = Cassette()
+        cassette.add(model_entry("task_agent", "first"))
+        cassette.add(model_entry("task_agent", "second " * 10, chunks=True))
+
+        model = replay_model(cassette, "task_agent")
+        assert model._run([]).choices[0].message.content == "first"
+        chunks = list(model._run([]))
+        assert "".join(c.choices[0].delta.content for c in chunks if c.choices) == "second " * 10
+        assert chunks[-1].usage.total_tokens == 120
+
+        assert model._run([]).choices[0].message.content == "Done."
+        assert replay_model(cassette, "other_agent")._run([]).choices[0].message.content == "Done."
+        assert cassette.misses == 2
+
+    def test_replay_model_async_and_latency(self, monkeypatch):
+        """Test the async path streams too and waits the recorded seconds scaled by the latency."""
+        slept = []
+
+        async def fake_sleep(seconds):
+            slept.append(seconds)
+
+        monkeypatch.setattr(replay_bench.asyncio, "sleep", fake_sleep)
+        cassette = Cassette()
+        cassette.add(model_entry("task_agent", "streamed", chunks=True))
+        model = replay_model(cassette, "task_agent")
+        model.latency = 0.5
+
+        async def run():
+            return [chunk async for chunk in await model._arun([])]
+
+        chunks = asyncio.run(run())
+        assert chunks[0].choices[0].delta.content == "streamed"
+        assert slept == [0.25]
+
+    def test_record_backend_writes_streams(self):
+        """Test a recorded stream is written once its usage chunk is read, even if the reader stops there."""
+        cassette = Cassette()
+        backend = ScriptedModel(model_config_dict={"stream": True})
+        backend._cassette_agent = "task_summary_agent"
+        record_backend(backend, cassette)
+
+        stream = backend._run([{"role": "user", "content": "anything"}])
+        for chunk in stream:
+            if chunk.usage:
+                break
+        entry = cassette.models["task_summary_agent"][0]
+        assert entry["chunks"][-1]["usage"]["total_tokens"] == 120
+
+        backend.model_config_dict["stream"] = False
+        backend._run([{"role": "user", "content": "anything"}])
+        assert "completion" in cassette.models["task_summary_agent"][1]
+
+    def test_scripted_assignments(self):
+        """Test the scripted coordinator assigns each subtask once, the first to the document agent."""
+        model = ScriptedModel()
+        model._cassette_agent = "coordinator_agent"
+        prompt = (
+            'Answer with "assignments".\n<w-doc>:<Document Agent: files>\n<w-dev>:<Developer Agent: code>\n'
+            "Task ID: t.1\nTask ID: t.2\nTask ID: t.1\n"
+        )
+        assignments = json.loads(model.reply([{"role": "user", "content": prompt}])["content"])["assignments"]
+        assert [(a["task_id"], a["assignee_id"], a["dependencies"]) for a in assignments] == [
+            ("t.1", "w-doc", []),
+            ("t.2", "w-dev", ["t.1"]),
+        ]
+
+    def test_shipped_cassette(self):
+        """Test the default cassette has the workers and a response for every agent of the run."""
+        cassette = Cassette.load(replay_bench.default_cassette)
+        assert cassette.meta["scripted"] is True
+        assert any(description.startswith("Developer Agent") for description in cassette.workers)
+        for agent in ("question_confirm_agent", "task_agent", "coordinator_agent", "document_agent", "developer_agent", "task_summary_agent"):
+            assert cassette.models[agent], agent
+        assert cassette.tools[("developer_agent", "shell_exec")][0]["result"].startswith("3 ")
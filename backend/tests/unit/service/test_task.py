@@ -287,6 +287,52 @@ class TestTaskLock:
         assert task1.cancelled()
         assert task2.cancelled()
 
+    @pytest.mark.asyncio
+    async def test_task_lock_put_queue_threadsafe_from_worker_thread(self):
+        """Test put_queue_threadsafe delivers items queued from a worker thread."""
+        task_lock = TaskLock("test_123", asyncio.Queue(), {})
+        data = ActionStartData()
+
+        await asyncio.to_thread(task_lock.put_queue_threadsafe, data)
+
+        retrieved_data = await asyncio.wait_for(task_lock.get_queue(), timeout=1)
+        assert retrieved_data == data
+
+    @pytest.mark.asyncio
+    async def test_task_lock_put_queue_threadsafe_on_loop(self):
+        """Test put_queue_threadsafe schedules a tracked task on the running loop."""
+        task_lock = TaskLock("test_123", asyncio.Queue(), {})
+        data = ActionStartData()
+
+        task_lock.put_queue_threadsafe(data)
+        assert len(task_lock.background_tasks) == 1
+
+        retrieved_data = await asyncio.wait_for(task_lock.get_queue(), timeout=1)
+        assert retrieved_data == data
+
+    @pytest.mark.asyncio
+    async def test_task_lock_put_queue_threadsafe_from_other_loop(self):
+        """Test put_queue_threadsafe from a thread running its own loop hands the item to the queue's loop."""
+        task_lock = TaskLock("test_123", asyncio.Queue(), {})
+        data = ActionStartData()
+        put_queue = task_lock.put_queue
+        loops = []
+
+        async def recording_put_queue(item):
+            loops.append(asyncio.get_running_loop())
+            await put_queue(item)
+
+        task_lock.put_queue = recording_put_queue
+
+        async def other_loop():
+            task_lock.put_queue_threadsafe(data)
+
+        await asyncio.to_thread(asyncio.run, other_loop())
+
+        retrieved_data = await asyncio.wait_for(task_lock.get_queue(), timeout=1)
+        assert retrieved_data == data
+        assert loops == [asyncio.get_running_loop()]
+
 
 @pytest.mark.unit
 class TestTaskLockManagement:
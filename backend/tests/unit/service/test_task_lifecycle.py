@@ -0,0 +1,111 @@
+import asyncio
+import gc
+import weakref
+from datetime import datetime, timedelta
+import pytest
+
+from app.model.chat import Status
+from app.service.task import Action, TaskLock, create_task_lock, task_locks
+from app.service.task_lifecycle import TaskLockLifecycle, estimate_task_lock_bytes
+
+
+@pytest.mark.unit
+class TestTaskLockLifecycle:
+    """Test cases for idle task lock eviction and accounting."""
+
+    def setup_method(self):
+        """Clean up task_locks before each test."""
+        task_locks.clear()
+
+    def teardown_method(self):
+        task_locks.clear()
+
+    @pytest.mark.asyncio
+    async def test_sweep_evicts_only_idle_locks(self):
+        """Test sweep removes idle locks and keeps fresh and busy ones."""
+        lifecycle = TaskLockLifecycle(idle_timeout=timedelta(hours=2))
+        stale = create_task_lock("stale")
+        stale.last_accessed = datetime.now() - timedelta(hours=3)
+        busy = create_task_lock("busy")
+        busy.last_accessed = datetime.now() - timedelta(hours=3)
+        busy.status = Status.processing
+        create_task_lock("fresh")
+
+        evicted = await lifecycle.sweep()
+
+        assert evicted == ["stale"]
+        assert set(task_locks) == {"busy", "fresh"}
+        assert lifecycle.stats().live_locks == 2
+        assert lifecycle.stats().busy_locks == 1
+        assert lifecycle.stats().evicted_total == 1
+
+    @pytest.mark.asyncio
+    async def test_sweep_enforces_byte_budget_lru_first(self):
+        """Test locks are evicted least recently used first while over max_bytes."""
+        lifecycle = TaskLockLifecycle(idle_timeout=timedelta(days=1))
+        for i in range(5):
+            lock = create_task_lock(f"project_{i}")
+            lock.last_accessed = datetime.now() - timedelta(minutes=10 - i)
+        lifecycle.max_bytes = 2 * estimate_task_lock_bytes(task_locks["project_0"])
+
+        evicted = await lifecycle.sweep()
+
+        assert evicted == ["project_0", "project_1", "project_2"]
+        assert lifecycle.stats().approx_bytes <= lifecycle.max_bytes
+
+    @pytest.mark.asyncio
+    async def test_evict_with_attached_stream_sends_stop(self):
+        """Test a lock with a waiting SSE consumer is asked to stop instead of deleted."""
+        lifecycle = TaskLockLifecycle(idle_timeout=timedelta(seconds=0))
+        lock = create_task_lock("streaming")
+        consumer = asyncio.create_task(lock.get_queue())
+        await asyncio.sleep(0)
+
+        await lifecycle.sweep(now=datetime.now() + timedelta(seconds=1))
+
+        item = await asyncio.wait_for(consumer, timeout=1)
+        assert item.action == Action.stop
+        assert "streaming" in task_locks
+
+    @pytest.mark.asyncio
+    async def test_persist_and_restore_history(self, temp_dir):
+        """Test evicted history is restored when the project is created again."""
+        lifecycle = TaskLockLifecycle(idle_timeout=timedelta(seconds=0), persist_dir=str(temp_dir))
+        lock = create_task_lock("project_1")
+        lock.add_conversation("assistant", "hello")
+        lock.last_task_result = "result"
+
+        await lifecycle.sweep(now=datetime.now() + timedelta(seconds=1))
+        assert "project_1" not in task_locks
+
+        restored = TaskLock("project_1", asyncio.Queue(), {})
+        assert lifecycle.restore(restored)
+        assert restored.conversation_history[0]["content"] == "hello"
+        assert restored.last_task_result == "result"
+
+    @pytest.mark.asyncio
+    async def test_soak_thousands_of_projects_stay_bounded(self):
+        """Soak: churn through thousands of projects and check live locks and bytes stay bounded."""
+        lifecycle = TaskLockLifecycle(idle_timeout=timedelta(minutes=5))
+        refs = []
+        live_peaks = []
+        byte_peaks = []
+        for round_no in range(10):
+            for i in range(500):
+                lock = create_task_lock(f"soak_{round_no}_{i}")
+                lock.add_conversation("assistant", "x" * 200)
+                # Everything created in earlier rounds has gone idle by the next sweep
+                lock.last_accessed = datetime.now() + timedelta(minutes=10 * round_no)
+                refs.append(weakref.ref(lock))
+            del lock
+            await lifecycle.sweep(now=datetime.now() + timedelta(minutes=10 * round_no + 1))
+            stats = lifecycle.stats()
+            live_peaks.append(stats.live_locks)
+            byte_peaks.append(stats.approx_bytes)
+
+        gc.collect()
+        assert max(live_peaks) == 500
+        assert max(byte_peaks) == byte_peaks[0]
+        assert lifecycle.evicted_total == 4500
+        # Evicted locks are released, not just dropped from the registry
+        assert sum(1 for ref in refs if ref() is not None) == 500
@@ -0,0 +1,87 @@
+import asyncio
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+from camel.agents import ChatAgent
+
+from app.controller.task_controller import get_timeline
+from app.exception.exception import UserException
+from app.service.task import ActionNoticeData, TaskLock, create_task_lock, task_locks
+from app.service.task_timeline import TaskTimeline, now_ns
+from app.utils.agent import ListenChatAgent
+
+
+@pytest.mark.unit
+class TestTaskTimeline:
+    """Test cases for per-task spans and their Chrome trace export."""
+
+    def test_chrome_trace_lanes_and_task_filter(self):
+        """Test spans become complete events on named lanes, filterable by task."""
+        current = {"task": "t1"}
+        timeline = TaskTimeline(lambda: current["task"])
+        with timeline.span("step", "agent", "developer_agent 1234") as args:
+            args["tokens"] = 42
+        with pytest.raises(ValueError):
+            with timeline.span("shell_exec", "tool", "developer_agent 1234"):
+                raise ValueError("boom")
+        current["task"] = "t2"
+        timeline.add("decompose", "workforce", "workforce", now_ns())
+
+        trace = json.loads(json.dumps(timeline.chrome_trace(name="project")))
+        events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        lanes = {event["args"]["name"]: event["tid"] for event in trace["traceEvents"] if event["name"] == "thread_name"}
+
+        assert [event["name"] for event in events] == ["step", "shell_exec", "decompose"]
+        assert events[0]["args"] == {"task_id": "t1", "tokens": 42} and events[0]["dur"] >= 0
+        assert events[1]["args"]["error"] == "ValueError"
+        assert lanes == {"developer_agent 1234": events[0]["tid"], "workforce": events[2]["tid"]}
+        assert [event["name"] for event in timeline.chrome_trace("t1")["traceEvents"] if event["ph"] == "X"] == [
+            "step",
+            "shell_exec",
+        ]
+
+    def test_queue_dwell_runs_from_put_to_next_get(self):
+        """Test each event's span ends when the consumer comes back for the next one."""
+        async def run():
+            task_lock = TaskLock("timeline_queue", asyncio.Queue(), {})
+            await task_lock.put_queue(ActionNoticeData(process_task_id="1", data="a"))
+            await task_lock.put_queue(ActionNoticeData(process_task_id="1", data="b"))
+            await task_lock.get_queue()
+            await asyncio.sleep(0.01)
+            await task_lock.get_queue()
+            return task_lock.timeline
+
+        timeline = asyncio.run(run())
+
+        assert [(span.name, span.cat, span.lane) for span in timeline.spans] == [("notice", "queue", "sse queue")]
+        span = timeline.spans[0]
+        assert span.end_ns - span.start_ns >= 10_000_000 and span.args["wait_ms"] < 10
+
+    def test_agent_steps_are_recorded(self):
+        """Test ListenChatAgent.step adds a span on the agent's lane."""
+        task_lock = TaskLock("timeline_agent", asyncio.Queue(), {})
+        with (
+            patch("app.utils.agent.get_task_lock", return_value=task_lock),
+            patch("camel.models.ModelFactory.create", return_value=MagicMock()),
+            patch("asyncio.create_task"),
+            patch.object(ChatAgent, "step", return_value=MagicMock(msg=MagicMock(content="hi"), info={})),
+        ):
+            agent = ListenChatAgent(api_task_id="timeline_agent", agent_name="search_agent", model="gpt-4")
+            agent.step("hello")
+
+        assert [(span.name, span.lane) for span in task_lock.timeline.spans] == [("step", agent.timeline_lane)]
+
+    def test_timeline_endpoint(self):
+        """Test the endpoint exports the project's trace and 404s for unknown projects."""
+        task_lock = create_task_lock("timeline_endpoint")
+        try:
+            task_lock.timeline.add("find_assignee", "workforce", "workforce", now_ns())
+            trace = get_timeline("timeline_endpoint")
+            assert trace["traceEvents"][0]["args"]["name"] == "timeline_endpoint"
+            assert trace["traceEvents"][-1]["name"] == "find_assignee"
+        finally:
+            task_locks.pop("timeline_endpoint", None)
+
+        with pytest.raises(UserException):
+            get_timeline("timeline_endpoint")
@@ -0,0 +1,143 @@
+import copy
+import json
+
+import pytest
+from camel.tasks import Task
+
+from app.controller.task_controller import get_sub_tasks
+from app.exception.exception import UserException
+from app.service.task import create_task_lock, task_locks
+from app.service.task_tree import TaskTreeStream, diff_task_trees, tree_sub_tasks
+
+
+def apply_ops(tree, ops):
+    """Reference client: the same rules as src/lib/subTaskTree.ts."""
+    tree = copy.deepcopy(tree)
+
+    def children_of(nodes, node_id):
+        for node in nodes:
+            if node["id"] == node_id:
+                return node["subtasks"]
+            found = children_of(node["subtasks"], node_id)
+            if found is not None:
+                return found
+        return None
+
+    def remove(nodes, node_id):
+        nodes[:] = [node for node in nodes if node["id"] != node_id]
+        for node in nodes:
+            remove(node["subtasks"], node_id)
+
+    for op in ops:
+        if op["op"] == "remove":
+            remove(tree, op["id"])
+        elif op["op"] == "add":
+            siblings = tree if op["parent"] is None else children_of(tree, op["parent"])
+            siblings.insert(op["index"], copy.deepcopy(op["node"]))
+        else:
+            parent = None
+            stack = list(tree)
+            while stack:
+                node = stack.pop()
+                if node["id"] == op["id"]:
+                    parent = node
+                    break
+                stack.extend(node["subtasks"])
+            parent.update(op["fields"])
+    return tree
+
+
+def node(node_id, content=None, state="OPEN", subtasks=()):
+    return {"id": node_id, "content": content or node_id, "state": state, "subtasks": list(subtasks)}
+
+
+def plan(count=3, content="step"):
+    root = Task(content="root", id="1")
+    for i in range(count):
+        root.add_subtask(Task(content=f"{content} {i}", id=f"1.{i + 1}"))
+    return root
+
+
+@pytest.mark.unit
+class TestDiffTaskTrees:
+    """Test cases for subtask tree deltas."""
+
+    @pytest.mark.parametrize(
+        "old, new",
+        [
+            ([node("a"), node("b")], [node("a"), node("b", "edited"), node("c")]),
+            ([node("a", subtasks=[node("a1"), node("a2")])], [node("a", subtasks=[node("a2")]), node("a1")]),
+            ([node("a"), node("b"), node("c")], [node("c"), node("a"), node("b", state="DONE")]),
+            ([node("a", subtasks=[node("x")]), node("b")], [node("b", subtasks=[node("x", "moved")])]),
+            ([], [node("a", subtasks=[node("a1")])]),
+            ([node("a")], []),
+        ],
+    )
+    def test_ops_rebuild_the_new_tree(self, old, new):
+        """Test applying the ops to the old tree always yields the new tree."""
+        assert apply_ops(old, diff_task_trees(old, new)) == new
+
+    def test_small_edit_is_small(self):
+        """Test a single edit in a large plan produces a single op."""
+        old = [node(f"1.{i}", subtasks=[node(f"1.{i}.{j}") for j in range(5)]) for i in range(40)]
+        new = copy.deepcopy(old)
+        new[17]["subtasks"][2]["content"] = "changed"
+
+        assert diff_task_trees(old, new) == [{"op": "update", "id": "1.17.2", "fields": {"content": "changed"}}]
+        assert diff_task_trees(old, copy.deepcopy(old)) == []
+
+    def test_tree_builder_skips_empty_and_deep_tasks(self):
+        """Test the builder keeps the frontend's shape and limits."""
+        root = Task(content="root", id="r")
+        root.add_subtask(Task(content="", id="empty"))
+        current = root
+        for depth in range(8):
+            child = Task(content=f"level {depth}", id=f"l{depth}")
+            current.add_subtask(child)
+            current = child
+
+        tree = tree_sub_tasks(root.subtasks)
+
+        assert [item["id"] for item in tree] == ["l0"]
+        depth, nodes = 0, tree
+        while nodes:
+            depth += 1
+            nodes = nodes[0]["subtasks"]
+        assert depth == 6
+        assert tree[0]["state"] == root.subtasks[1].state
+
+
+@pytest.mark.unit
+class TestTaskTreeStream:
+    """Test cases for sequencing and resync."""
+
+    def test_snapshot_then_deltas(self):
+        """Test deltas chain from the last snapshot and unchanged trees send nothing."""
+        stream = TaskTreeStream()
+        task = plan()
+        snapshot = stream.snapshot(task.subtasks)
+
+        task.subtasks[1].content = "edited"
+        task.add_subtask(Task(content="added", id="1.4"))
+        delta = stream.delta(task.subtasks)
+
+        assert snapshot["seq"] == 1 and delta["base_seq"] == 1 and delta["seq"] == 2
+        assert apply_ops(json.loads(json.dumps(snapshot["sub_tasks"])), delta["ops"]) == json.loads(
+            json.dumps(tree_sub_tasks(task.subtasks))
+        )
+        assert stream.delta(task.subtasks) is None
+        assert stream.current()["seq"] == 2
+
+    def test_resync_endpoint(self):
+        """Test the resync endpoint serves the tree the deltas build on."""
+        task_lock = create_task_lock("tree_resync")
+        try:
+            task_lock.task_tree.snapshot(plan(2).subtasks)
+            result = get_sub_tasks("tree_resync")
+            assert result["seq"] == 1
+            assert [item["content"] for item in result["sub_tasks"]] == ["step 0", "step 1"]
+        finally:
+            task_locks.pop("tree_resync", None)
+
+        with pytest.raises(UserException):
+            get_sub_tasks("tree_resync")
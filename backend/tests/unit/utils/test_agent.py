@@ -15,6 +15,7 @@ from camel.types.agents import ToolCallingRecord
 
 from app.utils.agent import (
     ListenChatAgent,
+    ToolDispatch,
     agent_model,
     question_confirm_agent,
     task_summary_agent,
@@ -286,6 +287,51 @@ class TestListenChatAgent:
                 # Should queue toolkit activation and deactivation notifications  
                 assert mock_task_lock.put_queue.call_count >= 2
 
+    @pytest.mark.asyncio
+    async def test_listen_chat_agent_aexecute_tool_uses_cached_dispatch(self, mock_task_lock):
+        """Test _aexecute_tool resolves dispatch once per tool and re-resolves replaced tools."""
+        with patch('app.utils.agent.get_task_lock', return_value=mock_task_lock), \
+             patch('camel.models.ModelFactory.create') as mock_create_model:
+
+            mock_backend = MagicMock()
+            mock_backend.model_type = "gpt-4"
+            mock_backend.current_model = MagicMock()
+            mock_backend.current_model.model_type = "gpt-4"
+            mock_create_model.return_value = mock_backend
+
+            async def fetch(url: str) -> str:
+                """Fetch a url."""
+                return f"fetched {url}"
+
+            tool = FunctionTool(fetch)
+            setattr(tool, "_toolkit_name", "BrowserToolkit")
+            agent = ListenChatAgent(
+                api_task_id="test_api_task_123",
+                agent_name="TestAgent",
+                model="gpt-4",
+                tools=[tool],
+            )
+            assert agent._tool_dispatch["fetch"].toolkit_name == "BrowserToolkit"
+
+            tool_call_request = MagicMock(spec=ToolCallRequest)
+            tool_call_request.tool_name = "fetch"
+            tool_call_request.tool_call_id = "call_1"
+            tool_call_request.args = {"url": "https://example.com"}
+            tool_call_request.extra_content = None
+
+            with patch.object(ToolDispatch, 'resolve', wraps=ToolDispatch.resolve) as mock_resolve, \
+                 patch.object(agent, '_record_tool_calling') as mock_record:
+                await agent._aexecute_tool(tool_call_request)
+                await agent._aexecute_tool(tool_call_request)
+                mock_resolve.assert_not_called()
+                assert mock_record.call_args[0][2] == "fetched https://example.com"
+
+                # A tool replaced after construction gets a fresh record
+                agent._internal_tools["fetch"] = FunctionTool(fetch)
+                await agent._aexecute_tool(tool_call_request)
+                mock_resolve.assert_called_once()
+                assert agent._tool_dispatch["fetch"].toolkit_name == "mcp_toolkit"
+
     def test_listen_chat_agent_clone(self, mock_task_lock):
         """Test ListenChatAgent clone method."""
         api_task_id = "test_api_task_123"
@@ -572,6 +618,40 @@ class TestAgentFactoryFunctions:
             else:
                 assert "search" in str(system_message).lower()  # system_prompt contains search
 
+    @pytest.mark.asyncio
+    async def test_document_agent_builds_toolkits_off_event_loop(self, sample_chat_data):
+        """Test document_agent awaits only the MCP connect on the loop thread."""
+        import threading
+
+        options = Chat(**sample_chat_data)
+        from app.service.task import task_locks
+        task_locks[options.task_id] = MagicMock()
+        loop_thread = threading.get_ident()
+        build_threads = []
+
+        def excel_toolkit(*args, **kwargs):
+            build_threads.append(threading.get_ident())
+            return MagicMock()
+
+        with patch('app.utils.agent.agent_model') as mock_agent_model, \
+             patch('app.utils.agent.HumanToolkit') as mock_human_toolkit, \
+             patch('app.utils.agent.FileToolkit'), \
+             patch('app.utils.agent.PPTXToolkit'), \
+             patch('app.utils.agent.MarkItDownToolkit'), \
+             patch('app.utils.agent.ExcelToolkit', side_effect=excel_toolkit), \
+             patch('app.utils.agent.NoteTakingToolkit'), \
+             patch('app.utils.agent.TerminalToolkit'), \
+             patch('app.utils.agent.GoogleDriveMCPToolkit') as mock_gdrive_toolkit, \
+             patch('app.utils.agent.ToolkitMessageIntegration'):
+            mock_human_toolkit.get_can_use_tools.return_value = []
+            drive_tool = MagicMock()
+            mock_gdrive_toolkit.get_can_use_tools = AsyncMock(return_value=[drive_tool])
+
+            await document_agent(options)
+
+            assert build_threads and build_threads[0] != loop_thread
+            assert drive_tool in mock_agent_model.call_args[0][3]
+
     @pytest.mark.asyncio
     async def test_document_agent_creation(self, sample_chat_data):
         """Test document_agent creates agent with document tools."""
@@ -856,6 +936,24 @@ class TestToolkitFunctions:
             with pytest.raises(Exception):
                 await get_mcp_tools(mcp_servers)
 
+    def test_tool_schema_is_validated_once(self):
+        """Test reading a tool schema again does not repeat the JSON Schema check."""
+        def count_words(text: str) -> int:
+            """Count the words in a text.
+
+            Args:
+                text (str): The text to count.
+            """
+            return len(text.split())
+
+        tool = FunctionTool(count_words)
+        tool.openai_tool_schema["function"]["description"] = f"Count words {uuid.uuid4()}."
+        with patch("app.utils.agent._validate_openai_tool_schema") as validate:
+            tool.get_openai_tool_schema()
+            tool.get_openai_tool_schema()
+            FunctionTool(count_words).get_openai_tool_schema()
+        assert validate.call_count == 2
+
 
 @pytest.mark.integration
 class TestAgentIntegration:
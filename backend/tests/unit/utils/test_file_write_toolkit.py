@@ -0,0 +1,135 @@
+import csv
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.service.task import ActionWriteFileData
+from app.utils.toolkit.file_write_toolkit import FileToolkit, clone_file, staged_parts
+
+
+@pytest.fixture
+def toolkit(tmp_path):
+    sent = []
+    with (
+        patch("app.utils.toolkit.file_write_toolkit._safe_put_queue", lambda lock, data: sent.append(data)),
+        patch("app.utils.toolkit.file_write_toolkit.get_task_lock", return_value=MagicMock()),
+        patch("app.utils.listen.toolkit_listen._safe_put_queue"),
+        patch("app.utils.listen.toolkit_listen.get_task_lock", return_value=MagicMock()),
+    ):
+        toolkit = FileToolkit("file_task", working_directory=str(tmp_path))
+        toolkit.sent = sent
+        yield toolkit
+
+
+def write_events(toolkit):
+    return [event for event in toolkit.sent if isinstance(event, ActionWriteFileData)]
+
+
+@pytest.mark.unit
+class TestAtomicWrites:
+    """Test cases for rename-based writes and link backups."""
+
+    def test_overwrite_keeps_linked_backup(self, toolkit, tmp_path):
+        """Test an overwrite is backed up by a hard link and the old content survives."""
+        toolkit.write_to_file("Report", "first version", "report.md")
+        original_inode = os.stat(tmp_path / "report.md").st_ino
+
+        result = toolkit.write_to_file("Report", "second version", "report.md")
+
+        assert result == f"Content successfully written to file: {tmp_path / 'report.md'}"
+        assert (tmp_path / "report.md").read_text() == "second version"
+        backups = list(tmp_path.glob("report.md.*.bak"))
+        assert len(backups) == 1
+        assert backups[0].read_text() == "first version"
+        assert os.stat(backups[0]).st_ino == original_inode
+        assert not list(tmp_path.glob(".*tmp*"))
+        assert [event.data for event in write_events(toolkit)] == [str(tmp_path / "report.md")] * 2
+
+    def test_failed_write_leaves_target_untouched(self, toolkit, tmp_path):
+        """Test a write that fails keeps the existing file and sends no event."""
+        toolkit.write_to_file("Data", "old", "data.md")
+
+        with patch.object(FileToolkit, "_write_simple_text_file", side_effect=OSError("disk full")):
+            result = toolkit.write_to_file("Data", "new", "data.md")
+
+        assert "disk full" in result and str(tmp_path / "data.md") in result
+        assert (tmp_path / "data.md").read_text() == "old"
+        assert len(write_events(toolkit)) == 1
+        assert not list(tmp_path.glob(".*tmp*"))
+
+    def test_in_place_edit_backup_is_a_copy(self, toolkit, tmp_path):
+        """Test edit_file backups never share an inode with the file being edited."""
+        toolkit.write_to_file("Notes", "alpha beta", "notes.md")
+
+        toolkit.edit_file("notes.md", "beta", "gamma")
+
+        backups = list(tmp_path.glob("notes.md.*.bak"))
+        assert [backup.read_text() for backup in backups] == ["alpha beta"]
+        assert (tmp_path / "notes.md").read_text() == "alpha gamma"
+
+    def test_clone_file_falls_back_to_copy(self, tmp_path):
+        """Test cloning still works where links are not allowed or supported."""
+        src = tmp_path / "src.txt"
+        src.write_text("data")
+
+        with patch("os.link", side_effect=OSError("not supported")):
+            method = clone_file(src, tmp_path / "dst.txt", allow_link=True)
+
+        assert method in ("reflink", "copy")
+        assert (tmp_path / "dst.txt").read_text() == "data"
+
+
+@pytest.mark.unit
+class TestChunkedWrites:
+    """Test cases for append_to_file and finalize_file."""
+
+    def test_markdown_in_parts(self, toolkit, tmp_path):
+        """Test chunks are staged and published once, with a single write_file event."""
+        for i in range(5):
+            assert "staged" in toolkit.append_to_file("long_report", f"## Section {i}\n\n")
+        assert not (tmp_path / "long_report.md").exists()
+        assert write_events(toolkit) == []
+
+        result = toolkit.finalize_file("long_report")
+
+        assert result.endswith("long_report.md")
+        assert (tmp_path / "long_report.md").read_text() == "".join(f"## Section {i}\n\n" for i in range(5))
+        assert len(write_events(toolkit)) == 1
+        assert not (tmp_path / ".long_report.md.part").exists()
+
+    def test_csv_rows_in_parts(self, toolkit, tmp_path):
+        """Test CSV rows can be appended in batches."""
+        toolkit.append_to_file("table.csv", [["id", "value"]])
+        toolkit.append_to_file("table.csv", [[str(i), f"v{i}"] for i in range(3)])
+        toolkit.finalize_file("table.csv")
+
+        with open(tmp_path / "table.csv", newline="") as f:
+            assert list(csv.reader(f)) == [["id", "value"], ["0", "v0"], ["1", "v1"], ["2", "v2"]]
+
+    def test_whole_document_formats_and_empty_finalize(self, toolkit):
+        """Test unsupported formats and finalizing without content are reported."""
+        assert toolkit.append_to_file("slides.pdf", "text").startswith("Error")
+        assert toolkit.finalize_file("missing.md").startswith("Error")
+        assert write_events(toolkit) == []
+        assert {"append_to_file", "finalize_file", "write_to_file"} <= {
+            tool.get_function_name() for tool in toolkit.get_tools()
+        }
+
+    @pytest.mark.asyncio
+    async def test_task_end_removes_unfinished_parts(self, toolkit, tmp_path):
+        """Test parts that were never finalized are deleted when the task lock is cleaned up."""
+        import asyncio
+
+        from app.service.task import TaskLock
+
+        toolkit.append_to_file("draft", "unfinished")
+        toolkit.append_to_file("done", "complete")
+        toolkit.finalize_file("done")
+        assert (tmp_path / ".draft.md.part").exists()
+
+        await TaskLock("file_task", asyncio.Queue(), {}).cleanup()
+
+        assert not (tmp_path / ".draft.md.part").exists()
+        assert (tmp_path / "done.md").read_text() == "complete"
+        assert len(staged_parts) == 0
@@ -0,0 +1,174 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.exception.exception import ProgramException
+from app.utils.toolkit.hybrid_browser_python_toolkit import BrowserSession, BrowserTabPool
+
+
+class FakePage:
+    def __init__(self, url, opener=None):
+        self.url = url
+        self.closed = False
+        self.init_scripts = []
+        self._opener = opener
+
+    async def goto(self, url):
+        self.url = url
+
+    async def close(self):
+        self.closed = True
+
+    async def opener(self):
+        return self._opener
+
+    async def add_init_script(self, script):
+        self.init_scripts.append(script)
+
+    def is_closed(self):
+        return self.closed
+
+    def set_default_navigation_timeout(self, timeout):
+        pass
+
+    def set_default_timeout(self, timeout):
+        pass
+
+
+def make_pool(pages, **kwargs):
+    browser = MagicMock()
+    browser.is_connected.return_value = True
+    context = MagicMock(pages=pages)
+
+    async def new_page():
+        page = FakePage("about:blank")
+        pages.append(page)
+        return page
+
+    context.new_page = new_page
+    browser.contexts = [context]
+    playwright = MagicMock()
+    playwright.chromium.connect_over_cdp = AsyncMock(return_value=browser)
+    pool = BrowserTabPool(lease_retry_delay=0, **kwargs)
+    pool._start_driver = AsyncMock(return_value=playwright)
+    return pool
+
+
+@pytest.mark.unit
+class TestBrowserTabPool:
+    """Test cases for the shared Playwright driver and tab leasing."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_leases_share_one_driver(self):
+        """Test parallel sessions claim distinct tabs over a single driver and connection."""
+        pages = [FakePage(f"about:blank#tab-{i}") for i in range(3)]
+        pool = make_pool(pages)
+
+        leased = await asyncio.gather(*(pool.lease() for _ in range(3)))
+
+        assert len({id(page) for page in leased}) == 3
+        assert all(page.url == "about:blank" for page in leased)
+        assert pool.driver_starts == 1
+        assert pool._start_driver.await_count == 1
+        assert pool.leased_count == 3
+
+    @pytest.mark.asyncio
+    async def test_release_resets_tab_for_next_lease(self):
+        """Test a released tab goes back to its marker URL and can be leased again."""
+        page = FakePage("about:blank#tab-1")
+        pool = make_pool([page])
+
+        leased = await pool.lease("stealth()")
+        await leased.goto("https://example.com")
+        await pool.release(leased)
+        assert page.url == "about:blank#tab-1"
+
+        again = await pool.lease("stealth()")
+        assert again is page
+        assert page.init_scripts == ["stealth()"]
+
+    @pytest.mark.asyncio
+    async def test_lease_without_free_tab_raises(self):
+        """Test leasing fails once every marked tab is taken."""
+        pool = make_pool([FakePage("about:blank#tab-1"), FakePage("https://example.com")])
+        await pool.lease()
+
+        with pytest.raises(ProgramException):
+            await pool.lease()
+
+    @pytest.mark.asyncio
+    async def test_session_close_returns_tabs_to_pool(self):
+        """Test closing a browser session releases its tabs and keeps the shared driver."""
+        page = FakePage("about:blank#tab-1")
+        pool = make_pool([page])
+
+        with patch("app.utils.toolkit.hybrid_browser_python_toolkit.browser_tab_pool", pool):
+            session = BrowserSession(session_id="clone-1")
+            await session._ensure_browser_inner()
+            assert session._page is page
+            assert pool.leased_count == 1
+
+            await session._close_session()
+
+        assert pool.leased_count == 0
+        assert page.url == "about:blank#tab-1"
+        assert pool._browser is not None
+
+    @pytest.mark.asyncio
+    async def test_session_close_closes_its_other_tabs(self):
+        """Test closing a session also closes the tabs and popups it opened, but not other tabs."""
+        leased = FakePage("about:blank#tab-1")
+        pages = [leased, FakePage("https://user.example")]
+        pool = make_pool(pages)
+
+        with patch("app.utils.toolkit.hybrid_browser_python_toolkit.browser_tab_pool", pool):
+            session = BrowserSession(session_id="clone-1")
+            await session._ensure_browser_inner()
+            new_tab = FakePage("https://example.com")
+            session._pages["tab-new"] = new_tab
+            popup = FakePage("https://popup.example", opener=leased)
+            pages.extend([new_tab, popup])
+
+            await session._close_session()
+
+        assert new_tab.closed and popup.closed
+        assert not leased.closed and leased.url == "about:blank#tab-1"
+        assert not pages[1].closed
+
+    @pytest.mark.asyncio
+    async def test_lease_keeps_spare_tabs_warm(self):
+        """Test the pool opens spare tabs when none are free, up to its tab limit."""
+        pages = [FakePage("https://user.example")]
+        pool = make_pool(pages, spare_tabs=1, max_tabs=2)
+
+        first = await pool.lease()
+        await pool._warm_task
+        assert first.url == "about:blank"
+        spare = pages[-1]
+        assert spare is not first and spare.url.startswith("about:blank#pool-")
+
+        second = await pool.lease()
+        assert second is spare
+        await pool._warm_task
+        with pytest.raises(ProgramException):
+            await pool.lease()
+        assert len(pages) == 3
+
+    def test_loop_change_stops_previous_driver(self):
+        """Test a driver started on a finished loop is stopped when another loop takes over."""
+        pool = make_pool([FakePage("about:blank#tab-1")])
+        driver_process = MagicMock(pid=4242)
+        playwright = pool._start_driver.return_value
+        stale = MagicMock()
+        stale.chromium.connect_over_cdp = playwright.chromium.connect_over_cdp
+        stale._impl_obj._connection._transport._proc = driver_process
+        pool._start_driver = AsyncMock(side_effect=[stale, playwright])
+
+        asyncio.run(pool.browser())
+        with patch("app.utils.toolkit.hybrid_browser_python_toolkit.os.kill") as kill:
+            asyncio.run(pool.browser())
+
+        kill.assert_called_once()
+        assert kill.call_args[0][0] == 4242
+        assert pool.driver_starts == 2
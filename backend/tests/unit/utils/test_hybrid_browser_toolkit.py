@@ -0,0 +1,182 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.toolkit.hybrid_browser_toolkit import WebSocketConnectionPool
+
+
+class FakeWebSocket:
+    open = True
+
+
+class FakeWrapper:
+    """Stands in for WebSocketBrowserWrapper; `start` blocks until the test releases it."""
+
+    gates: dict = {}
+
+    def __init__(self, config):
+        self.session_id = config["session_id"]
+        self.websocket = None
+        self.last_used = time.monotonic()
+        self._pending_responses = {}
+        self.stopped = False
+
+    async def start(self):
+        gate = self.gates.get(self.session_id)
+        if gate is not None:
+            await gate.wait()
+        self.websocket = FakeWebSocket()
+
+    async def stop(self):
+        self.stopped = True
+        self.websocket = None
+
+
+@pytest.fixture
+def fake_wrapper():
+    FakeWrapper.gates = {}
+    with patch("app.utils.toolkit.hybrid_browser_toolkit.WebSocketBrowserWrapper", FakeWrapper):
+        yield FakeWrapper
+
+
+@pytest.mark.unit
+class TestWebSocketConnectionPool:
+    """Test cases for per-session locking, capacity and reaping in WebSocketConnectionPool."""
+
+    @pytest.mark.asyncio
+    async def test_slow_start_does_not_block_other_sessions(self, fake_wrapper):
+        """Test a session that is still starting does not block lookups for other sessions."""
+        pool = WebSocketConnectionPool()
+        fast = await pool.get_connection("fast", {"session_id": "fast"})
+        fake_wrapper.gates["slow"] = asyncio.Event()
+
+        slow_task = asyncio.create_task(pool.get_connection("slow", {"session_id": "slow"}))
+        await asyncio.sleep(0)
+        assert pool.stats().starting == 1
+
+        reused = await asyncio.wait_for(pool.get_connection("fast", {"session_id": "fast"}), timeout=1)
+        other = await asyncio.wait_for(pool.get_connection("other", {"session_id": "other"}), timeout=1)
+        assert reused is fast
+        assert other.websocket is not None
+
+        fake_wrapper.gates["slow"].set()
+        await slow_task
+        stats = pool.stats()
+        assert stats.connections == 3
+        assert stats.created_total == 3
+        assert stats.reused_total == 1
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_same_session_starts_once(self, fake_wrapper):
+        """Test concurrent callers of one session share a single start."""
+        pool = WebSocketConnectionPool()
+        results = await asyncio.gather(*(pool.get_connection("s", {"session_id": "s"}) for _ in range(5)))
+
+        assert all(wrapper is results[0] for wrapper in results)
+        assert pool.stats().created_total == 1
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_capacity_queues_fairly(self, fake_wrapper):
+        """Test sessions beyond max_connections wait and are served in arrival order."""
+        pool = WebSocketConnectionPool(max_connections=1)
+        await pool.get_connection("a", {"session_id": "a"})
+        order = []
+
+        async def connect(session_id):
+            await pool.get_connection(session_id, {"session_id": session_id})
+            order.append(session_id)
+
+        waiting_b = asyncio.create_task(connect("b"))
+        await asyncio.sleep(0)
+        waiting_c = asyncio.create_task(connect("c"))
+        await asyncio.sleep(0)
+        assert pool.stats().waiting == 2
+
+        await pool.close_connection("a")
+        await waiting_b
+        assert order == ["b"]
+        await pool.close_connection("b")
+        await waiting_c
+        assert order == ["b", "c"]
+        assert pool.stats().connections == 1
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_failed_start_frees_slot(self, fake_wrapper):
+        """Test a start failure is counted and does not leak capacity."""
+        pool = WebSocketConnectionPool(max_connections=1)
+
+        with patch.object(FakeWrapper, "start", side_effect=RuntimeError("node missing")):
+            with pytest.raises(RuntimeError):
+                await pool.get_connection("a", {"session_id": "a"})
+
+        await asyncio.wait_for(pool.get_connection("b", {"session_id": "b"}), timeout=1)
+        assert pool.stats().start_failures == 1
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_reap_idle_connections(self, fake_wrapper):
+        """Test idle connections are closed and busy ones are kept."""
+        pool = WebSocketConnectionPool(idle_timeout=60)
+        idle = await pool.get_connection("idle", {"session_id": "idle"})
+        busy = await pool.get_connection("busy", {"session_id": "busy"})
+        fresh = await pool.get_connection("fresh", {"session_id": "fresh"})
+        idle.last_used -= 120
+        busy.last_used -= 120
+        busy._pending_responses["1"] = asyncio.get_running_loop().create_future()
+
+        assert await pool.reap_idle() == 1
+        assert idle.stopped
+        assert not busy.stopped and not fresh.stopped
+        assert pool.stats().reaped_total == 1
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_slot_wait_times_out(self, fake_wrapper):
+        """Test a session waiting longer than slot_timeout gets an error and leaves the queue."""
+        pool = WebSocketConnectionPool(max_connections=1, slot_timeout=0.05)
+        await pool.get_connection("a", {"session_id": "a"})
+
+        with pytest.raises(RuntimeError, match="No browser session available"):
+            await pool.get_connection("b", {"session_id": "b"})
+        assert pool.stats().waiting == 0
+
+        await pool.close_connection("a")
+        await asyncio.wait_for(pool.get_connection("c", {"session_id": "c"}), timeout=1)
+        await pool.close_all()
+
+    @pytest.mark.asyncio
+    async def test_new_session_adopts_warm_spare(self, fake_wrapper):
+        """Test a started session pre-warms a spare that the next session adopts without starting."""
+        pool = WebSocketConnectionPool(max_connections=4, warm_spares=1)
+        first = await pool.get_connection("a", {"session_id": "a", "headless": True})
+        await asyncio.sleep(0)
+        assert pool.stats().spares == 1
+
+        second = await pool.get_connection("b", {"session_id": "b", "headless": True})
+
+        assert second is not first and second.session_id.startswith("spare-")
+        assert pool.stats().warm_hits == 1
+        assert pool.stats().created_total == 1
+        await asyncio.sleep(0)
+        assert pool.stats().spares == 1
+        await pool.close_all()
+        assert pool.stats().spares == 0 and pool._slots_used == 0
+
+    @pytest.mark.asyncio
+    async def test_spare_gives_up_its_slot(self, fake_wrapper):
+        """Test a spare never keeps a session waiting for a slot."""
+        pool = WebSocketConnectionPool(max_connections=2, warm_spares=1, slot_timeout=0.05)
+        await pool.get_connection("a", {"session_id": "a", "headless": True})
+        await asyncio.sleep(0)
+        assert pool.stats().spares == 1
+
+        await pool.get_connection("b", {"session_id": "b", "headless": False})
+
+        assert pool.stats().connections == 2
+        assert pool.stats().spares == 0
+        await pool.close_all()
@@ -0,0 +1,88 @@
+import logging
+
+import pytest
+
+from utils.traceroot_wrapper import LogFacade, parse_log_limits
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def std_logger():
+    logger = logging.getLogger("test_log_facade")
+    handler = ListHandler()
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    yield logger
+    logger.handlers[:] = []
+
+
+@pytest.mark.unit
+class TestLogFacade:
+    """Test cases for the logging facade."""
+
+    def test_disabled_level_builds_nothing(self, std_logger):
+        """Test callables for the message and extra are not evaluated below the level."""
+        facade = LogFacade(std_logger)
+        facade.min_level = logging.INFO
+
+        def fail():
+            raise AssertionError("evaluated")
+
+        facade.debug(fail, extra=fail)
+        assert std_logger.handlers[0].records == []
+
+        facade.info(lambda: "built", extra=lambda: {"size": 3})
+        record = std_logger.handlers[0].records[0]
+        assert record.getMessage() == "built"
+        assert record.size == 3
+
+    def test_fields_and_args(self, std_logger):
+        """Test keyword fields become extra attributes and %-args are formatted lazily."""
+        facade = LogFacade(std_logger)
+        facade.info("Preview: %.5s", "abcdefgh", task_id="t1", extra={"action": "notice"})
+
+        record = std_logger.handlers[0].records[0]
+        assert record.getMessage() == "Preview: abcde"
+        assert record.task_id == "t1" and record.action == "notice"
+        assert record.funcName == "test_fields_and_args"
+
+    def test_rate_limit_counts_dropped(self, std_logger):
+        """Test the rate limit drops DEBUG/INFO beyond the burst, never warnings, and the next record reports the count."""
+        facade = LogFacade(std_logger, per_second=2)
+        for i in range(5):
+            facade.debug("event %d", i)
+        facade.warning("still logged")
+        records = std_logger.handlers[0].records
+        assert [r.getMessage() for r in records] == ["event 0", "event 1", "still logged"]
+        assert records[-1].dropped == 3
+        assert facade.dropped == 0
+
+        facade.limit.tokens = 1
+        facade.info("after")
+        assert records[-1].getMessage() == "after"
+        assert not hasattr(records[-1], "dropped")
+
+    def test_sampling(self, std_logger):
+        """Test a zero sample drops everything below WARNING."""
+        facade = LogFacade(std_logger, sample=0)
+        facade.info("dropped")
+        facade.error("kept")
+        records = std_logger.handlers[0].records
+        assert [r.getMessage() for r in records] == ["kept"]
+        assert records[0].dropped == 1
+
+    def test_parse_log_limits(self):
+        """Test LOG_LIMITS entries set sampling and rates and skip invalid values."""
+        assert parse_log_limits("task_service=0.1, agent=20/s,agent=0.5,bad=x,") == {
+            "task_service": {"sample": 0.1},
+            "agent": {"per_second": 20.0, "sample": 0.5},
+        }
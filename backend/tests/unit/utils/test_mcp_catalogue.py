@@ -0,0 +1,166 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from app.service.task import ActionSearchMcpData
+from app.utils.toolkit.mcp_catalogue import McpCatalogue, McpIndex
+from app.utils.toolkit.mcp_search_toolkit import McpSearchToolkit
+
+URL = "https://market.example.com/api/mcps"
+
+ITEMS = [
+    {"id": 1, "name": "Notion", "key": "notion", "description": "Pages and databases", "category": {"name": "Productivity"}},
+    {"id": 2, "name": "GitHub", "key": "github", "description": "Repositories, issues and pull requests", "category": {"name": "Developer"}},
+    {"id": 3, "name": "Slack", "key": "slack", "description": "Post messages to a github channel", "category": {"name": "Chat"}},
+    {"id": 4, "name": "Postgres", "key": "postgres", "description": "Query SQL databases", "category": {"name": "Developer"}},
+]
+
+
+class Marketplace:
+    """A paginated catalogue endpoint that supports ETag revalidation."""
+
+    def __init__(self, items, etag='"v1"'):
+        self.items = items
+        self.etag = etag
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.headers.get("if-none-match") == self.etag:
+            return httpx.Response(304)
+        page = int(request.url.params["page"])
+        size = int(request.url.params["size"])
+        items = self.items[page * size : (page + 1) * size]
+        return httpx.Response(
+            200,
+            json={"items": items, "total": len(self.items), "page": page, "size": size},
+            headers={"ETag": self.etag},
+        )
+
+
+def make_catalogue(tmp_path, marketplace, ttl=600.0):
+    return McpCatalogue(str(tmp_path / "mcp_catalogue.json"), ttl=ttl, transport=httpx.MockTransport(marketplace))
+
+
+@pytest.mark.unit
+class TestMcpIndex:
+    """Test cases for local ranking of the MCP catalogue."""
+
+    def test_name_matches_rank_above_description_matches(self):
+        """Test a server named after the keyword outranks one that only mentions it."""
+        results = McpIndex(ITEMS).search("github")
+
+        assert [item["key"] for item in results] == ["github", "slack"]
+
+    def test_prefix_and_category_matches(self):
+        """Test partial words and category names find servers."""
+        index = McpIndex(ITEMS)
+
+        assert [item["key"] for item in index.search("post")][0] == "postgres"
+        assert {item["key"] for item in index.search("developer")} == {"github", "postgres"}
+        assert [item["key"] for item in index.search("sql databases")][0] == "postgres"
+        assert len(index.search("")) == len(ITEMS)
+
+    def test_update_reindexes_only_changed_items(self):
+        """Test an update touches only added, changed and removed servers and keeps search consistent."""
+        index = McpIndex(ITEMS)
+        updated = [
+            {**ITEMS[0], "description": "Wikis and databases"},
+            ITEMS[1],
+            ITEMS[3],
+            {"id": 5, "name": "Linear", "key": "linear", "description": "Issues", "category": {"name": "Developer"}},
+        ]
+
+        with patch.object(McpIndex, "_weights", wraps=McpIndex._weights) as weights:
+            assert index.update(updated) == 3
+
+        assert [call.args[0]["key"] for call in weights.call_args_list] == ["notion", "linear"]
+        assert index.search("slack") == []
+        assert index.search("pages") == []
+        assert [item["key"] for item in index.search("wikis")] == ["notion"]
+        assert [item["key"] for item in index.search("developer")] == ["github", "postgres", "linear"]
+        assert index._terms == sorted(McpIndex(updated)._terms)
+
+
+@pytest.mark.unit
+class TestMcpCatalogue:
+    """Test cases for catalogue sync and caching."""
+
+    @pytest.mark.asyncio
+    async def test_full_sync_then_local_search(self, tmp_path):
+        """Test the first search downloads every page and later searches stay local."""
+        items = [{"id": i, "name": f"Server {i}", "key": f"server-{i}", "description": ""} for i in range(250)]
+        marketplace = Marketplace(items)
+        catalogue = make_catalogue(tmp_path, marketplace)
+
+        first = await catalogue.search(URL, "server", size=10, page=1)
+        second = await catalogue.search(URL, "server-42", size=5)
+
+        assert len(marketplace.requests) == 3
+        assert first["total"] == 250 and len(first["items"]) == 10
+        assert second["items"][0]["key"] == "server-42"
+        assert (tmp_path / "mcp_catalogue.json").exists()
+        await catalogue.aclose()
+
+    @pytest.mark.asyncio
+    async def test_revalidates_with_etag_after_restart(self, tmp_path):
+        """Test a restarted backend reuses the cached catalogue after a 304."""
+        marketplace = Marketplace(ITEMS)
+        catalogue = make_catalogue(tmp_path, marketplace)
+        await catalogue.search(URL, "notion")
+        await catalogue.aclose()
+
+        restarted = make_catalogue(tmp_path, marketplace, ttl=0)
+        result = await restarted.search(URL, "notion")
+
+        assert result["items"][0]["key"] == "notion"
+        assert marketplace.requests[-1].headers["if-none-match"] == '"v1"'
+        assert restarted.not_modified == 1
+        assert len(marketplace.requests) == 2
+
+        marketplace.items = ITEMS + [{"id": 5, "name": "Linear", "key": "linear", "description": "Issues"}]
+        marketplace.etag = '"v2"'
+        result = await restarted.search(URL, "linear")
+        assert result["items"][0]["key"] == "linear"
+        await restarted.aclose()
+
+    @pytest.mark.asyncio
+    async def test_offline_uses_cached_copy(self, tmp_path):
+        """Test a failed sync falls back to the cache and fails only without one."""
+        await make_catalogue(tmp_path, Marketplace(ITEMS)).search(URL, "slack")
+
+        def offline(request):
+            raise httpx.ConnectError("offline", request=request)
+
+        cached = make_catalogue(tmp_path, offline, ttl=0)
+        assert (await cached.search(URL, "slack"))["items"][0]["key"] == "slack"
+
+        empty = McpCatalogue(str(tmp_path / "other.json"), transport=httpx.MockTransport(offline))
+        with pytest.raises(httpx.ConnectError):
+            await empty.search(URL, "slack")
+
+
+@pytest.mark.unit
+class TestMcpSearchToolkit:
+    """Test the toolkit searches the local catalogue."""
+
+    @pytest.mark.asyncio
+    async def test_search_sends_items_event(self, tmp_path):
+        """Test search results come from the catalogue and are sent to the frontend."""
+        catalogue = make_catalogue(tmp_path, Marketplace(ITEMS))
+        task_lock = MagicMock(put_queue=AsyncMock())
+
+        with (
+            patch("app.utils.toolkit.mcp_search_toolkit.mcp_catalogue", catalogue),
+            patch("app.utils.toolkit.mcp_search_toolkit.env_not_empty", return_value=URL),
+            patch("app.utils.toolkit.mcp_search_toolkit.get_task_lock", return_value=task_lock),
+            patch("app.utils.listen.toolkit_listen.get_task_lock", return_value=task_lock),
+        ):
+            result = await McpSearchToolkit("mcp_task").search_mcp_from_url("notion", size=2)
+
+        assert result["items"][0]["key"] == "notion"
+        events = [call.args[0] for call in task_lock.put_queue.await_args_list]
+        search_event = next(event for event in events if isinstance(event, ActionSearchMcpData))
+        assert search_event.data == result["items"]
+        await catalogue.aclose()
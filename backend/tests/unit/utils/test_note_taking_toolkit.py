@@ -0,0 +1,161 @@
+import os
+import threading
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.service.task import Agents
+from app.utils.toolkit import note_taking_toolkit
+from app.utils.toolkit.note_store import DB_FILE, NoteStore
+from app.utils.toolkit.note_taking_toolkit import NoteTakingToolkit
+
+
+@pytest.fixture(autouse=True)
+def quiet_listener():
+    with (
+        patch("app.utils.listen.toolkit_listen._safe_put_queue"),
+        patch("app.utils.listen.toolkit_listen.get_task_lock", return_value=MagicMock()),
+    ):
+        yield
+
+
+def make_toolkit(tmp_path, agent):
+    return NoteTakingToolkit("note_task", agent, working_directory=str(tmp_path))
+
+
+@pytest.mark.unit
+class TestNoteStore:
+    """Test cases for the SQLite note store."""
+
+    def test_filters_combine(self, tmp_path):
+        """Test entries can be selected by note, author, time and words."""
+        store = NoteStore(str(tmp_path / DB_FILE))
+        store.add("research", "Python 3.13 drops the GIL optionally", "search_agent", created_at=100.0)
+        store.add("research", "Rust adoption in the kernel", "search_agent", created_at=200.0)
+        store.add("plan", "Write the python report", "document_agent", created_at=300.0)
+
+        assert [e.content for e in store.read(query="python")] == [
+            "Python 3.13 drops the GIL optionally",
+            "Write the python report",
+        ]
+        assert [e.note_name for e in store.read(agent="document_agent")] == ["plan"]
+        assert [e.created_at for e in store.read(note_name="research", since=150.0)] == [200.0]
+        assert [e.created_at for e in store.read(limit=2)] == [200.0, 300.0]
+
+    def test_replace_is_atomic(self, tmp_path):
+        """Test a reader never sees a note missing while another connection replaces it."""
+        store = NoteStore(str(tmp_path / DB_FILE))
+        store.add("status", "v0")
+        done = threading.Event()
+        missing = []
+
+        def read():
+            while not done.is_set():
+                if not store.exists("status"):
+                    missing.append(True)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for i in range(200):
+                store.replace("status", f"v{i + 1}", agent="writer")
+        finally:
+            done.set()
+            reader.join()
+
+        assert not missing
+        assert [entry.content for entry in store.read("status")] == ["v200"]
+
+    def test_like_fallback(self, tmp_path):
+        """Test queries still work without full-text search."""
+        store = NoteStore(str(tmp_path / DB_FILE))
+        store.fts = False
+        store.add("research", "Kernel Rust drivers", "search_agent")
+        store.add("research", "Kernel C drivers", "search_agent")
+
+        assert [e.content for e in store.read(query="rust kernel")] == ["Kernel Rust drivers"]
+
+
+@pytest.mark.unit
+class TestNoteTakingToolkit:
+    """Test cases for incremental note reads shared between agents."""
+
+    def test_plain_reads_return_only_new_entries(self, tmp_path):
+        """Test repeated read_note calls do not return entries already read."""
+        searcher = make_toolkit(tmp_path, Agents.search_agent)
+        writer = make_toolkit(tmp_path, Agents.document_agent)
+        searcher.append_note("findings", "first finding")
+        searcher.append_note("findings", "second finding")
+
+        first = writer.read_note()
+        assert "first finding" in first and "second finding" in first
+        assert "by search_agent" in first
+
+        searcher.append_note("findings", "third finding")
+        second = writer.read_note()
+        assert "third finding" in second and "first finding" not in second
+        assert writer.read_note().startswith("No new notes")
+
+        # Explicit filters always look at the whole history
+        assert "first finding" in writer.read_note(since="all")
+        assert "second finding" in writer.read_note(note_name="findings")
+        assert writer.read_note(agent="document_agent") == "No matching notes."
+        assert (tmp_path / "findings.md").read_text() == "first finding\nsecond finding\nthird finding\n"
+
+    def test_clones_keep_their_own_read_cursor(self, tmp_path):
+        """Test a cloned toolkit reads entries its original already consumed."""
+        searcher = make_toolkit(tmp_path, Agents.search_agent)
+        writer = make_toolkit(tmp_path, Agents.document_agent)
+        searcher.append_note("findings", "first finding")
+        assert "first finding" in writer.read_note()
+
+        clone = writer.clone_for_new_session("abc123")
+        assert clone is not writer
+        assert clone.store is writer.store
+        assert clone.agent_name == writer.agent_name
+        assert "first finding" in clone.read_note()
+
+        searcher.append_note("findings", "second finding")
+        assert "second finding" in clone.read_note()
+        assert "first finding" not in writer.read_note()
+        assert clone.read_note().startswith("No new notes")
+
+    def test_read_is_bounded(self, tmp_path):
+        """Test a read returns at most READ_LIMIT entries, newest kept."""
+        toolkit = make_toolkit(tmp_path, Agents.search_agent)
+        with patch.object(note_taking_toolkit, "READ_LIMIT", 3):
+            for i in range(5):
+                toolkit.append_note("log", f"entry {i}")
+            result = toolkit.read_note()
+
+        assert result.startswith("[Showing the latest 3")
+        assert "entry 1" not in result and "entry 4" in result
+
+    def test_since_and_overwrite(self, tmp_path):
+        """Test ISO since filters by time and overwrite replaces earlier entries."""
+        toolkit = make_toolkit(tmp_path, Agents.developer_agent)
+        toolkit.create_note("status", "draft")
+        assert toolkit.create_note("status", "again").startswith("Error")
+        assert toolkit.create_note("status", "final", overwrite=True).endswith("overwritten.")
+        assert "draft" not in toolkit.read_note(note_name="status")
+
+        future = datetime.fromtimestamp(time.time() + 60).isoformat()
+        assert toolkit.read_note(since=future) == "No matching notes."
+        assert toolkit.read_note(since="yesterday").startswith("Error")
+        assert toolkit.read_note(note_name="missing").startswith("Error")
+        assert "1 entries" in toolkit.list_note() and "developer_agent" in toolkit.list_note()
+
+    def test_existing_markdown_notes_are_imported(self, tmp_path):
+        """Test notes written before the store existed are still readable."""
+        (tmp_path / "legacy.md").write_text("old findings")
+        (tmp_path / ".note_register").write_text("legacy")
+
+        toolkit = make_toolkit(tmp_path, Agents.document_agent)
+
+        assert "old findings" in toolkit.read_note()
+        assert os.path.exists(tmp_path / DB_FILE)
+        make_toolkit(tmp_path, Agents.search_agent)
+        assert toolkit.list_note().count("legacy.md") == 1
+        assert "1 entries" in toolkit.list_note()
@@ -0,0 +1,158 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.service.task import ActionDeactivateToolkitData
+from app.utils.listen.preview import (
+    Preview,
+    PayloadStore,
+    payload_store,
+    preview_tool_result,
+    register_preview_renderer,
+    render_args_preview,
+    render_preview,
+    result_renderers,
+)
+from app.utils.listen.toolkit_listen import listen_toolkit
+
+
+class _Unrenderable:
+    def __repr__(self):
+        raise AssertionError("large values must not be fully rendered")
+
+
+@pytest.mark.unit
+class TestRenderPreview:
+    """Test cases for bounded preview rendering."""
+
+    def test_small_values_match_json_dumps(self):
+        """Test values under the budget render exactly like json.dumps."""
+        value = {"a": [1, None, True, "text"], "b": {"c": "d"}}
+
+        preview = render_preview(value)
+
+        assert preview == Preview(json.dumps(value, ensure_ascii=False), False)
+
+    def test_walk_stops_at_budget(self):
+        """Test the walk stops once the budget is spent, before reaching later items."""
+        value = ["x" * 100, _Unrenderable()]
+
+        preview = render_preview(value, budget=50)
+
+        assert preview.truncated
+        assert preview.text.startswith('["xxx')
+        assert len(preview.text.encode("utf-8")) <= 50 + len("... (truncated)")
+
+    def test_string_budget_is_in_utf8_bytes(self):
+        """Test multi-byte text is cut on a character boundary within the byte budget."""
+        preview = render_preview("é" * 100, budget=11)
+
+        assert preview.text == "é" * 5 + "... (truncated, total length: 100 chars)"
+
+    def test_args_preview_matches_repr(self):
+        """Test argument previews render like the repr join they replace."""
+        preview = render_args_preview(("a", [1, 2]), {"flag": None})
+
+        assert preview.text == "'a', [1, 2], flag=None"
+        assert not preview.truncated
+
+
+@pytest.mark.unit
+class TestPreviewToolResult:
+    """Test cases for out-of-band payloads and per-tool hooks."""
+
+    def test_truncated_result_is_stored_by_id(self):
+        """Test a cut preview references the full result in the payload store."""
+        result = {"content": "x" * 10000}
+
+        fields = preview_tool_result("task_1", "read_file", result)
+
+        assert len(fields["message"]) < 5000
+        assert payload_store.get("task_1", fields["payload_id"]) is result
+        with pytest.raises(KeyError):
+            payload_store.get("other_task", fields["payload_id"])
+
+    def test_registered_renderer_is_used(self):
+        """Test a per-tool hook can elide parts of a result and still keep the full payload."""
+        register_preview_renderer("custom_tool", result=lambda res, budget: Preview(f"{len(res)} rows", True))
+        try:
+            fields = preview_tool_result("task_1", "custom_tool", [[1, 2]] * 10)
+        finally:
+            result_renderers.pop("custom_tool")
+
+        assert fields["message"] == "10 rows"
+        assert "payload_id" in fields
+
+    def test_payload_store_evicts_oldest_and_drops_task(self):
+        """Test the store is bounded and cleared per task."""
+        store = PayloadStore(max_items=2)
+        first = store.put("task_1", "a")
+        store.put("task_1", "b")
+        store.put("task_2", "c")
+
+        assert len(store) == 2
+        with pytest.raises(KeyError):
+            store.get("task_1", first)
+
+        store.drop_task("task_1")
+        assert len(store) == 1
+
+    def test_payload_store_is_bounded_by_bytes(self):
+        """Test the store evicts by total size and skips values larger than its budget."""
+        store = PayloadStore(max_bytes=100)
+        first = store.put("task_1", "a" * 60)
+        second = store.put("task_1", {"content": "b" * 50})
+
+        assert store.total_bytes <= 100
+        with pytest.raises(KeyError):
+            store.get("task_1", first)
+        assert store.get("task_1", second) == {"content": "b" * 50}
+        assert store.put("task_1", "c" * 101) is None
+
+        store.drop_task("task_1")
+        assert store.total_bytes == 0
+
+    def test_browser_result_with_small_snapshot_is_not_stored(self):
+        """Test browser results are only stored when the snapshot had to be left out."""
+        import app.utils.toolkit.hybrid_browser_toolkit  # noqa: F401 registers the browser renderers
+
+        small = preview_tool_result("task_1", "browser_click", {"result": "ok", "snapshot": "- button"})
+        large = preview_tool_result("task_1", "browser_click", {"result": "ok", "snapshot": "- link\n" * 2000})
+
+        assert "payload_id" not in small
+        assert "- button" in small["message"]
+        assert "payload_id" in large
+        assert "page snapshot" in large["message"]
+
+    @pytest.mark.asyncio
+    async def test_listen_toolkit_sends_bounded_message(self):
+        """Test listen_toolkit sends a preview and payload id instead of the full result."""
+        mock_task_lock = MagicMock()
+        sent = []
+
+        async def put_queue(data):
+            sent.append(data)
+
+        mock_task_lock.put_queue = put_queue
+
+        class Toolkit:
+            api_task_id = "task_1"
+            agent_name = "search_agent"
+
+            @classmethod
+            def toolkit_name(cls):
+                return "Test Toolkit"
+
+            @listen_toolkit()
+            async def fetch(self, content):
+                return {"content": content}
+
+        with patch("app.utils.listen.toolkit_listen.get_task_lock", return_value=mock_task_lock):
+            result = await Toolkit().fetch("y" * 100000)
+
+        activate, deactivate = sent
+        assert len(activate.data["message"]) < 600
+        assert isinstance(deactivate, ActionDeactivateToolkitData)
+        assert len(deactivate.data["message"]) < 5000
+        assert payload_store.get("task_1", deactivate.data["payload_id"]) is result
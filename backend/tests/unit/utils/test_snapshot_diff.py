@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from app.bench import snapshot_diff as snapshot_bench
+from app.utils.toolkit.hybrid_browser_toolkit import WebSocketBrowserWrapper
+from app.utils.toolkit.snapshot_diff import SnapshotDiffer, diff_snapshots, format_snapshot_diff
+
+PAGE = """- generic [ref=e1]:
+  - combobox "Search" [ref=e2]: cats
+  - list [ref=e3]:
+    - listitem [ref=e4]:
+      - link "First" [ref=e5]:
+        - /url: /first
+    - listitem [ref=e6]:
+      - link "Second" [ref=e7]:
+        - /url: /second
+""" + "\n".join(f"  - paragraph [ref=p{i}]: filler text number {i}" for i in range(40))
+
+
+@pytest.mark.unit
+class TestSnapshotDiff:
+    """Test cases for structural snapshot diffs."""
+
+    def test_added_removed_and_changed_nodes(self):
+        """Test nodes are matched by ref and reported by kind."""
+        new = PAGE.replace(": cats", ": cats and dogs").replace(
+            """    - listitem [ref=e6]:
+      - link "Second" [ref=e7]:
+        - /url: /second
+""",
+            """    - listitem [ref=e8]:
+      - link "Third" [ref=e9]:
+        - /url: /third
+""",
+        )
+
+        diff = diff_snapshots(PAGE, new)
+
+        assert [key for key, _ in diff.added] == ["e8", "e9", "e9/- /url: /third#1"]
+        assert [key for key, _ in diff.removed] == ["e6", "e7", "e7/- /url: /second#1"]
+        assert [key for key, _, _ in diff.changed] == ["e2"]
+        text = format_snapshot_diff(diff)
+        assert '+ - link "Third" [ref=e9]: (in e8)' in text
+        assert '~ - combobox "Search" [ref=e2]: cats and dogs (was: - combobox "Search" [ref=e2]: cats)' in text
+
+    def test_differ_sends_full_snapshot_when_needed(self):
+        """Test the first, forced and unhelpful diffs fall back to the full snapshot."""
+        differ = SnapshotDiffer()
+
+        assert differ.render("tab-1", PAGE) == PAGE
+        unchanged = differ.render("tab-1", PAGE)
+        assert unchanged.startswith("- Page Snapshot (no changes")
+        assert differ.render("tab-1", PAGE, full=True) == PAGE
+        # Another tab has its own baseline
+        assert differ.render("tab-2", PAGE) == PAGE
+        # A completely different page is cheaper to send in full
+        other = "\n".join(f"- paragraph [ref=q{i}]: other page {i}" for i in range(40))
+        assert differ.render("tab-1", other) == other
+
+    def test_wrapper_applies_diff_mode_per_command(self):
+        """Test the WebSocket wrapper diffs action results and resets on navigation."""
+        wrapper = WebSocketBrowserWrapper.__new__(WebSocketBrowserWrapper)
+        wrapper.snapshot_differ = SnapshotDiffer()
+        wrapper._snapshot_tab = "current"
+
+        visit = {"result": "ok", "snapshot": PAGE}
+        wrapper._apply_snapshot_mode("visit_page", {"url": "https://example.com"}, visit)
+        wrapper._apply_snapshot_mode("get_tab_info", {}, [{"tab_id": "tab-3", "is_current": True}])
+        click = {"result": "ok", "snapshot": PAGE.replace(": cats", ": mice")}
+        wrapper._apply_snapshot_mode("click", {"ref": "e5"}, click)
+        click_again = {"result": "ok", "snapshot": PAGE}
+        wrapper._apply_snapshot_mode("click", {"ref": "e5"}, click_again)
+        back = {"result": "ok", "snapshot": PAGE}
+        wrapper._apply_snapshot_mode("back", {}, back)
+
+        assert visit["snapshot"] == PAGE
+        # The first snapshot of tab-3 is sent in full, later actions on it as diffs
+        assert click["snapshot"] == PAGE.replace(": cats", ": mice")
+        assert click_again["snapshot"].startswith("- Page Snapshot (diff")
+        assert back["snapshot"] == PAGE
+
+
+@pytest.mark.unit
+class TestSnapshotDiffBenchmark:
+    """Test the recorded-sequence benchmark."""
+
+    def test_recorded_sequence_saves_bytes(self, capsys):
+        """Test diff mode sends substantially fewer bytes than full snapshots."""
+        report = snapshot_bench.main(["--json"])
+
+        assert json.loads(capsys.readouterr().out)["diff_bytes"] == report["diff_bytes"]
+        assert report["saved_ratio"] > 0.5
+        assert report["diff_tokens"] < report["full_tokens"]
+        # Navigation steps always carry the full snapshot
+        assert all(not row["diff"] for row in report["steps"] if row["command"] in ("visit_page", "back"))
@@ -0,0 +1,160 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app.utils.toolkit import terminal_env
+from app.utils.toolkit.terminal_env import MARKER_FILE, SharedTerminalEnv, env_key, python_in
+from app.utils.toolkit.terminal_toolkit import TerminalToolkit
+
+
+def fake_run(cmd):
+    """Lays out what `uv venv` / `uv pip install` would create."""
+    if cmd[1] == "venv":
+        env_path = cmd[-1]
+        os.makedirs(os.path.dirname(python_in(env_path)), exist_ok=True)
+        open(python_in(env_path), "w").close()
+        os.makedirs(os.path.join(env_path, "lib", "python3.10", "site-packages"), exist_ok=True)
+    else:
+        site = os.path.join(os.path.dirname(os.path.dirname(cmd[4])), "lib", "python3.10", "site-packages")
+        for package in cmd[5:]:
+            os.makedirs(os.path.join(site, f"{package}-1.0.dist-info"), exist_ok=True)
+
+
+@pytest.fixture
+def builder(tmp_path):
+    uv_path = tmp_path / "uv"
+    uv_path.touch()
+    with (
+        patch.object(terminal_env, "_run", side_effect=fake_run) as run,
+        patch.object(terminal_env, "uv", return_value=str(uv_path)),
+    ):
+        yield run
+
+
+@pytest.mark.unit
+class TestSharedTerminalEnv:
+    """Test cases for the shared, hash-verified terminal environment."""
+
+    def test_built_once_and_reused_across_restarts(self, tmp_path, builder):
+        """Test concurrent callers share one build and a new process reuses the verified env."""
+        tmp_path = tmp_path / "envs"
+        shared = SharedTerminalEnv(str(tmp_path))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(shared.ensure(["numpy", "pandas"]))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(set(results)) == 1
+        assert shared.builds == 1
+        assert results[0] == str(tmp_path / env_key(["pandas", "numpy"]))
+        marker = json.loads((tmp_path / env_key(["numpy", "pandas"]) / MARKER_FILE).read_text())
+        assert "pandas-1.0.dist-info" in marker["distributions"]
+
+        restarted = SharedTerminalEnv(str(tmp_path))
+        assert restarted.ensure(["pandas", "numpy"]) == results[0]
+        assert restarted.builds == 0
+
+    def test_tampered_env_is_rebuilt(self, tmp_path, builder):
+        """Test a removed distribution or edited marker fails verification."""
+        env_path = SharedTerminalEnv(str(tmp_path)).ensure(["numpy"])
+        os.rmdir(os.path.join(env_path, "lib", "python3.10", "site-packages", "numpy-1.0.dist-info"))
+
+        assert not SharedTerminalEnv(str(tmp_path)).verify(env_path)
+        rebuilt = SharedTerminalEnv(str(tmp_path))
+        assert rebuilt.ensure(["numpy"]) == env_path
+        assert rebuilt.builds == 1
+
+        # Extra packages installed later by an agent are fine
+        os.makedirs(os.path.join(env_path, "lib", "python3.10", "site-packages", "rich-1.0.dist-info"))
+        assert rebuilt.verify(env_path)
+
+        marker_path = os.path.join(env_path, MARKER_FILE)
+        with open(marker_path) as f:
+            marker = json.load(f)
+        marker["distributions"].append("forged-1.0.dist-info")
+        with open(marker_path, "w") as f:
+            json.dump(marker, f)
+        assert not rebuilt.verify(env_path)
+
+    def test_package_set_selects_environment(self, tmp_path, builder):
+        """Test different package lists get separate versioned environments."""
+        shared = SharedTerminalEnv(str(tmp_path))
+
+        assert shared.ensure(["numpy"]) != shared.ensure(["numpy", "requests"])
+        key = env_key(["numpy"])
+        with patch.object(terminal_env, "ENV_VERSION", terminal_env.ENV_VERSION + 1):
+            assert env_key(["numpy"]) != key
+
+    def test_failed_build_returns_none(self, tmp_path):
+        """Test a failing build is reported as unavailable instead of raising."""
+        with patch.object(terminal_env, "_run", side_effect=OSError("no network")):
+            assert SharedTerminalEnv(str(tmp_path)).ensure(["numpy"]) is None
+        assert not os.path.exists(str(tmp_path / (env_key(["numpy"]) + ".lock")))
+
+
+@pytest.mark.unit
+class TestTerminalToolkitSharedEnv:
+    """Test the terminal toolkit links the shared environment instead of installing packages."""
+
+    def test_toolkit_uses_shared_env(self, tmp_path):
+        """Test a new toolkit runs in an overlay of the shared env and skips per-project installs."""
+        env_path = str(tmp_path / "shared")
+        with (
+            patch("app.utils.toolkit.terminal_toolkit.shared_terminal_env.ensure", return_value=env_path) as ensure,
+            patch("app.utils.toolkit.terminal_toolkit.overlay_env", side_effect=lambda shared, path: path) as overlay,
+            patch("camel.toolkits.terminal_toolkit.terminal_toolkit.TerminalToolkit._install_dependencies") as install,
+        ):
+            toolkit = TerminalToolkit("shared_env_task", working_directory=str(tmp_path / "work"))
+
+        ensure.assert_called_once_with(terminal_env.DEFAULT_PACKAGES)
+        overlay_path = str(tmp_path / "work" / ".initial_env")
+        overlay.assert_called_once_with(env_path, overlay_path)
+        install.assert_not_called()
+        assert toolkit.initial_env_path == overlay_path
+        assert toolkit.python_executable == python_in(overlay_path)
+
+    @pytest.mark.skipif(os.name == "nt", reason="links a POSIX interpreter")
+    def test_overlay_sees_shared_packages_and_installs_locally(self, tmp_path):
+        """Test the overlay imports shared packages while its own site-packages is separate."""
+        shared = tmp_path / "shared"
+        shared_site = shared / "lib" / "python3.10" / "site-packages"
+        shared_site.mkdir(parents=True)
+        (shared_site / "shared_mod.py").write_text("VALUE = 42\n")
+        os.makedirs(os.path.dirname(python_in(str(shared))))
+        os.symlink(sys.executable, python_in(str(shared)))
+
+        overlay = terminal_env.overlay_env(str(shared), str(tmp_path / "work" / ".initial_env"))
+
+        assert overlay is not None
+        output = subprocess.run(
+            [python_in(overlay), "-c", "import shared_mod, site, sys; print(shared_mod.VALUE, sys.prefix, site.getsitepackages()[0])"],
+            capture_output=True, text=True, check=True,
+        ).stdout.split()
+        assert output[0] == "42"
+        assert os.path.realpath(output[1]) == os.path.realpath(overlay)
+        assert os.path.realpath(output[2]).startswith(os.path.realpath(overlay))
+        assert sorted(os.listdir(shared_site)) == ["shared_mod.py"]
+        # A second toolkit in the same directory reuses the overlay
+        marker = tmp_path / "work" / ".initial_env" / "reused"
+        marker.touch()
+        assert terminal_env.overlay_env(str(shared), overlay) == overlay
+        assert marker.exists()
+
+    def test_toolkit_falls_back_without_shared_env(self, tmp_path):
+        """Test the base per-directory setup is used when the shared env is unavailable."""
+        with (
+            patch("app.utils.toolkit.terminal_toolkit.shared_terminal_env.ensure", return_value=None),
+            patch("camel.toolkits.terminal_toolkit.terminal_toolkit.TerminalToolkit._setup_initial_environment") as setup,
+            patch("camel.toolkits.terminal_toolkit.terminal_toolkit.TerminalToolkit._install_dependencies") as install,
+        ):
+            TerminalToolkit("shared_env_task", working_directory=str(tmp_path / "work"))
+
+        setup.assert_called_once()
+        install.assert_called_once()
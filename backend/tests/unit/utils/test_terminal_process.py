@@ -0,0 +1,132 @@
+import asyncio
+import platform
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.service.task import TaskLock, task_locks
+from app.utils.agent import ToolDispatch
+from app.utils.toolkit.terminal_process import process_loop
+from app.utils.toolkit.terminal_stream import TerminalStreams
+from app.utils.toolkit.terminal_toolkit import TerminalToolkit
+
+pytestmark = pytest.mark.skipif(platform.system() == "Windows", reason="uses POSIX shell commands")
+
+update_terminal_output = TerminalToolkit._update_terminal_output
+
+
+@pytest.fixture
+def toolkit(tmp_path):
+    """A TerminalToolkit with just the state shell sessions need, skipping env setup."""
+    toolkit = TerminalToolkit.__new__(TerminalToolkit)
+    toolkit.api_task_id = "terminal_process_task"
+    toolkit.safe_mode = False
+    toolkit.use_docker_backend = False
+    toolkit.shell_sessions = {}
+    toolkit._session_lock = threading.RLock()
+    toolkit._output_condition = threading.Condition(toolkit._session_lock)
+    toolkit.working_dir = str(tmp_path)
+    toolkit.log_dir = str(tmp_path)
+    toolkit.cloned_env_path = None
+    toolkit.initial_env_path = None
+    toolkit.os_type = platform.system()
+    task_lock = MagicMock(put_queue=AsyncMock())
+    with (
+        patch("app.utils.listen.toolkit_listen.get_task_lock", return_value=task_lock),
+        patch("app.utils.toolkit.terminal_toolkit.terminal_streams", TerminalStreams()),
+        patch.object(TerminalToolkit, "_update_terminal_output"),
+    ):
+        yield toolkit
+        toolkit.cleanup()
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.mark.unit
+class TestAsyncShellSessions:
+    """Test cases for non-blocking shell sessions on the shared process loop."""
+
+    def test_parallel_sessions_do_not_queue(self, toolkit):
+        """Test several slow commands started together finish together."""
+        start = time.monotonic()
+        for i in range(4):
+            assert "started" in toolkit.shell_exec(f"sleep 0.5; echo done-{i}", id=f"s{i}", block=False)
+
+        assert wait_until(lambda: not any(s["running"] for s in toolkit.shell_sessions.values()))
+        assert time.monotonic() - start < 1.8
+        for i in range(4):
+            assert f"done-{i}" in toolkit.shell_view(f"s{i}")
+
+    def test_interactive_session(self, toolkit):
+        """Test prompts without a newline are visible and stdin input is delivered."""
+        toolkit.shell_exec("printf 'name? '; read name; echo hello $name", id="ask", block=False)
+        assert wait_until(lambda: not toolkit.shell_sessions["ask"]["output_stream"].empty())
+        assert toolkit.shell_view("ask") == "name? "
+
+        output = toolkit.shell_write_to_process("ask", "world")
+
+        assert "hello world" in output
+
+    def test_kill_session(self, toolkit):
+        """Test base toolkit kill works on a session started on the process loop."""
+        toolkit.shell_exec("sleep 30", id="long", block=False)
+        process = toolkit.shell_sessions["long"]["process"]
+
+        assert "terminated" in toolkit.shell_kill_process("long")
+        assert wait_until(lambda: process.poll() is not None)
+
+    def test_running_session_id_is_rejected(self, toolkit):
+        """Test a running session id cannot be reused."""
+        toolkit.shell_exec("sleep 30", id="dup", block=False)
+
+        assert toolkit.shell_exec("echo again", id="dup", block=False).startswith("Error: Session 'dup'")
+
+    @pytest.mark.asyncio
+    async def test_output_reaches_task_loop(self, toolkit):
+        """Test output read on the process loop wakes a consumer waiting on the task queue."""
+        task_lock = TaskLock(toolkit.api_task_id, asyncio.Queue(), {})
+        with (
+            patch.dict(task_locks, {toolkit.api_task_id: task_lock}),
+            patch.object(TerminalToolkit, "_update_terminal_output", update_terminal_output),
+        ):
+            started = time.monotonic()
+            # Agents run terminal tools off the loop (see ToolDispatch)
+            await asyncio.to_thread(toolkit.shell_exec, "echo out-$((1 + 1))", id="out", block=False)
+            data = ""
+            while "out-2" not in data:
+                data += (await asyncio.wait_for(task_lock.get_queue(), timeout=2)).data
+
+        assert time.monotonic() - started < 1
+
+    def test_output_is_logged_per_chunk(self, toolkit):
+        """Test a burst of lines costs one log write per read chunk, not one per line."""
+        with patch.object(TerminalToolkit, "_write_to_log", autospec=True) as write_to_log:
+            toolkit.shell_exec("seq 200", id="burst", block=False)
+            assert wait_until(lambda: not toolkit.shell_sessions["burst"]["running"])
+
+        output = "".join(call.args[2] for call in write_to_log.call_args_list[1:])
+        assert output.split() == [str(i) for i in range(1, 201)]
+        assert write_to_log.call_count <= 4
+
+    @pytest.mark.asyncio
+    async def test_process_loop_refuses_to_block_event_loop(self):
+        """Test waiting on the process loop from a running event loop raises instead of stalling it."""
+        with pytest.raises(RuntimeError, match="block a running event loop"):
+            process_loop.run(asyncio.sleep(0))
+
+        assert await asyncio.to_thread(process_loop.run, asyncio.sleep(0, "ok")) == "ok"
+
+    def test_terminal_tools_dispatch_to_thread(self, toolkit):
+        """Test agents call the terminal's sync tools in a worker thread."""
+        from camel.toolkits import FunctionTool
+
+        assert ToolDispatch.resolve(FunctionTool(toolkit.shell_exec)).invoke == "thread"
@@ -0,0 +1,138 @@
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.service.task import TaskLock, task_locks
+from app.utils.toolkit.terminal_stream import AnsiStripper, TerminalStream, TerminalStreams
+from app.utils.toolkit.terminal_toolkit import TerminalToolkit
+
+
+@pytest.mark.unit
+class TestAnsiStripper:
+    """Test cases for incremental ANSI stripping."""
+
+    def test_sequence_split_across_chunks(self):
+        """Test an escape sequence split between writes is removed, not leaked as text."""
+        stripper = AnsiStripper()
+
+        out = stripper.feed("\x1b[32mok\x1b[") + stripper.feed("0m done\r\n") + stripper.feed("\x1b]0;title\x07next")
+
+        assert out == "ok done\nnext"
+
+    def test_unterminated_escape_is_not_held_forever(self):
+        """Test a stray escape prefix does not swallow the rest of the output."""
+        stripper = AnsiStripper()
+
+        out = stripper.feed("\x1b]" + "x" * 300)
+
+        assert out.endswith("x" * 300)
+
+
+@pytest.mark.unit
+class TestTerminalStream:
+    """Test cases for ring-buffered, rate-limited terminal output."""
+
+    def test_many_writes_are_batched(self):
+        """Test a burst of lines is flushed as a few chunks with contiguous offsets."""
+        chunks = []
+        stream = TerminalStream(chunks.append, flush_interval=0.05)
+        lines = [f"Collecting package-{i}\n" for i in range(2000)]
+
+        for line in lines:
+            stream.write(line)
+        stream.flush()
+
+        assert len(chunks) < 10
+        assert "".join(chunk.data for chunk in chunks) == "".join(lines)
+        assert [chunk.offset for chunk in chunks] == [
+            sum(len(c.data) for c in chunks[:i]) for i in range(len(chunks))
+        ]
+
+    def test_pending_output_flushes_on_timer(self):
+        """Test output written inside the interval is delivered without another write."""
+        chunks = []
+        stream = TerminalStream(chunks.append, flush_interval=0.05)
+
+        stream.write("first\n")
+        stream.write("second\n")
+        assert [chunk.data for chunk in chunks] == ["first\n"]
+
+        time.sleep(0.2)
+        assert [chunk.data for chunk in chunks] == ["first\n", "second\n"]
+        assert chunks[1].offset == len("first\n")
+
+    def test_size_threshold_flushes_immediately(self):
+        """Test a large burst is flushed as soon as it reaches the chunk size."""
+        chunks = []
+        stream = TerminalStream(chunks.append, flush_interval=60, flush_chars=100)
+        stream.write("warmup\n")
+
+        stream.write("x" * 150)
+
+        assert [len(chunk.data) for chunk in chunks] == [7, 150]
+
+    def test_read_catches_up_from_offset(self):
+        """Test clients can read from any offset still held in the ring buffer."""
+        stream = TerminalStream(MagicMock(), flush_interval=60, buffer_chars=10)
+        for i in range(5):
+            stream.write(f"line{i}\n")
+
+        recent = stream.read(stream.offset - 6)
+        assert recent.data == "line4\n"
+        assert not recent.truncated
+
+        old = stream.read(0)
+        assert old.truncated
+        assert old.data == "line3\nline4\n"
+        assert old.next_offset == 30
+
+
+@pytest.mark.unit
+class TestTerminalToolkitStreaming:
+    """Test the terminal toolkit forwards output through its stream."""
+
+    def test_write_to_log_sends_batched_events(self, tmp_path):
+        """Test many log writes become a few terminal events carrying offsets."""
+        streams = TerminalStreams()
+        sent = []
+        toolkit = TerminalToolkit.__new__(TerminalToolkit)
+        toolkit.api_task_id = "stream_task"
+        log_file = str(tmp_path / "session.log")
+
+        with (
+            patch("app.utils.toolkit.terminal_toolkit.terminal_streams", streams),
+            patch.object(TerminalToolkit, "_update_terminal_output", lambda self, *args: sent.append(args)),
+        ):
+            for i in range(500):
+                toolkit._write_to_log(log_file, f"\x1b[1mstep {i}\x1b[0m\n")
+            streams.drop_task("stream_task")
+
+        assert 1 <= len(sent) < 10
+        assert "".join(data for data, _, _ in sent) == "".join(f"step {i}\n" for i in range(500))
+        assert sent[0][1] == 0
+        assert len(streams) == 0
+
+    @pytest.mark.asyncio
+    async def test_timer_flush_reaches_task_loop(self, tmp_path):
+        """Test output flushed by the stream's timer thread wakes a consumer waiting on the task queue."""
+        task_lock = TaskLock("stream_loop_task", asyncio.Queue(), {})
+        toolkit = TerminalToolkit.__new__(TerminalToolkit)
+        toolkit.api_task_id = "stream_loop_task"
+
+        with (
+            patch.dict(task_locks, {"stream_loop_task": task_lock}),
+            patch("app.utils.toolkit.terminal_toolkit.terminal_streams", TerminalStreams()),
+        ):
+            stream = toolkit._terminal_stream("p1")
+            stream.write("first\n")
+            assert (await asyncio.wait_for(task_lock.get_queue(), timeout=1)).data == "first\n"
+
+            # Within the flush interval: held back and flushed from the timer thread
+            stream.write("second\n")
+            started = time.monotonic()
+            item = await asyncio.wait_for(task_lock.get_queue(), timeout=2)
+
+        assert item.data == "second\n" and item.offset == len("first\n")
+        assert time.monotonic() - started < 1
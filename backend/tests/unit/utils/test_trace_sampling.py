@@ -0,0 +1,126 @@
+import asyncio
+import inspect
+
+import pytest
+
+from utils import traceroot_wrapper as traceroot
+from utils.traceroot_wrapper import parse_trace_samples, sample_rate, sample_trace
+
+
+def traced_pair(rate, parent_recording=lambda: False):
+    """A function and its sampled version, recording which calls were traced."""
+    calls = []
+
+    def traced(*args):
+        calls.append(("traced", args))
+        return function(*args)
+
+    def function(*args):
+        calls.append(("plain", args))
+        return len(args)
+
+    return sample_trace(function, traced, rate, parent_recording), calls
+
+
+@pytest.mark.unit
+class TestTraceSampling:
+    """Test cases for head-based trace sampling."""
+
+    def test_disabled_trace_returns_function(self):
+        """Test the decorator is a no-op returning the original function when tracing is off."""
+        if traceroot.is_enabled():
+            pytest.skip("TraceRoot is configured")
+
+        def handler():
+            pass
+
+        assert traceroot.trace()(handler) is handler
+
+    def test_rate_decides_roots(self):
+        """Test root calls are traced at the given rate."""
+        always, calls = traced_pair(1)
+        assert always(1, 2) == 2
+        assert calls == [("traced", (1, 2)), ("plain", (1, 2))]
+
+        never, calls = traced_pair(0.0)
+        assert never(1) == 1
+        assert calls == [("plain", (1,))]
+
+    def test_children_follow_the_root(self):
+        """Test calls under a sampled-out call are never traced and calls under a recording span always are."""
+        child, child_calls = traced_pair(1)
+
+        def root():
+            return child()
+
+        sample_trace(root, lambda: None, 0.0, lambda: False)()
+        assert child_calls == [("plain", ())]
+        child()
+        assert child_calls[-1] == ("plain", ())
+        assert child_calls[-2] == ("traced", ())
+
+        in_span, calls = traced_pair(0.0, parent_recording=lambda: True)
+        in_span()
+        assert calls[0][0] == "traced"
+
+    def test_async_functions(self):
+        """Test coroutine functions stay awaitable and the decision is scoped to the call."""
+        seen = []
+
+        async def function():
+            seen.append(traceroot._sampled_out.get())
+
+        async def traced():
+            seen.append("traced")
+
+        wrapper = sample_trace(function, traced, 0.0, lambda: False)
+        assert asyncio.iscoroutinefunction(wrapper)
+        asyncio.run(wrapper())
+        assert seen == [True]
+        assert traceroot._sampled_out.get() is False
+
+    def test_generator_functions(self):
+        """Test generator functions stay generators and stay sampled out until the iteration ends."""
+        seen = []
+
+        def function():
+            for item in range(2):
+                seen.append(traceroot._sampled_out.get())
+                yield item
+
+        async def async_function():
+            for item in range(2):
+                seen.append(traceroot._sampled_out.get())
+                yield item
+
+        def traced():
+            seen.append("traced")
+            yield from function()
+
+        wrapper = sample_trace(function, traced, 0.0, lambda: False)
+        assert inspect.isgeneratorfunction(wrapper)
+        assert list(wrapper()) == [0, 1]
+        assert seen == [True, True]
+        assert traceroot._sampled_out.get() is False
+
+        seen.clear()
+        assert list(sample_trace(function, traced, 1, lambda: False)()) == [0, 1]
+        assert seen == ["traced", False, False]
+
+        async def collect():
+            wrapper = sample_trace(async_function, async_function, 0.0, lambda: False)
+            assert inspect.isasyncgenfunction(wrapper)
+            items = [item async for item in wrapper()]
+            return items, traceroot._sampled_out.get()
+
+        seen.clear()
+        assert asyncio.run(collect()) == ([0, 1], False)
+        assert seen == [True, True]
+
+    def test_rates_from_environment_spec(self):
+        """Test TRACE_SAMPLE parsing and longest-prefix matching."""
+        rates = parse_trace_samples("app.controller=0.1, app.controller.chat_controller=0.5,bad=x")
+        assert rates == {"app.controller": 0.1, "app.controller.chat_controller": 0.5}
+        assert sample_rate("app.controller.chat_controller.post", rates, 1.0) == 0.5
+        assert sample_rate("app.controller.task_controller.start", rates, 1.0) == 0.1
+        assert sample_rate("app.service.chat_service.step_solve", rates, 1.0) == 1.0
@@ -30,7 +30,8 @@ class TestWorkforce:
         assert workforce.api_task_id == api_task_id
         assert workforce.description == description
 
-    def test_node_make_sub_tasks_success(self):
+    @pytest.mark.asyncio
+    async def test_node_make_sub_tasks_success(self):
         """Test node_make_sub_tasks successfully decomposes task."""
         api_task_id = "test_api_task_123"
         workforce = Workforce(
@@ -48,10 +49,10 @@ class TestWorkforce:
         
         with patch.object(workforce, 'reset'), \
              patch.object(workforce, 'set_channel'), \
-             patch.object(workforce, '_decompose_task', return_value=mock_subtasks), \
+             patch.object(workforce, '_adecompose_task', new_callable=AsyncMock, return_value=mock_subtasks), \
              patch('app.utils.workforce.validate_task_content', return_value=True):
             
-            result = workforce.node_make_sub_tasks(task)
+            result = await workforce.node_make_sub_tasks(task)
             
             assert result == mock_subtasks
             assert workforce._task is task
@@ -59,7 +60,8 @@ class TestWorkforce:
             assert task.state == TaskState.OPEN
             assert task in workforce._pending_tasks
 
-    def test_node_make_sub_tasks_with_streaming_decomposition(self):
+    @pytest.mark.asyncio
+    async def test_node_make_sub_tasks_with_streaming_decomposition(self):
         """Test node_make_sub_tasks with streaming decomposition result."""
         api_task_id = "test_api_task_123"
         workforce = Workforce(
@@ -70,17 +72,17 @@ class TestWorkforce:
         task = Task(content="Complex project task", id="main_task")
         
         # Mock streaming generator
-        def mock_streaming_decomposition():
+        async def mock_streaming_decomposition():
             yield [Task(content="Phase 1", id="phase_1")]
             yield [Task(content="Phase 2", id="phase_2")]
             yield [Task(content="Phase 3", id="phase_3")]
         
         with patch.object(workforce, 'reset'), \
              patch.object(workforce, 'set_channel'), \
-             patch.object(workforce, '_decompose_task', return_value=mock_streaming_decomposition()), \
+             patch.object(workforce, '_adecompose_task', new_callable=AsyncMock, return_value=mock_streaming_decomposition()), \
              patch('app.utils.workforce.validate_task_content', return_value=True):
             
-            result = workforce.node_make_sub_tasks(task)
+            result = await workforce.node_make_sub_tasks(task)
             
             # Should have flattened all streaming results
             assert len(result) == 3
@@ -89,7 +91,40 @@ class TestWorkforce:
             assert result[1].content == "Phase 2"
             assert result[2].content == "Phase 3"
 
-    def test_node_make_sub_tasks_invalid_content(self):
+    @pytest.mark.asyncio
+    async def test_node_make_sub_tasks_awaits_async_stream_callbacks(self):
+        """Test node_make_sub_tasks awaits coroutine stream callbacks on the running loop."""
+        workforce = Workforce(
+            api_task_id="test_api_task_123",
+            description="Test workforce"
+        )
+        task = Task(content="Complex project task", id="main_task")
+
+        async def mock_streaming_decomposition():
+            yield [Task(content="Phase 1", id="phase_1")]
+            yield [Task(content="Phase 2", id="phase_2")]
+
+        batches = []
+
+        async def on_stream_batch(new_tasks, is_final=False):
+            batches.append(([t.id for t in new_tasks], is_final))
+
+        with patch.object(workforce, 'reset'), \
+             patch.object(workforce, 'set_channel'), \
+             patch.object(workforce, '_adecompose_task', new_callable=AsyncMock, return_value=mock_streaming_decomposition()), \
+             patch('app.utils.workforce.validate_task_content', return_value=True):
+
+            result = await workforce.node_make_sub_tasks(task, on_stream_batch=on_stream_batch)
+
+            assert len(result) == 2
+            assert batches == [
+                (["phase_1"], False),
+                (["phase_2"], False),
+                (["phase_1", "phase_2"], True),
+            ]
+
+    @pytest.mark.asyncio
+    async def test_node_make_sub_tasks_invalid_content(self):
         """Test node_make_sub_tasks with invalid task content."""
         api_task_id = "test_api_task_123"
         workforce = Workforce(
@@ -102,7 +137,7 @@ class TestWorkforce:
         
         with patch('app.utils.workforce.validate_task_content', return_value=False):
             with pytest.raises(UserException):
-                workforce.node_make_sub_tasks(task)
+                await workforce.node_make_sub_tasks(task)
             
             # Task should be marked as failed
             assert task.state == TaskState.FAILED
@@ -413,12 +448,12 @@ class TestWorkforceIntegration:
             Task(content="Testing", id="test_task")
         ]
         
-        with patch.object(workforce, '_decompose_task', return_value=subtasks), \
+        with patch.object(workforce, '_adecompose_task', new_callable=AsyncMock, return_value=subtasks), \
              patch('app.utils.workforce.validate_task_content', return_value=True), \
              patch.object(workforce, 'start', new_callable=AsyncMock):
             
             # Make subtasks
-            result_subtasks = workforce.node_make_sub_tasks(main_task)
+            result_subtasks = await workforce.node_make_sub_tasks(main_task)
             assert len(result_subtasks) == 3
             
             # Start workforce
@@ -531,7 +566,8 @@ class TestWorkforceWithLLM:
 class TestWorkforceErrorCases:
     """Test error cases and edge conditions for Workforce."""
     
-    def test_node_make_sub_tasks_with_none_task(self):
+    @pytest.mark.asyncio
+    async def test_node_make_sub_tasks_with_none_task(self):
         """Test node_make_sub_tasks with None task."""
         api_task_id = "error_test_123"
         workforce = Workforce(
@@ -540,9 +576,10 @@ class TestWorkforceErrorCases:
         )
         
         with pytest.raises((AttributeError, TypeError)):
-            workforce.node_make_sub_tasks(None)
+            await workforce.node_make_sub_tasks(None)
 
-    def test_node_make_sub_tasks_with_malformed_task(self):
+    @pytest.mark.asyncio
+    async def test_node_make_sub_tasks_with_malformed_task(self):
         """Test node_make_sub_tasks with malformed task object."""
         api_task_id = "error_test_123"
         workforce = Workforce(
@@ -557,7 +594,7 @@ class TestWorkforceErrorCases:
         
         with patch('app.utils.workforce.validate_task_content', return_value=False):
             with pytest.raises(UserException):
-                workforce.node_make_sub_tasks(fake_task)
+                await workforce.node_make_sub_tasks(fake_task)
 
     @pytest.mark.asyncio
     async def test_node_start_with_empty_subtasks(self):
@@ -0,0 +1,431 @@
+"""
+Latency and SQL statements per request of the busiest database endpoints.
+
+Seeds a database with production-like volumes, many users' chat histories,
+their steps, credit records, installed MCP servers and configs, then calls
+each endpoint through the FastAPI app as one user with other users' rows
+around it:
+
+    POST /chat/steps                  GET /user/current_credits
+    GET  /chat/steps/playback/{id}    GET /user/stat
+    GET  /chat/histories/grouped      GET /mcps
+
+    python -m app.bench.db_endpoints [--steps 1000000] [--histories 20000] \\
+        [--requests 100] [--database-url URL] [--json]
+
+Run it from `server/`, like `main.py`. Without `--database-url` the data
+goes to a SQLite file in the temp directory, kept and reused by runs with
+the same volumes. A scratch Postgres works too, seeded when it has no
+bench user yet.
+
+Every statement a request sends is counted and, once per distinct
+statement, explained. A case fails when it answers with an error, sends
+more statements than its budget (the shape N+1 queries take) or scans a
+table of more than `--scan-rows` rows without an index; the command then
+exits with status 1.
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import delete, event, inspect, text
+from sqlalchemy.engine import Engine
+
+BENCH_EMAIL = "bench@example.com"
+# Steps posted by the bench go to a task of their own, deleted after the run
+WRITE_TASK = "db-bench-writes"
+BATCH = 10000
+
+STEP_KINDS = ["activate_agent", "activate_toolkit", "deactivate_toolkit", "deactivate_agent", "assign_task", "task_state"]
+
+
+@dataclass
+class Volumes:
+    users: int = 1000
+    histories: int = 20000
+    steps: int = 1000000
+    credits: int = 100000
+    mcps: int = 300
+    mcp_users: int = 5000
+    configs: int = 20000
+    user_share: float = 0.05
+    """Fraction of histories, credit records, MCP installs and configs that belong to the bench user"""
+
+    def key(self) -> str:
+        return "_".join(str(v) for v in (self.users, self.histories, self.steps, self.credits, self.mcps, self.mcp_users, self.configs, self.user_share))
+
+
+@dataclass
+class Case:
+    name: str
+    method: str
+    path: str
+    budget: int
+    """Statements one request may send"""
+    body: Callable[[int], Any] | None = None
+    stream: bool = False
+
+
+@dataclass
+class Statements:
+    """Statements sent through the engine, with the parameters of their first use."""
+
+    sent: List[str] = field(default_factory=list)
+    first: Dict[str, Any] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def listen(self, engine: Engine) -> None:
+        @event.listens_for(engine, "before_cursor_execute")
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            with self.lock:
+                self.sent.append(statement)
+                self.first.setdefault(statement, parameters)
+
+    def take(self) -> List[str]:
+        with self.lock:
+            sent, self.sent = self.sent, []
+        return sent
+
+
+def configure(database_url: str | None, volumes: Volumes) -> str:
+    """Point the app at the bench database; it reads its settings at import time."""
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.gettempdir(), f"eigent_db_bench_{volumes.key()}.sqlite")
+    os.environ["database_url"] = database_url
+    os.environ.setdefault("secret_key", "bench")
+    return database_url
+
+
+def rows(count: int, make: Callable[[int], Dict[str, Any]]):
+    batch = []
+    for i in range(count):
+        batch.append(make(i))
+        if len(batch) == BATCH:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(engine: Engine, volumes: Volumes) -> None:
+    from sqlmodel import SQLModel
+
+    from app.model.chat.chat_history import ChatHistory
+    from app.model.chat.chat_step import ChatStep
+    from app.model.config.config import Config
+    from app.model.mcp.category import Category
+    from app.model.mcp.mcp import Mcp
+    from app.model.mcp.mcp_env import McpEnv
+    from app.model.mcp.mcp_user import McpUser
+    from app.model.user.user import User
+    from app.model.user.user_credits_record import UserCreditsRecord
+    from app.model.user.user_stat import UserStat
+
+    SQLModel.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime.now()
+
+    def owner(i: int) -> int:
+        # The bench user (id 1) owns `user_share` of the rows, the rest is spread over everyone
+        return 1 if rng.random() < volumes.user_share else rng.randint(2, volumes.users)
+
+    def ago(days: float) -> datetime:
+        return now - timedelta(days=days)
+
+    histories = []
+    for i in range(volumes.histories):
+        user_id = owner(i)
+        histories.append((user_id, f"task_{i}", f"project_{user_id}_{i // 5}"))
+
+    tables: List[Tuple[Any, int, Callable[[int], Dict[str, Any]]]] = [
+        (User, volumes.users, lambda i: {
+            "id": i + 1,
+            "email": BENCH_EMAIL if i == 0 else f"user{i + 1}@example.com",
+            "username": f"user{i + 1}",
+            "credits": 1000,
+            "status": 1,
+            "created_at": ago(400),
+            "updated_at": ago(1),
+        }),
+        (ChatHistory, volumes.histories, lambda i: {
+            "id": i + 1,
+            "user_id": histories[i][0],
+            "task_id": histories[i][1],
+            "project_id": histories[i][2],
+            "question": f"Build a landing page for product {i} and write the copy for it.",
+            "language": "en",
+            "model_platform": "openai",
+            "model_type": "gpt-4o",
+            "api_key": "",
+            "api_url": "https://api.openai.com/v1",
+            "max_retries": 3,
+            "installed_mcp": "{}",
+            "project_name": f"Project {i // 5}",
+            "summary": "Built the page and wrote the copy.",
+            "tokens": 1000 + i % 5000,
+            "spend": 0.0,
+            "status": 2 if i % 7 else 1,
+            "created_at": ago(i / volumes.histories * 365),
+            "updated_at": ago(i / volumes.histories * 365),
+        }),
+        (ChatStep, volumes.steps, lambda i: {
+            "id": i + 1,
+            "task_id": histories[i % volumes.histories][1],
+            "step": STEP_KINDS[i % len(STEP_KINDS)],
+            "data": {"agent_name": "developer_agent", "process_task_id": f"task_{i % volumes.histories}.1", "message": "x" * 200},
+            "timestamp": time.time() - (volumes.steps - i),
+            "created_at": ago((volumes.steps - i) / volumes.steps * 365),
+            "updated_at": ago((volumes.steps - i) / volumes.steps * 365),
+        }),
+        (UserCreditsRecord, volumes.credits, lambda i: {
+            "id": i + 1,
+            "user_id": 1 if i == 0 else owner(i),
+            "amount": -10 if i % 3 else 500,
+            "balance": 0,
+            "channel": 3 if i == 0 else (7 if i % 3 else 5),
+            "source_id": i,
+            "remark": "",
+            "expire_at": now + timedelta(days=1) if i == 0 else None,
+            "used": False,
+            "created_at": ago(i / volumes.credits * 365),
+            "updated_at": ago(i / volumes.credits * 365),
+        }),
+        (UserStat, volumes.users, lambda i: {"id": i + 1, "user_id": i + 1, "model_type": "cloud", "created_at": ago(30), "updated_at": ago(1)}),
+        (Category, 12, lambda i: {"id": i + 1, "name": f"Category {i}", "description": "", "priority": i, "created_at": ago(300), "updated_at": ago(300)}),
+        (Mcp, volumes.mcps, lambda i: {
+            "id": i + 1,
+            "category_id": i % 12 + 1,
+            "name": f"MCP server {i}",
+            "key": f"mcp-server-{i}",
+            "description": "Tools for a service.",
+            "home_page": "",
+            "type": 1,
+            "status": 1,
+            "sort": i,
+            "server_name": f"server-{i}",
+            "install_command": {"command": "npx", "args": [f"mcp-server-{i}"], "env": {}},
+            "created_at": ago(300),
+            "updated_at": ago(300),
+        }),
+        (McpEnv, volumes.mcps * 2, lambda i: {
+            "id": i + 1,
+            "mcp_id": i // 2 + 1,
+            "env_name": f"TOKEN_{i}",
+            "env_description": "",
+            "env_key": f"TOKEN_{i}",
+            "env_default_value": "",
+            "env_required": 1,
+            "status": 1 if i % 4 else 2,
+            "created_at": ago(300),
+            "updated_at": ago(300),
+        }),
+        (McpUser, volumes.mcp_users, lambda i: {
+            "id": i + 1,
+            "mcp_id": i % volumes.mcps + 1,
+            "user_id": owner(i),
+            "mcp_name": f"MCP server {i % volumes.mcps}",
+            "mcp_key": f"mcp-server-{i % volumes.mcps}",
+            "type": 1,
+            "status": 1,
+            "created_at": ago(100),
+            "updated_at": ago(100),
+        }),
+        (Config, volumes.configs, lambda i: {
+            "id": i + 1,
+            "user_id": owner(i),
+            "config_name": f"KEY_{i}",
+            "config_value": "value",
+            "config_group": f"group_{i % 8}",
+            "created_at": ago(100),
+            "updated_at": ago(100),
+        }),
+    ]
+    with engine.begin() as conn:
+        for model, count, make in tables:
+            for batch in rows(count, make):
+                conn.execute(model.__table__.insert(), batch)
+        if engine.dialect.name == "postgresql":
+            # Rows were inserted with explicit ids, which leaves the id sequences at 1
+            for model, _, _ in tables:
+                name = model.__table__.name
+                conn.execute(
+                    text(f"SELECT setval(pg_get_serial_sequence(:table, 'id'), (SELECT max(id) FROM \"{name}\"))"),
+                    {"table": f'"{name}"'},
+                )
+
+
+def seeded(engine: Engine) -> bool:
+    if not inspect(engine).has_table("user"):
+        return False
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT count(*) FROM "user" WHERE email = :email'), {"email": BENCH_EMAIL}).scalar() > 0
+
+
+def table_rows(engine: Engine) -> Dict[str, int]:
+    with engine.connect() as conn:
+        return {name: conn.execute(text(f'SELECT count(*) FROM "{name}"')).scalar() for name in inspect(engine).get_table_names()}
+
+
+def scans(engine: Engine, statement: str, parameters: Any, sizes: Dict[str, int], scan_rows: int) -> List[str]:
+    """Tables of more than `scan_rows` rows the statement reads in full, from the database's own plan."""
+    if statement.lstrip().upper().startswith("INSERT"):
+        return []
+    sqlite = engine.dialect.name == "sqlite"
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters)
+        plan = [str(row[-1] if sqlite else row[0]) for row in cursor.fetchall()]
+    finally:
+        raw.close()
+    found = []
+    for line in plan:
+        words = line.replace("Seq Scan on ", "SCAN ").split()
+        if "SCAN" in words:
+            table = words[words.index("SCAN") + 1].strip('"')
+            if sizes.get(table, 0) > scan_rows and table not in found:
+                found.append(table)
+    return found
+
+
+def clear_writes(engine: Engine) -> None:
+    from app.model.chat.chat_step import ChatStep
+
+    with engine.begin() as conn:
+        conn.execute(delete(ChatStep.__table__).where(ChatStep.__table__.c.task_id == WRITE_TASK))
+
+
+def cases(playback_task: str) -> List[Case]:
+    return [
+        Case(
+            "POST /chat/steps",
+            "POST",
+            "/chat/steps",
+            budget=3,
+            body=lambda i: {"task_id": WRITE_TASK, "step": "notice", "data": {"message": f"bench {i}"}, "timestamp": time.time()},
+        ),
+        Case("GET /chat/steps/playback", "GET", f"/chat/steps/playback/{playback_task}", budget=3, stream=True),
+        Case("GET /chat/histories/grouped", "GET", "/chat/histories/grouped", budget=3),
+        Case("GET /user/current_credits", "GET", "/user/current_credits", budget=4),
+        Case("GET /user/stat", "GET", "/user/stat", budget=6),
+        Case("GET /mcps", "GET", "/mcps", budget=6),
+        Case("GET /mcps?mine=1", "GET", "/mcps?mine=1", budget=7),
+    ]
+
+
+def measure(client, case: Case, requests: int, statements: Statements) -> Dict[str, Any]:
+    timings, counts, sent, status = [], [], set(), None
+    statements.take()
+    for i in range(requests):
+        started = time.perf_counter()
+        response = client.request(case.method, case.path, json=case.body(i) if case.body else None)
+        if case.stream:
+            response.read()
+        timings.append((time.perf_counter() - started) * 1000)
+        status = response.status_code
+        requested = statements.take()
+        counts.append(len(requested))
+        sent.update(requested)
+        if status >= 400:
+            break
+    timings.sort()
+    return {
+        "status": status,
+        "requests": len(timings),
+        "ms_p50": statistics.median(timings),
+        "ms_p99": timings[min(len(timings) - 1, int(0.99 * len(timings)))],
+        "queries": max(counts),
+        "budget": case.budget,
+        "statements": sorted(sent),
+    }
+
+
+def run(volumes: Volumes, requests: int, database_url: str | None = None, scan_rows: int = 10000) -> Dict[str, Any]:
+    url = configure(database_url, volumes)
+    from fastapi.testclient import TestClient
+
+    # The app as `main.py` builds it, with every router
+    from main import api
+    from app.component.auth import Auth
+    from app.component.database import engine
+
+    started = time.perf_counter()
+    if not seeded(engine):
+        seed(engine, volumes)
+    seed_seconds = time.perf_counter() - started
+    sizes = table_rows(engine)
+
+    # A run that was interrupted may have left its writes behind
+    clear_writes(engine)
+    statements = Statements()
+    statements.listen(engine)
+    with engine.connect() as conn:
+        playback_task = conn.execute(text("SELECT task_id FROM chat_history WHERE user_id = 1 ORDER BY id DESC LIMIT 1")).scalar()
+    token = Auth.create_access_token(1)
+    report: Dict[str, Any] = {"database": engine.dialect.name, "seed_seconds": seed_seconds, "rows": sizes, "cases": {}}
+    # Errors are reported as the status of their case
+    with TestClient(api, headers={"Authorization": f"Bearer {token}"}, raise_server_exceptions=False) as client:
+        try:
+            for case in cases(playback_task):
+                # Warm the statement caches before timing
+                measure(client, case, 2, statements)
+                result = measure(client, case, requests, statements)
+                scanned = sorted({t for s in result.pop("statements") for t in scans(engine, s, statements.first[s], sizes, scan_rows)})
+                result["scans"] = scanned
+                result["failed"] = result["status"] >= 400 or result["queries"] > case.budget or bool(scanned)
+                report["cases"][case.name] = result
+        finally:
+            clear_writes(engine)
+    report["database_url"] = url.split("@")[-1]
+    report["failed"] = [name for name, result in report["cases"].items() if result["failed"]]
+    return report
+
+
+def main(argv: List[str] | None = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    defaults = Volumes()
+    for name in ("users", "histories", "steps", "credits", "mcps", "mcp_users", "configs"):
+        parser.add_argument("--" + name.replace("_", "-"), type=int, default=getattr(defaults, name), help="rows to seed")
+    parser.add_argument("--user-share", type=float, default=defaults.user_share, help="fraction of rows owned by the bench user")
+    parser.add_argument("--requests", type=int, default=100, help="requests per endpoint")
+    parser.add_argument("--database-url", default=None, help="database to seed and query instead of a temporary SQLite file")
+    parser.add_argument("--scan-rows", type=int, default=10000, help="tables larger than this must not be scanned in full")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    volumes = Volumes(
+        args.users, args.histories, args.steps, args.credits, args.mcps, args.mcp_users, args.configs, args.user_share
+    )
+    if args.json:
+        # The app logs each request to stdout
+        logging.disable(logging.INFO)
+    report = run(volumes, args.requests, args.database_url, args.scan_rows)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['database']} at {report['database_url']}, seeded in {report['seed_seconds']:.1f}s")
+        for name, result in report["cases"].items():
+            print(
+                f"{name:30} {result['status']:4} {result['ms_p50']:8.2f} ms p50 {result['ms_p99']:8.2f} ms p99 "
+                f"{result['queries']:3}/{result['budget']} queries"
+                + (f"  scans {', '.join(result['scans'])}" if result["scans"] else "")
+                + ("  FAILED" if result["failed"] else "")
+            )
+    if report["failed"]:
+        parser.exit(1)
+    return report
+
+
+if __name__ == "__main__":
+    main()
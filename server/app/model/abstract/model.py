@@ -30,13 +30,14 @@ class AbstractModel(SQLModel):
         options: ExecutableOption | list[ExecutableOption] | None = None,
         s: Session,
     ):
-        logger.debug("Executing query by conditions", extra={
-            "model_class": cls.__name__,
-            "has_order_by": order_by is not None,
-            "limit": limit,
-            "offset": offset,
-            "has_options": options is not None
-        })
+        logger.debug(
+            "Executing query by conditions",
+            model_class=cls.__name__,
+            has_order_by=order_by is not None,
+            limit=limit,
+            offset=offset,
+            has_options=options is not None,
+        )
         stmt = select(cls).where(*whereclause)
         if order_by is not None:
             stmt = stmt.order_by(order_by)
@@ -54,14 +55,10 @@ class AbstractModel(SQLModel):
         *whereclause: ColumnExpressionArgument[bool] | bool,
         s: Session,
     ) -> bool:
-        logger.debug("Checking if record exists", extra={"model_class": cls.__name__})
+        logger.debug("Checking if record exists", model_class=cls.__name__)
         res = s.exec(select(func.count("*")).where(*whereclause)).first()
         result = res is not None and res > 0
-        logger.debug("Record existence check result", extra={
-            "model_class": cls.__name__,
-            "exists": result,
-            "count": res
-        })
+        logger.debug("Record existence check result", model_class=cls.__name__, exists=result, count=res)
         return result
 
     @classmethod
@@ -0,0 +1,72 @@
+/**
+ * Applies `sub_tasks_delta` events from the backend to a subtask tree.
+ *
+ * The backend sends the whole tree once with `to_sub_tasks` (carrying a
+ * `seq`) and afterwards only the changes, each naming the `base_seq` it
+ * applies to. A delta whose `base_seq` is not the tree we hold means an
+ * event was missed; the caller then fetches the full tree again.
+ */
+
+export interface SubTaskNode {
+	id: string;
+	content: string;
+	state?: string;
+	subtasks?: SubTaskNode[];
+	[key: string]: any;
+}
+
+export type SubTaskOp =
+	| { op: 'remove'; id: string }
+	| { op: 'add'; parent: string | null; index: number; node: SubTaskNode }
+	| { op: 'update'; id: string; fields: Partial<SubTaskNode> };
+
+export interface SubTaskDelta {
+	seq: number;
+	base_seq: number;
+	ops: SubTaskOp[];
+}
+
+const withoutNode = (nodes: SubTaskNode[], id: string): SubTaskNode[] =>
+	nodes
+		.filter((node) => node.id !== id)
+		.map((node) => (node.subtasks?.length ? { ...node, subtasks: withoutNode(node.subtasks, id) } : node));
+
+const mapNode = (
+	nodes: SubTaskNode[],
+	id: string,
+	change: (node: SubTaskNode) => SubTaskNode
+): SubTaskNode[] =>
+	nodes.map((node) => {
+		if (node.id === id) return change(node);
+		return node.subtasks?.length ? { ...node, subtasks: mapNode(node.subtasks, id, change) } : node;
+	});
+
+const insertAt = (nodes: SubTaskNode[], index: number, node: SubTaskNode): SubTaskNode[] => {
+	const next = [...nodes];
+	next.splice(index, 0, node);
+	return next;
+};
+
+/** Returns a new tree with the ops applied in order; the input is not modified. */
+export function applySubTaskOps(tree: SubTaskNode[], ops: SubTaskOp[]): SubTaskNode[] {
+	return ops.reduce((nodes, op) => {
+		switch (op.op) {
+			case 'remove':
+				return withoutNode(nodes, op.id);
+			case 'update':
+				return mapNode(nodes, op.id, (node) => ({ ...node, ...op.fields }));
+			case 'add':
+				if (op.parent === null) return insertAt(nodes, op.index, op.node);
+				return mapNode(nodes, op.parent, (node) => ({
+					...node,
+					subtasks: insertAt(node.subtasks || [], op.index, op.node),
+				}));
+			default:
+				return nodes;
+		}
+	}, tree);
+}
+
+/** Whether `delta` can be applied to the tree at `seq`. */
+export const appliesTo = (delta: SubTaskDelta, seq: number | undefined): boolean =>
+	seq !== undefined && delta.base_seq === seq;
@@ -1,4 +1,4 @@
-import { fetchPost, fetchPut, getBaseURL, proxyFetchPost, proxyFetchPut, proxyFetchGet, uploadFile, fetchDelete, waitForBackendReady } from '@/api/http';
+import { fetchGet, fetchPost, fetchPut, getBaseURL, proxyFetchPost, proxyFetchPut, proxyFetchGet, uploadFile, fetchDelete, waitForBackendReady } from '@/api/http';
 import { fetchEventSource } from '@microsoft/fetch-event-source';
 import { createStore } from 'zustand';
 import { generateUniqueId, uploadLog } from "@/lib";
@@ -8,6 +8,7 @@ import { useProjectStore } from './projectStore';
 import { showCreditsToast } from '@/components/Toast/creditsToast';
 import { showStorageToast } from '@/components/Toast/storageToast';
 import { toast } from 'sonner';
+import { applySubTaskOps, appliesTo, SubTaskDelta, SubTaskNode } from '@/lib/subTaskTree';
 
 
 interface Task {
@@ -159,6 +160,8 @@ const resolveProcessTaskIdForToolkitEvent = (
 // Throttle streaming decompose text updates to prevent excessive re-renders
 const streamingDecomposeTextBuffer: Record<string, string> = {};
 const streamingDecomposeTextTimers: Record<string, ReturnType<typeof setTimeout>> = {};
+// Subtask tree as last sent by the backend, which sub_tasks_delta events apply to
+const subTaskTrees: Record<string, { seq: number; tree: SubTaskNode[] }> = {};
 
 const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 	(set, get) => ({
@@ -552,6 +555,13 @@ const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 			let lockedChatStore = targetChatStore;
 			let lockedTaskId = newTaskId;
 
+			// `end` messages of this session by task id: the backend sends `end` with the
+			// raw result and follows up with a `summary` event once the LLM summary is ready.
+			// An entry is made before the end handler awaits anything, so a summary
+			// arriving before the message is added is kept for it.
+			type EndMessage = { chatStore: VanillaChatStore; messageId: string; summary?: string };
+			const endMessages: Record<string, EndMessage> = {};
+
 			// Create AbortController for this task's SSE connection
 			// First check if there's already an active SSE connection for this task
 			if (activeSSEControllers[newTaskId]) {
@@ -631,6 +641,21 @@ const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 						return;
 					}
 
+					// Arrives after `end`, when the task is already finished
+					if (agentMessages.step === "summary") {
+						const { task_id, summary } = agentMessages.data;
+						const endMessage = endMessages[task_id];
+						if (endMessage) {
+							endMessage.summary = summary;
+							const { chatStore, messageId } = endMessage;
+							const message = chatStore.getState().tasks[task_id]?.messages.find((m: Message) => m.id === messageId);
+							if (message) {
+								chatStore.getState().updateMessage(task_id, messageId, { ...message, content: summary });
+							}
+						}
+						return;
+					}
+
 					// Check if this task has been stopped before processing any message
 					// But allow messages that switch to new tasks (like confirmed events)
 					const lockedTaskId = getCurrentTaskId();
@@ -829,6 +854,13 @@ const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 					if (agentMessages.step === "to_sub_tasks") {
 						// Clear streaming decompose text when task splitting is done
 						clearStreamingDecomposeText(currentTaskId);
+						// Keep the backend's version of the tree for later deltas
+						if (typeof agentMessages.data.seq === 'number') {
+							subTaskTrees[currentTaskId] = {
+								seq: agentMessages.data.seq,
+								tree: JSON.parse(JSON.stringify(agentMessages.data.sub_tasks || [])),
+							};
+						}
 						// Check if this is a multi-turn scenario after task completion
 						const isMultiTurnAfterCompletion = tasks[currentTaskId].status === 'finished';
 
@@ -928,6 +960,25 @@ const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 						setTaskRunning(currentTaskId, agentMessages.data.sub_tasks as TaskInfo[])
 						return;
 					}
+					if (agentMessages.step === "sub_tasks_delta") {
+						const delta = agentMessages.data as unknown as SubTaskDelta;
+						const showTree = (seq: number, tree: SubTaskNode[]) => {
+							subTaskTrees[currentTaskId] = { seq, tree };
+							const subTasks = tree.map((item) => ({ ...item, status: '' })) as TaskInfo[];
+							setTaskInfo(currentTaskId, subTasks);
+							setTaskRunning(currentTaskId, subTasks);
+						};
+						const known = subTaskTrees[currentTaskId];
+						if (known && appliesTo(delta, known.seq)) {
+							showTree(delta.seq, applySubTaskOps(known.tree, delta.ops));
+						} else if (project_id && type !== 'replay') {
+							// An update was missed: resync from the full tree
+							fetchGet(`/task/${project_id}/sub-tasks`)
+								.then((res: any) => res?.sub_tasks && showTree(res.seq, res.sub_tasks))
+								.catch((error: any) => console.warn('Failed to resync subtasks:', error));
+						}
+						return;
+					}
 					// Create agent
 					if (agentMessages.step === "create_agent") {
 						const { agent_name, agent_id } = agentMessages.data;
@@ -1603,6 +1654,8 @@ const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 					}
 
 					if (agentMessages.step === "end") {
+						const endEntry: EndMessage = { chatStore: lockedChatStore, messageId: generateUniqueId() };
+						endMessages[currentTaskId] = endEntry;
 						// compute task time
 						console.log('tasks[taskId].snapshotsTemp', tasks[currentTaskId].snapshotsTemp)
 						Promise.all(tasks[currentTaskId].snapshotsTemp.map((snapshot) =>
@@ -1739,9 +1792,9 @@ const chatStore = (initial?: Partial<ChatStore>) => createStore<ChatStore>()(
 
 						console.log('endMessage', endMessage)
 						newMessage = {
-							id: generateUniqueId(),
+							id: endEntry.messageId,
 							role: "agent",
-							content: endMessage || "",
+							content: endEntry.summary || endMessage || "",
 							step: agentMessages.step,
 							isConfirm: false,
 							fileList: fileList,
@@ -104,6 +104,7 @@ declare global {
 			failure_count?: number;
 			tokens?: number;
 			sub_tasks?: TaskInfo[];
+			seq?: number;
 			summary_task?: string;
 			content?: string;
 			notice?: string;
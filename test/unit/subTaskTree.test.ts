@@ -0,0 +1,35 @@
+import { describe, it, expect } from 'vitest'
+import { applySubTaskOps, appliesTo, SubTaskNode } from '@/lib/subTaskTree'
+
+const tree = (): SubTaskNode[] => [
+  { id: '1.1', content: 'Research', state: 'OPEN', subtasks: [] },
+  {
+    id: '1.2',
+    content: 'Write',
+    state: 'OPEN',
+    subtasks: [{ id: '1.2.1', content: 'Outline', state: 'OPEN', subtasks: [] }],
+  },
+]
+
+describe('subTaskTree', () => {
+  it('should apply remove, add and update ops in order', () => {
+    const original = tree()
+    const result = applySubTaskOps(original, [
+      { op: 'remove', id: '1.1' },
+      { op: 'update', id: '1.2.1', fields: { content: 'Detailed outline' } },
+      { op: 'add', parent: '1.2', index: 1, node: { id: '1.2.2', content: 'Draft', state: 'OPEN', subtasks: [] } },
+      { op: 'add', parent: null, index: 1, node: { id: '1.3', content: 'Review', state: 'OPEN', subtasks: [] } },
+    ])
+
+    expect(result.map((node) => node.id)).toEqual(['1.2', '1.3'])
+    expect(result[0].subtasks?.map((node) => node.content)).toEqual(['Detailed outline', 'Draft'])
+    // The input tree is left untouched
+    expect(original).toEqual(tree())
+  })
+
+  it('should only apply deltas based on the tree held', () => {
+    expect(appliesTo({ seq: 3, base_seq: 2, ops: [] }, 2)).toBe(true)
+    expect(appliesTo({ seq: 4, base_seq: 3, ops: [] }, 2)).toBe(false)
+    expect(appliesTo({ seq: 1, base_seq: 0, ops: [] }, undefined)).toBe(false)
+  })
+})
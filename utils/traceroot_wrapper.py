@@ -1,8 +1,24 @@
+from contextvars import ContextVar
+from functools import wraps
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable, Dict
+import inspect
 import logging
+import os
+import random
+import threading
+import time
 from dotenv import load_dotenv
 
+env_path = Path(__file__).resolve().parents[1] / '.env'
+
+load_dotenv(env_path)
+
+# Span attribute caps, applied by the OpenTelemetry SDK when TraceRoot
+# creates its tracer provider, which it does on import
+os.environ.setdefault("OTEL_SPAN_ATTRIBUTE_COUNT_LIMIT", os.getenv("TRACE_MAX_ATTRIBUTES", "32"))
+os.environ.setdefault("OTEL_ATTRIBUTE_VALUE_LENGTH_LIMIT", os.getenv("TRACE_MAX_ATTRIBUTE_CHARS", "1024"))
+
 # Try to import traceroot, but handle gracefully if not available
 try:
     import traceroot
@@ -29,16 +45,132 @@ def _get_module_name():
         del frame
     return 'unknown'
 
-env_path = Path(__file__).resolve().parents[1] / '.env'
+def parse_trace_samples(spec: str) -> Dict[str, float]:
+    """
+    `TRACE_SAMPLE` entries, comma separated: `prefix=rate` traces that
+    fraction of the calls to functions whose span name (`module.qualname`)
+    starts with `prefix`, e.g. `app.controller.chat_controller=0.1`.
+    """
+    rates: Dict[str, float] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, value = entry.partition("=")
+        try:
+            rates[prefix.strip()] = float(value)
+        except ValueError:
+            logging.getLogger("traceroot_wrapper").warning(f"Ignoring invalid TRACE_SAMPLE entry: {entry}")
+    return rates
 
-load_dotenv(env_path)
+
+def sample_rate(span_name: str, rates: Dict[str, float], default: float) -> float:
+    """The rate of the longest prefix in `rates` matching `span_name`."""
+    matches = [prefix for prefix in rates if span_name.startswith(prefix)]
+    return rates[max(matches, key=len)] if matches else default
+
+
+# Set while a call that was not sampled runs, so nothing below it is traced
+_sampled_out: ContextVar[bool] = ContextVar("trace_sampled_out", default=False)
+
+
+def sample_trace(function: Callable, traced: Callable, rate: float, parent_recording: Callable[[], bool]) -> Callable:
+    """
+    Head-based sampling in front of `traced`, the traced version of `function`.
+
+    A call inside a traced span is traced and one inside a call that was not
+    sampled is not, so a trace is kept or dropped as a whole. Only calls
+    without either start a trace, with probability `rate`. For generator
+    functions the decision holds until the iteration ends.
+    """
+    def decide() -> bool:
+        if _sampled_out.get():
+            return False
+        return parent_recording() or rate >= 1 or random.random() < rate
+
+    if inspect.isasyncgenfunction(function):
+        @wraps(function)
+        async def async_gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if decide():
+                async for item in traced(*args, **kwargs):
+                    yield item
+                return
+            token = _sampled_out.set(True)
+            try:
+                async for item in function(*args, **kwargs):
+                    yield item
+            finally:
+                _sampled_out.reset(token)
+
+        return async_gen_wrapper
+
+    if inspect.isgeneratorfunction(function):
+        @wraps(function)
+        def gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if decide():
+                return (yield from traced(*args, **kwargs))
+            token = _sampled_out.set(True)
+            try:
+                return (yield from function(*args, **kwargs))
+            finally:
+                _sampled_out.reset(token)
+
+        return gen_wrapper
+
+    if inspect.iscoroutinefunction(function):
+        @wraps(function)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if decide():
+                return await traced(*args, **kwargs)
+            token = _sampled_out.set(True)
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                _sampled_out.reset(token)
+
+        return async_wrapper
+
+    @wraps(function)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if decide():
+            return traced(*args, **kwargs)
+        token = _sampled_out.set(True)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _sampled_out.reset(token)
+
+    return wrapper
+
+
+_trace_default_rate = float(os.getenv("TRACE_SAMPLE_RATE", "1"))
+_trace_rates = parse_trace_samples(os.getenv("TRACE_SAMPLE", ""))
 
 if TRACEROOT_AVAILABLE and traceroot.init():
+    from opentelemetry import trace as _otel_trace
     from traceroot.logger import get_logger as _get_traceroot_logger
+    from traceroot.tracer import TraceOptions
+
+    def _parent_recording() -> bool:
+        return _otel_trace.get_current_span().is_recording()
 
-    trace = traceroot.trace
+    def trace(options: TraceOptions | None = None, sample: float | None = None):
+        """
+        TraceRoot's `trace`, sampled per `TRACE_SAMPLE_RATE` / `TRACE_SAMPLE`
+        or `sample`. Functions are left undecorated when their rate is 0, and
+        get TraceRoot's wrapper alone when no rate is below 1.
+        """
+        options = options or TraceOptions()
 
-    def get_logger(name: str = __name__):
+        def decorator(function: Callable) -> Callable:
+            rate = sample if sample is not None else sample_rate(options.get_span_name(function), _trace_rates, _trace_default_rate)
+            if rate <= 0:
+                return function
+            traced = traceroot.trace(options)(function)
+            if rate >= 1 and _trace_default_rate >= 1 and not _trace_rates:
+                return traced
+            return sample_trace(function, traced, rate, _parent_recording)
+
+        return decorator
+
+    def _make_logger(name: str):
         """Get TraceRoot logger instance."""
         return _get_traceroot_logger(name)
 
@@ -52,13 +184,14 @@ if TRACEROOT_AVAILABLE and traceroot.init():
     _init_logger.info("TraceRoot initialized successfully", extra={"backend": "traceroot", "service_module": module_name})
 else:
     # No-op implementations when TraceRoot is not configured
+    def _untraced(func: Callable) -> Callable:
+        return func
+
     def trace(*args, **kwargs):
-        """No-op trace decorator."""
-        def decorator(func: Callable) -> Callable:
-            return func
-        return decorator
+        """No-op trace decorator: functions are returned as they are."""
+        return _untraced
 
-    def get_logger(name: str = __name__):
+    def _make_logger(name: str):
         """Get standard Python logger when TraceRoot is disabled."""
         logger = logging.getLogger(name)
         if not logger.handlers:
@@ -82,4 +215,184 @@ else:
         _fallback_logger.warning("TraceRoot not available - using Python logging as fallback")
 
 
-__all__ = ['trace', 'get_logger', 'is_enabled']
+_DEBUG = logging.DEBUG
+_INFO = logging.INFO
+
+
+class RateLimit:
+    """Token bucket: `per_second` records on average, bursts of up to `burst`."""
+
+    def __init__(self, per_second: float, burst: float | None = None) -> None:
+        self.per_second = per_second
+        self.burst = burst if burst is not None else max(1.0, per_second)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.per_second)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class LogFacade:
+    """
+    The logger handed out by `get_logger`, in front of the TraceRoot or
+    standard logger.
+
+    It checks the level before doing anything else, so callers can defer the
+    cost of a record to when it is actually written:
+
+        logger.debug("Queued item", task_id=task_id, action=action)  # fields become `extra`
+        logger.info("Decomposing %s", task_id)                         # %-args formatted only if emitted
+        logger.debug(lambda: f"Content: {task.content[:200]}")         # message built only if emitted
+        logger.debug("Args", extra=lambda: {"args": json.dumps(args)})  # same for `extra`
+
+    `sample` keeps that fraction of DEBUG and INFO records and `per_second`
+    caps their rate; warnings and errors always go through. The first record
+    let through after some were dropped carries their count as `dropped`.
+    Records below `LOG_LEVEL` (default INFO) are dropped before any work,
+    including before reaching TraceRoot, whose logger accepts every level.
+    """
+
+    def __init__(self, logger: Any, sample: float = 1.0, per_second: float | None = None) -> None:
+        self._logger = logger
+        # TraceRoot wraps a standard logger and adds one call frame
+        self._std = getattr(logger, "logger", logger)
+        self._stacklevel = 3 if self._std is logger else 4
+        self._enabled = self._std.isEnabledFor
+        self.min_level = logging.DEBUG
+        self.sample = sample
+        self.limit = RateLimit(per_second) if per_second else None
+        self.dropped = 0
+
+    def isEnabledFor(self, level: int) -> bool:
+        return level >= self.min_level and self._enabled(level)
+
+    def configure(self, sample: float | None = None, per_second: float | None = None) -> "LogFacade":
+        if sample is not None:
+            self.sample = sample
+        if per_second is not None:
+            self.limit = RateLimit(per_second) if per_second > 0 else None
+        return self
+
+    # The two hot levels check inline instead of calling isEnabledFor
+    def debug(self, msg, *args, **kwargs) -> None:
+        if self.min_level <= _DEBUG and self._enabled(_DEBUG):
+            self._emit(_DEBUG, "debug", msg, args, kwargs)
+
+    def info(self, msg, *args, **kwargs) -> None:
+        if self.min_level <= _INFO and self._enabled(_INFO):
+            self._emit(_INFO, "info", msg, args, kwargs)
+
+    def warning(self, msg, *args, **kwargs) -> None:
+        if self.isEnabledFor(logging.WARNING):
+            self._emit(logging.WARNING, "warning", msg, args, kwargs)
+
+    warn = warning
+
+    def error(self, msg, *args, **kwargs) -> None:
+        if self.isEnabledFor(logging.ERROR):
+            self._emit(logging.ERROR, "error", msg, args, kwargs)
+
+    def exception(self, msg, *args, exc_info=True, **kwargs) -> None:
+        if self.isEnabledFor(logging.ERROR):
+            self._emit(logging.ERROR, "error", msg, args, {"exc_info": exc_info, **kwargs})
+
+    def critical(self, msg, *args, **kwargs) -> None:
+        if self.isEnabledFor(logging.CRITICAL):
+            self._emit(logging.CRITICAL, "critical", msg, args, kwargs)
+
+    def log(self, level: int, msg, *args, **kwargs) -> None:
+        if self.isEnabledFor(level):
+            self._emit(level, logging.getLevelName(level).lower(), msg, args, kwargs)
+
+    def _emit(self, level: int, method: str, msg, args: tuple, kwargs: Dict[str, Any]) -> None:
+        if level < logging.WARNING and (self.sample < 1 or self.limit is not None) and not self._admit():
+            return
+        log = getattr(self._logger, method, None)
+        if not kwargs and not self.dropped and log is not None and not callable(msg):
+            log(msg, *args, stacklevel=self._stacklevel)
+            return
+        extra = kwargs.pop("extra", None)
+        options = {key: kwargs.pop(key) for key in ("exc_info", "stack_info", "stacklevel") if key in kwargs}
+        if callable(msg):
+            msg = msg()
+        if callable(extra):
+            extra = extra()
+        if kwargs:
+            extra = {**extra, **kwargs} if extra else kwargs
+        if self.dropped:
+            extra = {**(extra or {}), "dropped": self.dropped}
+            self.dropped = 0
+        options["stacklevel"] = options.get("stacklevel", 1) + self._stacklevel - 1
+        if log is None:
+            self._std.log(level, msg, *args, extra=extra, **options)
+        else:
+            log(msg, *args, extra=extra, **options)
+
+    def _admit(self) -> bool:
+        if (self.sample >= 1 or random.random() < self.sample) and (self.limit is None or self.limit.allow()):
+            return True
+        self.dropped += 1
+        return False
+
+    def __getattr__(self, name: str) -> Any:
+        # handlers, setLevel, ... of the wrapped logger
+        return getattr(self._logger, name)
+
+
+def parse_log_limits(spec: str) -> Dict[str, Dict[str, float]]:
+    """
+    `LOG_LIMITS` entries, comma separated: `name=0.1` keeps a tenth of the
+    DEBUG/INFO records of logger `name`, `name=20/s` allows 20 per second.
+    """
+    limits: Dict[str, Dict[str, float]] = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = entry.partition("=")
+        try:
+            if value.endswith("/s"):
+                limits.setdefault(name.strip(), {})["per_second"] = float(value[:-2])
+            else:
+                limits.setdefault(name.strip(), {})["sample"] = float(value)
+        except ValueError:
+            logging.getLogger("traceroot_wrapper").warning(f"Ignoring invalid LOG_LIMITS entry: {entry}")
+    return limits
+
+
+_facades: Dict[str, LogFacade] = {}
+_facades_lock = threading.Lock()
+_log_limits = parse_log_limits(os.getenv("LOG_LIMITS", ""))
+_min_level = logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+if not isinstance(_min_level, int):
+    _min_level = logging.INFO
+
+
+def get_logger(name: str = __name__, sample: float | None = None, per_second: float | None = None) -> LogFacade:
+    """
+    Get the logger for `name`; the same facade is returned on every call.
+
+    `sample` and `per_second` set its sampling and rate limit (see
+    `LogFacade`); `LOG_LIMITS` overrides them from the environment.
+    """
+    facade = _facades.get(name)
+    if facade is None:
+        with _facades_lock:
+            facade = _facades.get(name)
+            if facade is None:
+                facade = LogFacade(_make_logger(name))
+                facade.min_level = _min_level
+                _facades[name] = facade
+    if sample is not None or per_second is not None:
+        facade.configure(sample, per_second)
+    if name in _log_limits:
+        facade.configure(**_log_limits[name])
+    return facade
+
+
+__all__ = ['trace', 'get_logger', 'is_enabled', 'LogFacade']